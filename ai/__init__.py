@@ -1,13 +1,35 @@
-from ai.estrategias import (
-    EstrategiaAleatoria,
-    EstrategiaPrimeroMejor,
-    EstrategiaMinimax,
-)
-from ai.evaluador import FuncionEvaluadora
-
-__all__ = [
-    "EstrategiaAleatoria",
-    "EstrategiaPrimeroMejor",
-    "EstrategiaMinimax",
-    "FuncionEvaluadora",
-]
+"""
+Estrategias de IA, evaluador y búsquedas.
+
+Como en core, los nombres se cargan al primer uso: `from ai import
+FactoriaEstrategias` no importa las estrategias, que se cargan al crear
+la primera (y df-pn, MCTS o numpy solo si esa estrategia los usa). ai no
+importa pygame.
+"""
+
+import importlib
+
+# Nombre público -> módulo que lo define
+_ORIGENES = {
+    "EstrategiaAleatoria": "ai.estrategias",
+    "EstrategiaPrimeroMejor": "ai.estrategias",
+    "EstrategiaMinimax": "ai.estrategias",
+    "EstrategiaMCTS": "ai.estrategias",
+    "FuncionEvaluadora": "ai.evaluador",
+    "EstadisticasBusqueda": "ai.estadisticas",
+    "FactoriaEstrategias": "ai.factoria",
+}
+
+__all__ = list(_ORIGENES)
+
+
+def __getattr__(nombre: str):
+    if nombre not in _ORIGENES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(_ORIGENES[nombre]), nombre)
+    globals()[nombre] = valor  # Las siguientes consultas no pasan por aquí
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
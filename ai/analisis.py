@@ -0,0 +1,45 @@
+"""
+Análisis de posiciones: las mejores jugadas con su valor y variación
+principal (multi-PV) para cualquier EstadoJuego, p. ej. para el botón
+"Pista" de la interfaz o para entrenadores.
+
+    lineas = analizar_estado(estado, k=3, tiempo_limite=1.0)
+    for linea in lineas:
+        print(linea.movimiento, linea.valor, linea.variacion)
+
+La búsqueda es EstrategiaMinimax.analizar: una sola profundización
+iterativa cuyas k líneas comparten la tabla de transposición.
+"""
+
+import threading
+from typing import List, Optional
+
+from core.interfaces import EstadoJuego
+from core.juego import MotorJuego
+from ai.estrategias import EstrategiaMinimax, LineaAnalisis
+
+__all__ = ["LineaAnalisis", "analizar_estado"]
+
+
+def analizar_estado(
+    estado: EstadoJuego,
+    k: int = 3,
+    profundidad: int = 4,
+    tiempo_limite: Optional[float] = None,
+    detener: Optional[threading.Event] = None,
+    jugador: Optional[str] = None,
+    estrategia: Optional[EstrategiaMinimax] = None,
+) -> List[LineaAnalisis]:
+    """
+    Las k mejores jugadas de `jugador` (por defecto, el de estado.turno).
+    Sin `tiempo_limite` ni `detener` busca hasta `profundidad`; con ellos,
+    hasta agotar el tiempo. Con `estrategia` se reutiliza su tabla de
+    transposición entre llamadas. No modifica `estado`.
+    """
+    jugador = jugador or estado.turno
+    if estrategia is None or estrategia.jugador != jugador:
+        estrategia = EstrategiaMinimax(jugador, profundidad=profundidad)
+    topologia = estado.topologia
+    motor = MotorJuego(topologia.tamano, topologia.envolvente)
+    motor.estado_actual = estado.copiar()
+    return estrategia.analizar(motor, k, tiempo_limite, detener)
@@ -0,0 +1,196 @@
+"""
+Caché de posiciones en disco (SQLite) compartida entre partidas y procesos.
+
+Cada entrada guarda, para una posición codificada con codificar_estado
+(tablero, cabezas y jugador en turno), la profundidad buscada, el valor y
+la cota desde el punto de vista del jugador en turno, y el índice de la
+mejor casilla. Así la misma entrada sirve a una IA azul y a una roja.
+
+    - Al abrirla se precargan en memoria las entradas más profundas
+      (hasta `max_memoria`); las demás se consultan en SQLite. Si el
+      archivo cabía entero en memoria no se vuelve a leer, salvo que otra
+      conexión haya escrito desde entonces (PRAGMA data_version).
+    - Los resultados nuevos se acumulan y se escriben en lotes
+      (`tamano_lote`, o al llamar a volcar()), sin pisar una entrada más
+      profunda que la nueva.
+    - Con más de `max_entradas` filas se desalojan primero las menos
+      profundas y, entre ellas, las usadas hace más tiempo.
+
+El archivo usa WAL, así que varios procesos (p. ej. el pool del servidor
+de partidas) pueden leer y escribir el mismo caché.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (profundidad, valor para el jugador en turno, cota, índice de casilla o -1)
+EntradaCache = Tuple[int, float, int, int]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS posiciones (
+    clave BLOB PRIMARY KEY,
+    profundidad INTEGER NOT NULL,
+    valor REAL NOT NULL,
+    cota INTEGER NOT NULL,
+    movimiento INTEGER NOT NULL,
+    acceso REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+_GUARDAR = """
+INSERT INTO posiciones (clave, profundidad, valor, cota, movimiento, acceso)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (clave) DO UPDATE SET
+    profundidad = excluded.profundidad,
+    valor = excluded.valor,
+    cota = excluded.cota,
+    movimiento = excluded.movimiento,
+    acceso = excluded.acceso
+WHERE excluded.profundidad >= posiciones.profundidad
+"""
+
+
+class CachePersistente:
+    """Tabla de posiciones persistente con escritura por lotes y desalojo"""
+
+    def __init__(
+        self,
+        ruta: str,
+        max_entradas: int = 1_000_000,
+        max_memoria: int = 200_000,
+        profundidad_minima: int = 2,
+        tamano_lote: int = 1000,
+    ):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.max_memoria = max_memoria
+        # Solo vale la pena guardar (y consultar) resultados de búsquedas
+        # de al menos esta profundidad
+        self.profundidad_minima = profundidad_minima
+        self.tamano_lote = tamano_lote
+
+        self.lecturas_disco = 0
+        self.aciertos = 0
+        self.escrituras = 0
+
+        self._conexion = sqlite3.connect(ruta, timeout=30.0)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(_ESQUEMA)
+        self._conexion.commit()
+
+        self._memoria: Dict[bytes, EntradaCache] = {}
+        self._pendientes: Dict[bytes, EntradaCache] = {}
+        self._precargar()
+
+    def _precargar(self) -> None:
+        filas = self._conexion.execute(
+            "SELECT clave, profundidad, valor, cota, movimiento FROM posiciones "
+            "ORDER BY profundidad DESC, acceso DESC LIMIT ?",
+            (self.max_memoria,),
+        )
+        for clave, profundidad, valor, cota, movimiento in filas:
+            self._memoria[clave] = (profundidad, valor, cota, movimiento)
+        self._todo_en_memoria = len(self._memoria) < self.max_memoria
+        self._version_precarga = self._version_datos()
+        logger.debug("Caché %s: %d entradas precargadas", self.ruta, len(self._memoria))
+
+    def _version_datos(self) -> int:
+        # Cambia cuando otra conexión confirma una escritura (no las propias)
+        (version,) = self._conexion.execute("PRAGMA data_version").fetchone()
+        return version
+
+    def __len__(self) -> int:
+        (cantidad,) = self._conexion.execute("SELECT COUNT(*) FROM posiciones").fetchone()
+        return cantidad + sum(1 for c in self._pendientes if c not in self._memoria)
+
+    def obtener(self, clave: bytes) -> Optional[EntradaCache]:
+        entrada = self._pendientes.get(clave) or self._memoria.get(clave)
+        if (
+            entrada is None
+            and self._todo_en_memoria
+            and self._version_datos() != self._version_precarga
+        ):
+            # Otro proceso escribió: la memoria ya no es todo el archivo
+            self._todo_en_memoria = False
+        if entrada is None and not self._todo_en_memoria:
+            self.lecturas_disco += 1
+            fila = self._conexion.execute(
+                "SELECT profundidad, valor, cota, movimiento FROM posiciones "
+                "WHERE clave = ?",
+                (clave,),
+            ).fetchone()
+            if fila is not None:
+                entrada = tuple(fila)
+                if len(self._memoria) < self.max_memoria:
+                    self._memoria[clave] = entrada
+        if entrada is not None:
+            self.aciertos += 1
+        return entrada
+
+    def guardar(
+        self, clave: bytes, profundidad: int, valor: float, cota: int, movimiento: int
+    ) -> None:
+        """Anota un resultado; se escribe en disco con el próximo lote"""
+        if profundidad < self.profundidad_minima:
+            return
+        anterior = self._pendientes.get(clave) or self._memoria.get(clave)
+        if anterior is not None and anterior[0] > profundidad:
+            return
+        self._pendientes[clave] = (profundidad, valor, cota, movimiento)
+        if len(self._pendientes) >= self.tamano_lote:
+            self.volcar()
+
+    def volcar(self) -> None:
+        """Escribe los resultados pendientes en una transacción y desaloja"""
+        if not self._pendientes:
+            return
+        ahora = time.time()
+        filas = [
+            (clave, profundidad, valor, cota, movimiento, ahora)
+            for clave, (profundidad, valor, cota, movimiento) in self._pendientes.items()
+        ]
+        with self._conexion:
+            self._conexion.executemany(_GUARDAR, filas)
+            self._desalojar()
+        self.escrituras += len(filas)
+        for clave, entrada in self._pendientes.items():
+            if clave in self._memoria or len(self._memoria) < self.max_memoria:
+                self._memoria[clave] = entrada
+            else:
+                self._todo_en_memoria = False
+        self._pendientes.clear()
+
+    def _desalojar(self) -> None:
+        (cantidad,) = self._conexion.execute("SELECT COUNT(*) FROM posiciones").fetchone()
+        sobrantes = cantidad - self.max_entradas
+        if sobrantes <= 0:
+            return
+        desalojadas = [
+            fila[0]
+            for fila in self._conexion.execute(
+                "SELECT clave FROM posiciones ORDER BY profundidad ASC, acceso ASC LIMIT ?",
+                (sobrantes,),
+            )
+        ]
+        self._conexion.executemany(
+            "DELETE FROM posiciones WHERE clave = ?", ((clave,) for clave in desalojadas)
+        )
+        for clave in desalojadas:
+            self._memoria.pop(clave, None)
+            self._pendientes.pop(clave, None)
+        logger.debug("Caché %s: %d entradas desalojadas", self.ruta, sobrantes)
+
+    def cerrar(self) -> None:
+        self.volcar()
+        self._conexion.close()
+
+    def __enter__(self) -> "CachePersistente":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
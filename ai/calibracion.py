@@ -0,0 +1,166 @@
+"""
+Calibración de la máquina: cuántos nodos de minimax y cuántas simulaciones
+de Monte Carlo por segundo hace, para que cada dificultad responda en más
+o menos el mismo tiempo en cualquier equipo.
+
+La medición tarda alrededor de medio segundo (busca sobre unas posiciones
+fijas de 7x7) y se guarda en un JSON en disco junto con una huella de la
+máquina (arquitectura, procesador, versión de Python y VERSION); mientras
+la huella no cambie, los arranques siguientes solo leen el archivo.
+
+Cada dificultad de búsqueda tiene un PresupuestoDificultad: un trabajo
+objetivo (nodos o simulaciones, es decir, la fuerza del nivel) y una
+latencia máxima. En una máquina rápida el nivel hace exactamente su
+trabajo objetivo y responde antes; en una lenta, hace lo que alcanza en la
+latencia:
+
+    calibracion = obtener_calibracion()
+    nodos = calibracion.presupuesto(Dificultad.EXPERTO)
+"""
+
+import json
+import logging
+import os
+import platform
+import random
+import time
+from typing import Dict, NamedTuple, Optional
+
+from core.interfaces import AZUL, Dificultad
+from core.juego import MotorJuego
+
+logger = logging.getLogger(__name__)
+
+# Subirla cuando un cambio en la búsqueda altere su velocidad: invalida
+# las calibraciones guardadas
+VERSION = 1
+RUTA_CALIBRACION = os.path.join(
+    os.path.expanduser("~"), ".cache", "snake_vs_snake", "calibracion.json"
+)
+# Posiciones de referencia (apertura, medio juego y final): tantas jugadas
+# al azar desde el tablero vacío
+JUGADAS_REFERENCIA = (2, 10, 18)
+NODOS_POR_MEDICION = 5_000
+SIMULACIONES_POR_MEDICION = 500
+
+
+class PresupuestoDificultad(NamedTuple):
+    trabajo: int  # Nodos (minimax) o simulaciones (MCTS) en una máquina rápida
+    latencia: float  # Segundos por jugada como máximo
+    minimo: int  # Piso del trabajo en máquinas muy lentas
+
+
+PRESUPUESTOS: Dict[Dificultad, PresupuestoDificultad] = {
+    Dificultad.EXPERTO: PresupuestoDificultad(5_000, 0.25, 200),
+    Dificultad.MAESTRO: PresupuestoDificultad(10_000, 1.0, 100),
+}
+
+
+class Calibracion(NamedTuple):
+    nodos_por_segundo: float  # EstrategiaMinimax
+    simulaciones_por_segundo: float  # EstrategiaMCTS
+    huella: str
+    fecha: float
+
+    def presupuesto(self, dificultad: Dificultad) -> int:
+        """Nodos (EXPERTO) o simulaciones (MAESTRO) por jugada en esta máquina"""
+        objetivo = PRESUPUESTOS[dificultad]
+        velocidad = (
+            self.simulaciones_por_segundo
+            if dificultad == Dificultad.MAESTRO
+            else self.nodos_por_segundo
+        )
+        alcanzable = int(velocidad * objetivo.latencia)
+        return max(objetivo.minimo, min(objetivo.trabajo, alcanzable))
+
+
+def huella_maquina() -> str:
+    return "|".join((
+        platform.machine(), platform.processor(), platform.python_implementation(),
+        platform.python_version(), str(VERSION),
+    ))
+
+
+def _posiciones_referencia():
+    rng = random.Random(0)
+    for jugadas in JUGADAS_REFERENCIA:
+        motor = MotorJuego()
+        motor.inicializar_juego(AZUL)
+        for _ in range(jugadas):
+            estado = motor.obtener_estado_actual()
+            motor.realizar_movimiento(rng.choice(motor.obtener_movimientos_validos(estado.turno)))
+        yield motor
+
+
+def calibrar(segundos: float = 0.5) -> Calibracion:
+    """Mide esta máquina: dos tercios de `segundos` en minimax, el resto en MCTS"""
+    from ai.estrategias import EstrategiaMCTS, EstrategiaMinimax
+
+    posiciones = list(_posiciones_referencia())
+    nodos = simulaciones = 0
+    tiempo_nodos = tiempo_simulaciones = 0.0
+    fin = time.perf_counter() + segundos * 2 / 3
+    while not nodos or time.perf_counter() < fin:
+        for motor in posiciones:
+            estrategia = EstrategiaMinimax(motor.estado_actual.turno)
+            _, estadisticas = estrategia.buscar(motor, max_nodos=NODOS_POR_MEDICION)
+            nodos += estadisticas.nodos
+            tiempo_nodos += estadisticas.tiempo_total
+
+    fin = time.perf_counter() + segundos / 3
+    while not simulaciones or time.perf_counter() < fin:
+        for motor in posiciones:
+            estrategia = EstrategiaMCTS(
+                motor.estado_actual.turno, simulaciones=SIMULACIONES_POR_MEDICION, semilla=0
+            )
+            _, estadisticas = estrategia.buscar(motor)
+            simulaciones += estadisticas.simulaciones
+            tiempo_simulaciones += estadisticas.tiempo_total
+
+    return Calibracion(
+        nodos / max(tiempo_nodos, 1e-9), simulaciones / max(tiempo_simulaciones, 1e-9),
+        huella_maquina(), time.time(),
+    )
+
+
+def cargar_calibracion(ruta: str = RUTA_CALIBRACION) -> Optional[Calibracion]:
+    """La calibración guardada, si existe y es de esta máquina"""
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            calibracion = Calibracion(**json.load(archivo))
+    except (OSError, ValueError, TypeError):
+        return None
+    if calibracion.huella != huella_maquina():
+        return None
+    return calibracion
+
+
+def guardar_calibracion(calibracion: Calibracion, ruta: str = RUTA_CALIBRACION) -> None:
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(calibracion._asdict(), archivo, indent=2)
+    os.replace(temporal, ruta)
+
+
+def obtener_calibracion(ruta: str = RUTA_CALIBRACION, recalibrar: bool = False) -> Calibracion:
+    """
+    Lee la calibración de `ruta` o, si falta, es de otra máquina o se pide
+    `recalibrar`, mide y la guarda. Si no se puede escribir (disco de solo
+    lectura) se usa la medición igual.
+    """
+    calibracion = None if recalibrar else cargar_calibracion(ruta)
+    if calibracion is not None:
+        return calibracion
+    calibracion = calibrar()
+    logger.info(
+        "Calibración: %.0f nodos/s, %.0f simulaciones/s",
+        calibracion.nodos_por_segundo, calibracion.simulaciones_por_segundo,
+    )
+    try:
+        guardar_calibracion(calibracion, ruta)
+    except OSError:
+        logger.warning("No se pudo guardar la calibración en %s", ruta, exc_info=True)
+    return calibracion
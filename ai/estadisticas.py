@@ -0,0 +1,147 @@
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+from core.interfaces import Posicion
+
+
+class EstadisticasBusqueda:
+    """
+    Contadores de una búsqueda de la IA (una llamada a seleccionar_movimiento).
+    Se llenan durante la búsqueda y se entregan junto con el movimiento.
+    """
+
+    def __init__(self):
+        self.nodos = 0
+        self.evaluaciones = 0  # Hojas evaluadas con la función evaluadora
+        self.cortes = 0  # Podas alfa-beta
+        self.extensiones = 0  # Jugadas forzadas recorridas sin gastar profundidad
+        self.reducciones = 0  # Jugadas tardías probadas con una profundidad menos
+        self.re_busquedas = 0  # Ventana nula o reducción superada: se buscó de nuevo
+        self.fallos_aspiracion = 0  # Raíz fuera de la ventana de aspiración
+        self.consultas_cache = 0
+        self.aciertos_cache = 0
+        self.aciertos_cache_persistente = 0  # Entradas leídas del caché en disco
+        self.aciertos_compartida = 0  # Entradas leídas de la tabla entre procesos
+        self.aciertos_finales = 0  # Posiciones resueltas por la tabla de finales
+        self.nodos_prueba = 0  # Nodos de la búsqueda por números de prueba
+        self.victoria_demostrada = False  # La jugada sale de una prueba completa
+        self.simulaciones = 0  # Partidas simuladas por Monte Carlo
+        self.simulaciones_reutilizadas = 0  # Heredadas del árbol del turno anterior
+        self.profundidad_alcanzada = 0
+        self.tiempo_por_profundidad: List[float] = []
+        self.tiempo_total = 0.0
+        self.mejor_movimiento: Optional[Posicion] = None
+        self.mejor_valor: Optional[float] = None
+        # Valor de cada jugada de la raíz en la última profundidad completa.
+        # Solo se llena si hay callback de progreso; las jugadas que no
+        # mejoran a la mejor tienen una cota superior (poda alfa)
+        self.valores_raiz: Optional[Dict[Posicion, float]] = None
+        # La búsqueda se cortó por tiempo o por una orden de detenerse
+        self.interrumpida = False
+
+    @property
+    def tasa_aciertos_cache(self) -> float:
+        """Fracción de consultas a la tabla de transposición que sirvieron"""
+        if not self.consultas_cache:
+            return 0.0
+        return self.aciertos_cache / self.consultas_cache
+
+    @property
+    def nodos_por_segundo(self) -> float:
+        if self.tiempo_total <= 0:
+            return 0.0
+        return self.nodos / self.tiempo_total
+
+    @property
+    def simulaciones_por_segundo(self) -> float:
+        if self.tiempo_total <= 0:
+            return 0.0
+        return self.simulaciones / self.tiempo_total
+
+    def resumen(self) -> dict:
+        """Versión serializable (logs, JSON, overlay de la GUI)"""
+        return {
+            "nodos": self.nodos,
+            "evaluaciones": self.evaluaciones,
+            "cortes": self.cortes,
+            "extensiones": self.extensiones,
+            "reducciones": self.reducciones,
+            "re_busquedas": self.re_busquedas,
+            "fallos_aspiracion": self.fallos_aspiracion,
+            "tasa_aciertos_cache": self.tasa_aciertos_cache,
+            "aciertos_cache_persistente": self.aciertos_cache_persistente,
+            "aciertos_compartida": self.aciertos_compartida,
+            "aciertos_finales": self.aciertos_finales,
+            "nodos_prueba": self.nodos_prueba,
+            "victoria_demostrada": self.victoria_demostrada,
+            "simulaciones": self.simulaciones,
+            "simulaciones_reutilizadas": self.simulaciones_reutilizadas,
+            "simulaciones_por_segundo": self.simulaciones_por_segundo,
+            "profundidad_alcanzada": self.profundidad_alcanzada,
+            "tiempo_por_profundidad": list(self.tiempo_por_profundidad),
+            "tiempo_total": self.tiempo_total,
+            "nodos_por_segundo": self.nodos_por_segundo,
+            "mejor_movimiento": self.mejor_movimiento,
+            "mejor_valor": self.mejor_valor,
+            "interrumpida": self.interrumpida,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"EstadisticasBusqueda(nodos={self.nodos}, "
+            f"profundidad={self.profundidad_alcanzada}, "
+            f"cortes={self.cortes}, "
+            f"cache={self.tasa_aciertos_cache:.0%}, "
+            f"nps={self.nodos_por_segundo:.0f})"
+        )
+
+
+# Firma del callback de progreso: recibe las estadísticas tras cada profundidad
+CallbackProgreso = Callable[[EstadisticasBusqueda], None]
+
+
+class ProgresoBusqueda(NamedTuple):
+    """Foto del progreso de una búsqueda, tal como la entrega CanalProgreso"""
+
+    clave: object  # La que se pasó a CanalProgreso.reiniciar (p.ej. estado.clave())
+    profundidad: int
+    valores: Dict[Posicion, float]  # Por jugada de la raíz
+    mejor_movimiento: Optional[Posicion]
+
+
+class CanalProgreso:
+    """
+    Canal entre el hilo que busca y quien muestra el progreso (la GUI).
+    `publicar` sirve como callback_progreso: guarda una copia del último
+    resultado bajo un lock y avisa con `al_publicar` (p.ej. para despertar
+    el bucle de la interfaz). El lector toma la última foto con `ultimo`.
+    Si la estrategia no tiene callback no se arma nada de esto.
+    """
+
+    def __init__(self, al_publicar: Optional[Callable[[], None]] = None):
+        self.al_publicar = al_publicar
+        self._lock = threading.Lock()
+        self._clave: object = None
+        self._ultimo: Optional[ProgresoBusqueda] = None
+
+    def reiniciar(self, clave: object) -> None:
+        """Descarta lo publicado y etiqueta lo siguiente con `clave`"""
+        with self._lock:
+            self._clave = clave
+            self._ultimo = None
+
+    def publicar(self, estadisticas: EstadisticasBusqueda) -> None:
+        if estadisticas.valores_raiz is None:
+            return
+        with self._lock:
+            self._ultimo = ProgresoBusqueda(
+                self._clave,
+                estadisticas.profundidad_alcanzada,
+                dict(estadisticas.valores_raiz),
+                estadisticas.mejor_movimiento,
+            )
+        if self.al_publicar is not None:
+            self.al_publicar()
+
+    def ultimo(self) -> Optional[ProgresoBusqueda]:
+        with self._lock:
+            return self._ultimo
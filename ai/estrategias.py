@@ -1,7 +1,53 @@
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
+import logging
 import random
-from core.interfaces import Posicion, EstadoJuego
+import threading
+import time
+from core.interfaces import AZUL, ROJO, CODIGO_VACIO, CODIGOS, Posicion, EstadoJuego
+from core.estado import GestorEstado
+from core.serializacion import codificar_estado
 from ai.evaluador import FuncionEvaluadora
+from ai.estadisticas import EstadisticasBusqueda, CallbackProgreso
+from ai.finales import EMPATE, GANA, ResultadoFinal
+
+logger = logging.getLogger(__name__)
+
+# Valor de una posición ganada (se suma la profundidad restante para
+# preferir las victorias más cortas y las derrotas más largas)
+VICTORIA = 1000.0
+
+# Tipos de cota guardados en la tabla de transposición
+EXACTA = 0
+INFERIOR = 1  # El valor real es >= al guardado (corte beta)
+SUPERIOR = 2  # El valor real es <= al guardado (ningún movimiento superó alfa)
+# La cota vista desde el otro jugador (el valor cambia de signo)
+COTA_OPUESTA = {EXACTA: EXACTA, INFERIOR: SUPERIOR, SUPERIOR: INFERIOR}
+
+# Cada cuántos nodos se comprueba el reloj / la orden de detenerse
+NODOS_ENTRE_COMPROBACIONES = 256
+
+# Los valores son enteros (diferencia de movilidad, VICTORIA + profundidad):
+# una ventana (alfa, alfa + 1) solo responde si el valor supera a alfa
+VENTANA_NULA = 1.0
+# Media ventana de aspiración alrededor del valor de la iteración anterior
+VENTANA_ASPIRACION = 1.0
+# Reducciones de jugadas tardías: desde la jugada número LMR_DESDE_JUGADA
+# (0 = la primera) en nodos con al menos LMR_PROFUNDIDAD_MINIMA por delante
+LMR_DESDE_JUGADA = 2
+LMR_PROFUNDIDAD_MINIMA = 3
+
+
+class BusquedaInterrumpida(Exception):
+    """Se agotó el tiempo de la búsqueda o se pidió detenerla"""
+
+
+class LineaAnalisis(NamedTuple):
+    """Una de las mejores jugadas según EstrategiaMinimax.analizar"""
+
+    movimiento: Posicion
+    valor: float  # Desde el punto de vista de quien mueve en la raíz
+    # Variación principal: el movimiento y las respuestas esperadas
+    variacion: List[Posicion]
 
 
 class EstrategiaIA:
@@ -10,16 +56,25 @@ class EstrategiaIA:
     def __init__(self, jugador: str):
         self.jugador = jugador
         self.evaluador = FuncionEvaluadora()
+        self.ultimas_estadisticas: Optional[EstadisticasBusqueda] = None
 
-    def seleccionar_movimiento(self, motor_juego) -> Optional[Posicion]:
-        """Método abstracto - debe ser implementado por subclases"""
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
+        """
+        Método abstracto - debe ser implementado por subclases. Las
+        estrategias que buscan terminan antes (con la mejor jugada hasta
+        ese momento) si se activa `detener`.
+        """
         raise NotImplementedError
 
 
 class EstrategiaAleatoria(EstrategiaIA):
     """Nivel Principiante - Selección aleatoria"""
 
-    def seleccionar_movimiento(self, motor_juego) -> Optional[Posicion]:
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
         """
         INTERFAZ PARA PERSONA 3
         Retorna movimiento aleatorio válido o None si no hay movimientos
@@ -31,7 +86,9 @@ class EstrategiaAleatoria(EstrategiaIA):
 class EstrategiaPrimeroMejor(EstrategiaIA):
     """Nivel Normal - Primero el mejor (greedy)"""
 
-    def seleccionar_movimiento(self, motor_juego) -> Optional[Posicion]:
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
         """
         INTERFAZ PARA PERSONA 3
         Evalúa todos los movimientos y retorna el mejor según función evaluadora
@@ -63,180 +120,867 @@ class EstrategiaPrimeroMejor(EstrategiaIA):
 class EstrategiaMinimax(EstrategiaIA):
     """Nivel Experto - Algoritmo Minimax"""
 
-    def __init__(self, jugador: str, profundidad: int = 3):
+    def __init__(
+        self,
+        jugador: str,
+        profundidad: int = 3,
+        callback_progreso: Optional[CallbackProgreso] = None,
+        tamano_tabla: int = 200_000,
+        cache=None,
+        finales=None,
+        extender_forzadas: bool = True,
+        compartida=None,
+        max_nodos: Optional[int] = None,
+        pvs: bool = True,
+        aspiracion: bool = True,
+        reducciones: bool = True,
+    ):
         super().__init__(jugador)
         self.profundidad = profundidad
-        self.oponente = "rojo" if jugador == "azul" else "azul"
+        # Con `max_nodos`, seleccionar_movimiento profundiza hasta gastar
+        # esos nodos en lugar de parar en `profundidad` (ver ai.calibracion)
+        self.max_nodos = max_nodos
+        self.oponente = ROJO if jugador == AZUL else AZUL
+        self.callback_progreso = callback_progreso
+        # Tabla de transposición: clave -> (profundidad, valor, cota, movimiento)
+        self.tabla: dict = {}
+        self.tamano_tabla = tamano_tabla
+        # Caché persistente opcional (ai.cache_persistente.CachePersistente)
+        self.cache = cache
+        # Tabla de finales opcional (ai.finales.TablaFinales): valor exacto
+        # de las posiciones con pocas casillas vacías
+        self.finales = finales
+        # Tabla de transposición opcional en memoria compartida entre
+        # procesos (ai.tabla_compartida.TablaCompartida)
+        self.compartida = compartida
+        # Las jugadas forzadas (una sola respuesta) no gastan profundidad
+        self.extender_forzadas = extender_forzadas
+        # Búsqueda de variación principal (ventanas nulas tras la primera
+        # jugada), ventanas de aspiración en la raíz y reducciones de
+        # jugadas tardías; cada una se puede apagar para medirla aparte
+        self.pvs = pvs
+        self.aspiracion = aspiracion
+        self.reducciones = reducciones
+        self._estadisticas = EstadisticasBusqueda()
+        # Control de la búsqueda en curso (ver buscar)
+        self._vigilar = False
+        self._fin: Optional[float] = None
+        self._detener: Optional[threading.Event] = None
+        self._max_nodos: Optional[int] = None
 
-    def seleccionar_movimiento(self, motor_juego) -> Optional[Posicion]:
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
         """
         INTERFAZ PARA PERSONA 3
-        Implementa minimax con la profundidad especificada
+        Implementa minimax con la profundidad especificada, o con el
+        presupuesto de nodos si se indicó `max_nodos`
         """
         try:
-            print(f"[DEBUG] IA Minimax iniciando movimiento para jugador: {self.jugador}")
-            
-            # USAR EL MOTOR CORRECTAMENTE - solo movimientos desde la cabeza
-            movimientos = motor_juego.obtener_movimientos_validos(self.jugador)
-            if not movimientos:
-                print("[DEBUG] No hay movimientos válidos disponibles")
-                return None
-            
-            print(f"[DEBUG] Movimientos válidos desde cabeza encontrados: {len(movimientos)}")
-            
-            # Si solo hay un movimiento, devolverlo directamente
-            if len(movimientos) == 1:
-                print(f"[DEBUG] Solo un movimiento disponible: {movimientos[0]}")
-                return movimientos[0]
-            
-            estado_actual = motor_juego.obtener_estado_actual()
-            
-            mejor_movimiento = None
-            mejor_valor = float("-inf")
-            
-            print(f"[DEBUG] Evaluando {len(movimientos)} movimientos...")
-            
-            for i, movimiento in enumerate(movimientos):
-                print(f"[DEBUG] Evaluando movimiento {i+1}/{len(movimientos)}: {movimiento}")
-                
-                # USAR EL MÉTODO DE SIMULACIÓN DEL MOTOR
-                estado_simulado = motor_juego.simular_movimiento(estado_actual, movimiento, self.jugador)
-                
-                if estado_simulado is None:
-                    print(f"[DEBUG] Movimiento {movimiento} no es válido según simulación")
-                    continue
-                
-                # Llamar a minimax
-                try:
-                    valor, _ = self.minimax(
-                        estado_simulado,
-                        self.profundidad - 1,
-                        False,  # Siguiente turno es del oponente (minimizar)
-                        motor_juego
-                    )
-                    
-                    print(f"[DEBUG] Movimiento {movimiento} evaluado con valor: {valor}")
-                    
-                    if valor > mejor_valor:
-                        mejor_valor = valor
-                        mejor_movimiento = movimiento
-                        print(f"[DEBUG] Nuevo mejor movimiento: {movimiento} con valor {valor}")
-                        
-                except Exception as e:
-                    print(f"[DEBUG] Error evaluando movimiento {movimiento}: {e}")
-                    continue
-            
-            print(f"[DEBUG] Mejor movimiento seleccionado: {mejor_movimiento}")
-            return mejor_movimiento
-            
-        except Exception as e:
-            print(f"[ERROR] Error en seleccionar_movimiento: {e}")
+            movimiento, _ = self.buscar(
+                motor_juego, detener=detener,
+                # `detener` no cambia la profundidad del nivel
+                profundidad_maxima=self.profundidad if self.max_nodos is None else None,
+                max_nodos=self.max_nodos,
+            )
+            return movimiento
+        except Exception:
+            logger.exception("Error en seleccionar_movimiento")
             # Fallback: devolver movimiento aleatorio válido
             movimientos = motor_juego.obtener_movimientos_validos(self.jugador)
             if movimientos:
                 fallback = random.choice(movimientos)
-                print(f"[FALLBACK] Usando movimiento aleatorio: {fallback}")
+                logger.warning("Usando movimiento aleatorio: %s", fallback)
                 return fallback
             return None
 
-    def minimax(
-        self, 
-        estado: EstadoJuego, 
-        profundidad: int, 
-        es_maximizando: bool, 
-        motor_juego
-    ) -> Tuple[float, Optional[Posicion]]:
-        """Algoritmo minimax recursivo que respeta las reglas del Snake"""
-        
-        try:
-            # Condición de parada por profundidad
-            if profundidad <= 0:
-                try:
-                    valor = self.evaluador.evaluar_estado(estado, motor_juego)
-                    # Ajustar evaluación según perspectiva del jugador IA
-                    if self.jugador == "rojo":
-                        valor = -valor
-                    return valor, None
-                except Exception as e:
-                    print(f"[ERROR] Error en evaluación: {e}")
-                    return 0.0, None
-
-            # Determinar jugador actual según el contexto de minimax
-            jugador_actual = self.jugador if es_maximizando else self.oponente
-
-            # CRÍTICO: Obtener movimientos válidos SOLO desde la cabeza del jugador actual
-            movimientos = motor_juego.obtener_movimientos_validos(jugador_actual)
-            
-            if not movimientos:
-                # No hay movimientos - evaluar estado actual
-                try:
-                    valor = self.evaluador.evaluar_estado(estado, motor_juego)
-                    if self.jugador == "rojo":
-                        valor = -valor
-                    return valor, None
-                except Exception as e:
-                    print(f"[ERROR] Error evaluando estado sin movimientos: {e}")
-                    return 0.0, None
-
-            mejor_movimiento = None
-            
-            if es_maximizando:
-                mejor_valor = float("-inf")
-                
-                for movimiento in movimientos:
-                    # USAR SIMULACIÓN CORRECTA DEL MOTOR
-                    nuevo_estado = motor_juego.simular_movimiento(estado, movimiento, jugador_actual)
-                    
-                    if nuevo_estado is None:
-                        continue  # Movimiento inválido
-                    
-                    # Llamada recursiva
-                    valor, _ = self.minimax(
-                        nuevo_estado, 
-                        profundidad - 1, 
-                        False,  # Cambiar a minimizar
-                        motor_juego
-                    )
-                    
-                    if valor > mejor_valor:
-                        mejor_valor = valor
-                        mejor_movimiento = movimiento
-                        
-            else:  # Minimizando
-                mejor_valor = float("inf")
-                
+    def buscar(
+        self,
+        motor_juego,
+        tiempo_limite: Optional[float] = None,
+        detener: Optional[threading.Event] = None,
+        profundidad_maxima: Optional[int] = None,
+        max_nodos: Optional[int] = None,
+    ) -> Tuple[Optional[Posicion], EstadisticasBusqueda]:
+        """
+        Búsqueda por profundización iterativa (1..profundidad) con poda
+        alfa-beta y tabla de transposición.
+        Retorna el mejor movimiento y las estadísticas de la búsqueda.
+
+        Con `tiempo_limite` (segundos), `detener` o `max_nodos` la
+        profundidad solo la limita `profundidad_maxima` (por defecto, las
+        casillas vacías): se profundiza hasta que se agota el tiempo, se
+        activa el evento o se gastan los nodos, y se devuelve el mejor
+        movimiento de la última iteración completa.
+        """
+        depurar = logger.isEnabledFor(logging.DEBUG)
+        estadisticas = EstadisticasBusqueda()
+        self._estadisticas = estadisticas
+        self.ultimas_estadisticas = estadisticas
+        inicio = time.perf_counter()
+        self._fin = None if tiempo_limite is None else inicio + tiempo_limite
+        self._detener = detener
+        self._max_nodos = max_nodos
+        self._vigilar = self._fin is not None or detener is not None or max_nodos is not None
+
+        estado_actual = motor_juego.obtener_estado_actual()
+        if profundidad_maxima is None:
+            profundidad_maxima = (
+                estado_actual.celdas.count(CODIGO_VACIO)
+                if self._vigilar
+                else self.profundidad
+            )
+        movimientos = GestorEstado.obtener_movimientos_validos(
+            estado_actual, self.jugador
+        )
+        if depurar:
+            logger.debug(
+                "Minimax %s: %d movimientos válidos", self.jugador, len(movimientos)
+            )
+
+        if not movimientos:
+            return None, estadisticas
+
+        # Si solo hay un movimiento, devolverlo directamente
+        if len(movimientos) == 1:
+            estadisticas.mejor_movimiento = movimientos[0]
+            estadisticas.tiempo_total = time.perf_counter() - inicio
+            return movimientos[0], estadisticas
+
+        # Posición ya analizada a esta profundidad en otra partida
+        if self.cache is not None and not self._vigilar:
+            entrada = self._consultar_cache(estado_actual, self.jugador)
+            if (
+                entrada is not None
+                and (entrada[0] >= profundidad_maxima or abs(entrada[1]) >= VICTORIA)
+                and entrada[2] == EXACTA
+                and entrada[3] in movimientos
+            ):
+                estadisticas.aciertos_cache_persistente += 1
+                estadisticas.profundidad_alcanzada = entrada[0]
+                estadisticas.mejor_valor = entrada[1]
+                estadisticas.mejor_movimiento = entrada[3]
+                estadisticas.tiempo_total = time.perf_counter() - inicio
+                return entrada[3], estadisticas
+
+        mejor_movimiento = movimientos[0]
+        estadisticas.mejor_movimiento = mejor_movimiento
+        for profundidad in range(1, max(profundidad_maxima, 1) + 1):
+            inicio_iteracion = time.perf_counter()
+            # Valores por jugada de la raíz solo si alguien escucha el progreso
+            valores = {} if self.callback_progreso is not None else None
+            try:
+                valor, movimiento = self._buscar_con_aspiracion(
+                    estado_actual, movimientos, profundidad, motor_juego, valores,
+                    estadisticas.mejor_valor if profundidad > 1 else None,
+                )
+            except BusquedaInterrumpida:
+                estadisticas.interrumpida = True
+                estadisticas.tiempo_total = time.perf_counter() - inicio
+                break
+            if movimiento is not None:
+                mejor_movimiento = movimiento
+                # El mejor de esta iteración se explora primero en la siguiente
+                movimientos.remove(movimiento)
+                movimientos.insert(0, movimiento)
+
+            ahora = time.perf_counter()
+            estadisticas.profundidad_alcanzada = profundidad
+            estadisticas.tiempo_por_profundidad.append(ahora - inicio_iteracion)
+            estadisticas.tiempo_total = ahora - inicio
+            estadisticas.mejor_movimiento = mejor_movimiento
+            estadisticas.mejor_valor = valor
+            if depurar:
+                logger.debug(
+                    "Profundidad %d: mejor %s (%.1f) %r",
+                    profundidad, mejor_movimiento, valor, estadisticas,
+                )
+            if self.callback_progreso is not None:
+                estadisticas.valores_raiz = valores
+                self.callback_progreso(estadisticas)
+            # Resultado demostrado: más profundidad no lo cambia
+            if abs(valor) >= VICTORIA:
+                break
+
+        if self.cache is not None:
+            if estadisticas.profundidad_alcanzada and estadisticas.mejor_valor is not None:
+                # El valor del mejor movimiento de la raíz es exacto
+                self._guardar_cache(
+                    estado_actual, self.jugador, estadisticas.profundidad_alcanzada,
+                    estadisticas.mejor_valor, EXACTA, mejor_movimiento,
+                )
+            self.cache.volcar()
+
+        return mejor_movimiento, estadisticas
+
+    def analizar(
+        self,
+        motor_juego,
+        k: int = 3,
+        tiempo_limite: Optional[float] = None,
+        detener: Optional[threading.Event] = None,
+        profundidad_maxima: Optional[int] = None,
+    ) -> List[LineaAnalisis]:
+        """
+        Las `k` mejores jugadas de self.jugador con su valor y variación
+        principal (multi-PV), ordenadas de mejor a peor.
+
+        Una sola búsqueda por profundización iterativa: todas las líneas
+        comparten la tabla de transposición. En la raíz, cada jugada se
+        busca con alfa igual al k-ésimo mejor valor ya obtenido, así que
+        las que no entran en las k mejores se descartan con una ventana
+        estrecha. Tiempo y profundidad como en buscar().
+        """
+        estadisticas = EstadisticasBusqueda()
+        self._estadisticas = estadisticas
+        self.ultimas_estadisticas = estadisticas
+        inicio = time.perf_counter()
+        self._fin = None if tiempo_limite is None else inicio + tiempo_limite
+        self._detener = detener
+        self._max_nodos = None
+        self._vigilar = self._fin is not None or detener is not None
+
+        estado = motor_juego.obtener_estado_actual()
+        if profundidad_maxima is None:
+            profundidad_maxima = (
+                estado.celdas.count(CODIGO_VACIO) if self._vigilar else self.profundidad
+            )
+        movimientos = GestorEstado.obtener_movimientos_validos(estado, self.jugador)
+        lineas: List[LineaAnalisis] = []
+        for profundidad in range(1, max(profundidad_maxima, 1) + 1):
+            inicio_iteracion = time.perf_counter()
+            resultados = []  # (valor, exacto, movimiento, estado tras el movimiento)
+            try:
+                estadisticas.nodos += 1
                 for movimiento in movimientos:
-                    # USAR SIMULACIÓN CORRECTA DEL MOTOR
-                    nuevo_estado = motor_juego.simular_movimiento(estado, movimiento, jugador_actual)
-                    
-                    if nuevo_estado is None:
-                        continue  # Movimiento inválido
-                    
-                    # Llamada recursiva
+                    hijo = motor_juego.simular_movimiento(estado, movimiento, self.jugador)
+                    valores = sorted((r[0] for r in resultados), reverse=True)
+                    alfa = valores[k - 1] if len(valores) >= k else float("-inf")
                     valor, _ = self.minimax(
-                        nuevo_estado, 
-                        profundidad - 1, 
-                        True,  # Cambiar a maximizar
-                        motor_juego
+                        hijo, profundidad - 1, False, motor_juego, alfa, float("inf")
                     )
-                    
-                    if valor < mejor_valor:
-                        mejor_valor = valor
-                        mejor_movimiento = movimiento
-
-            return mejor_valor, mejor_movimiento
-            
-        except Exception as e:
-            print(f"[ERROR] Error en minimax: {e}")
-            # Retornar evaluación simple del estado actual
-            try:
-                valor = self.evaluador.evaluar_estado(estado, motor_juego)
-                if self.jugador == "rojo":
-                    valor = -valor
-                return valor, None
-            except Exception as e:
-                print(f"[ERROR] Error en evaluación de emergencia: {e}")
-                return 0.0, None
+                    # Con valor <= alfa solo se sabe que no está entre las k mejores
+                    resultados.append((valor, valor > alfa, movimiento, hijo))
+            except BusquedaInterrumpida:
+                estadisticas.interrumpida = True
+                break
+
+            resultados.sort(key=lambda r: (r[0], r[1]), reverse=True)
+            lineas = [
+                LineaAnalisis(
+                    movimiento, valor,
+                    [movimiento]
+                    + self._variacion(hijo, self.oponente, profundidad - 1, motor_juego),
+                )
+                for valor, _, movimiento, hijo in resultados[:k]
+            ]
+            # La próxima iteración empieza por las mejores de esta
+            movimientos = [r[2] for r in resultados]
+            estadisticas.profundidad_alcanzada = profundidad
+            estadisticas.tiempo_por_profundidad.append(time.perf_counter() - inicio_iteracion)
+            if self.callback_progreso is not None:
+                estadisticas.mejor_movimiento = lineas[0].movimiento if lineas else None
+                estadisticas.mejor_valor = lineas[0].valor if lineas else None
+                self.callback_progreso(estadisticas)
+            # Todas las líneas pedidas ya tienen resultado demostrado
+            if lineas and all(abs(linea.valor) >= VICTORIA for linea in lineas):
+                break
+
+        estadisticas.tiempo_total = time.perf_counter() - inicio
+        if lineas:
+            estadisticas.mejor_movimiento = lineas[0].movimiento
+            estadisticas.mejor_valor = lineas[0].valor
+        return lineas
+
+    def _variacion(
+        self, estado: EstadoJuego, jugador: str, profundidad: int, motor_juego
+    ) -> List[Posicion]:
+        """
+        Variación principal desde `estado` siguiendo las mejores jugadas de
+        la tabla de transposición. Las jugadas forzadas no se guardan en la
+        tabla ni gastan profundidad: se siguen igual.
+        """
+        variacion: List[Posicion] = []
+        while True:
+            movimientos = GestorEstado.obtener_movimientos_validos(estado, jugador)
+            if len(movimientos) == 1:
+                movimiento = movimientos[0]
+            else:
+                entrada = self.tabla.get((estado.clave(), jugador))
+                if profundidad <= 0 or entrada is None or entrada[3] not in movimientos:
+                    break
+                movimiento = entrada[3]
+                profundidad -= 1
+            variacion.append(movimiento)
+            estado = motor_juego.simular_movimiento(estado, movimiento, jugador)
+            jugador = ROJO if jugador == AZUL else AZUL
+        return variacion
+
+    def _consultar_cache(
+        self, estado: EstadoJuego, jugador_actual: str
+    ) -> Optional[Tuple[int, float, int, Optional[Posicion]]]:
+        """Entrada del caché persistente en el formato de self.tabla"""
+        return self._desde_quien_mueve(
+            self.cache.obtener(codificar_estado(estado, jugador_actual)), estado, jugador_actual
+        )
+
+    def _desde_quien_mueve(
+        self, entrada, estado: EstadoJuego, jugador_actual: str
+    ) -> Optional[Tuple[int, float, int, Optional[Posicion]]]:
+        """
+        Entrada del caché persistente o de la tabla compartida, que guardan
+        valor y cota desde el punto de vista del que mueve, en el formato de
+        self.tabla
+        """
+        if entrada is None:
+            return None
+        profundidad, valor, cota, indice = entrada
+        if jugador_actual != self.jugador:
+            valor = -valor
+            cota = COTA_OPUESTA[cota]
+        movimiento = estado.topologia.posiciones[indice] if indice >= 0 else None
+        return profundidad, valor, cota, movimiento
+
+    def _hacia_quien_mueve(
+        self,
+        estado: EstadoJuego,
+        jugador_actual: str,
+        profundidad: int,
+        valor: float,
+        cota: int,
+        movimiento: Optional[Posicion],
+    ) -> Tuple[int, float, int, int]:
+        """Inversa de _desde_quien_mueve: (profundidad, valor, cota, índice o -1)"""
+        if jugador_actual != self.jugador:
+            valor = -valor
+            cota = COTA_OPUESTA[cota]
+        indice = -1 if movimiento is None else estado.topologia.indice(movimiento)
+        return profundidad, valor, cota, indice
+
+    def _guardar_cache(
+        self,
+        estado: EstadoJuego,
+        jugador_actual: str,
+        profundidad: int,
+        valor: float,
+        cota: int,
+        movimiento: Optional[Posicion],
+    ) -> None:
+        self.cache.guardar(
+            codificar_estado(estado, jugador_actual),
+            *self._hacia_quien_mueve(
+                estado, jugador_actual, profundidad, valor, cota, movimiento
+            ),
+        )
+
+    def _debe_detenerse(self) -> bool:
+        if self._detener is not None and self._detener.is_set():
+            return True
+        if self._max_nodos is not None and self._estadisticas.nodos >= self._max_nodos:
+            return True
+        return self._fin is not None and time.perf_counter() >= self._fin
+
+    def _buscar_con_aspiracion(
+        self,
+        estado: EstadoJuego,
+        movimientos: List[Posicion],
+        profundidad: int,
+        motor_juego,
+        valores: Optional[dict],
+        anterior: Optional[float],
+    ) -> Tuple[float, Optional[Posicion]]:
+        """
+        _buscar_raiz con una ventana de VENTANA_ASPIRACION alrededor del
+        valor `anterior` (el de la iteración previa). Si el resultado cae
+        fuera, se repite con ese lado de la ventana abierto.
+        """
+        alfa, beta = float("-inf"), float("inf")
+        if self.aspiracion and anterior is not None and abs(anterior) < VICTORIA:
+            alfa, beta = anterior - VENTANA_ASPIRACION, anterior + VENTANA_ASPIRACION
+        while True:
+            valor, movimiento = self._buscar_raiz(
+                estado, movimientos, profundidad, motor_juego, valores, alfa, beta
+            )
+            if valor <= alfa:
+                alfa = float("-inf")
+            elif valor >= beta:
+                beta = float("inf")
+            else:
+                return valor, movimiento
+            self._estadisticas.fallos_aspiracion += 1
+
+    def _buscar_raiz(
+        self,
+        estado: EstadoJuego,
+        movimientos: List[Posicion],
+        profundidad: int,
+        motor_juego,
+        valores: Optional[dict] = None,
+        alfa: float = float("-inf"),
+        beta: float = float("inf"),
+    ) -> Tuple[float, Optional[Posicion]]:
+        """
+        Recorre los movimientos de la raíz con ventana alfa creciente dentro
+        de (alfa, beta); se corta al llegar a beta.
+        Si se pasa `valores`, anota allí el valor de cada movimiento.
+        """
+        self._estadisticas.nodos += 1
+        mejor_valor = float("-inf")
+        mejor_movimiento = None
+
+        for movimiento in movimientos:
+            estado_simulado = motor_juego.simular_movimiento(
+                estado, movimiento, self.jugador
+            )
+            if estado_simulado is None:
+                continue
+
+            # Siguiente turno es del oponente (minimizar)
+            valor = self._buscar_hijo(
+                estado_simulado,
+                profundidad,
+                False,
+                motor_juego,
+                max(mejor_valor, alfa),
+                beta,
+                mejor_movimiento is None,
+                False,
+            )
+            if valores is not None:
+                valores[movimiento] = valor
+            if valor > mejor_valor:
+                mejor_valor = valor
+                mejor_movimiento = movimiento
+            if mejor_valor >= beta:
+                break
+
+        return mejor_valor, mejor_movimiento
+
+    def _buscar_hijo(
+        self,
+        hijo: EstadoJuego,
+        profundidad: int,
+        hijo_maximiza: bool,
+        motor_juego,
+        alfa: float,
+        beta: float,
+        primero: bool,
+        tardio: bool,
+    ) -> float:
+        """
+        Valor de `hijo` a `profundidad` - 1 para un padre con ventana
+        (alfa, beta). La primera jugada se busca con la ventana completa.
+        Con pvs, las demás primero con ventana nula sobre la cota que el
+        padre ya tiene, y solo si la superan se buscan de nuevo completas.
+        Con reducciones, las jugadas `tardio` se prueban antes con una
+        profundidad menos, y se buscan normalmente solo si sorprenden.
+        """
+        estadisticas = self._estadisticas
+        padre_maximiza = not hijo_maximiza
+        cota = alfa if padre_maximiza else beta
+        if primero or abs(cota) == float("inf"):
+            return self.minimax(hijo, profundidad - 1, hijo_maximiza, motor_juego, alfa, beta)[0]
+
+        if padre_maximiza:
+            nula = (alfa, alfa + VENTANA_NULA)
+        else:
+            nula = (beta - VENTANA_NULA, beta)
+
+        def supera(valor: float) -> bool:
+            return valor > alfa if padre_maximiza else valor < beta
+
+        if self.reducciones and tardio and profundidad >= LMR_PROFUNDIDAD_MINIMA:
+            estadisticas.reducciones += 1
+            valor, _ = self.minimax(hijo, profundidad - 2, hijo_maximiza, motor_juego, *nula)
+            if not supera(valor):
+                return valor
+            estadisticas.re_busquedas += 1
+
+        if self.pvs and beta - alfa > VENTANA_NULA:
+            valor, _ = self.minimax(hijo, profundidad - 1, hijo_maximiza, motor_juego, *nula)
+            # Sin superar la cota, o superando también el otro extremo, el
+            # padre ya sabe lo que necesita
+            if not supera(valor) or (valor >= beta if padre_maximiza else valor <= alfa):
+                return valor
+            estadisticas.re_busquedas += 1
+
+        return self.minimax(hijo, profundidad - 1, hijo_maximiza, motor_juego, alfa, beta)[0]
+
+    def minimax(
+        self,
+        estado: EstadoJuego,
+        profundidad: int,
+        es_maximizando: bool,
+        motor_juego,
+        alfa: float = float("-inf"),
+        beta: float = float("inf"),
+    ) -> Tuple[float, Optional[Posicion]]:
+        """Algoritmo minimax recursivo con poda alfa-beta"""
+        estadisticas = self._estadisticas
+        estadisticas.nodos += 1
+        if (
+            self._vigilar
+            and not estadisticas.nodos % NODOS_ENTRE_COMPROBACIONES
+            and self._debe_detenerse()
+        ):
+            raise BusquedaInterrumpida
+
+        # Determinar jugador actual según el contexto de minimax
+        jugador_actual = self.jugador if es_maximizando else self.oponente
+
+        if self.finales is not None:
+            final = self.finales.consultar(estado, jugador_actual)
+            if final is not None:
+                estadisticas.aciertos_finales += 1
+                return self._valor_final(final, profundidad, es_maximizando), None
+
+        # Movimientos SOLO desde la cabeza del jugador actual en ESTE estado
+        movimientos = GestorEstado.obtener_movimientos_validos(estado, jugador_actual)
+        if not movimientos:
+            return self._valor_terminal(estado, profundidad, es_maximizando), None
+        if len(movimientos) == 1 and self.extender_forzadas:
+            return self._seguir_forzadas(
+                estado, movimientos[0], profundidad, es_maximizando, motor_juego, alfa, beta
+            )
+
+        # Condición de parada por profundidad
+        if profundidad <= 0:
+            estadisticas.evaluaciones += 1
+            valor = self.evaluador.evaluar_estado(estado, motor_juego)
+            # Ajustar evaluación según perspectiva del jugador IA
+            if self.jugador == ROJO:
+                valor = -valor
+            return valor, None
+
+        # Consultar tabla de transposición
+        clave = (estado.clave(), jugador_actual)
+        alfa_original, beta_original = alfa, beta
+        estadisticas.consultas_cache += 1
+        entrada = self.tabla.get(clave)
+        clave_compartida = None
+        if entrada is None and self.compartida is not None:
+            clave_compartida = self.compartida.clave(estado, jugador_actual)
+            entrada = self._desde_quien_mueve(
+                self.compartida.obtener(clave_compartida), estado, jugador_actual
+            )
+            if entrada is not None:
+                estadisticas.aciertos_compartida += 1
+                self.tabla[clave] = entrada
+        if (
+            entrada is None
+            and self.cache is not None
+            and profundidad >= self.cache.profundidad_minima
+        ):
+            entrada = self._consultar_cache(estado, jugador_actual)
+            if entrada is not None:
+                estadisticas.aciertos_cache_persistente += 1
+                self.tabla[clave] = entrada
+        if entrada is not None:
+            prof_entrada, valor_entrada, cota, movimiento_entrada = entrada
+            if prof_entrada >= profundidad:
+                estadisticas.aciertos_cache += 1
+                if cota == EXACTA:
+                    return valor_entrada, movimiento_entrada
+                if cota == INFERIOR:
+                    alfa = max(alfa, valor_entrada)
+                else:
+                    beta = min(beta, valor_entrada)
+                if alfa >= beta:
+                    return valor_entrada, movimiento_entrada
+            # El mejor movimiento conocido se prueba primero
+            if movimiento_entrada in movimientos:
+                movimientos.remove(movimiento_entrada)
+                movimientos.insert(0, movimiento_entrada)
+
+        mejor_movimiento = None
+
+        if es_maximizando:
+            mejor_valor = float("-inf")
+
+            for orden, movimiento in enumerate(movimientos):
+                nuevo_estado = motor_juego.simular_movimiento(
+                    estado, movimiento, jugador_actual
+                )
+                if nuevo_estado is None:
+                    continue  # Movimiento inválido
+
+                # Llamada recursiva
+                valor = self._buscar_hijo(
+                    nuevo_estado, profundidad, False, motor_juego, alfa, beta,
+                    mejor_movimiento is None, orden >= LMR_DESDE_JUGADA,
+                )
+
+                if valor > mejor_valor:
+                    mejor_valor = valor
+                    mejor_movimiento = movimiento
+                alfa = max(alfa, valor)
+                if alfa >= beta:
+                    estadisticas.cortes += 1
+                    break
+
+        else:  # Minimizando
+            mejor_valor = float("inf")
+
+            for orden, movimiento in enumerate(movimientos):
+                nuevo_estado = motor_juego.simular_movimiento(
+                    estado, movimiento, jugador_actual
+                )
+                if nuevo_estado is None:
+                    continue  # Movimiento inválido
+
+                # Llamada recursiva
+                valor = self._buscar_hijo(
+                    nuevo_estado, profundidad, True, motor_juego, alfa, beta,
+                    mejor_movimiento is None, orden >= LMR_DESDE_JUGADA,
+                )
+
+                if valor < mejor_valor:
+                    mejor_valor = valor
+                    mejor_movimiento = movimiento
+                beta = min(beta, valor)
+                if alfa >= beta:
+                    estadisticas.cortes += 1
+                    break
+
+        # Guardar en la tabla de transposición
+        if mejor_valor <= alfa_original:
+            cota = SUPERIOR
+        elif mejor_valor >= beta_original:
+            cota = INFERIOR
+        else:
+            cota = EXACTA
+        if len(self.tabla) >= self.tamano_tabla:
+            self.tabla.clear()
+        self.tabla[clave] = (profundidad, mejor_valor, cota, mejor_movimiento)
+        if self.compartida is not None:
+            if clave_compartida is None:
+                clave_compartida = self.compartida.clave(estado, jugador_actual)
+            self.compartida.guardar(
+                clave_compartida,
+                *self._hacia_quien_mueve(
+                    estado, jugador_actual, profundidad, mejor_valor, cota, mejor_movimiento
+                ),
+            )
+        if self.cache is not None and profundidad >= self.cache.profundidad_minima:
+            self._guardar_cache(
+                estado, jugador_actual, profundidad, mejor_valor, cota, mejor_movimiento
+            )
+
+        return mejor_valor, mejor_movimiento
+
+    def _seguir_forzadas(
+        self,
+        estado: EstadoJuego,
+        movimiento: Posicion,
+        profundidad: int,
+        es_maximizando: bool,
+        motor_juego,
+        alfa: float,
+        beta: float,
+    ) -> Tuple[float, Optional[Posicion]]:
+        """
+        Recorre una cadena de jugadas forzadas sobre una sola copia del
+        estado, sin gastar profundidad, sin evaluar y sin tocar la tabla de
+        transposición, y sigue con minimax en la próxima decisión real (o
+        en el final de la partida)
+        """
+        estadisticas = self._estadisticas
+        topologia = estado.topologia
+        actual = estado.copiar()
+        primero = movimiento
+        forzadas = 0
+        while True:
+            forzadas += 1
+            jugador = self.jugador if es_maximizando else self.oponente
+            actual.celdas[topologia.indice(movimiento)] = CODIGOS[jugador]
+            actual.agregar_movimiento(movimiento, jugador)
+            actual.turno = jugador  # Como simular_movimiento: quien acaba de mover
+            es_maximizando = not es_maximizando
+            respuestas = GestorEstado.obtener_movimientos_validos(
+                actual, self.jugador if es_maximizando else self.oponente
+            )
+            if len(respuestas) != 1:
+                break
+            movimiento = respuestas[0]
+
+        estadisticas.extensiones += forzadas
+        # Las jugadas forzadas también alejan el final: se descuentan del
+        # bono por rapidez para seguir prefiriendo las victorias más cortas
+        # (y la ventana se corre igual para que los cortes sigan valiendo)
+        alfa_interna = self._correr_victoria(alfa, forzadas)
+        beta_interna = self._correr_victoria(beta, forzadas)
+        valor, _ = self.minimax(
+            actual, profundidad, es_maximizando, motor_juego, alfa_interna, beta_interna
+        )
+        if valor >= VICTORIA:
+            valor = max(valor - forzadas, VICTORIA)
+        elif valor <= -VICTORIA:
+            valor = min(valor + forzadas, -VICTORIA)
+        return valor, primero
+
+    @staticmethod
+    def _correr_victoria(cota: float, jugadas: int) -> float:
+        if cota >= VICTORIA:
+            return cota + jugadas
+        if cota <= -VICTORIA:
+            return cota - jugadas
+        return cota
+
+    def _valor_final(
+        self, final: ResultadoFinal, profundidad: int, es_maximizando: bool
+    ) -> float:
+        """
+        Valor de una posición resuelta por la tabla de finales, en la misma
+        escala que _valor_terminal (la victoria llega `distancia` jugadas
+        más abajo)
+        """
+        if final.resultado == EMPATE:
+            return 0.0
+        valor = VICTORIA + max(profundidad - final.distancia, 0)
+        ganador_es_ia = (final.resultado == GANA) == es_maximizando
+        return valor if ganador_es_ia else -valor
+
+    def _valor_terminal(
+        self, estado: EstadoJuego, profundidad: int, es_maximizando: bool
+    ) -> float:
+        """
+        Valor de una posición donde al jugador en turno no le quedan
+        movimientos: con tablero lleno gana quien tenga más fichas, si no,
+        pierde el jugador bloqueado.
+        """
+        if CODIGO_VACIO not in estado.celdas:
+            fichas_ia = estado.celdas.count(CODIGOS[self.jugador])
+            fichas_oponente = estado.celdas.count(CODIGOS[self.oponente])
+            if fichas_ia == fichas_oponente:
+                return 0.0
+            ganador_es_ia = fichas_ia > fichas_oponente
+        else:
+            ganador_es_ia = not es_maximizando
+
+        valor = VICTORIA + max(profundidad, 0)
+        return valor if ganador_es_ia else -valor
+
+
+class EstrategiaPruebas(EstrategiaIA):
+    """
+    Experto con búsqueda por números de prueba: si demuestra una victoria
+    forzada dentro de `max_nodos` la juega; si no, decide `respaldo`
+    (minimax). Solo lo intenta con a lo sumo `max_vacias` casillas libres,
+    donde una prueba es alcanzable.
+    """
+
+    def __init__(
+        self,
+        jugador: str,
+        max_nodos: int = 20_000,
+        max_vacias: int = 35,
+        tamano_tabla: int = 500_000,
+        respaldo: Optional[EstrategiaIA] = None,
+    ):
+        super().__init__(jugador)
+        self.max_nodos = max_nodos
+        self.max_vacias = max_vacias
+        self.tamano_tabla = tamano_tabla
+        self.respaldo = respaldo or EstrategiaMinimax(jugador)
+        self.busqueda = None  # ai.numeros_prueba.BusquedaNumerosPrueba
+
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
+        # df-pn se importa al primer uso: quien no juega experto no lo carga
+        from ai.numeros_prueba import BusquedaNumerosPrueba
+        from ai.solucionador import GANA as GANA_PRUEBA
+
+        inicio = time.perf_counter()
+        estado = motor_juego.obtener_estado_actual()
+        resultado = None
+        if estado.celdas.count(CODIGO_VACIO) <= self.max_vacias:
+            if self.busqueda is None or self.busqueda.topologia is not estado.topologia:
+                self.busqueda = BusquedaNumerosPrueba(
+                    estado.topologia, self.max_nodos, self.tamano_tabla
+                )
+            resultado = self.busqueda.resolver(estado, self.jugador, solo_victoria=True)
+
+        if resultado is not None and resultado.resultado == GANA_PRUEBA:
+            estadisticas = EstadisticasBusqueda()
+            estadisticas.mejor_movimiento = resultado.movimiento
+            estadisticas.mejor_valor = VICTORIA
+            estadisticas.victoria_demostrada = True
+            movimiento = resultado.movimiento
+        else:
+            movimiento = self.respaldo.seleccionar_movimiento(motor_juego, detener)
+            estadisticas = self.respaldo.ultimas_estadisticas or EstadisticasBusqueda()
+        if resultado is not None:
+            estadisticas.nodos_prueba = resultado.nodos
+        estadisticas.tiempo_total = time.perf_counter() - inicio
+        self.ultimas_estadisticas = estadisticas
+        return movimiento
+
+
+class EstrategiaMCTS(EstrategiaIA):
+    """
+    Nivel Maestro - Búsqueda por árbol de Monte Carlo (UCT). Piensa
+    `milisegundos` por turno o, si se indica, un número fijo de
+    `simulaciones`; el árbol de la partida se reutiliza entre turnos.
+    """
+
+    def __init__(
+        self,
+        jugador: str,
+        milisegundos: Optional[float] = 1000,
+        simulaciones: Optional[int] = None,
+        heuristica: bool = True,
+        exploracion: float = 1.4,
+        max_nodos: int = 500_000,
+        semilla: Optional[int] = None,
+    ):
+        super().__init__(jugador)
+        self.milisegundos = None if simulaciones is not None else milisegundos
+        self.simulaciones = simulaciones
+        self.heuristica = heuristica
+        self.exploracion = exploracion
+        self.max_nodos = max_nodos
+        self.semilla = semilla
+        self.busqueda = None  # ai.mcts.BusquedaMCTS
+
+    def seleccionar_movimiento(
+        self, motor_juego, detener: Optional[threading.Event] = None
+    ) -> Optional[Posicion]:
+        movimiento, _ = self.buscar(motor_juego, detener=detener)
+        return movimiento
 
+    def buscar(
+        self,
+        motor_juego,
+        tiempo_limite: Optional[float] = None,
+        detener: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[Posicion], EstadisticasBusqueda]:
+        """Como EstrategiaMinimax.buscar; `tiempo_limite` en segundos"""
+        estado = motor_juego.obtener_estado_actual()
+        if self.busqueda is None or self.busqueda.topologia is not estado.topologia:
+            from ai.mcts import BusquedaMCTS
 
+            self.busqueda = BusquedaMCTS(
+                estado.topologia, self.exploracion, self.heuristica,
+                max_nodos=self.max_nodos, semilla=self.semilla,
+            )
+        milisegundos = self.milisegundos if tiempo_limite is None else 1000 * tiempo_limite
+        resultado = self.busqueda.buscar(
+            estado, self.jugador, self.simulaciones, milisegundos, detener
+        )
 
+        estadisticas = EstadisticasBusqueda()
+        estadisticas.simulaciones = resultado.simulaciones
+        estadisticas.simulaciones_reutilizadas = resultado.reutilizadas
+        estadisticas.nodos = resultado.nodos
+        estadisticas.tiempo_total = resultado.segundos
+        estadisticas.mejor_movimiento = resultado.movimiento
+        estadisticas.mejor_valor = resultado.valor
+        estadisticas.interrumpida = detener is not None and detener.is_set()
+        self.ultimas_estadisticas = estadisticas
+        logger.debug(
+            "MCTS %s: %d simulaciones (%.0f/s, %d reutilizadas), valor %.2f",
+            self.jugador, resultado.simulaciones, estadisticas.simulaciones_por_segundo,
+            resultado.reutilizadas, resultado.valor,
+        )
+        return resultado.movimiento, estadisticas
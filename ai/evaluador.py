@@ -1,5 +1,8 @@
+import logging
 from core.interfaces import AZUL, ROJO, EstadoJuego
 
+logger = logging.getLogger(__name__)
+
 
 class FuncionEvaluadora:
     """Evaluador de estados del juego optimizado para Minimax."""
@@ -33,7 +36,7 @@ class FuncionEvaluadora:
             
         except Exception as e:
             # Fallback: evaluación simple basada en ocupación del tablero
-            print(f"[ERROR] Error en evaluar_estado: {e}, usando evaluación fallback")
+            logger.error("Error en evaluar_estado: %s, usando evaluación fallback", e)
             return self._evaluacion_fallback(estado)
 
     def _contar_movimientos_seguros(self, estado: EstadoJuego, jugador: str, motor_juego) -> int:
@@ -52,7 +55,7 @@ class FuncionEvaluadora:
             return cantidad
             
         except Exception as e:
-            print(f"[DEBUG] Error con motor_juego para {jugador}: {e}, usando conteo manual")
+            logger.debug("Error con motor_juego para %s: %s, usando conteo manual", jugador, e)
             # Fallback: usar el motor original directamente
             try:
                 turno_original = estado.turno
@@ -61,7 +64,7 @@ class FuncionEvaluadora:
                 estado.turno = turno_original
                 return len(movimientos) if movimientos else 0
             except Exception as e2:
-                print(f"[DEBUG] Error con motor original: {e2}")
+                logger.debug("Error con motor original: %s", e2)
                 return 0
 
     def _contar_movimientos_manual(self, estado: EstadoJuego, jugador: str) -> int:
@@ -99,7 +102,7 @@ class FuncionEvaluadora:
             return contador
             
         except Exception as e:
-            print(f"[ERROR] Error en conteo manual: {e}")
+            logger.error("Error en conteo manual: %s", e)
             return 0
 
     def _evaluacion_fallback(self, estado: EstadoJuego) -> float:
@@ -129,7 +132,7 @@ class FuncionEvaluadora:
                 return fichas_azul - fichas_rojo
                 
         except Exception as e:
-            print(f"[ERROR] Error crítico en evaluación fallback: {e}")
+            logger.error("Error crítico en evaluación fallback: %s", e)
             return 0.0
 
     @staticmethod
@@ -0,0 +1,54 @@
+from typing import Optional
+from core.interfaces import Dificultad
+from ai.calibracion import Calibracion
+
+
+class FactoriaEstrategias:
+    """Crea estrategias de IA según la dificultad seleccionada"""
+
+    @staticmethod
+    def crear_estrategia(
+        dificultad: Dificultad,
+        jugador: str,
+        cache=None,
+        finales=None,
+        nodos_prueba: Optional[int] = None,
+        compartida=None,
+        calibracion: Optional[Calibracion] = None,
+    ):
+        """
+        `cache` (CachePersistente) y `finales` (TablaFinales): opcionales,
+        para las estrategias de búsqueda. Con `nodos_prueba` el experto
+        busca antes victorias forzadas por números de prueba. `compartida`
+        (TablaCompartida): tabla de transposición común a varios procesos.
+
+        Con `calibracion` (ai.calibracion) el experto y el maestro reciben
+        el presupuesto de nodos o simulaciones de su dificultad en esta
+        máquina; sin ella, profundidad 3 y un segundo de Monte Carlo, iguales
+        en todas partes (lo que usan las herramientas reproducibles).
+        """
+        # Las estrategias se importan al crear la primera (ver ai/__init__)
+        from ai.estrategias import (
+            EstrategiaAleatoria,
+            EstrategiaPrimeroMejor,
+            EstrategiaMinimax,
+            EstrategiaPruebas,
+            EstrategiaMCTS,
+        )
+
+        if dificultad == Dificultad.PRINCIPIANTE:
+            return EstrategiaAleatoria(jugador)
+        elif dificultad == Dificultad.NORMAL:
+            return EstrategiaPrimeroMejor(jugador)
+        elif dificultad == Dificultad.MAESTRO:
+            if calibracion is not None:
+                return EstrategiaMCTS(jugador, simulaciones=calibracion.presupuesto(dificultad))
+            return EstrategiaMCTS(jugador)
+        else:  # EXPERTO
+            minimax = EstrategiaMinimax(
+                jugador, profundidad=3, cache=cache, finales=finales, compartida=compartida,
+                max_nodos=None if calibracion is None else calibracion.presupuesto(dificultad),
+            )
+            if nodos_prueba:
+                return EstrategiaPruebas(jugador, max_nodos=nodos_prueba, respaldo=minimax)
+            return minimax
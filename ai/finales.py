@@ -0,0 +1,553 @@
+"""
+Tabla de finales: resultado exacto (gana / pierde / empate y en cuántas
+jugadas) de toda posición con pocas casillas vacías.
+
+Con k casillas vacías el resto de la partida solo depende de:
+    - el conjunto de casillas vacías,
+    - la cabeza de cada serpiente (o "bloqueada" si ya no toca ninguna
+      casilla vacía: no volverá a poder moverse),
+    - la diferencia de fichas entre el jugador en turno y el otro
+      (0 o -1 en una partida normal), que decide el tablero lleno.
+Todo se guarda desde el punto de vista del jugador en turno, así la misma
+entrada sirve con azul o con rojo, y los conjuntos de casillas vacías se
+reducen por las simetrías del tablero (obtener_simetrias).
+
+Generación retrógrada por niveles: cada jugada llena exactamente una
+casilla, así que el nivel k se resuelve a partir del nivel k-1 ya
+guardado, empezando por el tablero lleno. Cada nivel se reparte en
+bloques entre procesos; cada bloque terminado queda en disco como punto
+de control y una generación interrumpida continúa donde quedó. Junto a los
+bloques se guarda la partición del nivel (tamaño de bloque y cantidad de
+conjuntos): si al reanudar no coincide, los bloques viejos se descartan y
+el nivel se resuelve de nuevo.
+
+Formato (un archivo nivel_KK.bin por nivel, leído con mmap):
+    cabecera   MAGICO, versión, tamaño, envolvente, k, conjuntos, bytes/máscara
+    índice     por conjunto canónico: máscara de vacías, desplazamiento
+    datos      un byte por (cabeza en turno, cabeza del otro, diferencia):
+               resultado en los 2 bits altos, distancia en los 6 bajos
+
+Consultar una posición cuesta una canonización (8 simetrías por casilla
+vacía) y un acceso al mmap, sin importar el tamaño de la tabla.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.interfaces import (
+    AZUL,
+    CODIGO_VACIO,
+    CODIGOS,
+    ROJO,
+    TABLERO_TAMANO,
+    EstadoJuego,
+    Topologia,
+    obtener_simetrias,
+    obtener_topologia,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGICO = b"SVSF"
+VERSION = 1
+_CABECERA = struct.Struct("<4sBBBBII")
+# Punto de control de un nivel a medias: tamaño de bloque y conjuntos
+_PARTICION = struct.Struct("<II")
+
+# Resultado para el jugador en turno (2 bits altos de cada byte; 0 = sin dato)
+GANA = 1
+PIERDE = 2
+EMPATE = 3
+MAX_DISTANCIA = 63
+
+
+class ResultadoFinal(NamedTuple):
+    resultado: int  # GANA, PIERDE o EMPATE para el jugador en turno
+    distancia: int  # Jugadas hasta el final con juego perfecto
+
+
+class NivelGenerado(NamedTuple):
+    vacias: int
+    conjuntos: int  # Conjuntos de casillas vacías distintos salvo simetría
+    entradas: int
+    segundos: float
+    reanudado: bool  # Ya estaba (completo o en parte) de una ejecución anterior
+
+
+def _codificar(resultado: int, distancia: int) -> int:
+    return resultado << 6 | distancia
+
+
+def casillas_mascara(mascara: int) -> List[int]:
+    """Índices de los bits activos, de menor a mayor"""
+    casillas = []
+    while mascara:
+        bajo = mascara & -mascara
+        casillas.append(bajo.bit_length() - 1)
+        mascara ^= bajo
+    return casillas
+
+
+class _Canonizador:
+    """Forma canónica de un conjunto de casillas bajo las simetrías"""
+
+    def __init__(self, topologia: Topologia):
+        simetrias = obtener_simetrias(topologia)
+        self.simetrias = simetrias
+        self._bits = [tuple(1 << i for i in permutacion) for permutacion in simetrias]
+        if topologia.envolvente:
+            # Basta con las simetrías que llevan alguna casilla del conjunto
+            # a la 0: ese subconjunto de imágenes es el mismo para todo el
+            # conjunto de la órbita, así que su mínimo también
+            self._candidatas = [
+                [n for n, p in enumerate(simetrias) if p[i] == 0]
+                for i in range(topologia.celdas)
+            ]
+        else:
+            self._candidatas = None
+
+    def canonizar(self, casillas: Sequence[int]) -> Tuple[int, Tuple[int, ...]]:
+        """(máscara canónica, simetría que lleva `casillas` a ella)"""
+        if not casillas:
+            return 0, self.simetrias[0]
+        if self._candidatas is None:
+            candidatas = range(len(self.simetrias))
+        else:
+            candidatas = [n for c in casillas for n in self._candidatas[c]]
+        mejor = mejor_simetria = None
+        for n in candidatas:
+            bits = self._bits[n]
+            mascara = sum([bits[c] for c in casillas])
+            if mejor is None or mascara < mejor:
+                mejor, mejor_simetria = mascara, n
+        return mejor, self.simetrias[mejor_simetria]
+
+
+class _Nivel:
+    """Un nivel (k casillas vacías) de la tabla, mapeado en memoria"""
+
+    def __init__(self, ruta: str, topologia: Topologia):
+        self.ruta = ruta
+        self.topologia = topologia
+        with open(ruta, "rb") as archivo:
+            self.datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, version, tamano, envolvente, vacias, conjuntos, bytes_mascara = (
+            _CABECERA.unpack_from(self.datos, 0)
+        )
+        if magico != MAGICO or version != VERSION:
+            raise ValueError(f"{ruta}: no es un nivel de tabla de finales")
+        if (tamano, bool(envolvente)) != (topologia.tamano, topologia.envolvente):
+            raise ValueError(f"{ruta}: generado para otra topología")
+        self.vacias = vacias
+
+        entrada = struct.Struct(f"<{bytes_mascara}sQ")
+        inicio_datos = _CABECERA.size + conjuntos * entrada.size
+        # máscara canónica -> posición de su bloque de datos en el archivo
+        self.desplazamientos: Dict[int, int] = {
+            int.from_bytes(mascara, "little"): inicio_datos + desplazamiento
+            for mascara, desplazamiento in entrada.iter_unpack(
+                self.datos[_CABECERA.size:inicio_datos]
+            )
+        }
+        self._fronteras: Dict[int, Tuple[Dict[int, int], int]] = {}
+
+    def frontera(self, mascara: int) -> Tuple[Dict[int, int], int]:
+        """
+        Casillas ocupadas vecinas de las vacías (únicas cabezas que aún
+        pueden moverse) -> índice, y cantidad de índices contando el de
+        "bloqueada", que es el último
+        """
+        frontera = self._fronteras.get(mascara)
+        if frontera is None:
+            frontera = _frontera(mascara, self.topologia)
+            self._fronteras[mascara] = frontera
+        return frontera
+
+    def cerrar(self) -> None:
+        self.datos.close()
+
+
+def _frontera(mascara: int, topologia: Topologia) -> Tuple[Dict[int, int], int]:
+    casillas = sorted(
+        {v for c in casillas_mascara(mascara) for v in topologia.vecinos[c] if not mascara >> v & 1}
+    )
+    return {casilla: i for i, casilla in enumerate(casillas)}, len(casillas) + 1
+
+
+def _ruta_nivel(directorio: str, vacias: int) -> str:
+    return os.path.join(directorio, f"nivel_{vacias:02d}.bin")
+
+
+class TablaFinales:
+    """Consulta de una tabla de finales generada con generar_tabla_finales"""
+
+    def __init__(
+        self, directorio: str, tamano: int = TABLERO_TAMANO, envolvente: bool = True
+    ):
+        self.topologia = obtener_topologia(tamano, envolvente)
+        self._canonizador = _Canonizador(self.topologia)
+        self.niveles: List[_Nivel] = []
+        while os.path.exists(_ruta_nivel(directorio, len(self.niveles))):
+            ruta = _ruta_nivel(directorio, len(self.niveles))
+            self.niveles.append(_Nivel(ruta, self.topologia))
+        # Casillas vacías máximas cubiertas (-1 si no hay niveles)
+        self.max_vacias = len(self.niveles) - 1
+        self.consultas = 0
+        self.aciertos = 0
+
+    def consultar(self, estado: EstadoJuego, jugador: str) -> Optional[ResultadoFinal]:
+        """
+        Resultado con juego perfecto para `jugador`, que es quien mueve en
+        `estado`; None si la posición no está en la tabla
+        """
+        celdas = estado.celdas
+        vacias = celdas.count(CODIGO_VACIO)
+        if vacias > self.max_vacias or estado.topologia is not self.topologia:
+            return None
+        self.consultas += 1
+        if jugador == AZUL:
+            propia, ajena = estado.cabeza_azul, estado.cabeza_roja
+        else:
+            propia, ajena = estado.cabeza_roja, estado.cabeza_azul
+        if propia is None or ajena is None:
+            return None
+        otro = ROJO if jugador == AZUL else AZUL
+        ventaja = celdas.count(CODIGOS[jugador]) - celdas.count(CODIGOS[otro])
+        if ventaja not in (0, -1):
+            return None
+
+        casillas = []
+        i = celdas.find(CODIGO_VACIO)
+        while i >= 0:
+            casillas.append(i)
+            i = celdas.find(CODIGO_VACIO, i + 1)
+        mascara, simetria = self._canonizador.canonizar(casillas)
+        nivel = self.niveles[vacias]
+        desplazamiento = nivel.desplazamientos.get(mascara)
+        if desplazamiento is None:
+            return None
+        indices, cantidad = nivel.frontera(mascara)
+        bloqueada = cantidad - 1
+        fila = indices.get(simetria[self.topologia.indice(propia)], bloqueada)
+        columna = indices.get(simetria[self.topologia.indice(ajena)], bloqueada)
+        codigo = nivel.datos[desplazamiento + (fila * cantidad + columna) * 2 - ventaja]
+        if not codigo:
+            return None
+        self.aciertos += 1
+        return ResultadoFinal(codigo >> 6, codigo & MAX_DISTANCIA)
+
+    def cerrar(self) -> None:
+        for nivel in self.niveles:
+            nivel.cerrar()
+        self.niveles = []
+        self.max_vacias = -1
+
+    def __enter__(self) -> "TablaFinales":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+# ===== Generación =====
+
+
+class _Resolutor:
+    """Resuelve bloques de conjuntos de un nivel a partir del anterior"""
+
+    def __init__(self, directorio: str, tamano: int, envolvente: bool):
+        self.directorio = directorio
+        self.topologia = obtener_topologia(tamano, envolvente)
+        self.canonizador = _Canonizador(self.topologia)
+        self._anterior: Optional[_Nivel] = None
+
+    def nivel_anterior(self, vacias: int) -> _Nivel:
+        if self._anterior is None or self._anterior.vacias != vacias - 1:
+            if self._anterior is not None:
+                self._anterior.cerrar()
+            self._anterior = _Nivel(_ruta_nivel(self.directorio, vacias - 1), self.topologia)
+        return self._anterior
+
+    def resolver_bloque(self, vacias: int, indice: int, mascaras: Sequence[int]) -> int:
+        """Resuelve `mascaras` y guarda el bloque como punto de control"""
+        datos = bytearray()
+        for mascara in mascaras:
+            datos += self.resolver_conjunto(vacias, mascara)
+        ruta = _ruta_bloque(self.directorio, vacias, indice)
+        with open(ruta + ".tmp", "wb") as archivo:
+            archivo.write(datos)
+        os.replace(ruta + ".tmp", ruta)
+        return len(mascaras)
+
+    def resolver_conjunto(self, vacias: int, mascara: int) -> bytearray:
+        """Bloque de datos de un conjunto canónico de casillas vacías"""
+        indices, cantidad = _frontera(mascara, self.topologia)
+        datos = bytearray(cantidad * cantidad * 2)
+        if vacias == 0:
+            # Tablero lleno: decide la cantidad de fichas
+            datos[0] = _codificar(EMPATE, 0)
+            datos[1] = _codificar(PIERDE, 0)
+            return datos
+
+        # Cada jugada posible lleva a un conjunto del nivel anterior
+        anterior = self.nivel_anterior(vacias)
+        casillas = casillas_mascara(mascara)
+        hijos = {}
+        for jugada in casillas:
+            resto = [c for c in casillas if c != jugada]
+            mascara_hijo, simetria = self.canonizador.canonizar(resto)
+            indices_hijo, cantidad_hijo = anterior.frontera(mascara_hijo)
+            hijos[jugada] = (
+                anterior.desplazamientos[mascara_hijo], simetria,
+                indices_hijo, cantidad_hijo,
+            )
+
+        vecinos = self.topologia.vecinos
+        cabezas: List[Optional[int]] = sorted(indices, key=indices.get) + [None]
+        valores = anterior.datos
+        for fila, propia in enumerate(cabezas):
+            jugadas = (
+                [] if propia is None else [v for v in vecinos[propia] if mascara >> v & 1]
+            )
+            for columna, ajena in enumerate(cabezas):
+                if propia is not None and propia == ajena:
+                    continue  # Imposible: se deja sin dato
+                posicion = (fila * cantidad + columna) * 2
+                if not jugadas:
+                    datos[posicion] = datos[posicion + 1] = _codificar(PIERDE, 0)
+                    continue
+                for diferencia in (0, 1):  # ventaja 0 y -1
+                    mejor = None
+                    for jugada in jugadas:
+                        desplazamiento, simetria, indices_hijo, cantidad_hijo = hijos[jugada]
+                        bloqueada = cantidad_hijo - 1
+                        # En el hijo mueve el otro y la jugada es la cabeza nueva
+                        fila_hijo = (
+                            bloqueada if ajena is None
+                            else indices_hijo.get(simetria[ajena], bloqueada)
+                        )
+                        columna_hijo = indices_hijo.get(simetria[jugada], bloqueada)
+                        codigo = valores[
+                            desplazamiento
+                            + (fila_hijo * cantidad_hijo + columna_hijo) * 2
+                            + 1 - diferencia
+                        ]
+                        candidato = _desde_hijo(codigo)
+                        if mejor is None or candidato > mejor:
+                            mejor = candidato
+                    datos[posicion + diferencia] = _codificar(*_desde_orden(mejor))
+        return datos
+
+
+def _desde_hijo(codigo: int) -> Tuple[int, int]:
+    """
+    Clave de orden (mayor es mejor para quien mueve) del resultado de un
+    hijo, que está desde el punto de vista del rival
+    """
+    resultado, distancia = codigo >> 6, codigo & MAX_DISTANCIA
+    if not resultado:
+        raise ValueError("Nivel anterior incompleto")
+    if resultado == PIERDE:  # El rival pierde: ganar cuanto antes
+        return 2, -distancia
+    if resultado == EMPATE:
+        return 1, -distancia
+    return 0, distancia  # Perder lo más tarde posible
+
+
+def _desde_orden(orden: Tuple[int, int]) -> Tuple[int, int]:
+    clase, distancia = orden
+    resultado = (PIERDE, EMPATE, GANA)[clase]
+    return resultado, abs(distancia) + 1
+
+
+def _ruta_bloque(directorio: str, vacias: int, indice: int) -> str:
+    return os.path.join(directorio, f"nivel_{vacias:02d}.bloque_{indice:05d}")
+
+
+def _ruta_particion(directorio: str, vacias: int) -> str:
+    return os.path.join(directorio, f"nivel_{vacias:02d}.particion")
+
+
+def _preparar_particion(
+    directorio: str, vacias: int, tamano_bloque: int, conjuntos: int
+) -> None:
+    """
+    Deja en disco la partición del nivel. Los bloques guardados con otra
+    partición (u otra versión, sin archivo de partición) no se pueden
+    concatenar con los nuevos: se borran.
+    """
+    ruta = _ruta_particion(directorio, vacias)
+    particion = _PARTICION.pack(tamano_bloque, conjuntos)
+    try:
+        with open(ruta, "rb") as archivo:
+            guardada = archivo.read()
+    except FileNotFoundError:
+        guardada = None
+    if guardada == particion:
+        return
+
+    prefijo = f"nivel_{vacias:02d}.bloque_"
+    viejos = [nombre for nombre in os.listdir(directorio) if nombre.startswith(prefijo)]
+    if viejos:
+        logger.warning(
+            "Nivel %d: %d bloques de otra partición, se descartan", vacias, len(viejos)
+        )
+    for nombre in viejos:
+        os.remove(os.path.join(directorio, nombre))
+    with open(ruta + ".tmp", "wb") as archivo:
+        archivo.write(particion)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def _conjuntos_nivel(
+    anteriores: Sequence[int], canonizador: _Canonizador, celdas: int
+) -> List[int]:
+    """Conjuntos canónicos de k vacías: los de k-1 más una casilla"""
+    conjuntos = set()
+    for mascara in anteriores:
+        casillas = casillas_mascara(mascara)
+        for casilla in range(celdas):
+            if not mascara >> casilla & 1:
+                conjuntos.add(canonizador.canonizar(casillas + [casilla])[0])
+    return sorted(conjuntos)
+
+
+_RESOLUTOR: Optional[_Resolutor] = None
+
+
+def _iniciar_trabajador(directorio: str, tamano: int, envolvente: bool) -> None:
+    global _RESOLUTOR
+    _RESOLUTOR = _Resolutor(directorio, tamano, envolvente)
+
+
+def _resolver_bloque(vacias: int, indice: int, mascaras: Sequence[int]) -> int:
+    return _RESOLUTOR.resolver_bloque(vacias, indice, mascaras)
+
+
+def generar_tabla_finales(
+    directorio: str,
+    max_vacias: int,
+    tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True,
+    procesos: Optional[int] = None,
+    tamano_bloque: int = 200,
+) -> List[NivelGenerado]:
+    """
+    Genera (o completa) en `directorio` los niveles 0..max_vacias. Los
+    niveles ya terminados se reutilizan y, dentro de un nivel a medias,
+    los bloques ya guardados con el mismo `tamano_bloque`. `procesos=1`
+    resuelve en este proceso.
+    """
+    if not 0 <= max_vacias <= MAX_DISTANCIA:
+        raise ValueError(f"max_vacias fuera de rango: {max_vacias}")
+    os.makedirs(directorio, exist_ok=True)
+    topologia = obtener_topologia(tamano, envolvente)
+    canonizador = _Canonizador(topologia)
+    bytes_mascara = (topologia.celdas + 7) // 8
+
+    ejecutor = None
+    local = _Resolutor(directorio, tamano, envolvente)
+    if procesos != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        ejecutor = ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_iniciar_trabajador,
+            initargs=(directorio, tamano, envolvente),
+        )
+
+    resumen = []
+    anteriores = [0]
+    try:
+        for vacias in range(max_vacias + 1):
+            inicio = time.perf_counter()
+            ruta = _ruta_nivel(directorio, vacias)
+            if os.path.exists(ruta):
+                nivel = _Nivel(ruta, topologia)
+                anteriores = sorted(nivel.desplazamientos)
+                entradas = len(nivel.datos) - min(nivel.desplazamientos.values())
+                nivel.cerrar()
+                resumen.append(NivelGenerado(vacias, len(anteriores), entradas, 0.0, True))
+                continue
+
+            conjuntos = (
+                [0] if vacias == 0
+                else _conjuntos_nivel(anteriores, canonizador, topologia.celdas)
+            )
+            _preparar_particion(directorio, vacias, tamano_bloque, len(conjuntos))
+            bloques = [
+                conjuntos[i:i + tamano_bloque]
+                for i in range(0, len(conjuntos), tamano_bloque)
+            ]
+            pendientes = [
+                i for i in range(len(bloques))
+                if not os.path.exists(_ruta_bloque(directorio, vacias, i))
+            ]
+            if ejecutor is None or len(pendientes) <= 1:
+                for i in pendientes:
+                    local.resolver_bloque(vacias, i, bloques[i])
+            else:
+                futuros = [
+                    ejecutor.submit(_resolver_bloque, vacias, i, bloques[i])
+                    for i in pendientes
+                ]
+                for futuro in futuros:
+                    futuro.result()
+
+            entradas = _unir_bloques(
+                directorio, vacias, topologia, conjuntos, len(bloques), bytes_mascara
+            )
+            segundos = time.perf_counter() - inicio
+            reanudado = len(pendientes) < len(bloques)
+            resumen.append(
+                NivelGenerado(vacias, len(conjuntos), entradas, segundos, reanudado)
+            )
+            logger.info(
+                "Nivel %d: %d conjuntos, %d entradas en %.1f s",
+                vacias, len(conjuntos), entradas, segundos,
+            )
+            anteriores = conjuntos
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+        if local._anterior is not None:
+            local._anterior.cerrar()
+    return resumen
+
+
+def _unir_bloques(
+    directorio: str,
+    vacias: int,
+    topologia: Topologia,
+    conjuntos: Sequence[int],
+    cantidad_bloques: int,
+    bytes_mascara: int,
+) -> int:
+    """Escribe nivel_KK.bin con el índice y los bloques, y borra los bloques"""
+    entrada = struct.Struct(f"<{bytes_mascara}sQ")
+    indice = bytearray()
+    desplazamiento = 0
+    for mascara in conjuntos:
+        indice += entrada.pack(mascara.to_bytes(bytes_mascara, "little"), desplazamiento)
+        cantidad = _frontera(mascara, topologia)[1]
+        desplazamiento += cantidad * cantidad * 2
+
+    ruta = _ruta_nivel(directorio, vacias)
+    with open(ruta + ".tmp", "wb") as archivo:
+        archivo.write(_CABECERA.pack(
+            MAGICO, VERSION, topologia.tamano, topologia.envolvente, vacias,
+            len(conjuntos), bytes_mascara,
+        ))
+        archivo.write(indice)
+        for i in range(cantidad_bloques):
+            with open(_ruta_bloque(directorio, vacias, i), "rb") as bloque:
+                archivo.write(bloque.read())
+    os.replace(ruta + ".tmp", ruta)
+    for i in range(cantidad_bloques):
+        os.remove(_ruta_bloque(directorio, vacias, i))
+    os.remove(_ruta_particion(directorio, vacias))
+    return desplazamiento
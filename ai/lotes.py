@@ -0,0 +1,170 @@
+"""
+Evaluación vectorizada (numpy) de muchos estados en una sola llamada.
+
+Calcula lo mismo que FuncionEvaluadora.evaluar_estado,
+f(e) = movimientos_azul - movimientos_rojo, pero para un lote: las celdas
+de todos los estados se apilan en una matriz y los movimientos desde cada
+cabeza se cuentan indexando la tabla de vecinos de la topología.
+evaluar_jugadas_lote puntúa además los hijos de cada estado sin crearlos.
+
+Este módulo importa numpy; por eso no se reexporta desde ai/__init__.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from core.interfaces import (
+    AZUL,
+    CODIGO_AZUL,
+    CODIGO_ROJO,
+    CODIGO_VACIO,
+    EstadoJuego,
+    Posicion,
+    Topologia,
+)
+
+# Tablas de vecinos como arrays, una por topología
+_VECINOS: Dict[Topologia, np.ndarray] = {}
+
+
+def _tabla_vecinos(topologia: Topologia) -> np.ndarray:
+    """
+    Matriz (celdas x 4) de índices de vecinos; los huecos (bordes de un
+    tablero acotado) apuntan a una columna centinela que nunca está vacía
+    """
+    tabla = _VECINOS.get(topologia)
+    if tabla is None:
+        tabla = np.full((topologia.celdas, 4), topologia.celdas, dtype=np.intp)
+        for indice, vecinos in enumerate(topologia.vecinos):
+            tabla[indice, : len(vecinos)] = vecinos
+        _VECINOS[topologia] = tabla
+    return tabla
+
+
+def _indices_cabeza(estados: Sequence[EstadoJuego], atributo: str) -> np.ndarray:
+    """Índice de la cabeza de cada estado, o -1 si el jugador no tiene"""
+    resultado = np.empty(len(estados), dtype=np.intp)
+    for i, estado in enumerate(estados):
+        cabeza = getattr(estado, atributo)
+        resultado[i] = -1 if cabeza is None else estado.topologia.indice(cabeza)
+    return resultado
+
+
+def _matriz_celdas(estados: Sequence[EstadoJuego], topologia: Topologia) -> np.ndarray:
+    return np.frombuffer(
+        b"".join(bytes(estado.celdas) for estado in estados), dtype=np.uint8
+    ).reshape(len(estados), topologia.celdas)
+
+
+def _contar_movimientos(
+    vacias: np.ndarray, total_vacias: np.ndarray, vecinos: np.ndarray,
+    cabezas: np.ndarray,
+) -> np.ndarray:
+    filas = np.arange(len(cabezas))[:, None]
+    desde_cabeza = vacias[filas, vecinos[np.maximum(cabezas, 0)]].sum(axis=1)
+    # Sin cabeza, cualquier casilla vacía es válida
+    return np.where(cabezas >= 0, desde_cabeza, total_vacias)
+
+
+def _valores(
+    celdas: np.ndarray, cabezas_azul: np.ndarray, cabezas_rojo: np.ndarray,
+    topologia: Topologia,
+) -> np.ndarray:
+    """f(e) para cada fila de `celdas` (una fila por estado)"""
+    # Columna extra (centinela) siempre ocupada
+    vacias = np.zeros((len(celdas), topologia.celdas + 1), dtype=np.int16)
+    vacias[:, : topologia.celdas] = celdas == CODIGO_VACIO
+    total_vacias = vacias.sum(axis=1)
+
+    vecinos = _tabla_vecinos(topologia)
+    azul = _contar_movimientos(vacias, total_vacias, vecinos, cabezas_azul)
+    rojo = _contar_movimientos(vacias, total_vacias, vecinos, cabezas_rojo)
+    return (azul - rojo).astype(np.float64)
+
+
+def _agrupar(estados: Sequence[EstadoJuego]) -> Dict[Topologia, List[int]]:
+    grupos: Dict[Topologia, List[int]] = defaultdict(list)
+    for i, estado in enumerate(estados):
+        grupos[estado.topologia].append(i)
+    return grupos
+
+
+def _evaluar_misma_topologia(
+    estados: Sequence[EstadoJuego], topologia: Topologia
+) -> np.ndarray:
+    return _valores(
+        _matriz_celdas(estados, topologia),
+        _indices_cabeza(estados, "cabeza_azul"),
+        _indices_cabeza(estados, "cabeza_roja"),
+        topologia,
+    )
+
+
+def evaluar_lote(estados: Sequence[EstadoJuego]) -> np.ndarray:
+    """
+    Valor de cada estado (+ favorable a azul, - favorable a rojo), en el
+    mismo orden. Admite estados de distintas topologías en el mismo lote.
+    """
+    if not estados:
+        return np.zeros(0, dtype=np.float64)
+
+    grupos = _agrupar(estados)
+    if len(grupos) == 1:
+        return _evaluar_misma_topologia(estados, estados[0].topologia)
+
+    valores = np.empty(len(estados), dtype=np.float64)
+    for topologia, indices in grupos.items():
+        valores[indices] = _evaluar_misma_topologia(
+            [estados[i] for i in indices], topologia
+        )
+    return valores
+
+
+def _evaluar_jugadas_misma_topologia(
+    estados: Sequence[EstadoJuego],
+    jugadas: Sequence[Sequence[Posicion]],
+    topologia: Topologia,
+) -> np.ndarray:
+    cantidades = np.fromiter((len(j) for j in jugadas), dtype=np.intp, count=len(jugadas))
+    destinos = np.fromiter(
+        (topologia.indice(pos) for lista in jugadas for pos in lista),
+        dtype=np.intp,
+        count=int(cantidades.sum()),
+    )
+    mueve_azul = np.repeat(
+        np.fromiter((e.turno == AZUL for e in estados), dtype=bool, count=len(estados)),
+        cantidades,
+    )
+
+    # Una fila por hijo: la del padre con la casilla jugada ocupada
+    celdas = np.repeat(_matriz_celdas(estados, topologia), cantidades, axis=0)
+    celdas[np.arange(len(destinos)), destinos] = np.where(
+        mueve_azul, CODIGO_AZUL, CODIGO_ROJO
+    )
+    cabezas_azul = np.repeat(_indices_cabeza(estados, "cabeza_azul"), cantidades)
+    cabezas_rojo = np.repeat(_indices_cabeza(estados, "cabeza_roja"), cantidades)
+    cabezas_azul[mueve_azul] = destinos[mueve_azul]
+    cabezas_rojo[~mueve_azul] = destinos[~mueve_azul]
+    return _valores(celdas, cabezas_azul, cabezas_rojo, topologia)
+
+
+def evaluar_jugadas_lote(
+    estados: Sequence[EstadoJuego], jugadas: Sequence[Sequence[Posicion]]
+) -> List[np.ndarray]:
+    """
+    Valor de cada estado tras cada una de sus jugadas (del jugador en
+    turno), sin construir los estados hijos: para el estado i, un array con
+    un valor por posición de jugadas[i]. Las jugadas deben ser válidas.
+    """
+    resultado: List[np.ndarray] = [np.zeros(0, dtype=np.float64)] * len(estados)
+    for topologia, indices in _agrupar(estados).items():
+        grupo_jugadas = [jugadas[i] for i in indices]
+        valores = _evaluar_jugadas_misma_topologia(
+            [estados[i] for i in indices], grupo_jugadas, topologia
+        )
+        limites = np.cumsum([len(j) for j in grupo_jugadas])[:-1]
+        for i, tramo in zip(indices, np.split(valores, limites)):
+            resultado[i] = tramo
+    return resultado
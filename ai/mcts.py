@@ -0,0 +1,265 @@
+"""
+Búsqueda por árbol de Monte Carlo (UCT) con reutilización del árbol entre
+turnos.
+
+Es un algoritmo "anytime": cada iteración baja por el árbol eligiendo con
+UCB1, agrega un hijo, juega una partida simulada hasta el final y propaga
+el resultado. Se corta por cantidad de simulaciones, por tiempo o por un
+evento, y siempre tiene una jugada lista (la más visitada).
+
+Las simulaciones usan el estado compacto de ai.solucionador (máscara de
+vacías, cabezas y diferencia de fichas): una jugada es un par de
+operaciones sobre enteros, sin crear EstadoJuego. Con `heuristica` cada
+jugada simulada maximiza la movilidad propia menos la del rival (la misma
+idea que FuncionEvaluadora, contada con popcount sobre las máscaras),
+salvo una fracción `epsilon` de jugadas al azar.
+
+Entre turnos se conserva el subárbol de la posición que efectivamente se
+jugó: la raíz nueva se busca entre los nietos de la anterior (la jugada
+propia y la respuesta del rival), con sus visitas acumuladas.
+"""
+
+import math
+import random
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from core.interfaces import AZUL, CODIGO_VACIO, CODIGOS, ROJO, EstadoJuego, Posicion, Topologia
+from ai.finales import casillas_mascara
+
+# Simulaciones entre consultas del reloj y del evento de detención
+SIMULACIONES_ENTRE_COMPROBACIONES = 16
+
+
+class ResultadoMCTS(NamedTuple):
+    movimiento: Optional[Posicion]
+    simulaciones: int
+    segundos: float
+    # Fracción de victorias (empate = 1/2) del movimiento elegido
+    valor: float
+    # Simulaciones que ya traía la raíz del turno anterior
+    reutilizadas: int
+    nodos: int  # Nodos del árbol al terminar
+
+
+class _Nodo:
+    """
+    Posición del árbol, desde el punto de vista de quien mueve en ella;
+    `valor` acumula los resultados de quien hizo la jugada que lleva aquí
+    """
+
+    __slots__ = (
+        "vacias", "propia", "ajena", "diferencia", "jugada",
+        "padre", "hijos", "pendientes", "visitas", "valor",
+    )
+
+    def __init__(self, vacias: int, propia: int, ajena: int, diferencia: int,
+                 jugada: int, padre: Optional["_Nodo"], jugadas: List[int]):
+        self.vacias = vacias
+        self.propia = propia
+        self.ajena = ajena
+        self.diferencia = diferencia
+        self.jugada = jugada
+        self.padre = padre
+        self.hijos: List[_Nodo] = []
+        self.pendientes = jugadas  # Jugadas todavía sin hijo
+        self.visitas = 0
+        self.valor = 0.0
+
+
+class BusquedaMCTS:
+    """UCT sobre una topología, con el árbol conservado entre llamadas"""
+
+    def __init__(
+        self,
+        topologia: Topologia,
+        exploracion: float = 1.4,
+        heuristica: bool = True,
+        epsilon: float = 0.25,
+        max_nodos: int = 500_000,
+        semilla: Optional[int] = None,
+    ):
+        self.topologia = topologia
+        self.exploracion = exploracion
+        self.heuristica = heuristica
+        self.epsilon = epsilon
+        self.max_nodos = max_nodos
+        self.sin_cabeza = topologia.celdas
+        self._vecinos = topologia.mascaras_vecinos
+        self._rng = random.Random(semilla)
+        self.raiz: Optional[_Nodo] = None
+        self.nodos = 0
+
+    # ===== Interfaz =====
+
+    def buscar(
+        self,
+        estado: EstadoJuego,
+        jugador: str,
+        simulaciones: Optional[int] = None,
+        milisegundos: Optional[float] = None,
+        detener: Optional[threading.Event] = None,
+    ) -> ResultadoMCTS:
+        """
+        Mejor jugada para `jugador`, que mueve en `estado`. Sin
+        `simulaciones` ni `milisegundos` ni `detener` hace 1000 simulaciones.
+        """
+        inicio = time.perf_counter()
+        raiz = self._ubicar_raiz(*self._compacto(estado, jugador))
+        reutilizadas = raiz.visitas
+        if simulaciones is None and milisegundos is None and detener is None:
+            simulaciones = 1000
+        fin = None if milisegundos is None else inicio + milisegundos / 1000
+
+        hechas = 0
+        while simulaciones is None or hechas < simulaciones:
+            if hechas % SIMULACIONES_ENTRE_COMPROBACIONES == 0 and hechas:
+                if fin is not None and time.perf_counter() >= fin:
+                    break
+                if detener is not None and detener.is_set():
+                    break
+            self._iterar(raiz)
+            hechas += 1
+
+        segundos = time.perf_counter() - inicio
+        if not raiz.hijos:
+            return ResultadoMCTS(None, hechas, segundos, 0.0, reutilizadas, self.nodos)
+        mejor = max(raiz.hijos, key=lambda hijo: hijo.visitas)
+        return ResultadoMCTS(
+            self.topologia.posiciones[mejor.jugada], hechas, segundos,
+            mejor.valor / mejor.visitas, reutilizadas, self.nodos,
+        )
+
+    def _compacto(self, estado: EstadoJuego, jugador: str):
+        if estado.topologia is not self.topologia:
+            raise ValueError(f"La búsqueda es para {self.topologia}")
+        otro = ROJO if jugador == AZUL else AZUL
+        diferencia = estado.celdas.count(CODIGOS[otro]) - estado.celdas.count(CODIGOS[jugador])
+        vacias = sum(
+            1 << i for i, codigo in enumerate(estado.celdas) if codigo == CODIGO_VACIO
+        )
+        if jugador == AZUL:
+            propia, ajena = estado.cabeza_azul, estado.cabeza_roja
+        else:
+            propia, ajena = estado.cabeza_roja, estado.cabeza_azul
+        return (
+            vacias, self._codigo_cabeza(propia), self._codigo_cabeza(ajena),
+            max(0, min(diferencia, 1)),
+        )
+
+    def _codigo_cabeza(self, cabeza: Optional[Posicion]) -> int:
+        return self.sin_cabeza if cabeza is None else self.topologia.indice(cabeza)
+
+    def _ubicar_raiz(self, vacias: int, propia: int, ajena: int, diferencia: int) -> _Nodo:
+        """El nodo de la posición actual en el árbol anterior, o uno nuevo"""
+        clave = (vacias, propia, ajena, diferencia)
+        anterior = self.raiz
+        if anterior is not None:
+            candidatos = [anterior]
+            for hijo in anterior.hijos:
+                candidatos.append(hijo)
+                candidatos.extend(hijo.hijos)
+            for nodo in candidatos:
+                if (nodo.vacias, nodo.propia, nodo.ajena, nodo.diferencia) == clave:
+                    nodo.padre = None  # Lo demás queda para el recolector
+                    self.raiz = nodo
+                    self.nodos = self._contar(nodo)
+                    return nodo
+        self.raiz = _Nodo(vacias, propia, ajena, diferencia, -1, None,
+                          casillas_mascara(self._jugadas(vacias, propia)))
+        self.nodos = 1
+        return self.raiz
+
+    @staticmethod
+    def _contar(raiz: _Nodo) -> int:
+        cantidad = 0
+        pila = [raiz]
+        while pila:
+            nodo = pila.pop()
+            cantidad += 1
+            pila.extend(nodo.hijos)
+        return cantidad
+
+    def _jugadas(self, vacias: int, propia: int) -> int:
+        if propia == self.sin_cabeza:
+            return vacias
+        return vacias & self._vecinos[propia]
+
+    # ===== UCT =====
+
+    def _iterar(self, raiz: _Nodo) -> None:
+        nodo = raiz
+        # Selección: bajar mientras el nodo esté completamente expandido
+        while not nodo.pendientes and nodo.hijos:
+            registro = math.log(nodo.visitas)
+            exploracion = self.exploracion
+            mejor = None
+            mejor_puntaje = -1.0
+            for hijo in nodo.hijos:
+                if hijo.visitas == 0:
+                    # Puede quedar sin visitas un hijo si la búsqueda se cortó
+                    mejor = hijo
+                    break
+                puntaje = hijo.valor / hijo.visitas + exploracion * math.sqrt(
+                    registro / hijo.visitas
+                )
+                if puntaje > mejor_puntaje:
+                    mejor, mejor_puntaje = hijo, puntaje
+            nodo = mejor
+
+        # Expansión: un hijo nuevo por iteración
+        if nodo.pendientes and self.nodos < self.max_nodos:
+            jugadas = nodo.pendientes
+            jugada = jugadas.pop(self._rng.randrange(len(jugadas)))
+            vacias = nodo.vacias ^ (1 << jugada)
+            hijo = _Nodo(vacias, nodo.ajena, jugada, 1 - nodo.diferencia, jugada, nodo,
+                         casillas_mascara(self._jugadas(vacias, nodo.ajena)))
+            nodo.hijos.append(hijo)
+            self.nodos += 1
+            nodo = hijo
+
+        # Simulación: resultado para quien mueve en `nodo`
+        resultado = self._simular(nodo.vacias, nodo.propia, nodo.ajena, nodo.diferencia)
+
+        # Propagación: cada nodo suma el resultado de quien movió hacia él
+        while nodo is not None:
+            nodo.visitas += 1
+            nodo.valor += 1.0 - resultado
+            resultado = 1.0 - resultado
+            nodo = nodo.padre
+
+    def _simular(self, vacias: int, propia: int, ajena: int, diferencia: int) -> float:
+        """Partida al azar (o guiada) hasta el final: 1, 0 o 1/2 para quien mueve"""
+        vecinos = self._vecinos
+        sin_cabeza = self.sin_cabeza
+        aleatorio = self._rng.random
+        heuristica = self.heuristica
+        epsilon = self.epsilon
+        mueve_inicial = True
+        while True:
+            jugadas = vacias if propia == sin_cabeza else vacias & vecinos[propia]
+            if not jugadas:
+                # Sin jugadas pierde quien mueve, salvo tablero lleno parejo
+                if not vacias and not diferencia:
+                    return 0.5
+                return 0.0 if mueve_inicial else 1.0
+            casillas = casillas_mascara(jugadas)
+            if len(casillas) == 1:
+                jugada = casillas[0]
+            elif not heuristica or aleatorio() < epsilon:
+                jugada = casillas[int(aleatorio() * len(casillas))]
+            else:
+                # Movilidad propia tras la jugada menos la del rival
+                jugada = -1
+                mejor = -99
+                for casilla in casillas:
+                    resto = vacias ^ (1 << casilla)
+                    rival = resto if ajena == sin_cabeza else resto & vecinos[ajena]
+                    puntaje = (resto & vecinos[casilla]).bit_count() - rival.bit_count()
+                    if puntaje > mejor:
+                        jugada, mejor = casilla, puntaje
+            vacias ^= 1 << jugada
+            propia, ajena = ajena, jugada
+            diferencia = 1 - diferencia
+            mueve_inicial = not mueve_inicial
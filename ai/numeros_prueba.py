@@ -0,0 +1,234 @@
+"""
+Búsqueda por números de prueba en profundidad (df-pn) para demostrar
+victorias o derrotas forzadas.
+
+Minimax con profundidad fija se pierde en las líneas forzadas largas de
+los finales (una o dos respuestas durante muchas jugadas). df-pn avanza
+siempre por el hijo más fácil de demostrar o refutar, así que esas líneas
+se recorren enteras con pocos nodos.
+
+Cada búsqueda tiene un atacante. Cada nodo guarda (phi, delta), los
+números de prueba y refutación del objetivo de quien mueve en ese nodo:
+"gana el atacante" si mueve el atacante, "el atacante no gana" si mueve
+el defensor. Entonces phi(n) = min delta(hijo) y
+delta(n) = suma phi(hijo). Con el umbral 1+epsilon se evita ir y venir
+entre hermanos.
+
+El estado es el compacto de ai.solucionador (máscara de vacías, cabezas
+y diferencia de fichas); no se crean EstadoJuego. La tabla está acotada
+(`tamano_tabla`): al llenarse se descarta la mitad con menos trabajo,
+conservando antes lo ya demostrado. Se reutiliza entre llamadas, así una
+prueba casi terminada en un turno se completa en el siguiente.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from core.interfaces import (
+    AZUL,
+    CODIGO_VACIO,
+    CODIGOS,
+    ROJO,
+    EstadoJuego,
+    Posicion,
+    Topologia,
+)
+from ai.finales import casillas_mascara
+from ai.solucionador import EMPATE, GANA, PIERDE
+
+INFINITO = 1 << 40
+
+
+class ResultadoPrueba(NamedTuple):
+    # GANA, PIERDE o EMPATE para quien mueve; None si no alcanzó el presupuesto
+    resultado: Optional[int]
+    movimiento: Optional[Posicion]  # La jugada que gana, si resultado == GANA
+    nodos: int
+
+
+class _PresupuestoAgotado(Exception):
+    pass
+
+
+# Nodo: (vacías, cabeza propia, cabeza ajena, diferencia, mueve el atacante)
+Nodo = Tuple[int, int, int, int, int]
+
+
+class BusquedaNumerosPrueba:
+    """df-pn sobre una topología con presupuesto de nodos y tabla acotada"""
+
+    def __init__(
+        self,
+        topologia: Topologia,
+        max_nodos: int = 100_000,
+        tamano_tabla: int = 1_000_000,
+        epsilon: float = 0.25,
+    ):
+        self.topologia = topologia
+        self.max_nodos = max_nodos
+        self.tamano_tabla = tamano_tabla
+        self.epsilon = epsilon
+        self.sin_cabeza = topologia.celdas
+        self._codigos = topologia.celdas + 1
+        # clave -> (phi, delta, trabajo)
+        self.tabla: Dict[int, Tuple[int, int, int]] = {}
+        self.nodos = 0
+        self._limite = 0
+
+    # ===== Interfaz =====
+
+    def resolver(
+        self, estado: EstadoJuego, jugador: str, solo_victoria: bool = False
+    ) -> ResultadoPrueba:
+        """
+        Intenta demostrar el resultado para `jugador`, que mueve en
+        `estado`, con a lo sumo max_nodos nodos. Primero busca una victoria;
+        si queda refutada (y no `solo_victoria`) busca una derrota, y si
+        también se refuta el resultado es empate.
+        """
+        vacias, propia, ajena, diferencia = self._compacto(estado, jugador)
+        self.nodos = 0
+        self._limite = self.max_nodos
+
+        ganada = self._probar((vacias, propia, ajena, diferencia, 1))
+        if ganada:
+            movimiento = self._jugada_ganadora(vacias, propia, ajena, diferencia)
+            if movimiento is None:
+                return ResultadoPrueba(None, None, self.nodos)
+            return ResultadoPrueba(GANA, movimiento, self.nodos)
+        if ganada is None or solo_victoria:
+            return ResultadoPrueba(None, None, self.nodos)
+
+        # Ahora ataca el rival: el objetivo de la raíz es que no gane
+        salvada = self._probar((vacias, propia, ajena, diferencia, 0))
+        if salvada is None:
+            return ResultadoPrueba(None, None, self.nodos)
+        return ResultadoPrueba(EMPATE if salvada else PIERDE, None, self.nodos)
+
+    def _compacto(self, estado: EstadoJuego, jugador: str) -> Tuple[int, int, int, int]:
+        if estado.topologia is not self.topologia:
+            raise ValueError(f"La búsqueda es para {self.topologia}")
+        otro = ROJO if jugador == AZUL else AZUL
+        diferencia = estado.celdas.count(CODIGOS[otro]) - estado.celdas.count(CODIGOS[jugador])
+        if diferencia not in (0, 1):
+            raise ValueError("Diferencia de fichas imposible para el jugador en turno")
+        vacias = sum(
+            1 << i for i, codigo in enumerate(estado.celdas) if codigo == CODIGO_VACIO
+        )
+        if jugador == AZUL:
+            propia, ajena = estado.cabeza_azul, estado.cabeza_roja
+        else:
+            propia, ajena = estado.cabeza_roja, estado.cabeza_azul
+        return vacias, self._codigo_cabeza(propia), self._codigo_cabeza(ajena), diferencia
+
+    def _codigo_cabeza(self, cabeza: Optional[Posicion]) -> int:
+        return self.sin_cabeza if cabeza is None else self.topologia.indice(cabeza)
+
+    def _jugada_ganadora(
+        self, vacias: int, propia: int, ajena: int, diferencia: int
+    ) -> Optional[Posicion]:
+        """
+        Una jugada hacia un hijo refutado. Si la recolección ya lo descartó
+        de la tabla se vuelve a demostrar cada hijo con el presupuesto que
+        queda; None si no alcanza.
+        """
+        hijos = [
+            (jugada, (vacias ^ (1 << jugada), ajena, jugada, 1 - diferencia, 0))
+            for jugada in casillas_mascara(self._jugadas(vacias, propia))
+        ]
+        for jugada, hijo in hijos:
+            if self._consultar(self._clave(hijo), hijo)[1] == 0:
+                return self.topologia.posiciones[jugada]
+        for jugada, hijo in hijos:
+            salvado = self._probar(hijo)
+            if salvado is None:
+                return None
+            if not salvado:
+                return self.topologia.posiciones[jugada]
+        return None
+
+    # ===== df-pn =====
+
+    def _probar(self, raiz: Nodo) -> Optional[bool]:
+        """True si se demuestra el objetivo de la raíz, False si se refuta"""
+        clave = self._clave(raiz)
+        phi, delta = self._consultar(clave, raiz)
+        try:
+            if phi and delta:
+                phi, delta = self._mid(raiz, clave, INFINITO, INFINITO)
+        except _PresupuestoAgotado:
+            return None
+        return phi == 0
+
+    def _clave(self, nodo: Nodo) -> int:
+        vacias, propia, ajena, diferencia, atacante = nodo
+        codigos = self._codigos
+        return (((vacias * codigos + propia) * codigos + ajena) * 2 + diferencia) * 2 + atacante
+
+    def _jugadas(self, vacias: int, propia: int) -> int:
+        if propia == self.sin_cabeza:
+            return vacias
+        return vacias & self.topologia.mascaras_vecinos[propia]
+
+    def _consultar(self, clave: int, nodo: Nodo) -> Tuple[int, int]:
+        entrada = self.tabla.get(clave)
+        if entrada is not None:
+            return entrada[0], entrada[1]
+        vacias, propia, _, diferencia, atacante = nodo
+        if self._jugadas(vacias, propia):
+            return 1, 1
+        # Sin jugadas quien mueve pierde, salvo tablero lleno con empate:
+        # eso solo cumple el objetivo del defensor
+        if not vacias and not diferencia and not atacante:
+            return 0, INFINITO
+        return INFINITO, 0
+
+    def _guardar(self, clave: int, phi: int, delta: int, trabajo: int) -> None:
+        if len(self.tabla) >= self.tamano_tabla:
+            self._recolectar()
+        self.tabla[clave] = (phi, delta, trabajo)
+
+    def _recolectar(self) -> None:
+        """Conserva la mitad más valiosa: lo resuelto y lo que más costó"""
+        conservar = sorted(
+            self.tabla.items(),
+            key=lambda item: (item[1][0] == 0 or item[1][1] == 0, item[1][2]),
+            reverse=True,
+        )[: self.tamano_tabla // 2]
+        self.tabla = dict(conservar)
+
+    def _mid(
+        self, nodo: Nodo, clave: int, umbral_phi: int, umbral_delta: int
+    ) -> Tuple[int, int]:
+        self.nodos += 1
+        if self.nodos > self._limite:
+            raise _PresupuestoAgotado
+        inicio = self.nodos
+
+        vacias, propia, ajena, diferencia, atacante = nodo
+        hijos = []
+        for jugada in casillas_mascara(self._jugadas(vacias, propia)):
+            hijo = (vacias ^ (1 << jugada), ajena, jugada, 1 - diferencia, 1 - atacante)
+            hijos.append((self._clave(hijo), hijo))
+
+        while True:
+            suma_phi = 0
+            menor_delta = segundo_delta = INFINITO
+            mejor = None
+            phi_mejor = 0
+            for clave_hijo, hijo in hijos:
+                phi_hijo, delta_hijo = self._consultar(clave_hijo, hijo)
+                suma_phi += phi_hijo
+                if delta_hijo < menor_delta:
+                    segundo_delta = menor_delta
+                    menor_delta, mejor, phi_mejor = delta_hijo, (hijo, clave_hijo), phi_hijo
+                elif delta_hijo < segundo_delta:
+                    segundo_delta = delta_hijo
+            phi, delta = menor_delta, min(suma_phi, INFINITO)
+            if phi >= umbral_phi or delta >= umbral_delta:
+                break
+            umbral_hijo_phi = umbral_delta - delta + phi_mejor
+            umbral_hijo_delta = min(umbral_phi, int(segundo_delta * (1 + self.epsilon)) + 1)
+            self._mid(mejor[0], mejor[1], umbral_hijo_phi, umbral_hijo_delta)
+
+        self._guardar(clave, phi, delta, self.nodos - inicio)
+        return phi, delta
@@ -0,0 +1,320 @@
+"""
+Solución completa del juego en tableros chicos (4x4 a 6x6): valor teórico
+desde el tablero vacío con juego perfecto de ambos lados.
+
+Búsqueda negamax con memoización sobre un estado compacto, el mismo que
+usa la tabla de finales: casillas vacías (máscara de bits), cabeza de cada
+jugador (casilla, "sin cabeza" antes de su primera jugada o "bloqueada"
+cuando ya no toca casillas vacías) y diferencia de fichas. El estado se
+lleva a una forma canónica bajo las simetrías del tablero antes de
+memoizarlo, y cada posición se guarda como un entero.
+
+Los valores son para el jugador en turno: 1 gana, 0 empate, -1 pierde. La
+memoria se vuelca a SQLite cuando supera `max_memoria` entradas (primero
+las más antiguas). Con `ruta` el archivo queda como base de resultados:
+una fila por posición resuelta y una por tablero resuelto (tabla
+soluciones), reutilizable en ejecuciones siguientes.
+"""
+
+import logging
+import os
+import time
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional
+
+from ai.finales import casillas_mascara
+from core.interfaces import (
+    AZUL,
+    CODIGO_VACIO,
+    CODIGOS,
+    ROJO,
+    EstadoJuego,
+    Posicion,
+    obtener_simetrias,
+    obtener_topologia,
+)
+
+logger = logging.getLogger(__name__)
+
+GANA = 1
+EMPATE = 0
+PIERDE = -1
+NOMBRES_VALOR = {GANA: "gana", EMPATE: "empate", PIERDE: "pierde"}
+
+# Las claves se guardan como enteros de 64 bits en SQLite
+MAX_TAMANO = 7
+
+
+class ResultadoSolucion(NamedTuple):
+    tamano: int
+    envolvente: bool
+    valor: int  # Para el primer jugador
+    mejores: List[Posicion]  # Primeras jugadas que consiguen ese valor
+    posiciones: int  # Posiciones distintas (salvo simetría) resueltas
+    nodos: int  # Nodos visitados, incluidos los resueltos por la tabla
+    segundos: float
+
+
+class TablaSolucion:
+    """
+    Memo posición -> valor en un dict; al superar `max_memoria` entradas
+    la mitad más antigua pasa a SQLite (en `ruta` o en un temporal)
+    """
+
+    def __init__(self, ruta: Optional[str], nombre: str, max_memoria: int = 5_000_000):
+        self.nombre = nombre
+        self.max_memoria = max_memoria
+        # sqlite3 y tempfile solo hacen falta al resolver, no al importar
+        import sqlite3
+        import tempfile
+
+        self._temporal = None
+        if ruta is None:
+            self._temporal = tempfile.TemporaryDirectory()
+            ruta = os.path.join(self._temporal.name, "tabla.db")
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=OFF")
+        self._conexion.execute(
+            f"CREATE TABLE IF NOT EXISTS {nombre} "
+            "(clave INTEGER PRIMARY KEY, valor INTEGER NOT NULL)"
+        )
+        self._memoria: Dict[int, int] = {}
+        (self.en_disco,) = self._conexion.execute(f"SELECT COUNT(*) FROM {nombre}").fetchone()
+        self.lecturas_disco = 0
+        self.desbordes = 0
+
+    def __len__(self) -> int:
+        return len(self._memoria) + self.en_disco
+
+    def obtener(self, clave: int) -> Optional[int]:
+        valor = self._memoria.get(clave)
+        if valor is None and self.en_disco:
+            self.lecturas_disco += 1
+            fila = self._conexion.execute(
+                f"SELECT valor FROM {self.nombre} WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is not None:
+                valor = fila[0]
+        return valor
+
+    def guardar(self, clave: int, valor: int) -> None:
+        self._memoria[clave] = valor
+        if len(self._memoria) > self.max_memoria:
+            self._volcar(len(self._memoria) // 2)
+            self.desbordes += 1
+
+    def _volcar(self, cantidad: int) -> None:
+        """Pasa a disco las `cantidad` entradas más antiguas"""
+        filas = list(islice(self._memoria.items(), cantidad))
+        with self._conexion:
+            self._conexion.executemany(
+                f"INSERT OR REPLACE INTO {self.nombre} (clave, valor) VALUES (?, ?)", filas
+            )
+        for clave, _ in filas:
+            del self._memoria[clave]
+        self.en_disco += len(filas)
+        logger.debug("Tabla %s: %d posiciones a disco", self.nombre, len(filas))
+
+    def guardar_resumen(self, resultado: ResultadoSolucion) -> None:
+        with self._conexion:
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS soluciones (tamano INTEGER, envolvente INTEGER, "
+                "valor INTEGER, mejores TEXT, posiciones INTEGER, nodos INTEGER, "
+                "segundos REAL, PRIMARY KEY (tamano, envolvente))"
+            )
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO soluciones VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    resultado.tamano, resultado.envolvente, resultado.valor,
+                    " ".join(f"{p.x},{p.y}" for p in resultado.mejores),
+                    resultado.posiciones, resultado.nodos, resultado.segundos,
+                ),
+            )
+
+    def cerrar(self, conservar: bool = True) -> None:
+        """Con `conservar`, escribe en disco todo lo que queda en memoria"""
+        if conservar and self._temporal is None:
+            self._volcar(len(self._memoria))
+        self._conexion.close()
+        if self._temporal is not None:
+            self._temporal.cleanup()
+
+
+class Solucionador:
+    """Resuelve posiciones (y el tablero vacío) de una topología chica"""
+
+    def __init__(
+        self,
+        tamano: int = 4,
+        envolvente: bool = True,
+        ruta: Optional[str] = None,
+        max_memoria: int = 5_000_000,
+        reducir_simetrias: bool = True,
+    ):
+        if tamano > MAX_TAMANO:
+            raise ValueError(f"El solucionador admite tableros de hasta {MAX_TAMANO}x{MAX_TAMANO}")
+        self.topologia = obtener_topologia(tamano, envolvente)
+        celdas = self.topologia.celdas
+        self.todas = (1 << celdas) - 1
+        # Códigos de cabeza además de las casillas 0..celdas-1
+        self.sin_cabeza = celdas
+        self.bloqueada = celdas + 1
+
+        simetrias = obtener_simetrias(self.topologia) if reducir_simetrias else ()
+        self._simetrias = [p + (self.sin_cabeza, self.bloqueada) for p in simetrias]
+        self._bits = [tuple(1 << i for i in p[:celdas]) for p in simetrias]
+        self._candidatas = None
+        if envolvente and simetrias:
+            # Como en ai.finales: solo las que llevan una casilla del
+            # conjunto base a la 0
+            self._candidatas = [
+                [n for n, p in enumerate(simetrias) if p[i] == 0] for i in range(celdas)
+            ]
+
+        nombre = f"posiciones_{tamano}x{tamano}_{'envolvente' if envolvente else 'acotado'}"
+        self.tabla = TablaSolucion(ruta, nombre, max_memoria)
+        self.nodos = 0
+        self.posiciones = 0
+
+    # ===== Estado compacto =====
+
+    def clave(self, vacias: int, propia: int, ajena: int, diferencia: int) -> int:
+        """
+        Entero que identifica la posición salvo simetría. `diferencia` es 0
+        si quien mueve tiene tantas fichas como el otro y 1 si tiene una menos
+        """
+        if not self._simetrias:
+            return self._empaquetar(vacias, propia, ajena, diferencia)
+        # Base de la canonización: el conjunto más chico entre vacías y
+        # ocupadas (ambos determinan al otro)
+        ocupadas = self.todas ^ vacias
+        cantidad = vacias.bit_count()
+        desde_vacias = cantidad * 2 <= self.topologia.celdas
+        base = vacias if desde_vacias else ocupadas
+        if not base:
+            return self._empaquetar(vacias, propia, ajena, diferencia)
+        casillas = casillas_mascara(base)
+        if self._candidatas is None:
+            candidatas = range(len(self._simetrias))
+        else:
+            candidatas = [n for c in casillas for n in self._candidatas[c]]
+
+        mejor = None
+        for n in candidatas:
+            bits = self._bits[n]
+            permutacion = self._simetrias[n]
+            candidato = (
+                sum([bits[c] for c in casillas]), permutacion[propia], permutacion[ajena]
+            )
+            if mejor is None or candidato < mejor:
+                mejor = candidato
+        mascara, propia, ajena = mejor
+        if not desde_vacias:
+            mascara ^= self.todas
+        return self._empaquetar(mascara, propia, ajena, diferencia)
+
+    def _empaquetar(self, vacias: int, propia: int, ajena: int, diferencia: int) -> int:
+        codigos = self.topologia.celdas + 2
+        return ((vacias * codigos + propia) * codigos + ajena) * 2 + diferencia
+
+    def _normalizar(self, cabeza: int, vacias: int) -> int:
+        if cabeza < self.sin_cabeza and not self.topologia.mascaras_vecinos[cabeza] & vacias:
+            return self.bloqueada
+        return cabeza
+
+    # ===== Búsqueda =====
+
+    def resolver_posicion(self, vacias: int, propia: int, ajena: int, diferencia: int) -> int:
+        """Valor exacto para quien mueve (GANA, EMPATE o PIERDE)"""
+        self.nodos += 1
+        propia = self._normalizar(propia, vacias)
+        if propia == self.sin_cabeza:
+            jugadas = vacias
+        elif propia == self.bloqueada:
+            jugadas = 0
+        else:
+            jugadas = vacias & self.topologia.mascaras_vecinos[propia]
+        if not jugadas:
+            # Tablero lleno: decide la cantidad de fichas
+            if not vacias and not diferencia:
+                return EMPATE
+            return PIERDE
+
+        ajena = self._normalizar(ajena, vacias)
+        clave = self.clave(vacias, propia, ajena, diferencia)
+        valor = self.tabla.obtener(clave)
+        if valor is not None:
+            return valor
+
+        # Primero las jugadas que le quitan casillas a la cabeza rival
+        if ajena < self.sin_cabeza:
+            cerca = jugadas & self.topologia.mascaras_vecinos[ajena]
+            orden = casillas_mascara(cerca) + casillas_mascara(jugadas ^ cerca)
+        else:
+            orden = casillas_mascara(jugadas)
+        mejor = PIERDE
+        for jugada in orden:
+            valor = -self.resolver_posicion(
+                vacias ^ (1 << jugada), ajena, jugada, 1 - diferencia
+            )
+            if valor > mejor:
+                mejor = valor
+                if mejor == GANA:
+                    break
+        self.tabla.guardar(clave, mejor)
+        self.posiciones += 1
+        return mejor
+
+    def resolver(self) -> ResultadoSolucion:
+        """Valor desde el tablero vacío y todas las primeras jugadas óptimas"""
+        inicio = time.perf_counter()
+        valores = {}
+        for jugada in range(self.topologia.celdas):
+            valores[jugada] = -self.resolver_posicion(
+                self.todas ^ (1 << jugada), self.sin_cabeza, jugada, 1
+            )
+        valor = max(valores.values())
+        resultado = ResultadoSolucion(
+            tamano=self.topologia.tamano,
+            envolvente=self.topologia.envolvente,
+            valor=valor,
+            mejores=[self.topologia.posiciones[j] for j, v in valores.items() if v == valor],
+            posiciones=self.posiciones,
+            nodos=self.nodos,
+            segundos=time.perf_counter() - inicio,
+        )
+        self.tabla.guardar_resumen(resultado)
+        return resultado
+
+    def valor_estado(self, estado: EstadoJuego, jugador: str) -> int:
+        """Valor exacto de una posición del juego para `jugador`, que mueve"""
+        if estado.topologia is not self.topologia:
+            raise ValueError(f"El solucionador es para {self.topologia}")
+        otro = ROJO if jugador == AZUL else AZUL
+        diferencia = estado.celdas.count(CODIGOS[otro]) - estado.celdas.count(CODIGOS[jugador])
+        if diferencia not in (0, 1):
+            raise ValueError("Diferencia de fichas imposible para el jugador en turno")
+        vacias = sum(
+            1 << i for i, codigo in enumerate(estado.celdas) if codigo == CODIGO_VACIO
+        )
+        return self.resolver_posicion(
+            vacias,
+            self._codigo_cabeza(estado.cabeza_azul if jugador == AZUL else estado.cabeza_roja),
+            self._codigo_cabeza(estado.cabeza_roja if jugador == AZUL else estado.cabeza_azul),
+            diferencia,
+        )
+
+    def _codigo_cabeza(self, cabeza: Optional[Posicion]) -> int:
+        return self.sin_cabeza if cabeza is None else self.topologia.indice(cabeza)
+
+    def cerrar(self) -> None:
+        self.tabla.cerrar()
+
+    def __enter__(self) -> "Solucionador":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
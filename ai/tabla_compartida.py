@@ -0,0 +1,170 @@
+"""
+Tabla de transposición en memoria compartida (multiprocessing.shared_memory)
+para que varios procesos de búsqueda usen una sola tabla.
+
+Es un arreglo de tamaño fijo de entradas de 16 bytes, en cubetas de dos:
+la primera se reemplaza solo por una búsqueda igual o más profunda, la
+segunda siempre. Cada entrada son dos palabras de 64 bits:
+
+    verificación = clave XOR datos
+    datos        = valor (float32) | profundidad (6 bits) y cota (2 bits)
+                   | casilla (255 = ninguna) | proceso que la escribió
+
+No hay locks: si dos procesos escriben la misma entrada a la vez, o una
+lectura ve media escritura, la verificación no coincide y la entrada se
+trata como ausente (el esquema "lockless" de Hyatt y Mann).
+
+La clave es un hash de 64 bits (blake2b) de tablero, cabezas, jugador en
+turno y topología, igual en todos los procesos sin importar PYTHONHASHSEED.
+Como en CachePersistente, valor y cota son desde el punto de vista del
+jugador en turno.
+
+    tabla = TablaCompartida(entradas=1 << 20)         # proceso principal
+    TablaCompartida.abrir(tabla.nombre)               # en cada trabajador
+"""
+
+import hashlib
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+from core.interfaces import ROJO, EstadoJuego
+from ai.cache_persistente import EntradaCache
+
+_DATOS = struct.Struct("<fBBH")
+# Cabezas, turno y topología que se agregan al tablero antes del hash
+_EXTRA = struct.Struct("<HHBBB")
+BYTES_POR_ENTRADA = 16
+MAX_PROFUNDIDAD = 63
+SIN_CASILLA = 255
+
+
+class TablaCompartida:
+    """Tabla de transposición de tamaño fijo compartida entre procesos"""
+
+    def __init__(self, entradas: int = 1 << 20, nombre: Optional[str] = None,
+                 crear: bool = True):
+        if crear:
+            # Potencia de dos de cubetas (de dos entradas)
+            cubetas = 1 << max(0, (max(entradas, 2) // 2 - 1).bit_length())
+            self._memoria = shared_memory.SharedMemory(
+                name=nombre, create=True, size=cubetas * 2 * BYTES_POR_ENTRADA
+            )
+        else:
+            # Los trabajadores (fork o spawn) comparten el resource_tracker
+            # del proceso principal, que es quien la libera
+            self._memoria = shared_memory.SharedMemory(name=nombre)
+        self.nombre = self._memoria.name
+        self.propietaria = crear
+        self._palabras = self._memoria.buf.cast("Q")
+        self._mascara = len(self._palabras) // 4 - 1
+        self.proceso = os.getpid() & 0xFFFF
+
+        # Contadores de este proceso
+        self.consultas = 0
+        self.aciertos = 0
+        self.aciertos_ajenos = 0  # Entradas escritas por otro proceso
+        self.colisiones = 0  # Fallos con la cubeta ocupada por otras posiciones
+        self.escrituras = 0
+
+    @classmethod
+    def abrir(cls, nombre: str) -> "TablaCompartida":
+        """Se conecta a una tabla creada por otro proceso"""
+        return cls(nombre=nombre, crear=False)
+
+    @property
+    def entradas(self) -> int:
+        return len(self._palabras) // 2
+
+    @property
+    def tasa_colisiones(self) -> float:
+        return self.colisiones / self.consultas if self.consultas else 0.0
+
+    @staticmethod
+    def clave(estado: EstadoJuego, jugador: str) -> int:
+        """Hash de 64 bits de la posición con `jugador` en turno (nunca 0)"""
+        topologia = estado.topologia
+        azul, roja = estado.cabeza_azul, estado.cabeza_roja
+        extra = _EXTRA.pack(
+            0xFFFF if azul is None else topologia.indice(azul),
+            0xFFFF if roja is None else topologia.indice(roja),
+            jugador == ROJO, topologia.tamano, topologia.envolvente,
+        )
+        resumen = hashlib.blake2b(bytes(estado.celdas) + extra, digest_size=8).digest()
+        return int.from_bytes(resumen, "little") or 1
+
+    def obtener(self, clave: int) -> Optional[EntradaCache]:
+        """(profundidad, valor, cota, casilla o -1) si la posición está"""
+        self.consultas += 1
+        palabras = self._palabras
+        base = (clave & self._mascara) * 4
+        ocupada = False
+        for palabra in (base, base + 2):
+            verificacion = palabras[palabra]
+            if not verificacion:
+                continue
+            datos = palabras[palabra + 1]
+            if verificacion ^ datos != clave:
+                ocupada = True
+                continue
+            valor, profundidad_cota, casilla, proceso = _DATOS.unpack(
+                datos.to_bytes(8, "little")
+            )
+            self.aciertos += 1
+            if proceso != self.proceso:
+                self.aciertos_ajenos += 1
+            return (
+                profundidad_cota >> 2, valor, profundidad_cota & 3,
+                -1 if casilla == SIN_CASILLA else casilla,
+            )
+        if ocupada:
+            self.colisiones += 1
+        return None
+
+    def guardar(self, clave: int, profundidad: int, valor: float, cota: int,
+                casilla: int) -> None:
+        palabras = self._palabras
+        base = (clave & self._mascara) * 4
+        profundidad = min(profundidad, MAX_PROFUNDIDAD)
+        # La primera entrada de la cubeta prefiere las búsquedas profundas,
+        # también frente a una búsqueda menos profunda de la misma posición
+        if palabras[base] and (palabras[base + 1] >> 34) & MAX_PROFUNDIDAD > profundidad:
+            base += 2
+        if not 0 <= casilla < SIN_CASILLA:
+            casilla = SIN_CASILLA
+        datos = int.from_bytes(
+            _DATOS.pack(valor, (profundidad << 2) | cota, casilla, self.proceso), "little"
+        )
+        palabras[base + 1] = datos
+        palabras[base] = clave ^ datos
+        self.escrituras += 1
+
+    def limpiar(self) -> None:
+        self._memoria.buf[:] = bytes(len(self._memoria.buf))
+
+    def estadisticas(self) -> dict:
+        return {
+            "consultas": self.consultas,
+            "aciertos": self.aciertos,
+            "aciertos_ajenos": self.aciertos_ajenos,
+            "colisiones": self.colisiones,
+            "tasa_colisiones": self.tasa_colisiones,
+            "escrituras": self.escrituras,
+        }
+
+    def cerrar(self) -> None:
+        """Se desconecta; si la creó este proceso, además la libera"""
+        if self._palabras is None:
+            return
+        self._palabras.release()
+        self._palabras = None
+        self._memoria.close()
+        if self.propietaria:
+            self._memoria.unlink()
+
+    def __enter__(self) -> "TablaCompartida":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
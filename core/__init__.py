@@ -1,25 +1,45 @@
-from core.interfaces import (
-    AZUL,
-    ROJO,
-    VACIO,
-    TABLERO_TAMANO,
-    Dificultad,
-    Posicion,
-    MovimientoResult,
-    EstadoJuego,
-)
-from core.estado import GestorEstado
-from core.juego import MotorJuego
-
-__all__ = [
-    "AZUL",
-    "ROJO",
-    "VACIO",
-    "TABLERO_TAMANO",
-    "Dificultad",
-    "Posicion",
-    "MovimientoResult",
-    "EstadoJuego",
-    "GestorEstado",
-    "MotorJuego",
-]
+"""
+Motor del juego: estado, reglas y serialización.
+
+Los nombres de este paquete se cargan al primer uso (PEP 562): `import
+core` no importa ningún submódulo y `from core import MotorJuego` importa
+solo lo que MotorJuego necesita. core no importa pygame ni numpy.
+"""
+
+import importlib
+
+# Nombre público -> módulo que lo define
+_ORIGENES = {
+    "AZUL": "core.interfaces",
+    "ROJO": "core.interfaces",
+    "VACIO": "core.interfaces",
+    "TABLERO_TAMANO": "core.interfaces",
+    "Dificultad": "core.interfaces",
+    "Posicion": "core.interfaces",
+    "MovimientoResult": "core.interfaces",
+    "EstadoJuego": "core.interfaces",
+    "Topologia": "core.interfaces",
+    "obtener_topologia": "core.interfaces",
+    "obtener_simetrias": "core.interfaces",
+    "GestorEstado": "core.estado",
+    "MotorJuego": "core.juego",
+    "MotorCompacto": "core.compacto",
+    "codificar_estado": "core.serializacion",
+    "decodificar_estado": "core.serializacion",
+    "estado_a_texto": "core.serializacion",
+    "estado_desde_texto": "core.serializacion",
+}
+
+__all__ = list(_ORIGENES)
+
+
+def __getattr__(nombre: str):
+    if nombre not in _ORIGENES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(_ORIGENES[nombre]), nombre)
+    globals()[nombre] = valor  # Las siguientes consultas no pasan por aquí
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
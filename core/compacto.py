@@ -0,0 +1,126 @@
+"""
+Motor compacto: las reglas de GestorEstado y MotorJuego sobre enteros, para
+simulaciones que juegan muchas jugadas seguidas.
+
+El tablero son dos máscaras de bits (fichas azules y rojas, bit i = casilla
+y * tamano + x), las cabezas son índices y los colores son 0 (azul) y 1
+(rojo). `jugar` modifica el motor en el lugar y devuelve lo necesario para
+`deshacer`, sin copiar estados.
+
+El fin de partida usa la regla relativa a quien mueve del solucionador y de
+MCTS: si el siguiente no tiene jugadas gana quien acaba de mover, salvo con
+el tablero lleno y las fichas parejas, que es empate. Con turnos alternados
+equivale al conteo de fichas de MotorJuego.verificar_fin_juego, y
+herramientas.fuzzing lo comprueba jugada a jugada contra el motor de
+referencia.
+"""
+
+from typing import List, Optional, Tuple
+
+from core.interfaces import (
+    AZUL,
+    ROJO,
+    CODIGO_AZUL,
+    CODIGO_ROJO,
+    TABLERO_TAMANO,
+    EstadoJuego,
+    obtener_topologia,
+)
+
+SIN_CABEZA = -1
+COLORES_COMPACTOS = (AZUL, ROJO)  # índice de color -> color
+
+# (casilla, cabeza previa, turno previo, terminado previo, ganador previo)
+Deshacer = Tuple[int, int, int, bool, Optional[int]]
+
+
+class MotorCompacto:
+    """Partida sobre máscaras de bits con jugar/deshacer en el lugar"""
+
+    __slots__ = ("topologia", "fichas", "cabezas", "turno", "terminado", "ganador",
+                 "_vecinos", "_llenas")
+
+    def __init__(self, tamano: int = TABLERO_TAMANO, envolvente: bool = True,
+                 jugador_inicial: str = AZUL):
+        self.topologia = obtener_topologia(tamano, envolvente)
+        self._vecinos = self.topologia.mascaras_vecinos
+        self._llenas = (1 << self.topologia.celdas) - 1
+        self.reiniciar(jugador_inicial)
+
+    def reiniciar(self, jugador_inicial: str = AZUL) -> None:
+        self.fichas: List[int] = [0, 0]
+        self.cabezas: List[int] = [SIN_CABEZA, SIN_CABEZA]
+        self.turno = COLORES_COMPACTOS.index(jugador_inicial)
+        self.terminado = False
+        self.ganador: Optional[int] = None  # Color ganador; None = empate o en curso
+
+    @classmethod
+    def desde_estado(cls, estado: EstadoJuego) -> "MotorCompacto":
+        """
+        Motor en la posición de `estado`, con `estado.turno` por mover. No
+        recalcula el fin de partida: se supone que `estado` sigue en juego.
+        """
+        topologia = estado.topologia
+        motor = cls(topologia.tamano, topologia.envolvente, estado.turno)
+        for i, codigo in enumerate(estado.celdas):
+            if codigo == CODIGO_AZUL:
+                motor.fichas[0] |= 1 << i
+            elif codigo == CODIGO_ROJO:
+                motor.fichas[1] |= 1 << i
+        for color, cabeza in enumerate((estado.cabeza_azul, estado.cabeza_roja)):
+            if cabeza is not None:
+                motor.cabezas[color] = topologia.indice(cabeza)
+        return motor
+
+    @property
+    def vacias(self) -> int:
+        return self._llenas ^ (self.fichas[0] | self.fichas[1])
+
+    def jugadas(self, color: Optional[int] = None) -> int:
+        """Máscara de casillas donde puede jugar `color` (por defecto, el del turno)"""
+        cabeza = self.cabezas[self.turno if color is None else color]
+        vacias = self.vacias
+        if cabeza == SIN_CABEZA:
+            return vacias
+        return vacias & self._vecinos[cabeza]
+
+    def jugar(self, casilla: int) -> Optional[Deshacer]:
+        """
+        Juega `casilla` para el color en turno. Devuelve None, sin cambiar
+        nada, si la jugada no es válida o la partida ya terminó.
+        """
+        if self.terminado or not 0 <= casilla < self.topologia.celdas:
+            return None
+        bit = 1 << casilla
+        if not self.jugadas() & bit:
+            return None
+
+        color = self.turno
+        deshacer = (casilla, self.cabezas[color], color, self.terminado, self.ganador)
+        self.fichas[color] |= bit
+        self.cabezas[color] = casilla
+        if self.jugadas(1 - color):
+            self.turno = 1 - color
+        else:
+            self.terminado = True
+            parejas = self.fichas[0].bit_count() == self.fichas[1].bit_count()
+            self.ganador = None if not self.vacias and parejas else color
+        return deshacer
+
+    def deshacer(self, deshacer: Deshacer) -> None:
+        casilla, cabeza, turno, terminado, ganador = deshacer
+        self.fichas[turno] &= ~(1 << casilla)
+        self.cabezas[turno] = cabeza
+        self.turno = turno
+        self.terminado = terminado
+        self.ganador = ganador
+
+    def celdas(self) -> bytearray:
+        """Tablero con los códigos de EstadoJuego.celdas"""
+        celdas = bytearray(self.topologia.celdas)
+        for codigo, mascara in ((CODIGO_AZUL, self.fichas[0]), (CODIGO_ROJO, self.fichas[1])):
+            while mascara:
+                bit = mascara & -mascara
+                celdas[bit.bit_length() - 1] = codigo
+                mascara ^= bit
+        return celdas
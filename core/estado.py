@@ -1,12 +1,15 @@
-from typing import List
+from typing import List, Optional
 from core.interfaces import (
-    TABLERO_TAMANO,
     VACIO,
     AZUL,
     ROJO,
+    CODIGO_VACIO,
+    CODIGOS,
     Posicion,
     EstadoJuego,
     MovimientoResult,
+    Topologia,
+    obtener_topologia,
 )
 
 
@@ -14,33 +17,32 @@ class GestorEstado:
     """Maneja la representación y manipulación de estados"""
 
     @staticmethod
-    def crear_estado_inicial() -> EstadoJuego:
+    def crear_estado_inicial(topologia: Optional[Topologia] = None) -> EstadoJuego:
         """Crea el estado inicial del juego (tablero vacío)"""
+        topologia = topologia or obtener_topologia()
         tablero = [
-            [VACIO for _ in range(TABLERO_TAMANO)] for _ in range(TABLERO_TAMANO)
+            [VACIO for _ in range(topologia.tamano)] for _ in range(topologia.tamano)
         ]
         # Azul inicia por defecto
-        return EstadoJuego(tablero=tablero, turno=AZUL)
+        return EstadoJuego(tablero=tablero, turno=AZUL, topologia=topologia)
 
     @staticmethod
-    def es_posicion_valida(pos: Posicion) -> bool:
+    def es_posicion_valida(
+        pos: Posicion, topologia: Optional[Topologia] = None
+    ) -> bool:
         """Valida si una posición está dentro del tablero"""
-        return 0 <= pos.x < TABLERO_TAMANO and 0 <= pos.y < TABLERO_TAMANO
+        return (topologia or obtener_topologia()).contiene(pos)
 
     @staticmethod
-    def obtener_posiciones_adyacentes(pos: Posicion) -> List[Posicion]:
-        """Obtiene posiciones adyacentes (incluye wraparound)"""
-
-        def wraparound(coord: int) -> int:
-            return coord % TABLERO_TAMANO
-
-        adyacentes = [
-            Posicion(wraparound(pos.x - 1), pos.y),  # Izquierda
-            Posicion(wraparound(pos.x + 1), pos.y),  # Derecha
-            Posicion(pos.x, wraparound(pos.y - 1)),  # Arriba
-            Posicion(pos.x, wraparound(pos.y + 1)),  # Abajo
-        ]
-        return adyacentes
+    def obtener_posiciones_adyacentes(
+        pos: Posicion, topologia: Optional[Topologia] = None
+    ) -> List[Posicion]:
+        """
+        Obtiene posiciones adyacentes (izquierda, derecha, arriba, abajo),
+        con wraparound si la topología lo tiene
+        """
+        topologia = topologia or obtener_topologia()
+        return list(topologia.vecinos_pos[topologia.indice(pos)])
 
     @staticmethod
     def aplicar_movimiento(estado: EstadoJuego, posicion: Posicion) -> MovimientoResult:
@@ -49,13 +51,15 @@ class GestorEstado:
         nuevo_estado = estado.copiar()
 
         # Validar que la posición esté dentro del tablero
-        if not GestorEstado.es_posicion_valida(posicion):
+        topologia = nuevo_estado.topologia
+        if not topologia.contiene(posicion):
             return MovimientoResult(
                 es_valido=False, mensaje="Posición fuera del tablero"
             )
 
         # Validar que la casilla esté vacía
-        if nuevo_estado.tablero[posicion.y][posicion.x] != VACIO:
+        indice = topologia.indice(posicion)
+        if nuevo_estado.celdas[indice] != CODIGO_VACIO:
             return MovimientoResult(es_valido=False, mensaje="Casilla ocupada")
 
         # Obtener cabeza del jugador actual
@@ -68,7 +72,7 @@ class GestorEstado:
         # Si es el primer movimiento del jugador
         if cabeza_actual is None:
             # Cualquier casilla vacía es válida
-            nuevo_estado.tablero[posicion.y][posicion.x] = nuevo_estado.turno
+            nuevo_estado.celdas[indice] = CODIGOS[nuevo_estado.turno]
             nuevo_estado.agregar_movimiento(posicion, nuevo_estado.turno)
             return MovimientoResult(
                 es_valido=True,
@@ -77,20 +81,47 @@ class GestorEstado:
             )
 
         # Validar que la posición sea adyacente a la cabeza actual
-        adyacentes = GestorEstado.obtener_posiciones_adyacentes(cabeza_actual)
-        if posicion not in adyacentes:
+        if indice not in topologia.vecinos[topologia.indice(cabeza_actual)]:
             return MovimientoResult(
                 es_valido=False, mensaje="Posición no adyacente a la cabeza"
             )
 
         # Colocar la ficha
-        nuevo_estado.tablero[posicion.y][posicion.x] = nuevo_estado.turno
+        nuevo_estado.celdas[indice] = CODIGOS[nuevo_estado.turno]
         nuevo_estado.agregar_movimiento(posicion, nuevo_estado.turno)
 
         return MovimientoResult(
             es_valido=True, mensaje="Movimiento válido", nuevo_estado=nuevo_estado
         )
 
+    @staticmethod
+    def obtener_movimientos_validos(estado: EstadoJuego, jugador: str) -> List[Posicion]:
+        """
+        Posiciones donde `jugador` puede colocar ficha en `estado`,
+        sin importar a quién le toque (lo usan el motor y la búsqueda)
+        """
+        cabeza = estado.cabeza_azul if jugador == AZUL else estado.cabeza_roja
+
+        celdas = estado.celdas
+        topologia = estado.topologia
+
+        posiciones = topologia.posiciones
+
+        # Si no hay cabeza, cualquier casilla vacía es válida
+        if cabeza is None:
+            return [
+                posiciones[i]
+                for i, codigo in enumerate(celdas)
+                if codigo == CODIGO_VACIO
+            ]
+
+        # Si hay cabeza, solo las casillas adyacentes vacías
+        return [
+            posiciones[i]
+            for i in topologia.vecinos[topologia.indice(cabeza)]
+            if celdas[i] == CODIGO_VACIO
+        ]
+
     @staticmethod
     def contar_movimientos_disponibles(estado: EstadoJuego, jugador: str) -> int:
         """
@@ -105,18 +136,13 @@ class GestorEstado:
 
         # Si no tiene cabeza, puede colocar en cualquier casilla vacía
         if cabeza is None:
-            contador = 0
-            for y in range(TABLERO_TAMANO):
-                for x in range(TABLERO_TAMANO):
-                    if estado.tablero[y][x] == VACIO:
-                        contador += 1
-            return contador
+            return estado.celdas.count(CODIGO_VACIO)
 
         # Si tiene cabeza, solo casillas adyacentes vacías
-        contador = 0
-        adyacentes = GestorEstado.obtener_posiciones_adyacentes(cabeza)
-        for pos in adyacentes:
-            if estado.tablero[pos.y][pos.x] == VACIO:
-                contador += 1
-
-        return contador
+        topologia = estado.topologia
+        celdas = estado.celdas
+        return sum(
+            1
+            for i in topologia.vecinos[topologia.indice(cabeza)]
+            if celdas[i] == CODIGO_VACIO
+        )
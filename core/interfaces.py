@@ -1,5 +1,6 @@
-from typing import List, Optional, NamedTuple
+from typing import List, Optional, NamedTuple, Tuple
 from enum import Enum, auto
+from functools import lru_cache
 
 # Constantes del juego
 TABLERO_TAMANO = 7
@@ -14,6 +15,7 @@ class Dificultad(Enum):
     PRINCIPIANTE = auto()
     NORMAL = auto()
     EXPERTO = auto()
+    MAESTRO = auto()
 
 
 class Posicion(NamedTuple):
@@ -31,41 +33,301 @@ class MovimientoResult(NamedTuple):
     nuevo_estado: Optional["EstadoJuego"] = None
 
 
+class Topologia:
+    """
+    Tablero de lado `tamano`, con wraparound (toro) o acotado, y sus tablas
+    precalculadas: para cada índice de casilla (y * tamano + x) sus vecinos
+    como índices, como Posicion y como máscara de bits. Se construye una
+    sola vez por combinación (ver obtener_topologia) y la comparten todos
+    los estados de esa configuración.
+    """
+
+    __slots__ = ("tamano", "envolvente", "celdas", "posiciones", "vecinos",
+                 "vecinos_pos", "mascaras_vecinos")
+
+    def __init__(self, tamano: int, envolvente: bool = True):
+        if tamano < 2:
+            raise ValueError(f"Tamaño de tablero inválido: {tamano}")
+        self.tamano = tamano
+        self.envolvente = envolvente
+        self.celdas = tamano * tamano
+        self.posiciones: Tuple[Posicion, ...] = tuple(
+            Posicion(i % tamano, i // tamano) for i in range(self.celdas)
+        )
+
+        vecinos = []
+        for pos in self.posiciones:
+            indices: List[int] = []
+            # Izquierda, derecha, arriba, abajo
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                x, y = pos.x + dx, pos.y + dy
+                if envolvente:
+                    x, y = x % tamano, y % tamano
+                elif not (0 <= x < tamano and 0 <= y < tamano):
+                    continue
+                indice = y * tamano + x
+                if indice not in indices:  # En 2x2 con wraparound se repiten
+                    indices.append(indice)
+            vecinos.append(tuple(indices))
+
+        self.vecinos: Tuple[Tuple[int, ...], ...] = tuple(vecinos)
+        self.vecinos_pos: Tuple[Tuple[Posicion, ...], ...] = tuple(
+            tuple(self.posiciones[j] for j in indices) for indices in vecinos
+        )
+        self.mascaras_vecinos: Tuple[int, ...] = tuple(
+            sum(1 << j for j in indices) for indices in vecinos
+        )
+
+    def contiene(self, pos: Posicion) -> bool:
+        return 0 <= pos.x < self.tamano and 0 <= pos.y < self.tamano
+
+    def indice(self, pos: Posicion) -> int:
+        return pos.y * self.tamano + pos.x
+
+    def __repr__(self) -> str:
+        tipo = "envolvente" if self.envolvente else "acotado"
+        return f"Topologia({self.tamano}x{self.tamano}, {tipo})"
+
+
+@lru_cache(maxsize=None)
+def obtener_topologia(tamano: int = TABLERO_TAMANO, envolvente: bool = True) -> Topologia:
+    """Topología compartida para un tamaño y tipo de borde"""
+    return Topologia(tamano, envolvente)
+
+
+@lru_cache(maxsize=None)
+def obtener_simetrias(topologia: Topologia) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Simetrías del tablero como permutaciones de índices de casilla
+    (permutacion[i] = imagen de la casilla i): los 8 giros y reflejos del
+    cuadrado y, con wraparound, además cada traslación. La primera es la
+    identidad. Todas conservan la relación de vecindad.
+    """
+    n = topologia.tamano
+    transformaciones = (
+        lambda x, y: (x, y),
+        lambda x, y: (n - 1 - y, x),
+        lambda x, y: (n - 1 - x, n - 1 - y),
+        lambda x, y: (y, n - 1 - x),
+        lambda x, y: (n - 1 - x, y),
+        lambda x, y: (x, n - 1 - y),
+        lambda x, y: (y, x),
+        lambda x, y: (n - 1 - y, n - 1 - x),
+    )
+    traslaciones = (
+        [(dx, dy) for dy in range(n) for dx in range(n)]
+        if topologia.envolvente
+        else [(0, 0)]
+    )
+    simetrias = []
+    for dx, dy in traslaciones:
+        for transformar in transformaciones:
+            permutacion = []
+            for pos in topologia.posiciones:
+                x, y = transformar(pos.x, pos.y)
+                permutacion.append(((y + dy) % n) * n + (x + dx) % n)
+            simetrias.append(tuple(permutacion))
+    return tuple(simetrias)
+
+
+# Códigos de casilla en EstadoJuego.celdas (bytearray plano, fila a fila)
+CODIGO_VACIO = 0
+CODIGO_AZUL = 1
+CODIGO_ROJO = 2
+COLORES = (VACIO, AZUL, ROJO)  # código -> color
+CODIGOS = {VACIO: CODIGO_VACIO, AZUL: CODIGO_AZUL, ROJO: CODIGO_ROJO}
+
+
+class NodoHistorial:
+    """
+    Eslabón de un historial inmutable (lista enlazada hacia atrás).
+    Agregar un movimiento crea un nodo nuevo que apunta al anterior, así
+    un estado y sus copias comparten todo el historial previo.
+    """
+
+    __slots__ = ("posicion", "anterior", "longitud")
+
+    def __init__(self, posicion: Posicion, anterior: Optional["NodoHistorial"]):
+        self.posicion = posicion
+        self.anterior = anterior
+        self.longitud = 1 if anterior is None else anterior.longitud + 1
+
+    def a_lista(self) -> List[Posicion]:
+        """Posiciones desde la primera hasta esta"""
+        posiciones = []
+        nodo = self
+        while nodo is not None:
+            posiciones.append(nodo.posicion)
+            nodo = nodo.anterior
+        posiciones.reverse()
+        return posiciones
+
+
+class _VistaFila:
+    """Fila de EstadoJuego.tablero: se lee y escribe como lista de colores"""
+
+    __slots__ = ("_celdas", "_inicio", "_tamano")
+
+    def __init__(self, celdas: bytearray, inicio: int, tamano: int):
+        self._celdas = celdas
+        self._inicio = inicio
+        self._tamano = tamano
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    def __getitem__(self, x: int) -> str:
+        if not -self._tamano <= x < self._tamano:
+            raise IndexError("columna fuera del tablero")
+        return COLORES[self._celdas[self._inicio + x % self._tamano]]
+
+    def __setitem__(self, x: int, color: str) -> None:
+        if not -self._tamano <= x < self._tamano:
+            raise IndexError("columna fuera del tablero")
+        self._celdas[self._inicio + x % self._tamano] = CODIGOS[color]
+
+    def __iter__(self):
+        fila = self._celdas[self._inicio:self._inicio + self._tamano]
+        return (COLORES[codigo] for codigo in fila)
+
+    def __eq__(self, otra) -> bool:
+        return list(self) == list(otra)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _VistaTablero:
+    """Vista tablero[y][x] sobre las celdas planas de un EstadoJuego"""
+
+    __slots__ = ("_celdas", "_tamano")
+
+    def __init__(self, celdas: bytearray, tamano: int):
+        self._celdas = celdas
+        self._tamano = tamano
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    def __getitem__(self, y: int) -> _VistaFila:
+        if not -self._tamano <= y < self._tamano:
+            raise IndexError("fila fuera del tablero")
+        return _VistaFila(self._celdas, (y % self._tamano) * self._tamano, self._tamano)
+
+    def __iter__(self):
+        return (self[y] for y in range(self._tamano))
+
+    def __eq__(self, otro) -> bool:
+        return [list(fila) for fila in self] == [list(fila) for fila in otro]
+
+    def __repr__(self) -> str:
+        return repr([list(fila) for fila in self])
+
+
 class EstadoJuego:
-    """Representa el estado completo del juego"""
+    """
+    Representa el estado completo del juego.
 
-    def __init__(self, tablero: List[List[str]], turno: str):
-        self.tablero = tablero
+    El tablero se guarda como un bytearray plano (`celdas`, un código por
+    casilla) y el historial como listas enlazadas compartidas con las
+    copias, así que copiar() y la memoria por estado no dependen de cuánto
+    lleve la partida. `tablero[y][x]` sigue disponible como vista.
+    """
+
+    __slots__ = (
+        "celdas",
+        "tamano",
+        "topologia",
+        "turno",
+        "cabeza_azul",
+        "cabeza_roja",
+        "_historial_azul",
+        "_historial_rojo",
+    )
+
+    def __init__(
+        self,
+        tablero: List[List[str]],
+        turno: str,
+        topologia: Optional[Topologia] = None,
+    ):
+        self.topologia = topologia or obtener_topologia(len(tablero))
+        self.tamano = self.topologia.tamano
+        self.celdas = bytearray(CODIGOS[c] for fila in tablero for c in fila)
         self.turno = turno
         self.cabeza_azul: Optional[Posicion] = None
         self.cabeza_roja: Optional[Posicion] = None
         # Historial para tracking de cabezas (última colocada)
-        self.historial_azul: List[Posicion] = []
-        self.historial_rojo: List[Posicion] = []
+        self._historial_azul: Optional[NodoHistorial] = None
+        self._historial_rojo: Optional[NodoHistorial] = None
         self._actualizar_cabezas_desde_historial()
 
+    @classmethod
+    def desde_celdas(
+        cls, celdas: bytearray, topologia: Topologia, turno: str
+    ) -> "EstadoJuego":
+        """Construye un estado sin historial a partir de celdas ya codificadas"""
+        estado = cls.__new__(cls)
+        estado.topologia = topologia
+        estado.tamano = topologia.tamano
+        estado.celdas = celdas
+        estado.turno = turno
+        estado.cabeza_azul = None
+        estado.cabeza_roja = None
+        estado._historial_azul = None
+        estado._historial_rojo = None
+        return estado
+
+    @property
+    def tablero(self) -> _VistaTablero:
+        return _VistaTablero(self.celdas, self.tamano)
+
+    @property
+    def historial_azul(self) -> List[Posicion]:
+        return self._historial_azul.a_lista() if self._historial_azul else []
+
+    @property
+    def historial_rojo(self) -> List[Posicion]:
+        return self._historial_rojo.a_lista() if self._historial_rojo else []
+
     def _actualizar_cabezas_desde_historial(self) -> None:
         """Actualiza cabezas basándose en el historial de movimientos"""
-        if self.historial_azul:
-            self.cabeza_azul = self.historial_azul[-1]
-        if self.historial_rojo:
-            self.cabeza_roja = self.historial_rojo[-1]
+        if self._historial_azul:
+            self.cabeza_azul = self._historial_azul.posicion
+        if self._historial_rojo:
+            self.cabeza_roja = self._historial_rojo.posicion
 
     def agregar_movimiento(self, posicion: Posicion, color: str) -> None:
         """Agrega un movimiento al historial correspondiente"""
         if color == AZUL:
-            self.historial_azul.append(posicion)
+            self._historial_azul = NodoHistorial(posicion, self._historial_azul)
             self.cabeza_azul = posicion
         elif color == ROJO:
-            self.historial_rojo.append(posicion)
+            self._historial_rojo = NodoHistorial(posicion, self._historial_rojo)
             self.cabeza_roja = posicion
 
+    def fichas_colocadas(self) -> int:
+        """Cantidad de fichas en el tablero (movimientos jugados)"""
+        return len(self.celdas) - self.celdas.count(CODIGO_VACIO)
+
+    def clave(self) -> tuple:
+        """Identifica la posición (tablero y cabezas) para tablas de transposición"""
+        return (
+            bytes(self.celdas),
+            self.cabeza_azul,
+            self.cabeza_roja,
+            self.topologia.envolvente,
+        )
+
     def copiar(self) -> "EstadoJuego":
-        """Crea una copia profunda del estado actual"""
-        nuevo_tablero = [fila[:] for fila in self.tablero]
-        nuevo_estado = EstadoJuego(nuevo_tablero, self.turno)
+        """Copia independiente del tablero; el historial se comparte"""
+        nuevo_estado = EstadoJuego.__new__(EstadoJuego)
+        nuevo_estado.topologia = self.topologia
+        nuevo_estado.tamano = self.tamano
+        nuevo_estado.celdas = self.celdas[:]
+        nuevo_estado.turno = self.turno
         nuevo_estado.cabeza_azul = self.cabeza_azul
         nuevo_estado.cabeza_roja = self.cabeza_roja
-        nuevo_estado.historial_azul = self.historial_azul[:]
-        nuevo_estado.historial_rojo = self.historial_rojo[:]
+        nuevo_estado._historial_azul = self._historial_azul
+        nuevo_estado._historial_rojo = self._historial_rojo
         return nuevo_estado
@@ -2,11 +2,14 @@ from typing import List, Optional, Tuple
 from core.interfaces import (
     AZUL,
     ROJO,
-    VACIO,
+    CODIGO_VACIO,
+    CODIGO_AZUL,
+    CODIGO_ROJO,
     Posicion,
     EstadoJuego,
     MovimientoResult,
     TABLERO_TAMANO,
+    obtener_topologia,
 )
 from core.estado import GestorEstado
 
@@ -14,14 +17,16 @@ from core.estado import GestorEstado
 class MotorJuego:
     """Controla la lógica principal del juego"""
 
-    def __init__(self):
+    def __init__(self, tamano: int = TABLERO_TAMANO, envolvente: bool = True):
+        # Tablas de vecinos compartidas por todos los estados de la partida
+        self.topologia = obtener_topologia(tamano, envolvente)
         self.estado_actual: Optional[EstadoJuego] = None
         self.juego_terminado: bool = False
         self.ganador: Optional[str] = None
 
     def inicializar_juego(self, jugador_inicial: str) -> None:
         """Inicializa un nuevo juego"""
-        self.estado_actual = GestorEstado.crear_estado_inicial()
+        self.estado_actual = GestorEstado.crear_estado_inicial(self.topologia)
         self.estado_actual.turno = jugador_inicial
         self.juego_terminado = False
         self.ganador = None
@@ -34,28 +39,7 @@ class MotorJuego:
         if not self.estado_actual:
             return []
 
-        # Crear un estado temporal para el jugador específico
-        estado_temp = self.estado_actual.copiar()
-        estado_temp.turno = jugador
-
-        movimientos_validos = []
-        cabeza = estado_temp.cabeza_azul if jugador == AZUL else estado_temp.cabeza_roja
-
-        # Si no hay cabeza, cualquier casilla vacía es válida
-        if cabeza is None:
-            for y in range(TABLERO_TAMANO):
-                for x in range(TABLERO_TAMANO):
-                    if estado_temp.tablero[y][x] == VACIO:
-                        movimientos_validos.append(Posicion(x, y))
-            return movimientos_validos
-
-        # Si hay cabeza, solo las casillas adyacentes vacías
-        adyacentes = GestorEstado.obtener_posiciones_adyacentes(cabeza)
-        for pos in adyacentes:
-            if estado_temp.tablero[pos.y][pos.x] == VACIO:
-                movimientos_validos.append(pos)
-
-        return movimientos_validos
+        return GestorEstado.obtener_movimientos_validos(self.estado_actual, jugador)
 
     def realizar_movimiento(self, posicion: Posicion) -> MovimientoResult:
         """
@@ -95,13 +79,13 @@ class MotorJuego:
             return False, None
 
         # Caso 1: tablero lleno
-        lleno = all(celda != VACIO for fila in estado.tablero for celda in fila)
+        lleno = CODIGO_VACIO not in estado.celdas
         if lleno:
             self.juego_terminado = True
 
             # Determinar ganador por cantidad de casillas ocupadas
-            azul_count = sum(c == AZUL for fila in estado.tablero for c in fila)
-            rojo_count = sum(c == ROJO for fila in estado.tablero for c in fila)
+            azul_count = estado.celdas.count(CODIGO_AZUL)
+            rojo_count = estado.celdas.count(CODIGO_ROJO)
 
             if azul_count > rojo_count:
                 self.ganador = AZUL
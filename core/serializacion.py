@@ -0,0 +1,208 @@
+"""
+Codificación compacta y canónica de EstadoJuego.
+
+Formato binario (15 bytes en el tablero de 7x7):
+    byte 0      lado del tablero (hasta TAMANO_MAXIMO = 127); el bit alto
+                (0x80) marca tablero acotado (sin wraparound)
+    bytes 1..   entero little-endian con, desde el bit menos significativo,
+                máscara de fichas azules (n*n bits), máscara de fichas rojas
+                (n*n bits), índice de la cabeza azul y de la roja (n*n = sin
+                cabeza) y el bit de turno (1 = rojo)
+
+Notación de texto (para logs y pruebas), al estilo FEN: filas de arriba a
+abajo separadas por "/", dígitos para casillas vacías consecutivas, "a"/"r"
+para cuerpo y "A"/"R" para cabezas, el turno y, solo si el tablero no
+tiene wraparound, la palabra "acotado":
+    "7/7/3A3/7/7/1R5/7 A"
+    "5/5/2A2/5/1R3 R acotado"
+
+Solo se guardan tablero, cabezas y turno: es todo lo que usan las reglas.
+Al decodificar, el historial de cada jugador queda reducido a su cabeza.
+"""
+
+from typing import List, Optional
+from core.interfaces import (
+    AZUL,
+    ROJO,
+    VACIO,
+    CODIGO_AZUL,
+    CODIGO_ROJO,
+    Posicion,
+    EstadoJuego,
+    obtener_topologia,
+)
+
+# Bit del byte de cabecera que marca un tablero sin wraparound
+BIT_ACOTADO = 0x80
+# El lado ocupa los 7 bits restantes de la cabecera
+TAMANO_MAXIMO = 0x7F
+SUFIJO_ACOTADO = "acotado"
+
+
+def _bits_cabeza(celdas: int) -> int:
+    # Hace falta representar 0..celdas (celdas = sin cabeza)
+    return celdas.bit_length()
+
+
+def _indice(pos: Optional[Posicion], tamano: int) -> int:
+    return tamano * tamano if pos is None else pos.y * tamano + pos.x
+
+
+def _posicion(indice: int, tamano: int) -> Optional[Posicion]:
+    if indice >= tamano * tamano:
+        return None
+    return Posicion(indice % tamano, indice // tamano)
+
+
+def codificar_estado(estado: EstadoJuego, turno: Optional[str] = None) -> bytes:
+    """
+    Codifica tablero, cabezas y turno en unos pocos bytes. `turno` reemplaza
+    al del estado (la búsqueda sabe a quién le toca sin tocar estado.turno).
+    """
+    turno = turno or estado.turno
+    tamano = estado.tamano
+    if tamano > TAMANO_MAXIMO:
+        raise ValueError(
+            f"La codificación admite tableros de hasta {TAMANO_MAXIMO}x{TAMANO_MAXIMO}"
+        )
+    celdas = tamano * tamano
+    bits_cabeza = _bits_cabeza(celdas)
+
+    azul = rojo = 0
+    bit = 1
+    for codigo in estado.celdas:
+        if codigo == CODIGO_AZUL:
+            azul |= bit
+        elif codigo == CODIGO_ROJO:
+            rojo |= bit
+        bit <<= 1
+
+    valor = azul | (rojo << celdas)
+    desplazamiento = 2 * celdas
+    valor |= _indice(estado.cabeza_azul, tamano) << desplazamiento
+    desplazamiento += bits_cabeza
+    valor |= _indice(estado.cabeza_roja, tamano) << desplazamiento
+    desplazamiento += bits_cabeza
+    if turno == ROJO:
+        valor |= 1 << desplazamiento
+
+    longitud = (desplazamiento + 1 + 7) // 8
+    cabecera = tamano if estado.topologia.envolvente else tamano | BIT_ACOTADO
+    return bytes((cabecera,)) + valor.to_bytes(longitud, "little")
+
+
+def decodificar_estado(datos: bytes) -> EstadoJuego:
+    """Inversa de codificar_estado"""
+    if not datos:
+        raise ValueError("Codificación de estado vacía")
+    tamano = datos[0] & ~BIT_ACOTADO
+    envolvente = not datos[0] & BIT_ACOTADO
+    celdas = tamano * tamano
+    bits_cabeza = _bits_cabeza(celdas)
+    valor = int.from_bytes(datos[1:], "little")
+
+    mascara_celdas = (1 << celdas) - 1
+    azul = valor & mascara_celdas
+    rojo = (valor >> celdas) & mascara_celdas
+    if azul & rojo:
+        raise ValueError("Codificación inválida: casilla azul y roja a la vez")
+
+    desplazamiento = 2 * celdas
+    mascara_cabeza = (1 << bits_cabeza) - 1
+    cabeza_azul = _posicion((valor >> desplazamiento) & mascara_cabeza, tamano)
+    desplazamiento += bits_cabeza
+    cabeza_roja = _posicion((valor >> desplazamiento) & mascara_cabeza, tamano)
+    desplazamiento += bits_cabeza
+    turno = ROJO if (valor >> desplazamiento) & 1 else AZUL
+
+    codigos = bytearray(celdas)
+    for indice in range(celdas):
+        if azul >> indice & 1:
+            codigos[indice] = CODIGO_AZUL
+        elif rojo >> indice & 1:
+            codigos[indice] = CODIGO_ROJO
+
+    topologia = obtener_topologia(tamano, envolvente)
+    estado = EstadoJuego.desde_celdas(codigos, topologia, turno)
+    return _agregar_cabezas(estado, cabeza_azul, cabeza_roja)
+
+
+def estado_a_texto(estado: EstadoJuego) -> str:
+    """Notación de texto compacta (ver docstring del módulo)"""
+    filas = []
+    for y, fila in enumerate(estado.tablero):
+        partes = []
+        vacias = 0
+        for x, celda in enumerate(fila):
+            if celda == VACIO:
+                vacias += 1
+                continue
+            if vacias:
+                partes.append(str(vacias))
+                vacias = 0
+            pos = Posicion(x, y)
+            es_cabeza = pos == (estado.cabeza_azul if celda == AZUL else estado.cabeza_roja)
+            letra = "a" if celda == AZUL else "r"
+            partes.append(letra.upper() if es_cabeza else letra)
+        if vacias:
+            partes.append(str(vacias))
+        filas.append("".join(partes))
+    texto = "/".join(filas) + " " + estado.turno
+    if not estado.topologia.envolvente:
+        texto += " " + SUFIJO_ACOTADO
+    return texto
+
+
+def estado_desde_texto(texto: str) -> EstadoJuego:
+    """Inversa de estado_a_texto"""
+    partes = texto.split()
+    envolvente = True
+    if len(partes) == 3 and partes[2] == SUFIJO_ACOTADO:
+        envolvente = False
+        partes.pop()
+    try:
+        tablero_texto, turno = partes
+    except ValueError:
+        raise ValueError(f"Notación inválida: {texto!r}")
+    if turno not in (AZUL, ROJO):
+        raise ValueError(f"Turno inválido en notación: {turno!r}")
+
+    tablero: List[List[str]] = []
+    cabeza_azul = cabeza_roja = None
+    for y, fila_texto in enumerate(tablero_texto.split("/")):
+        fila: List[str] = []
+        numero = ""
+        for caracter in fila_texto + "\0":
+            if caracter.isdigit():
+                numero += caracter
+                continue
+            if numero:
+                fila.extend([VACIO] * int(numero))
+                numero = ""
+            if caracter == "\0":
+                break
+            if caracter.lower() not in ("a", "r"):
+                raise ValueError(f"Casilla inválida en notación: {caracter!r}")
+            color = AZUL if caracter.lower() == "a" else ROJO
+            if caracter.isupper():
+                pos = Posicion(len(fila), y)
+                if color == AZUL:
+                    cabeza_azul = pos
+                else:
+                    cabeza_roja = pos
+            fila.append(color)
+        tablero.append(fila)
+
+    tamano = len(tablero)
+    if any(len(fila) != tamano for fila in tablero):
+        raise ValueError(f"El tablero de la notación no es cuadrado: {texto!r}")
+    estado = EstadoJuego(tablero, turno, obtener_topologia(tamano, envolvente))
+    return _agregar_cabezas(estado, cabeza_azul, cabeza_roja)
+
+
+def _agregar_cabezas(estado: EstadoJuego, cabeza_azul, cabeza_roja) -> EstadoJuego:
+    if cabeza_azul is not None:
+        estado.agregar_movimiento(cabeza_azul, AZUL)
+    if cabeza_roja is not None:
+        estado.agregar_movimiento(cabeza_roja, ROJO)
+    return estado
@@ -2,12 +2,14 @@ from gui.interfaz import (
     GestorInterfaz,
     PantallaDificultad,
     PantallaTurno,
-    PantallaJuego
+    PantallaJuego,
+    PantallaEspectador,
 )
 
 __all__ = [
     'GestorInterfaz',
     'PantallaDificultad',
     'PantallaTurno',
-    'PantallaJuego'
+    'PantallaJuego',
+    'PantallaEspectador',
 ]
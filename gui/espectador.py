@@ -0,0 +1,194 @@
+"""
+Modo espectador: muchas partidas IA contra IA a la vez en una sola ventana
+(gui.interfaz.PantallaEspectador), para demostraciones y pruebas de carga.
+
+    python -m gui.espectador --partidas 64 --procesos 4
+    python -m gui.espectador --partidas 16 --azul maestro --rojo experto --continuo
+    python -m gui.espectador --partidas 64 --medir 600   # solo el dibujo
+
+Las partidas se reparten entre procesos trabajadores; cada uno avanza una
+jugada por partida por turno y manda el estado (celdas, cabezas, latencia
+de la jugada) por una cola. La ventana vacía la cola en cada fotograma y
+solo redibuja las casillas que cambiaron.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import time
+from typing import List, Optional
+
+import pygame
+
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO, Dificultad
+from core.juego import MotorJuego
+from ai.factoria import FactoriaEstrategias
+from herramientas.partida import dificultad_desde_texto
+from gui.interfaz import WINDOW_HEIGHT, WINDOW_WIDTH, GestorInterfaz, PantallaEspectador
+
+# Segundos que queda a la vista una partida terminada antes de la siguiente
+PAUSA_ENTRE_PARTIDAS = 2.0
+
+
+def _actualizacion(partida: int, motor: MotorJuego, latencia_ms: Optional[float]) -> tuple:
+    """Argumentos de PantallaEspectador.actualizar para el estado del motor"""
+    estado = motor.obtener_estado_actual()
+    topologia = estado.topologia
+    azul = -1 if estado.cabeza_azul is None else topologia.indice(estado.cabeza_azul)
+    roja = -1 if estado.cabeza_roja is None else topologia.indice(estado.cabeza_roja)
+    resultado = None
+    if motor.juego_terminado:
+        _, ganador = motor.verificar_fin_juego()
+        resultado = "empate" if ganador is None else f"gana {ganador}"
+    return partida, bytes(estado.celdas), azul, roja, latencia_ms, resultado
+
+
+def trabajador(
+    cola,
+    detener,
+    partidas: List[int],
+    dificultades: dict,
+    tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True,
+    continuo: bool = False,
+) -> None:
+    """
+    Juega `partidas` (sus números en la grilla) intercalando una jugada de
+    cada una, hasta que terminen todas (o hasta `detener` si `continuo`).
+    """
+    juegos = {}
+
+    def nueva(partida: int) -> None:
+        motor = MotorJuego(tamano, envolvente)
+        motor.inicializar_juego(AZUL if partida % 2 == 0 else ROJO)
+        estrategias = {
+            jugador: FactoriaEstrategias.crear_estrategia(dificultad, jugador)
+            for jugador, dificultad in dificultades.items()
+        }
+        juegos[partida] = (motor, estrategias, 0.0)
+        cola.put(_actualizacion(partida, motor, None))
+
+    for partida in partidas:
+        nueva(partida)
+    while juegos and not detener.is_set():
+        for partida in list(juegos):
+            motor, estrategias, reanudar = juegos[partida]
+            if motor.juego_terminado:
+                if not continuo:
+                    del juegos[partida]
+                elif time.monotonic() >= reanudar:
+                    nueva(partida)
+                continue
+            jugador = motor.obtener_estado_actual().turno
+            inicio = time.perf_counter()
+            posicion = estrategias[jugador].seleccionar_movimiento(motor)
+            latencia_ms = 1000 * (time.perf_counter() - inicio)
+            if posicion is None or not motor.realizar_movimiento(posicion).es_valido:
+                # Sin jugada válida: se da por terminada con lo que haya
+                motor.juego_terminado = True
+            if motor.juego_terminado:
+                juegos[partida] = (motor, estrategias, time.monotonic() + PAUSA_ENTRE_PARTIDAS)
+            cola.put(_actualizacion(partida, motor, latencia_ms))
+            if detener.is_set():
+                break
+
+
+def medir_dibujo(partidas: int = 64, fotogramas: int = 600, tamano: int = TABLERO_TAMANO,
+                 semilla: int = 0) -> dict:
+    """
+    Coste del dibujo de la grilla sin IA: cada fotograma todas las partidas
+    hacen una jugada al azar. Devuelve ms por fotograma (dibujo y
+    display.update) y los FPS que eso permite.
+    """
+    pygame.init()
+    pantalla = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    espectador = PantallaEspectador(pantalla, partidas, tamano)
+    rng = random.Random(semilla)
+    motores = [MotorJuego(tamano) for _ in range(partidas)]
+    for motor in motores:
+        motor.inicializar_juego(AZUL)
+
+    dibujo = 0.0
+    for _ in range(fotogramas):
+        for partida, motor in enumerate(motores):
+            if motor.juego_terminado:
+                motor.inicializar_juego(AZUL)
+            else:
+                turno = motor.obtener_estado_actual().turno
+                motor.realizar_movimiento(rng.choice(motor.obtener_movimientos_validos(turno)))
+            espectador.actualizar(*_actualizacion(partida, motor, 0.0))
+        inicio = time.perf_counter()
+        pygame.display.update(espectador.dibujar())
+        dibujo += time.perf_counter() - inicio
+    pygame.quit()
+    ms = 1000 * dibujo / fotogramas
+    return {"partidas": partidas, "fotogramas": fotogramas, "ms_por_fotograma": ms,
+            "fps_posibles": 1000 / ms if ms else float("inf")}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Grilla de partidas IA contra IA")
+    parser.add_argument("--partidas", type=int, default=16)
+    parser.add_argument("--azul", type=dificultad_desde_texto, default=Dificultad.EXPERTO)
+    parser.add_argument("--rojo", type=dificultad_desde_texto, default=Dificultad.NORMAL)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument(
+        "--continuo", action="store_true", help="al terminar una partida empieza otra"
+    )
+    parser.add_argument(
+        "--medir", type=int, default=None, metavar="FOTOGRAMAS",
+        help="solo medir el coste de dibujo con jugadas al azar",
+    )
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        resultado = medir_dibujo(args.partidas, args.medir, args.tamano)
+        print(
+            f"{resultado['partidas']} partidas: {resultado['ms_por_fotograma']:.2f} ms "
+            f"por fotograma ({resultado['fps_posibles']:.0f} FPS posibles)"
+        )
+        return
+
+    procesos = max(1, min(args.procesos, args.partidas))
+    cola = multiprocessing.Queue()
+    detener = multiprocessing.Event()
+    dificultades = {AZUL: args.azul, ROJO: args.rojo}
+    trabajadores = [
+        multiprocessing.Process(
+            target=trabajador,
+            args=(cola, detener, list(range(i, args.partidas, procesos)), dificultades,
+                  args.tamano, not args.sin_wraparound, args.continuo),
+            daemon=True,
+        )
+        for i in range(procesos)
+    ]
+    for proceso in trabajadores:
+        proceso.start()
+
+    def obtener_actualizaciones():
+        # Acotado para que una ráfaga no se coma el fotograma
+        for _ in range(4 * args.partidas):
+            try:
+                yield cola.get_nowait()
+            except queue.Empty:
+                return
+
+    interfaz = GestorInterfaz()
+    try:
+        interfaz.ejecutar_espectador(args.partidas, obtener_actualizaciones, args.tamano)
+    finally:
+        detener.set()
+        for proceso in trabajadores:
+            proceso.join(timeout=2)
+            if proceso.is_alive():
+                proceso.terminate()
+    resumen = interfaz.obtener_metricas()
+    print(f"FPS: {resumen['fps']:.1f}, {resumen['tiempo_fotograma_ms']:.2f} ms por fotograma")
+
+
+if __name__ == "__main__":
+    main()
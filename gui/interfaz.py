@@ -1,7 +1,13 @@
 import pygame
-from typing import Optional, Callable, Tuple
+from typing import Callable, Iterable, List, Optional, Tuple
+from collections import deque
+import math
 import sys
+import time
 from core.interfaces import (
+    CODIGO_AZUL,
+    CODIGO_ROJO,
+    CODIGO_VACIO,
     TABLERO_TAMANO,
     AZUL,
     ROJO,
@@ -16,6 +22,16 @@ WINDOW_HEIGHT = 600
 BOARD_OFFSET_X = 100
 BOARD_OFFSET_Y = 100
 CELL_SIZE = 60
+# El tablero ocupa siempre el mismo área; en tableros más grandes que el
+# estándar las casillas se achican
+BOARD_SIZE_PX = TABLERO_TAMANO * CELL_SIZE
+
+# Ritmo del bucle principal
+FPS_ACTIVO = 60  # Mientras hay entrada o cambios que mostrar
+FPS_REPOSO = 10  # Tope cuando la pantalla está estática
+ESPERA_MAXIMA_MS = 1000  # Bloqueo máximo en pygame.event.wait
+
+ALTO_LINEA_ESTADISTICAS = 20
 
 COLORS = {
     "background": (240, 240, 240),
@@ -29,7 +45,17 @@ COLORS = {
     f'{AZUL}_cabeza': (150, 150, 255),
     "boton": (180, 180, 180),
     "boton_hover": (150, 150, 150),
+    "pista": (230, 170, 0),
+    # Extremos del mapa de calor de la búsqueda (peor y mejor jugada)
+    "calor_bajo": (255, 245, 170),
+    "calor_alto": (225, 70, 20),
 }
+ALFA_CALOR = 170
+
+# Evento que despierta el bucle principal cuando un hilo termina una pista
+EVENTO_PISTA = pygame.USEREVENT + 1
+# Ídem cuando la búsqueda de la IA publica una profundidad terminada
+EVENTO_PROGRESO = pygame.USEREVENT + 2
 
 
 class PantallaDificultad:
@@ -40,6 +66,7 @@ class PantallaDificultad:
             Dificultad.PRINCIPIANTE: pygame.Rect(300, 200, 200, 50),
             Dificultad.NORMAL: pygame.Rect(300, 300, 200, 50),
             Dificultad.EXPERTO: pygame.Rect(300, 400, 200, 50),
+            Dificultad.MAESTRO: pygame.Rect(300, 500, 200, 50),
         }
 
     def manejar_eventos(self, eventos) -> bool:
@@ -65,6 +92,7 @@ class PantallaDificultad:
             Dificultad.PRINCIPIANTE: "Principiante",
             Dificultad.NORMAL: "Normal",
             Dificultad.EXPERTO: "Experto",
+            Dificultad.MAESTRO: "Maestro",
         }
         for dificultad, rect in self.botones.items():
             color = COLORS["boton_hover"] if rect.collidepoint(pygame.mouse.get_pos()) else COLORS["boton"]
@@ -118,20 +146,39 @@ class PantallaJuego:
         self.pantalla = pantalla
         self.click_callback: Optional[Callable] = None
         self.tiempo_inicio = None  # Para controlar el tiempo transcurrido
+        # Overlay de estadísticas de búsqueda de la IA (tecla E)
+        self.estadisticas = None
+        self.mostrar_estadisticas = False
+        # Lado del tablero mostrado (se toma del estado al dibujar)
+        self.tamano_tablero = TABLERO_TAMANO
+        # Pista: (clave del estado analizado, [(movimiento, texto), ...]);
+        # solo se muestra mientras el tablero sigue en esa posición
+        self.pista: Optional[Tuple[tuple, List[Tuple[Posicion, str]]]] = None
+        # Clave del estado que se está analizando en segundo plano
+        self.pista_en_curso: Optional[tuple] = None
+        # Progreso de la búsqueda de la IA (ai.estadisticas.CanalProgreso o
+        # cualquier objeto con ultimo()); se dibuja como mapa de calor
+        self.canal_progreso = None
 
         # Configurar botones
         self.boton_reiniciar = pygame.Rect(
-            BOARD_OFFSET_X + TABLERO_TAMANO * CELL_SIZE + 50,  # a la derecha del tablero
+            BOARD_OFFSET_X + BOARD_SIZE_PX + 50,  # a la derecha del tablero
             BOARD_OFFSET_Y,
             120,
             50,
         )
         self.boton_salir = pygame.Rect(
-            BOARD_OFFSET_X + TABLERO_TAMANO * CELL_SIZE + 50,
+            BOARD_OFFSET_X + BOARD_SIZE_PX + 50,
             BOARD_OFFSET_Y + 70,
             120,
             50,
         )
+        self.boton_pista = pygame.Rect(
+            BOARD_OFFSET_X + BOARD_SIZE_PX + 50,
+            BOARD_OFFSET_Y + BOARD_SIZE_PX - 50,  # alineado con el borde inferior
+            120,
+            50,
+        )
 
     def establecer_callback_click(self, callback: Callable[[Posicion], None]) -> None:
         """Establece función para manejar clicks en el tablero"""
@@ -143,12 +190,15 @@ class PantallaJuego:
         Retorna:
             - Posición del tablero si se clickeó allí
             - "reiniciar" si se clickeó el botón reiniciar
+            - "pista" si se clickeó el botón de pista
             - None en otros casos
         """
         for evento in eventos:
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_e:
+                self.mostrar_estadisticas = not self.mostrar_estadisticas
             if evento.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
 
@@ -160,6 +210,8 @@ class PantallaJuego:
                 # Revisar botones
                 if self.boton_reiniciar.collidepoint(pos):
                     return "reiniciar"
+                if self.boton_pista.collidepoint(pos):
+                    return "pista"
                 if self.boton_salir.collidepoint(pos):
                     pygame.quit()
                     sys.exit()
@@ -170,13 +222,15 @@ class PantallaJuego:
         self.pantalla.fill(COLORS["background"])
 
         # Dibujar tablero y fichas
-        for y in range(TABLERO_TAMANO):
-            for x in range(TABLERO_TAMANO):
+        self.tamano_tablero = estado.tamano
+        celda = self.tamano_casilla
+        for y in range(estado.tamano):
+            for x in range(estado.tamano):
                 rect = pygame.Rect(
-                    BOARD_OFFSET_X + x * CELL_SIZE,
-                    BOARD_OFFSET_Y + y * CELL_SIZE,
-                    CELL_SIZE,
-                    CELL_SIZE,
+                    BOARD_OFFSET_X + x * celda,
+                    BOARD_OFFSET_Y + y * celda,
+                    celda,
+                    celda,
                 )
                 pygame.draw.rect(self.pantalla, COLORS["board"], rect)
                 pygame.draw.rect(self.pantalla, COLORS["grid"], rect, 1)
@@ -189,12 +243,14 @@ class PantallaJuego:
                     )
                     color_ficha = COLORS[color]
                     centro = rect.center
-                    radio = CELL_SIZE // 2 - 5
+                    radio = max(celda // 2 - 5, 2)
                     pygame.draw.circle(self.pantalla, color_ficha, centro, radio)
                     if es_cabeza:
                         # Dibujar borde negro para la cabeza
                         pygame.draw.circle(self.pantalla, (0, 0, 0), centro, radio, 3)
 
+        self.dibujar_mapa_calor(estado)
+
         # Dibujar botones
         fuente = pygame.font.Font(None, 30)
 
@@ -210,6 +266,63 @@ class PantallaJuego:
         texto_salir = fuente.render("Salir", True, COLORS["text"])
         self.pantalla.blit(texto_salir, texto_salir.get_rect(center=self.boton_salir.center))
 
+        # Botón pista
+        color_pista = COLORS["boton_hover"] if self.boton_pista.collidepoint(pygame.mouse.get_pos()) else COLORS["boton"]
+        pygame.draw.rect(self.pantalla, color_pista, self.boton_pista)
+        etiqueta = "Pensando..." if self.pista_en_curso == estado.clave() else "Pista"
+        texto_pista = fuente.render(etiqueta, True, COLORS["text"])
+        self.pantalla.blit(texto_pista, texto_pista.get_rect(center=self.boton_pista.center))
+        self.dibujar_pista(estado)
+
+    def dibujar_pista(self, estado: EstadoJuego) -> None:
+        """Marca las jugadas sugeridas (1, 2, 3...) y lista sus líneas bajo el tablero"""
+        if self.pista is None or self.pista[0] != estado.clave():
+            return
+        celda = self.tamano_casilla
+        fuente_numero = pygame.font.Font(None, max(celda // 2, 14))
+        fuente = pygame.font.Font(None, 22)
+        y = BOARD_OFFSET_Y + self.tamano_tablero * celda + 8
+        for numero, (movimiento, texto) in enumerate(self.pista[1], start=1):
+            centro = (
+                BOARD_OFFSET_X + movimiento.x * celda + celda // 2,
+                BOARD_OFFSET_Y + movimiento.y * celda + celda // 2,
+            )
+            pygame.draw.circle(self.pantalla, COLORS["pista"], centro, max(celda // 2 - 8, 2), 3)
+            marca = fuente_numero.render(str(numero), True, COLORS["pista"])
+            self.pantalla.blit(marca, marca.get_rect(center=centro))
+            linea = fuente.render(f"{numero}. {texto}", True, COLORS["text"])
+            self.pantalla.blit(linea, (BOARD_OFFSET_X, y))
+            y += 20
+
+    def dibujar_mapa_calor(self, estado: EstadoJuego) -> None:
+        """
+        Colorea las casillas candidatas de la IA según su valor en la última
+        profundidad terminada (de claro a intenso, por orden de valor) y
+        remarca la mejor. Solo mientras el tablero sigue en esa posición.
+        """
+        if self.canal_progreso is None:
+            return
+        progreso = self.canal_progreso.ultimo()
+        if progreso is None or progreso.clave != estado.clave() or not progreso.valores:
+            return
+        celda = self.tamano_casilla
+        # Por orden y no por magnitud: un valor de victoria no aplasta al resto
+        distintos = sorted(set(progreso.valores.values()))
+        escala = max(len(distintos) - 1, 1)
+        bajo, alto = COLORS["calor_bajo"], COLORS["calor_alto"]
+        capa = pygame.Surface((celda, celda), pygame.SRCALPHA)
+        for movimiento, valor in progreso.valores.items():
+            t = distintos.index(valor) / escala
+            color = tuple(int(b + (a - b) * t) for b, a in zip(bajo, alto))
+            capa.fill((*color, ALFA_CALOR))
+            esquina = (BOARD_OFFSET_X + movimiento.x * celda, BOARD_OFFSET_Y + movimiento.y * celda)
+            self.pantalla.blit(capa, esquina)
+            if movimiento == progreso.mejor_movimiento:
+                pygame.draw.rect(self.pantalla, (0, 0, 0), pygame.Rect(esquina, (celda, celda)), 2)
+        fuente = pygame.font.Font(None, 22)
+        texto = fuente.render(f"IA: profundidad {progreso.profundidad}", True, COLORS["text"])
+        self.pantalla.blit(texto, (BOARD_OFFSET_X, BOARD_OFFSET_Y - 22))
+
     def dibujar_info_turno(
         self, turno_actual: str, juego_terminado: bool, ganador: Optional[str]
     ) -> None:
@@ -228,10 +341,7 @@ class PantallaJuego:
         self.pantalla.blit(superficie, pos)
 
         # Calcular tiempo transcurrido en segundos
-        if self.tiempo_inicio:
-            tiempo_transcurrido = int(pygame.time.get_ticks() / 1000 - self.tiempo_inicio)
-        else:
-            tiempo_transcurrido = 0
+        tiempo_transcurrido = self.segundos_transcurridos()
 
         # Mostrar tiempo en la esquina superior derecha
         texto_tiempo = f"Tiempo: {tiempo_transcurrido}s"
@@ -239,21 +349,301 @@ class PantallaJuego:
         pos_tiempo = superficie_tiempo.get_rect(topright=(WINDOW_WIDTH - 20, 20))
         self.pantalla.blit(superficie_tiempo, pos_tiempo)
 
+    def dibujar_estadisticas(self) -> None:
+        """Dibuja las estadísticas de la última búsqueda de la IA"""
+        if not self.mostrar_estadisticas:
+            return
+        fuente = pygame.font.Font(None, 24)
+        x = BOARD_OFFSET_X + BOARD_SIZE_PX + 20
+        y = BOARD_OFFSET_Y + 150
+
+        est = self.estadisticas
+        if est is None:
+            lineas = ["IA: sin estadísticas"]
+        else:
+            lineas = [
+                f"Nodos: {est.nodos}",
+                f"Hojas: {est.evaluaciones}",
+                f"Cortes: {est.cortes}",
+                f"Cache: {est.tasa_aciertos_cache:.0%}",
+                f"Profundidad: {est.profundidad_alcanzada}",
+                f"Tiempo: {est.tiempo_total * 1000:.0f} ms",
+                f"Nodos/s: {est.nodos_por_segundo:.0f}",
+            ]
+            # Solo las últimas profundidades que caben sobre el botón Pista
+            libres = max(0, (self.boton_pista.top - y) // ALTO_LINEA_ESTADISTICAS - len(lineas))
+            tiempos = list(enumerate(est.tiempo_por_profundidad, start=1))
+            if libres:
+                lineas += [f"  p{i}: {t * 1000:.0f} ms" for i, t in tiempos[-libres:]]
+
+        for linea in lineas:
+            superficie = fuente.render(linea, True, COLORS["text"])
+            self.pantalla.blit(superficie, (x, y))
+            y += ALTO_LINEA_ESTADISTICAS
+
+    def segundos_transcurridos(self) -> int:
+        """Segundos enteros desde el inicio de la partida (texto del reloj)"""
+        if not self.tiempo_inicio:
+            return 0
+        return int(pygame.time.get_ticks() / 1000 - self.tiempo_inicio)
+
+    def ms_hasta_siguiente_segundo(self) -> int:
+        """Milisegundos que faltan para que cambie el texto del reloj"""
+        if not self.tiempo_inicio:
+            return ESPERA_MAXIMA_MS
+        transcurrido_ms = pygame.time.get_ticks() - int(self.tiempo_inicio * 1000)
+        return 1000 - transcurrido_ms % 1000
+
+    @property
+    def tamano_casilla(self) -> int:
+        """Lado en pixeles de cada casilla del tablero mostrado"""
+        return BOARD_SIZE_PX // self.tamano_tablero
+
     def convertir_pixel_a_casilla(
         self, pos_pixel: Tuple[int, int]
     ) -> Optional[Posicion]:
         """Convierte coordenadas de pixel a coordenadas de tablero"""
         x, y = pos_pixel
+        celda = self.tamano_casilla
+        lado = self.tamano_tablero * celda
         if (
-            BOARD_OFFSET_X <= x < BOARD_OFFSET_X + TABLERO_TAMANO * CELL_SIZE
-            and BOARD_OFFSET_Y <= y < BOARD_OFFSET_Y + TABLERO_TAMANO * CELL_SIZE
+            BOARD_OFFSET_X <= x < BOARD_OFFSET_X + lado
+            and BOARD_OFFSET_Y <= y < BOARD_OFFSET_Y + lado
         ):
-            tablero_x = (x - BOARD_OFFSET_X) // CELL_SIZE
-            tablero_y = (y - BOARD_OFFSET_Y) // CELL_SIZE
+            tablero_x = (x - BOARD_OFFSET_X) // celda
+            tablero_y = (y - BOARD_OFFSET_Y) // celda
             return Posicion(tablero_x, tablero_y)
         return None
 
 
+class PantallaEspectador:
+    """
+    Muchas partidas IA contra IA en una grilla de tableros chicos. Las
+    actualizaciones (ver `actualizar`) se acumulan y `dibujar` solo toca las
+    casillas que cambiaron, con blits de sprites precalculados sobre la
+    pantalla; devuelve los rectángulos a pasar a pygame.display.update.
+    """
+
+    ALTO_ENCABEZADO = 28
+    ALTO_ETIQUETA = 14
+    SEPARACION = 6
+
+    def __init__(self, pantalla, partidas: int, tamano: int = TABLERO_TAMANO):
+        self.pantalla = pantalla
+        self.partidas = partidas
+        self.tamano = tamano
+        ancho, alto = pantalla.get_size()
+        self.columnas = max(1, math.ceil(math.sqrt(partidas * ancho / alto)))
+        self.filas = max(1, math.ceil(partidas / self.columnas))
+        ancho_caja = (ancho - self.SEPARACION) // self.columnas
+        alto_caja = (alto - self.ALTO_ENCABEZADO - self.SEPARACION) // self.filas
+        self.celda = max(
+            2,
+            min(ancho_caja - self.SEPARACION, alto_caja - self.SEPARACION - self.ALTO_ETIQUETA)
+            // tamano,
+        )
+        lado = self.celda * tamano
+        self.tableros = [
+            pygame.Rect(
+                self.SEPARACION + (i % self.columnas) * ancho_caja,
+                self.ALTO_ENCABEZADO + self.SEPARACION + (i // self.columnas) * alto_caja,
+                lado,
+                lado,
+            )
+            for i in range(partidas)
+        ]
+        self.sprites = self._crear_sprites(self.celda)
+        self.fuente = pygame.font.Font(None, 16)
+        self.fuente_encabezado = pygame.font.Font(None, 24)
+
+        # Lo que muestra cada tablero: (celdas, cabeza azul, cabeza roja);
+        # las cabezas son índices de casilla o -1
+        self._mostrado: List[Optional[Tuple[bytes, int, int]]] = [None] * partidas
+        # Última actualización sin dibujar por partida (las intermedias se saltean)
+        self._pendientes: dict = {}
+        self._completa = False
+        # Latencia por jugada: (última, suma, cantidad) en milisegundos
+        self.latencias = [(0.0, 0.0, 0)] * partidas
+        self.movimientos = [0] * partidas
+        self.resultados: List[Optional[str]] = [None] * partidas
+        self.terminadas = 0
+
+    @staticmethod
+    def _crear_sprites(celda: int) -> List["pygame.Surface"]:
+        """Casilla vacía, ficha azul, ficha roja, cabeza azul y cabeza roja"""
+        sprites = []
+        radio = max(celda // 2 - 1, 1)
+        for color, cabeza in ((None, False), (AZUL, False), (ROJO, False), (AZUL, True), (ROJO, True)):
+            sprite = pygame.Surface((celda, celda))
+            sprite.fill(COLORS["board"])
+            if celda >= 4:
+                pygame.draw.rect(sprite, COLORS["grid"], sprite.get_rect(), 1)
+            if color is not None:
+                centro = (celda // 2, celda // 2)
+                pygame.draw.circle(sprite, COLORS[color], centro, radio)
+                if cabeza:
+                    pygame.draw.circle(sprite, (0, 0, 0), centro, radio, max(1, celda // 8))
+            sprites.append(sprite.convert() if pygame.display.get_surface() else sprite)
+        return sprites
+
+    def actualizar(
+        self,
+        partida: int,
+        celdas: bytes,
+        cabeza_azul: int = -1,
+        cabeza_roja: int = -1,
+        latencia_ms: Optional[float] = None,
+        resultado: Optional[str] = None,
+    ) -> None:
+        """
+        Nuevo estado de `partida`. `latencia_ms` es lo que tardó la jugada
+        que llevó a él; `resultado` un texto corto si la partida terminó. Un
+        tablero vacío (sin fichas) marca el comienzo de otra partida.
+        """
+        if latencia_ms is not None:
+            _, suma, cantidad = self.latencias[partida]
+            self.latencias[partida] = (latencia_ms, suma + latencia_ms, cantidad + 1)
+        if not any(celdas):
+            self.latencias[partida] = (0.0, 0.0, 0)
+            self.resultados[partida] = None
+        if resultado is not None and self.resultados[partida] is None:
+            self.terminadas += 1
+        self.resultados[partida] = resultado
+        self.movimientos[partida] = len(celdas) - celdas.count(CODIGO_VACIO)
+        self._pendientes[partida] = (bytes(celdas), cabeza_azul, cabeza_roja)
+
+    def dibujar(self) -> List["pygame.Rect"]:
+        """Dibuja lo pendiente y devuelve las zonas de pantalla que cambiaron"""
+        if not self._completa:
+            self.pantalla.fill(COLORS["background"])
+            vacio = bytes(self.tamano * self.tamano)
+            for partida in range(self.partidas):
+                self._mostrado[partida] = None
+                self._pendientes.setdefault(partida, (vacio, -1, -1))
+            self._completa = True
+            completa = True
+        else:
+            completa = False
+
+        sprites = self.sprites
+        celda = self.celda
+        tamano = self.tamano
+        blits = []
+        cambios = []
+        for partida, (celdas, azul, roja) in self._pendientes.items():
+            tablero = self.tableros[partida]
+            anterior = self._mostrado[partida]
+            if anterior is None:
+                indices = range(len(celdas))
+            else:
+                previas, azul_previa, roja_previa = anterior
+                indices = {i for i in range(len(celdas)) if celdas[i] != previas[i]}
+                indices.update(i for i in (azul, roja, azul_previa, roja_previa) if i >= 0)
+            for i in indices:
+                codigo = celdas[i]
+                if codigo == CODIGO_AZUL and i == azul:
+                    codigo = 3
+                elif codigo == CODIGO_ROJO and i == roja:
+                    codigo = 4
+                blits.append((
+                    sprites[codigo],
+                    (tablero.x + (i % tamano) * celda, tablero.y + (i // tamano) * celda),
+                ))
+            self._mostrado[partida] = (celdas, azul, roja)
+            cambios.append(tablero)
+            cambios.append(self._dibujar_etiqueta(partida))
+        self.pantalla.blits(blits, doreturn=False)
+        self._pendientes.clear()
+        return [self.pantalla.get_rect()] if completa else cambios
+
+    def _dibujar_etiqueta(self, partida: int) -> "pygame.Rect":
+        """Número de jugadas y latencia (última / media), o el resultado"""
+        tablero = self.tableros[partida]
+        zona = pygame.Rect(
+            tablero.x, tablero.bottom + 1,
+            self.tableros[0].width + self.SEPARACION, self.ALTO_ETIQUETA,
+        )
+        self.pantalla.fill(COLORS["background"], zona)
+        ultima, suma, cantidad = self.latencias[partida]
+        texto = f"{self.movimientos[partida]}j {ultima:.0f}/{suma / max(cantidad, 1):.0f}ms"
+        if self.resultados[partida] is not None:
+            texto = f"{self.movimientos[partida]}j {self.resultados[partida]}"
+        superficie = self.fuente.render(texto, True, COLORS["text"])
+        self.pantalla.blit(superficie, zona, pygame.Rect(0, 0, zona.width, zona.height))
+        return zona
+
+    def dibujar_encabezado(self, fps: float, tiempo_fotograma_ms: float) -> "pygame.Rect":
+        """Línea superior con partidas, terminadas, FPS y latencia media global"""
+        zona = pygame.Rect(0, 0, self.pantalla.get_width(), self.ALTO_ENCABEZADO)
+        self.pantalla.fill(COLORS["background"], zona)
+        suma = sum(l[1] for l in self.latencias)
+        cantidad = sum(l[2] for l in self.latencias)
+        texto = (
+            f"{self.partidas} partidas, {self.terminadas} terminadas | "
+            f"{fps:.0f} FPS ({tiempo_fotograma_ms:.1f} ms/fotograma) | "
+            f"jugada media {suma / max(cantidad, 1):.0f} ms"
+        )
+        superficie = self.fuente_encabezado.render(texto, True, COLORS["text"])
+        self.pantalla.blit(superficie, (self.SEPARACION, 6))
+        return zona
+
+
+
+class MetricasFotograma:
+    """
+    Mide el coste del bucle principal: tiempo de trabajo por fotograma
+    (eventos + dibujo, sin contar la espera) y fracción de CPU usada
+    sobre una ventana deslizante de fotogramas.
+    """
+
+    def __init__(self, ventana: int = 120):
+        self.tiempos_fotograma = deque(maxlen=ventana)
+        # Muestras (tiempo de pared, tiempo de CPU del proceso)
+        self._muestras = deque(maxlen=ventana)
+        self.fotogramas = 0
+        self.fotogramas_dibujados = 0
+
+    def registrar(self, duracion: float, dibujado: bool) -> None:
+        """Registra un fotograma que tardó `duracion` segundos en procesarse"""
+        self.tiempos_fotograma.append(duracion)
+        self._muestras.append((time.perf_counter(), time.process_time()))
+        self.fotogramas += 1
+        if dibujado:
+            self.fotogramas_dibujados += 1
+
+    @property
+    def tiempo_fotograma_ms(self) -> float:
+        """Tiempo medio de trabajo por fotograma en milisegundos"""
+        if not self.tiempos_fotograma:
+            return 0.0
+        return 1000 * sum(self.tiempos_fotograma) / len(self.tiempos_fotograma)
+
+    @property
+    def uso_cpu(self) -> float:
+        """Fracción de CPU (0..1) consumida por el proceso en la ventana"""
+        if len(self._muestras) < 2:
+            return 0.0
+        pared = self._muestras[-1][0] - self._muestras[0][0]
+        cpu = self._muestras[-1][1] - self._muestras[0][1]
+        return cpu / pared if pared > 0 else 0.0
+
+    @property
+    def fps(self) -> float:
+        """Fotogramas por segundo efectivos en la ventana"""
+        if len(self._muestras) < 2:
+            return 0.0
+        pared = self._muestras[-1][0] - self._muestras[0][0]
+        return (len(self._muestras) - 1) / pared if pared > 0 else 0.0
+
+    def resumen(self) -> dict:
+        return {
+            "tiempo_fotograma_ms": self.tiempo_fotograma_ms,
+            "uso_cpu": self.uso_cpu,
+            "fps": self.fps,
+            "fotogramas": self.fotogramas,
+            "fotogramas_dibujados": self.fotogramas_dibujados,
+        }
+
 
 class GestorInterfaz:
     def __init__(self):
@@ -265,35 +655,56 @@ class GestorInterfaz:
         self.pantalla_dificultad = PantallaDificultad(self.pantalla)
         self.pantalla_turno = PantallaTurno(self.pantalla)
         self.pantalla_juego = PantallaJuego(self.pantalla)
+        self.metricas = MetricasFotograma()
+        # Se activa cuando algo externo (p.ej. la IA) cambia lo que se muestra
+        self.redibujar_pendiente = True
+        self._segundo_mostrado = -1
 
     def ejecutar_bucle_principal(
-        self, callback_juego_iniciado: Callable, callback_movimiento: Callable
+        self,
+        callback_juego_iniciado: Callable,
+        callback_movimiento: Callable,
+        callback_pista: Optional[Callable[[], None]] = None,
+        callback_fotograma: Optional[Callable[[], None]] = None,
     ) -> None:
         """
         Bucle principal de Pygame.
         Maneja selección de dificultad, turno y el juego.
         Permite reiniciar o salir, y muestra tiempo de partida.
+        `callback_pista` se llama al pulsar "Pista"; debe volver enseguida
+        y entregar el resultado con establecer_pista (desde otro hilo).
+        `callback_fotograma` se llama en cada vuelta durante la partida,
+        en este hilo (p.ej. para aplicar una jugada que calculó otro).
         """
         ejecutando = True
         while ejecutando:
-            eventos = pygame.event.get()
+            eventos = self._esperar_eventos()
+            inicio_fotograma = time.perf_counter()
             for evento in eventos:
                 if evento.type == pygame.QUIT:
                     ejecutando = False
 
+            # Solo se redibuja si hubo entrada, un cambio externo (movimiento
+            # de la IA) o cambió el texto del reloj; si no, la pantalla queda igual
+            estado_previo = self.estado_actual
+            redibujar = self._necesita_redibujar(eventos)
+
             # Limpiar pantalla
-            self.pantalla.fill(COLORS["background"])
+            if redibujar:
+                self.pantalla.fill(COLORS["background"])
 
             if self.estado_actual == "dificultad":
                 # Mostrar pantalla de dificultad
-                self.pantalla_dificultad.dibujar()
+                if redibujar:
+                    self.pantalla_dificultad.dibujar()
                 self.pantalla_dificultad.manejar_eventos(eventos)
                 if self.pantalla_dificultad.dificultad_seleccionada is not None:
                     self.estado_actual = "turno"
 
             elif self.estado_actual == "turno":
                 # Mostrar pantalla de selección de turno
-                self.pantalla_turno.dibujar()
+                if redibujar:
+                    self.pantalla_turno.dibujar()
                 self.pantalla_turno.manejar_eventos(eventos)
                 if self.pantalla_turno.jugador_inicial is not None:
                     # Iniciar juego
@@ -307,8 +718,12 @@ class GestorInterfaz:
                     self.estado_actual = "juego"
 
             elif self.estado_actual == "juego":
+                if callback_fotograma is not None:
+                    callback_fotograma()
                 # Procesar clicks en tablero
                 resultado = self.pantalla_juego.manejar_eventos(eventos)
+                if resultado == "pista" and callback_pista is not None:
+                    callback_pista()
 
                 # Botones de Reiniciar y Cerrar
                 mouse_pos = pygame.mouse.get_pos()
@@ -324,30 +739,145 @@ class GestorInterfaz:
                         elif boton_cerrar.collidepoint(mouse_pos):
                             ejecutando = False
 
-                # Dibujar botones
-                pygame.draw.rect(self.pantalla, COLORS["boton"], boton_reiniciar)
-                pygame.draw.rect(self.pantalla, COLORS["boton"], boton_cerrar)
-                fuente_boton = pygame.font.Font(None, 28)
-                self.pantalla.blit(fuente_boton.render("Reiniciar", True, COLORS["text"]),
-                                   boton_reiniciar.move(10, 10))
-                self.pantalla.blit(fuente_boton.render("Cerrar juego", True, COLORS["text"]),
-                                   boton_cerrar.move(10, 10))
-
-                # Dibujar tablero y info
-                estado_actual = callback_movimiento.__self__.motor_juego.obtener_estado_actual()
-                juego_terminado, ganador = callback_movimiento.__self__.motor_juego.verificar_fin_juego()
-                self.pantalla_juego.dibujar_tablero(estado_actual)
-                self.pantalla_juego.dibujar_info_turno(
-                    estado_actual.turno, juego_terminado, ganador
-                )
+                if redibujar:
+                    # Dibujar botones
+                    pygame.draw.rect(self.pantalla, COLORS["boton"], boton_reiniciar)
+                    pygame.draw.rect(self.pantalla, COLORS["boton"], boton_cerrar)
+                    fuente_boton = pygame.font.Font(None, 28)
+                    self.pantalla.blit(fuente_boton.render("Reiniciar", True, COLORS["text"]),
+                                       boton_reiniciar.move(10, 10))
+                    self.pantalla.blit(fuente_boton.render("Cerrar juego", True, COLORS["text"]),
+                                       boton_cerrar.move(10, 10))
+
+                    # Dibujar tablero y info
+                    estado_actual = callback_movimiento.__self__.motor_juego.obtener_estado_actual()
+                    juego_terminado, ganador = callback_movimiento.__self__.motor_juego.verificar_fin_juego()
+                    self.pantalla_juego.dibujar_tablero(estado_actual)
+                    self.pantalla_juego.dibujar_info_turno(
+                        estado_actual.turno, juego_terminado, ganador
+                    )
+                    self.pantalla_juego.dibujar_estadisticas()
+                    self._segundo_mostrado = self.pantalla_juego.segundos_transcurridos()
+
+            # Un cambio de pantalla se dibuja en la siguiente vuelta
+            if self.estado_actual != estado_previo:
+                self.redibujar_pendiente = True
 
             # Actualizar pantalla y controlar FPS
-            pygame.display.flip()
-            self.reloj.tick(60)
+            if redibujar:
+                pygame.display.flip()
+            self.metricas.registrar(time.perf_counter() - inicio_fotograma, redibujar)
+            self.reloj.tick(FPS_ACTIVO if redibujar else FPS_REPOSO)
 
         pygame.quit()
 
+    def ejecutar_espectador(
+        self,
+        partidas: int,
+        obtener_actualizaciones: Callable[[], Iterable[tuple]],
+        tamano: int = TABLERO_TAMANO,
+    ) -> None:
+        """
+        Bucle de la grilla de espectador (PantallaEspectador) hasta cerrar
+        la ventana o pulsar Escape. `obtener_actualizaciones` se llama en
+        cada fotograma y devuelve, sin bloquear, tuplas con los argumentos
+        de PantallaEspectador.actualizar.
+        """
+        espectador = PantallaEspectador(self.pantalla, partidas, tamano)
+        proximo_encabezado = 0.0
+        ejecutando = True
+        while ejecutando:
+            for evento in pygame.event.get():
+                if evento.type == pygame.QUIT or (
+                    evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE
+                ):
+                    ejecutando = False
+            inicio_fotograma = time.perf_counter()
+            for actualizacion in obtener_actualizaciones():
+                espectador.actualizar(*actualizacion)
+            cambios = espectador.dibujar()
+            if inicio_fotograma >= proximo_encabezado:
+                cambios.append(espectador.dibujar_encabezado(
+                    self.metricas.fps, self.metricas.tiempo_fotograma_ms
+                ))
+                proximo_encabezado = inicio_fotograma + 0.5
+            if cambios:
+                pygame.display.update(cambios)
+            self.metricas.registrar(time.perf_counter() - inicio_fotograma, bool(cambios))
+            self.reloj.tick(FPS_ACTIVO)
+        pygame.quit()
+
+    def _esperar_eventos(self) -> list:
+        """
+        Obtiene los eventos del fotograma. Si no hay nada pendiente de
+        dibujar, bloquea en pygame.event.wait hasta que llegue entrada o
+        hasta que toque actualizar el reloj, en vez de girar a 60 FPS.
+        """
+        if self.redibujar_pendiente:
+            return pygame.event.get()
+
+        if self.estado_actual == "juego":
+            espera = self.pantalla_juego.ms_hasta_siguiente_segundo()
+        else:
+            espera = ESPERA_MAXIMA_MS
+        evento = pygame.event.wait(max(1, min(espera, ESPERA_MAXIMA_MS)))
+        if evento.type == pygame.NOEVENT:
+            return []
+        return [evento] + pygame.event.get()
+
+    def _necesita_redibujar(self, eventos: list) -> bool:
+        """Decide si este fotograma debe dibujarse y consume la marca pendiente"""
+        redibujar = self.redibujar_pendiente or bool(eventos)
+        if (
+            self.estado_actual == "juego"
+            and self.pantalla_juego.segundos_transcurridos() != self._segundo_mostrado
+        ):
+            redibujar = True
+        self.redibujar_pendiente = False
+        return redibujar
+
+    def notificar_cambio(self) -> None:
+        """Pide redibujar en el próximo fotograma (p.ej. llegó un movimiento de la IA)"""
+        self.redibujar_pendiente = True
+
+    def establecer_estadisticas(self, estadisticas) -> None:
+        """Recibe las EstadisticasBusqueda de la IA para el overlay"""
+        self.pantalla_juego.estadisticas = estadisticas
+        self.notificar_cambio()
+
+    def iniciar_pista(self, estado: EstadoJuego) -> None:
+        """Marca `estado` como en análisis (el botón muestra "Pensando...")"""
+        self.pantalla_juego.pista_en_curso = estado.clave()
+        self.notificar_cambio()
+
+    def establecer_pista(
+        self, estado: EstadoJuego, sugerencias: List[Tuple[Posicion, str]]
+    ) -> None:
+        """
+        Recibe las jugadas sugeridas para `estado`, con el texto de cada
+        línea. Se puede llamar desde otro hilo: despierta al bucle principal
+        con un evento.
+        """
+        self.pantalla_juego.pista = (estado.clave(), sugerencias)
+        self.pantalla_juego.pista_en_curso = None
+        self.notificar_cambio()
+        pygame.event.post(pygame.event.Event(EVENTO_PISTA))
+
+    def establecer_canal_progreso(self, canal) -> None:
+        """Canal del que se lee el progreso de la IA para el mapa de calor"""
+        self.pantalla_juego.canal_progreso = canal
+
+    def notificar_progreso(self) -> None:
+        """Hay progreso nuevo en el canal; se puede llamar desde otro hilo"""
+        self.notificar_cambio()
+        pygame.event.post(pygame.event.Event(EVENTO_PROGRESO))
+
+    def obtener_metricas(self) -> dict:
+        """Tiempo por fotograma y uso de CPU medidos en el bucle principal"""
+        return self.metricas.resumen()
+
     def actualizar_display_juego(self, estado: EstadoJuego, turno: str, juego_terminado: bool, ganador: Optional[str]) -> None:
         if self.estado_actual == "juego":
             self.pantalla_juego.dibujar_tablero(estado)
             self.pantalla_juego.dibujar_info_turno(turno, juego_terminado, ganador)
+        self.notificar_cambio()
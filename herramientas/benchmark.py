@@ -0,0 +1,268 @@
+"""
+Benchmarks del motor sin ventana.
+
+    python -m herramientas.benchmark estado
+    python -m herramientas.benchmark topologia
+    python -m herramientas.benchmark forzadas
+    python -m herramientas.benchmark poda --profundidad 12
+"""
+
+import argparse
+import random
+import sys
+import time
+import timeit
+from typing import List
+
+from core.interfaces import AZUL, ROJO
+from core.estado import GestorEstado
+from core.juego import MotorJuego
+from ai.estrategias import EstrategiaMinimax, VICTORIA
+
+TAMANOS_TOPOLOGIA = (7, 9, 11, 15)
+
+# Configuraciones de benchmark_poda: alfa-beta solo y cada mejora por separado
+MEJORAS_PODA = {
+    "alfa-beta": dict(pvs=False, aspiracion=False, reducciones=False),
+    "pvs": dict(pvs=True, aspiracion=False, reducciones=False),
+    "aspiracion": dict(pvs=False, aspiracion=True, reducciones=False),
+    "reducciones": dict(pvs=False, aspiracion=False, reducciones=True),
+    "todas": dict(pvs=True, aspiracion=True, reducciones=True),
+}
+
+
+def _partida_aleatoria(
+    movimientos: int, semilla: int = 0, tamano: int = 7, envolvente: bool = True
+) -> MotorJuego:
+    """Motor tras `movimientos` jugadas aleatorias (o menos si termina antes)"""
+    rng = random.Random(semilla)
+    motor = MotorJuego(tamano, envolvente)
+    motor.inicializar_juego(AZUL)
+    for _ in range(movimientos):
+        if motor.juego_terminado:
+            break
+        jugador = motor.obtener_estado_actual().turno
+        opciones = motor.obtener_movimientos_validos(jugador)
+        if not opciones:
+            break
+        motor.realizar_movimiento(rng.choice(opciones))
+    return motor
+
+
+def _bytes_por_copia(estado) -> int:
+    """Memoria propia de una copia (el historial compartido no cuenta)"""
+    copia = estado.copiar()
+    return sys.getsizeof(copia) + sys.getsizeof(copia.celdas)
+
+
+def benchmark_estado(repeticiones: int = 20000) -> List[dict]:
+    """Tiempo de copiar() y memoria por estado según lo avanzada que esté la partida"""
+    filas = []
+    for movimientos in (0, 10, 20, 30, 40):
+        estado = _partida_aleatoria(movimientos, semilla=movimientos).obtener_estado_actual()
+        segundos = timeit.timeit(estado.copiar, number=repeticiones)
+        filas.append(
+            {
+                "fichas": estado.fichas_colocadas(),
+                "copiar_us": 1e6 * segundos / repeticiones,
+                "bytes_por_estado": _bytes_por_copia(estado),
+            }
+        )
+    return filas
+
+
+def benchmark_topologia(
+    repeticiones: int = 20000, profundidad: int = 6, tamanos=TAMANOS_TOPOLOGIA
+) -> List[dict]:
+    """
+    Coste de generar y aplicar movimientos, y nodos/s de Minimax, según el
+    lado del tablero y el tipo de borde
+    """
+    filas = []
+    for tamano in tamanos:
+        for envolvente in (True, False):
+            # Apertura corta con ambas cabezas colocadas y más de una opción,
+            # para que la búsqueda no termine de inmediato
+            semilla = tamano
+            while True:
+                motor = _partida_aleatoria(4, semilla, tamano, envolvente)
+                estado = motor.obtener_estado_actual()
+                jugador = estado.turno
+                opciones = GestorEstado.obtener_movimientos_validos(estado, jugador)
+                if not motor.juego_terminado and len(opciones) > 1:
+                    break
+                semilla += 1000
+
+            generar = timeit.timeit(
+                lambda: GestorEstado.obtener_movimientos_validos(estado, jugador),
+                number=repeticiones,
+            )
+            aplicar = timeit.timeit(
+                lambda: GestorEstado.aplicar_movimiento(estado, opciones[0]),
+                number=repeticiones,
+            )
+
+            estrategia = EstrategiaMinimax(jugador, profundidad=profundidad)
+            inicio = time.perf_counter()
+            _, estadisticas = estrategia.buscar(motor)
+            segundos = time.perf_counter() - inicio
+
+            filas.append(
+                {
+                    "tamano": tamano,
+                    "envolvente": envolvente,
+                    "generar_us": 1e6 * generar / repeticiones,
+                    "aplicar_us": 1e6 * aplicar / repeticiones,
+                    "nodos": estadisticas.nodos,
+                    "nodos_por_segundo": estadisticas.nodos / segundos if segundos else 0.0,
+                }
+            )
+    return filas
+
+
+def benchmark_forzadas(
+    posiciones: int = 10, profundidad: int = 6, segundos: float = 10.0,
+    movimientos: int = 14,
+) -> List[dict]:
+    """
+    Minimax con y sin extensiones de jugadas forzadas sobre posiciones de
+    partidas aleatorias: nodos a profundidad fija, y tiempo y profundidad
+    nominal hasta demostrar el resultado (con `segundos` como límite)
+    """
+    filas = []
+    semilla = 0
+    while len(filas) < posiciones:
+        semilla += 1
+        motor = _partida_aleatoria(movimientos, semilla)
+        estado = motor.obtener_estado_actual()
+        jugador = estado.turno
+        if motor.juego_terminado or len(motor.obtener_movimientos_validos(jugador)) < 2:
+            continue
+        fila = {"semilla": semilla}
+        for extender, nombre in ((False, "sin"), (True, "con")):
+            estrategia = EstrategiaMinimax(
+                jugador, profundidad=profundidad, extender_forzadas=extender
+            )
+            _, estadisticas = estrategia.buscar(motor)
+            fila[f"nodos_{nombre}"] = estadisticas.nodos
+            fila[f"extensiones_{nombre}"] = estadisticas.extensiones
+
+            estrategia = EstrategiaMinimax(jugador, extender_forzadas=extender)
+            inicio = time.perf_counter()
+            _, estadisticas = estrategia.buscar(motor, tiempo_limite=segundos)
+            fila[f"segundos_{nombre}"] = time.perf_counter() - inicio
+            fila[f"alcanzada_{nombre}"] = estadisticas.profundidad_alcanzada
+            fila[f"resuelta_{nombre}"] = abs(estadisticas.mejor_valor or 0) >= VICTORIA
+        filas.append(fila)
+    return filas
+
+
+def benchmark_poda(
+    posiciones: int = 12, profundidad: int = 12, movimientos: int = 14,
+) -> List[dict]:
+    """
+    Minimax a profundidad fija con cada mejora de la poda (MEJORAS_PODA)
+    sobre las mismas posiciones: nodos, segundos, re-búsquedas y si el
+    valor y la jugada coinciden con alfa-beta solo (PVS y aspiración no
+    deberían cambiarlos; las reducciones sí pueden)
+    """
+    filas = []
+    semilla = 0
+    while len(filas) < posiciones:
+        semilla += 1
+        motor = _partida_aleatoria(movimientos, semilla)
+        jugador = motor.obtener_estado_actual().turno
+        if motor.juego_terminado or len(motor.obtener_movimientos_validos(jugador)) < 2:
+            continue
+        fila = {"semilla": semilla}
+        referencia = None
+        for nombre, mejoras in MEJORAS_PODA.items():
+            estrategia = EstrategiaMinimax(jugador, profundidad=profundidad, **mejoras)
+            inicio = time.perf_counter()
+            movimiento, estadisticas = estrategia.buscar(motor)
+            fila[f"segundos_{nombre}"] = time.perf_counter() - inicio
+            fila[f"nodos_{nombre}"] = estadisticas.nodos
+            fila[f"re_busquedas_{nombre}"] = (
+                estadisticas.re_busquedas + estadisticas.fallos_aspiracion
+            )
+            if referencia is None:
+                referencia = (movimiento, estadisticas.mejor_valor)
+            fila[f"igual_{nombre}"] = (movimiento, estadisticas.mejor_valor) == referencia
+        filas.append(fila)
+    return filas
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor")
+    parser.add_argument("benchmark", choices=["estado", "topologia", "forzadas", "poda"])
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    parser.add_argument("--profundidad", type=int, default=6)
+    parser.add_argument("--posiciones", type=int, default=10)
+    parser.add_argument("--segundos", type=float, default=10.0)
+    parser.add_argument("--movimientos", type=int, default=14)
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "estado":
+        print(f"{'fichas':>7} {'copiar (us)':>12} {'bytes/estado':>13}")
+        for fila in benchmark_estado(args.repeticiones):
+            print(
+                f"{fila['fichas']:>7} {fila['copiar_us']:>12.2f} "
+                f"{fila['bytes_por_estado']:>13}"
+            )
+    elif args.benchmark == "topologia":
+        print(
+            f"{'tablero':>8} {'borde':>10} {'generar (us)':>13} "
+            f"{'aplicar (us)':>13} {'nodos':>8} {'nodos/s':>10}"
+        )
+        for fila in benchmark_topologia(args.repeticiones, args.profundidad):
+            borde = "envolvente" if fila["envolvente"] else "acotado"
+            tablero = f"{fila['tamano']}x{fila['tamano']}"
+            print(
+                f"{tablero:>8} {borde:>10} {fila['generar_us']:>13.2f} "
+                f"{fila['aplicar_us']:>13.2f} {fila['nodos']:>8} "
+                f"{fila['nodos_por_segundo']:>10.0f}"
+            )
+
+    elif args.benchmark == "forzadas":
+        print(
+            f"{'semilla':>8} {'nodos sin':>10} {'nodos con':>10} {'extensiones':>12} "
+            f"{'resolver sin':>13} {'resolver con':>13} {'prof. sin':>10} {'prof. con':>10}"
+        )
+        filas = benchmark_forzadas(
+            args.posiciones, args.profundidad, args.segundos, args.movimientos
+        )
+        for fila in filas:
+            sin = f"{fila['segundos_sin']:.2f}" + ("" if fila["resuelta_sin"] else "+")
+            con = f"{fila['segundos_con']:.2f}" + ("" if fila["resuelta_con"] else "+")
+            print(
+                f"{fila['semilla']:>8} {fila['nodos_sin']:>10} {fila['nodos_con']:>10} "
+                f"{fila['extensiones_con']:>12} {sin:>13} {con:>13} "
+                f"{fila['alcanzada_sin']:>10} {fila['alcanzada_con']:>10}"
+            )
+        sin = sum(fila["segundos_sin"] for fila in filas)
+        con = sum(fila["segundos_con"] for fila in filas)
+        print(
+            f"Resueltas: {sum(f['resuelta_sin'] for f in filas)} sin, "
+            f"{sum(f['resuelta_con'] for f in filas)} con; "
+            f"tiempo total {sin:.1f} s sin, {con:.1f} s con (+ = límite agotado)"
+        )
+
+    elif args.benchmark == "poda":
+        filas = benchmark_poda(args.posiciones, args.profundidad, args.movimientos)
+        base = sum(fila["nodos_alfa-beta"] for fila in filas)
+        print(
+            f"{'mejora':>12} {'nodos':>9} {'ahorro':>7} {'segundos':>9} "
+            f"{'re-búsq.':>9} {'iguales':>8}"
+        )
+        for nombre in MEJORAS_PODA:
+            nodos = sum(fila[f"nodos_{nombre}"] for fila in filas)
+            print(
+                f"{nombre:>12} {nodos:>9} {1 - nodos / base:>7.1%} "
+                f"{sum(fila[f'segundos_{nombre}'] for fila in filas):>9.2f} "
+                f"{sum(fila[f're_busquedas_{nombre}'] for fila in filas):>9} "
+                f"{sum(fila[f'igual_{nombre}'] for fila in filas):>5}/{len(filas)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Etiquetado en lote de posiciones con la búsqueda por números de prueba
+(ai.numeros_prueba), p. ej. para armar conjuntos de entrenamiento o de
+prueba.
+
+    python -m herramientas.etiquetar posiciones.txt --nodos 200000 --procesos 4
+    python -m herramientas.etiquetar --aleatorias 1000 --vacias 20 30 > etiquetas.tsv
+
+Entrada: una posición por línea en la notación de core.serializacion (el
+turno indica quién mueve). Salida, una línea por posición separada por
+tabuladores: notación, gana | pierde | empate | ? (presupuesto agotado),
+jugada ganadora (x,y o -) y nodos usados.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from core.interfaces import AZUL, CODIGO_VACIO, ROJO, TABLERO_TAMANO
+from core.juego import MotorJuego
+from core.serializacion import estado_a_texto, estado_desde_texto
+from ai.numeros_prueba import BusquedaNumerosPrueba
+from ai.solucionador import NOMBRES_VALOR
+
+# Búsquedas por proceso (una por topología), con su tabla entre posiciones
+_BUSQUEDAS = {}
+_NODOS = 100_000
+
+
+def _iniciar(nodos: int) -> None:
+    global _NODOS
+    _NODOS = nodos
+
+
+def etiquetar(texto: str) -> Tuple[str, str, str, int]:
+    """(notación, etiqueta, jugada ganadora o "-", nodos) de una posición"""
+    estado = estado_desde_texto(texto)
+    busqueda = _BUSQUEDAS.get(estado.topologia)
+    if busqueda is None:
+        busqueda = BusquedaNumerosPrueba(estado.topologia, max_nodos=_NODOS)
+        _BUSQUEDAS[estado.topologia] = busqueda
+    resultado = busqueda.resolver(estado, estado.turno)
+    etiqueta = "?" if resultado.resultado is None else NOMBRES_VALOR[resultado.resultado]
+    jugada = "-" if resultado.movimiento is None else (
+        f"{resultado.movimiento.x},{resultado.movimiento.y}"
+    )
+    return texto, etiqueta, jugada, resultado.nodos
+
+
+def posiciones_aleatorias(
+    cantidad: int, vacias_min: int, vacias_max: int, tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True, semilla: int = 0,
+) -> Iterator[str]:
+    """Posiciones de partidas aleatorias con vacias_min..vacias_max libres"""
+    rng = random.Random(semilla)
+    generadas = 0
+    while generadas < cantidad:
+        objetivo = rng.randint(vacias_min, vacias_max)
+        motor = MotorJuego(tamano, envolvente)
+        motor.inicializar_juego(rng.choice((AZUL, ROJO)))
+        while not motor.juego_terminado:
+            estado = motor.obtener_estado_actual()
+            if estado.celdas.count(CODIGO_VACIO) <= objetivo:
+                yield estado_a_texto(estado)
+                generadas += 1
+                break
+            motor.realizar_movimiento(rng.choice(motor.obtener_movimientos_validos(estado.turno)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Etiquetado de posiciones por números de prueba")
+    parser.add_argument("archivo", nargs="?", help="posiciones, una por línea (- = stdin)")
+    parser.add_argument("--aleatorias", type=int, default=0, help="generar N posiciones")
+    parser.add_argument("--vacias", type=int, nargs=2, default=(15, 30), metavar=("MIN", "MAX"))
+    parser.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--nodos", type=int, default=100_000, help="presupuesto por posición")
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.aleatorias:
+        posiciones = list(posiciones_aleatorias(
+            args.aleatorias, *args.vacias, args.tamano, not args.sin_wraparound, args.semilla
+        ))
+    elif args.archivo:
+        entrada = sys.stdin if args.archivo == "-" else open(args.archivo, encoding="utf-8")
+        with entrada:
+            posiciones = [linea.strip() for linea in entrada if linea.strip()]
+    else:
+        parser.error("indicar un archivo o --aleatorias")
+
+    inicio = time.perf_counter()
+    conteo: Counter = Counter()
+    if args.procesos == 1:
+        _iniciar(args.nodos)
+        resultados = map(etiquetar, posiciones)
+        ejecutor = None
+    else:
+        ejecutor = ProcessPoolExecutor(args.procesos, initializer=_iniciar, initargs=(args.nodos,))
+        resultados = ejecutor.map(etiquetar, posiciones, chunksize=16)
+    try:
+        for texto, etiqueta, jugada, nodos in resultados:
+            conteo[etiqueta] += 1
+            print(f"{texto}\t{etiqueta}\t{jugada}\t{nodos}")
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+
+    segundos = time.perf_counter() - inicio
+    resumen = ", ".join(f"{etiqueta}: {n}" for etiqueta, n in sorted(conteo.items()))
+    print(
+        f"{len(posiciones)} posiciones en {segundos:.1f} s "
+        f"({len(posiciones) / max(segundos, 1e-9):.0f}/s) — {resumen}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
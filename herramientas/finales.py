@@ -0,0 +1,114 @@
+"""
+Generación y verificación de la tabla de finales (ai.finales).
+
+    python -m herramientas.finales generar --vacias 6 --procesos 4
+    python -m herramientas.finales verificar --posiciones 200
+
+`generar` es reanudable: si se interrumpe, volver a ejecutarlo continúa
+desde el último bloque guardado. `verificar` compara la tabla con una
+búsqueda minimax completa (sin tabla) sobre finales de partidas
+aleatorias.
+"""
+
+import argparse
+import logging
+import os
+import random
+from typing import Dict
+
+from core.interfaces import AZUL, ROJO, CODIGO_VACIO, TABLERO_TAMANO
+from core.juego import MotorJuego
+from ai.estrategias import EstrategiaMinimax, VICTORIA
+from ai.finales import EMPATE, GANA, PIERDE, TablaFinales, generar_tabla_finales
+
+NOMBRES = {GANA: "gana", PIERDE: "pierde", EMPATE: "empate"}
+
+
+def directorio_por_defecto(tamano: int, envolvente: bool) -> str:
+    sufijo = "" if envolvente else "_acotado"
+    return os.path.join("tablas", f"finales_{tamano}x{tamano}{sufijo}")
+
+
+def verificar(
+    tabla: TablaFinales, posiciones: int, semilla: int = 0
+) -> Dict[str, int]:
+    """
+    Resultado de la tabla contra minimax hasta el final en posiciones de
+    partidas aleatorias con a lo sumo tabla.max_vacias casillas vacías
+    """
+    rng = random.Random(semilla)
+    topologia = tabla.topologia
+    conteo = {"posiciones": 0, "coinciden": 0, "sin_dato": 0}
+    while conteo["posiciones"] < posiciones:
+        motor = MotorJuego(topologia.tamano, topologia.envolvente)
+        motor.inicializar_juego(rng.choice((AZUL, ROJO)))
+        while not motor.juego_terminado:
+            estado = motor.obtener_estado_actual()
+            jugador = estado.turno
+            vacias = estado.celdas.count(CODIGO_VACIO)
+            if vacias <= tabla.max_vacias:
+                break
+            motor.realizar_movimiento(rng.choice(motor.obtener_movimientos_validos(jugador)))
+        if motor.juego_terminado:
+            continue
+
+        conteo["posiciones"] += 1
+        final = tabla.consultar(estado, jugador)
+        if final is None:
+            conteo["sin_dato"] += 1
+            continue
+        # Con profundidad = casillas vacías todas las hojas son finales
+        valor, _ = EstrategiaMinimax(jugador).minimax(estado, vacias, True, motor)
+        esperado = GANA if valor >= VICTORIA else PIERDE if valor <= -VICTORIA else EMPATE
+        if final.resultado == esperado:
+            conteo["coinciden"] += 1
+        else:
+            logging.warning(
+                "Distinto en %s: tabla %s, búsqueda %s",
+                estado, NOMBRES[final.resultado], NOMBRES[esperado],
+            )
+    return conteo
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Tabla de finales")
+    parser.add_argument("accion", choices=["generar", "verificar"])
+    parser.add_argument("--vacias", type=int, default=5, help="casillas vacías máximas")
+    parser.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument("--directorio", default=None)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--posiciones", type=int, default=100)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    envolvente = not args.sin_wraparound
+    directorio = args.directorio or directorio_por_defecto(args.tamano, envolvente)
+
+    if args.accion == "generar":
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        niveles = generar_tabla_finales(
+            directorio, args.vacias, args.tamano, envolvente, args.procesos
+        )
+        print(f"{'vacías':>7} {'conjuntos':>10} {'entradas':>12} {'segundos':>9}")
+        for nivel in niveles:
+            nota = "  (reanudado)" if nivel.reanudado else ""
+            print(
+                f"{nivel.vacias:>7} {nivel.conjuntos:>10} {nivel.entradas:>12} "
+                f"{nivel.segundos:>9.1f}{nota}"
+            )
+        total = sum(nivel.entradas for nivel in niveles)
+        print(f"Tabla en {directorio}/ ({total / 1e6:.1f} MB)")
+    else:
+        with TablaFinales(directorio, args.tamano, envolvente) as tabla:
+            if tabla.max_vacias < 0:
+                parser.error(f"no hay tabla en {directorio}/ (usar generar)")
+            conteo = verificar(tabla, args.posiciones, args.semilla)
+        print(
+            f"{conteo['coinciden']}/{conteo['posiciones']} coinciden con la búsqueda "
+            f"({conteo['sin_dato']} sin dato)"
+        )
+
+
+if __name__ == "__main__":
+    main()
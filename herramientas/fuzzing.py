@@ -0,0 +1,394 @@
+"""
+Fuzzing diferencial: el motor de referencia (GestorEstado y MotorJuego)
+contra un motor optimizado, jugada a jugada.
+
+    python -m herramientas.fuzzing --partidas 100000 --procesos 4
+    python -m herramientas.fuzzing --optimizado paquete.modulo:OtroMotor --tamanos 2,3,4
+
+Cada partida es una secuencia de intentos de jugada (x, y) que se aplica a
+los dos motores. Después de cada intento se comparan la validez de la
+jugada, el tablero, las cabezas, el turno, el veredicto de fin de partida
+(terminada y ganador) y el conjunto de jugadas legales de quien mueve. Con
+deshacer activado, además se deshace cada jugada en el motor optimizado, se
+comprueba que vuelve exactamente al estado previo y se rehace.
+
+Las secuencias se generan con el motor de referencia, en tres modos:
+"azar" (jugadas legales uniformes), "encierro" (preferir las casillas junto
+a la cabeza rival, para llegar a bloqueos) y "relleno" (preferir las
+casillas con menos vecinas libres, para llegar a tableros llenos y
+empates). En cualquier modo se intercalan intentos inválidos: casillas
+ocupadas, casillas libres no adyacentes a la cabeza, coordenadas fuera del
+tablero y jugadas después del fin. Los tableros van de 2x2 a 7x7, con y sin
+wraparound, y empieza cualquiera de los dos colores.
+
+Una discrepancia se reduce a una secuencia mínima (delta debugging: se
+quitan tramos de intentos mientras la discrepancia siga apareciendo) y se
+imprime con su configuración. Al final se informa cuántas jugadas por
+segundo procesó cada motor sobre las mismas secuencias.
+
+El motor optimizado se elige con --optimizado modulo:Clase y debe tener la
+interfaz de core.compacto.MotorCompacto: Clase(tamano, envolvente,
+jugador_inicial), jugar(casilla) -> deshacer o None, deshacer(...),
+jugadas() -> máscara, celdas(), cabezas, turno, terminado y ganador.
+"""
+
+import argparse
+import importlib
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from core.interfaces import AZUL, ROJO, Posicion
+from core.juego import MotorJuego
+from core.compacto import COLORES_COMPACTOS, SIN_CABEZA, MotorCompacto
+
+MODOS = ("azar", "encierro", "relleno")
+TAMANOS = (2, 3, 4, 5, 6, 7)
+PROBABILIDAD_INVALIDA = 0.1
+# Intentos de jugada después del fin de cada partida
+INTENTOS_TRAS_FIN = 2
+
+Intento = Tuple[int, int]
+
+
+class Configuracion(NamedTuple):
+    tamano: int
+    envolvente: bool
+    jugador_inicial: str
+
+
+class Discrepancia(NamedTuple):
+    intento: int  # Índice en la secuencia (-1 = posición inicial)
+    aspecto: str  # validez, celdas, cabezas, turno, fin, jugadas o deshacer
+    referencia: str
+    optimizado: str
+
+
+class Falla(NamedTuple):
+    configuracion: Configuracion
+    secuencia: List[Intento]
+    discrepancia: Discrepancia
+
+
+class ResumenFuzzing(NamedTuple):
+    partidas: int
+    intentos: int
+    jugadas: int  # Intentos válidos
+    segundos_referencia: float
+    segundos_optimizado: float
+    fallas: List[Falla]
+
+
+# ===== Comparación =====
+
+
+def _foto_referencia(motor: MotorJuego) -> tuple:
+    estado = motor.estado_actual
+    topologia = motor.topologia
+    cabezas = tuple(
+        SIN_CABEZA if cabeza is None else topologia.indice(cabeza)
+        for cabeza in (estado.cabeza_azul, estado.cabeza_roja)
+    )
+    ganador = None if motor.ganador is None else COLORES_COMPACTOS.index(motor.ganador)
+    jugadas = sorted(
+        topologia.indice(pos) for pos in motor.obtener_movimientos_validos(estado.turno)
+    )
+    return (
+        bytes(estado.celdas), cabezas, COLORES_COMPACTOS.index(estado.turno),
+        (motor.juego_terminado, ganador), jugadas,
+    )
+
+
+def _foto_optimizado(motor) -> tuple:
+    mascara = motor.jugadas()
+    jugadas = [i for i in range(mascara.bit_length()) if mascara >> i & 1]
+    return (
+        bytes(motor.celdas()), tuple(motor.cabezas), motor.turno,
+        (motor.terminado, motor.ganador), jugadas,
+    )
+
+
+_ASPECTOS = ("celdas", "cabezas", "turno", "fin", "jugadas")
+
+
+def _diferencia(intento: int, referencia: tuple, optimizado: tuple) -> Optional[Discrepancia]:
+    for aspecto, esperado, obtenido in zip(_ASPECTOS, referencia, optimizado):
+        if esperado != obtenido:
+            return Discrepancia(intento, aspecto, repr(esperado), repr(obtenido))
+    return None
+
+
+def comparar(
+    configuracion: Configuracion,
+    secuencia: Sequence[Intento],
+    optimizado=MotorCompacto,
+    deshacer: bool = True,
+    contadores: Optional[List[float]] = None,
+) -> Optional[Discrepancia]:
+    """
+    Aplica `secuencia` a los dos motores y devuelve la primera discrepancia,
+    o None. `contadores` ([segundos de referencia, segundos del optimizado,
+    intentos válidos]) acumula el tiempo que pasó cada motor jugando, sin
+    contar las comparaciones, y las jugadas válidas.
+    """
+    tamano, envolvente, jugador_inicial = configuracion
+    reloj = time.perf_counter
+    inicio = reloj()
+    referencia = MotorJuego(tamano, envolvente)
+    referencia.inicializar_juego(jugador_inicial)
+    medio = reloj()
+    motor = optimizado(tamano, envolvente, jugador_inicial)
+    fin = reloj()
+    segundos_referencia, segundos_optimizado = medio - inicio, fin - medio
+    validas = 0
+
+    foto = _foto_optimizado(motor)
+    discrepancia = _diferencia(-1, _foto_referencia(referencia), foto)
+    for numero, (x, y) in enumerate(secuencia):
+        if discrepancia is not None:
+            break
+        casilla = y * tamano + x if 0 <= x < tamano and 0 <= y < tamano else -1
+        inicio = reloj()
+        valida = referencia.realizar_movimiento(Posicion(x, y)).es_valido
+        medio = reloj()
+        deshecho = motor.jugar(casilla)
+        fin = reloj()
+        segundos_referencia += medio - inicio
+        segundos_optimizado += fin - medio
+
+        if valida != (deshecho is not None):
+            discrepancia = Discrepancia(numero, "validez", repr(valida), repr(not valida))
+            break
+        validas += valida
+        if valida and deshacer:
+            motor.deshacer(deshecho)
+            previa = _foto_optimizado(motor)
+            if previa != foto:
+                discrepancia = Discrepancia(numero, "deshacer", repr(foto), repr(previa))
+                break
+            motor.jugar(casilla)
+        foto = _foto_optimizado(motor)
+        discrepancia = _diferencia(numero, _foto_referencia(referencia), foto)
+
+    if contadores is not None:
+        contadores[0] += segundos_referencia
+        contadores[1] += segundos_optimizado
+        contadores[2] += validas
+    return discrepancia
+
+
+# ===== Generación =====
+
+
+def generar_secuencia(rng: random.Random, configuracion: Configuracion,
+                      modo: str = "azar") -> List[Intento]:
+    """Partida completa según `modo`, con intentos inválidos intercalados"""
+    tamano, envolvente, jugador_inicial = configuracion
+    motor = MotorJuego(tamano, envolvente)
+    motor.inicializar_juego(jugador_inicial)
+    topologia = motor.topologia
+    secuencia: List[Intento] = []
+
+    while not motor.juego_terminado:
+        estado = motor.estado_actual
+        legales = motor.obtener_movimientos_validos(estado.turno)
+        if rng.random() < PROBABILIDAD_INVALIDA:
+            intento = _intento_invalido(rng, motor, legales)
+            if intento is not None:
+                secuencia.append(intento)
+                motor.realizar_movimiento(Posicion(*intento))
+                continue
+        if modo == "encierro":
+            rival = estado.cabeza_roja if estado.turno == AZUL else estado.cabeza_azul
+            cerca = [] if rival is None else [
+                pos for pos in legales if pos in topologia.vecinos_pos[topologia.indice(rival)]
+            ]
+            pos = rng.choice(cerca or legales)
+        elif modo == "relleno":
+            celdas = estado.celdas
+            libres = {
+                pos: sum(not celdas[j] for j in topologia.vecinos[topologia.indice(pos)])
+                for pos in legales
+            }
+            menor = min(libres.values())
+            pos = rng.choice([pos for pos in legales if libres[pos] == menor])
+        else:
+            pos = rng.choice(legales)
+        secuencia.append((pos.x, pos.y))
+        motor.realizar_movimiento(pos)
+
+    for _ in range(rng.randint(0, INTENTOS_TRAS_FIN)):
+        secuencia.append((rng.randrange(tamano), rng.randrange(tamano)))
+    return secuencia
+
+
+def _intento_invalido(rng: random.Random, motor: MotorJuego,
+                      legales: List[Posicion]) -> Optional[Intento]:
+    """Casilla ocupada, libre pero no adyacente, o fuera del tablero"""
+    topologia = motor.topologia
+    celdas = motor.estado_actual.celdas
+    tipo = rng.randrange(3)
+    if tipo == 0:
+        ocupadas = [pos for i, pos in enumerate(topologia.posiciones) if celdas[i]]
+        pos = rng.choice(ocupadas) if ocupadas else None
+    elif tipo == 1:
+        lejanas = [
+            pos for i, pos in enumerate(topologia.posiciones)
+            if not celdas[i] and pos not in legales
+        ]
+        pos = rng.choice(lejanas) if lejanas else None
+    else:
+        n = topologia.tamano
+        x, y = rng.choice(((-1, rng.randrange(n)), (n, rng.randrange(n)),
+                           (rng.randrange(n), -1), (rng.randrange(n), n)))
+        return x, y
+    return None if pos is None else (pos.x, pos.y)
+
+
+def configuracion_al_azar(rng: random.Random,
+                          tamanos: Sequence[int] = TAMANOS) -> Configuracion:
+    return Configuracion(rng.choice(tamanos), rng.random() < 0.5, rng.choice((AZUL, ROJO)))
+
+
+# ===== Reducción =====
+
+
+def reducir(configuracion: Configuracion, secuencia: Sequence[Intento],
+            optimizado=MotorCompacto, deshacer: bool = True) -> List[Intento]:
+    """
+    Secuencia mínima que sigue mostrando una discrepancia (ddmin): se
+    prueban quitar tramos cada vez más cortos hasta que ningún intento
+    sobra.
+    """
+    def falla(candidata: List[Intento]) -> Optional[Discrepancia]:
+        return comparar(configuracion, candidata, optimizado, deshacer)
+
+    actual = list(secuencia)
+    discrepancia = falla(actual)
+    if discrepancia is None:
+        return actual
+    actual = actual[:discrepancia.intento + 1]
+
+    partes = 2
+    while len(actual) >= 2:
+        tramo = -(-len(actual) // partes)
+        for inicio in range(0, len(actual), tramo):
+            candidata = actual[:inicio] + actual[inicio + tramo:]
+            if falla(candidata) is not None:
+                actual = candidata
+                partes = max(partes - 1, 2)
+                break
+        else:
+            if partes >= len(actual):
+                break
+            partes = min(partes * 2, len(actual))
+    return actual
+
+
+# ===== Campaña =====
+
+
+def fuzz(
+    partidas: int,
+    semilla: int = 0,
+    optimizado=MotorCompacto,
+    tamanos: Sequence[int] = TAMANOS,
+    deshacer: bool = True,
+    max_fallas: int = 5,
+) -> ResumenFuzzing:
+    """`partidas` secuencias al azar; guarda hasta `max_fallas` sin reducir"""
+    rng = random.Random(semilla)
+    contadores = [0.0, 0.0, 0]
+    intentos = 0
+    fallas: List[Falla] = []
+    for _ in range(partidas):
+        configuracion = configuracion_al_azar(rng, tamanos)
+        secuencia = generar_secuencia(rng, configuracion, rng.choice(MODOS))
+        discrepancia = comparar(configuracion, secuencia, optimizado, deshacer, contadores)
+        intentos += len(secuencia)
+        if discrepancia is not None and len(fallas) < max_fallas:
+            fallas.append(Falla(configuracion, secuencia, discrepancia))
+    segundos_referencia, segundos_optimizado, jugadas = contadores
+    return ResumenFuzzing(partidas, intentos, jugadas, segundos_referencia,
+                          segundos_optimizado, fallas)
+
+
+def cargar_optimizado(ruta: str):
+    """'paquete.modulo:Clase' -> la clase"""
+    modulo, _, nombre = ruta.partition(":")
+    return getattr(importlib.import_module(modulo), nombre or "MotorCompacto")
+
+
+def _lote(argumentos) -> ResumenFuzzing:
+    partidas, semilla, ruta, tamanos, deshacer, max_fallas = argumentos
+    return fuzz(partidas, semilla, cargar_optimizado(ruta), tamanos, deshacer, max_fallas)
+
+
+def formatear_falla(falla: Falla, optimizado=MotorCompacto, deshacer: bool = True) -> str:
+    configuracion = falla.configuracion
+    minima = reducir(configuracion, falla.secuencia, optimizado, deshacer)
+    discrepancia = comparar(configuracion, minima, optimizado, deshacer)
+    tipo = "envolvente" if configuracion.envolvente else "acotado"
+    jugadas = " ".join(f"{x},{y}" for x, y in minima)
+    return (
+        f"{configuracion.tamano}x{configuracion.tamano} {tipo}, empieza "
+        f"{configuracion.jugador_inicial}: {len(falla.secuencia)} -> {len(minima)} intentos\n"
+        f"  secuencia: {jugadas}\n"
+        f"  intento {discrepancia.intento}, {discrepancia.aspecto}: "
+        f"referencia {discrepancia.referencia}, optimizado {discrepancia.optimizado}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--partidas", type=int, default=10_000)
+    parser.add_argument("--procesos", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--optimizado", default="core.compacto:MotorCompacto",
+                        help="modulo:Clase con la interfaz de MotorCompacto")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)))
+    parser.add_argument("--sin-deshacer", action="store_true",
+                        help="no comprobar deshacer en el motor optimizado")
+    parser.add_argument("--max-fallas", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tamanos = tuple(int(t) for t in args.tamanos.split(","))
+    deshacer = not args.sin_deshacer
+    optimizado = cargar_optimizado(args.optimizado)
+    lotes = max(1, args.procesos) * 4
+    tareas = [
+        (args.partidas // lotes + (i < args.partidas % lotes), args.semilla * 1_000_003 + i,
+         args.optimizado, tamanos, deshacer, args.max_fallas)
+        for i in range(lotes)
+    ]
+    inicio = time.perf_counter()
+    if args.procesos > 1:
+        with ProcessPoolExecutor(args.procesos) as pool:
+            resumenes = list(pool.map(_lote, tareas))
+    else:
+        resumenes = [_lote(tarea) for tarea in tareas]
+    segundos = time.perf_counter() - inicio
+
+    jugadas = sum(r.jugadas for r in resumenes)
+    intentos = sum(r.intentos for r in resumenes)
+    referencia = sum(r.segundos_referencia for r in resumenes)
+    rapido = sum(r.segundos_optimizado for r in resumenes)
+    fallas = [falla for r in resumenes for falla in r.fallas]
+    print(f"{args.partidas} partidas, {intentos} intentos ({jugadas} válidos) "
+          f"en {segundos:.1f} s")
+    print(f"  referencia: {intentos / max(referencia, 1e-9):,.0f} intentos/s")
+    print(f"  optimizado: {intentos / max(rapido, 1e-9):,.0f} intentos/s "
+          f"({referencia / max(rapido, 1e-9):.1f}x)")
+    if not fallas:
+        print("Sin discrepancias")
+        return 0
+    print(f"Discrepancias: {len(fallas)} (o más; hasta {args.max_fallas} por lote)")
+    for falla in fallas[:args.max_fallas]:
+        print(formatear_falla(falla, optimizado, deshacer))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Ejecutor de partidas IA contra IA sin ventana.
+
+    python -m herramientas.partida --azul experto --rojo normal --partidas 10
+    python -m herramientas.partida --azul experto --rojo experto --profile
+    python -m herramientas.partida --azul experto --rojo experto --partidas 40 \
+        --procesos 4 --compartida 1000000
+
+Con --procesos las partidas se reparten en un pool de procesos; con
+--compartida todas las búsquedas usan una tabla de transposición en
+memoria compartida (ai.tabla_compartida) y se informan sus aciertos
+cruzados entre procesos.
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO, Dificultad, Posicion
+from core.juego import MotorJuego
+from ai.factoria import FactoriaEstrategias
+from ai.cache_persistente import CachePersistente
+from ai.finales import TablaFinales
+from ai.tabla_compartida import TablaCompartida
+from herramientas import perfilado
+
+
+class ResultadoPartida(NamedTuple):
+    """Resultado de una partida sin ventana"""
+
+    ganador: Optional[str]
+    movimientos: List[Posicion]
+    # Tiempo de cada turno de la IA, por jugador, en segundos
+    tiempos: Dict[str, List[float]]
+
+
+def dificultad_desde_texto(texto: str) -> Dificultad:
+    try:
+        return Dificultad[texto.upper()]
+    except KeyError:
+        opciones = ", ".join(d.name.lower() for d in Dificultad)
+        raise argparse.ArgumentTypeError(
+            f"dificultad inválida: {texto} (opciones: {opciones})"
+        )
+
+
+def jugar_partida(
+    estrategias: dict,
+    jugador_inicial: str = AZUL,
+    perfilador: Optional[perfilado.Perfilador] = None,
+    dificultades: Optional[dict] = None,
+    motor: Optional[MotorJuego] = None,
+    numero_partida: Optional[int] = None,
+) -> ResultadoPartida:
+    """
+    Juega una partida completa entre dos estrategias ({AZUL: ..., ROJO: ...}).
+    Con `perfilador`, cada turno se perfila con la etiqueta
+    <dificultad>_mov<número de movimiento>, precedida de p<numero_partida>
+    si se indica.
+    """
+    motor = motor or MotorJuego()
+    motor.inicializar_juego(jugador_inicial)
+    dificultades = dificultades or {}
+    movimientos: List[Posicion] = []
+    tiempos: Dict[str, List[float]] = {AZUL: [], ROJO: []}
+
+    while not motor.juego_terminado:
+        jugador = motor.obtener_estado_actual().turno
+        estrategia = estrategias[jugador]
+        numero = len(movimientos) + 1
+
+        inicio = time.perf_counter()
+        if perfilador is not None:
+            dificultad = dificultades.get(jugador)
+            etiqueta = perfilado.etiqueta_turno(dificultad, numero, numero_partida)
+            with perfilador.perfilar(etiqueta, dificultad, numero):
+                posicion = estrategia.seleccionar_movimiento(motor)
+        else:
+            posicion = estrategia.seleccionar_movimiento(motor)
+        tiempos[jugador].append(time.perf_counter() - inicio)
+
+        if posicion is None:
+            break
+        resultado = motor.realizar_movimiento(posicion)
+        if not resultado.es_valido:
+            raise RuntimeError(
+                f"La IA de {jugador} jugó un movimiento inválido {posicion}: "
+                f"{resultado.mensaje}"
+            )
+        movimientos.append(posicion)
+
+    _, ganador = motor.verificar_fin_juego()
+    return ResultadoPartida(ganador, movimientos, tiempos)
+
+
+# Configuración y recursos de cada proceso del pool (ver _iniciar_trabajador)
+_TRABAJADOR: dict = {}
+
+
+def _iniciar_trabajador(
+    dificultades: dict,
+    nodos_prueba: dict,
+    tamano: int,
+    envolvente: bool,
+    ruta_cache: Optional[str],
+    ruta_finales: Optional[str],
+    nombre_compartida: Optional[str],
+) -> None:
+    """Inicializador del pool: abre caché, tabla de finales y tabla compartida"""
+    _TRABAJADOR.update(
+        dificultades=dificultades,
+        nodos_prueba=nodos_prueba,
+        tamano=tamano,
+        envolvente=envolvente,
+        cache=CachePersistente(ruta_cache) if ruta_cache else None,
+        finales=TablaFinales(ruta_finales, tamano, envolvente) if ruta_finales else None,
+        compartida=TablaCompartida.abrir(nombre_compartida) if nombre_compartida else None,
+    )
+
+
+def _jugar_en_trabajador(inicial: str) -> Tuple[ResultadoPartida, Counter]:
+    """Una partida en un proceso del pool, con lo que sumó a los contadores de la tabla"""
+    compartida = _TRABAJADOR["compartida"]
+    antes = Counter(compartida.estadisticas()) if compartida is not None else Counter()
+    estrategias = {
+        jugador: FactoriaEstrategias.crear_estrategia(
+            dificultad, jugador, _TRABAJADOR["cache"], _TRABAJADOR["finales"],
+            _TRABAJADOR["nodos_prueba"][jugador], compartida,
+        )
+        for jugador, dificultad in _TRABAJADOR["dificultades"].items()
+    }
+    motor = MotorJuego(_TRABAJADOR["tamano"], _TRABAJADOR["envolvente"])
+    resultado = jugar_partida(estrategias, inicial, motor=motor)
+    if compartida is None:
+        return resultado, Counter()
+    despues = Counter(compartida.estadisticas())
+    despues.subtract(antes)
+    return resultado, despues
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Partidas IA contra IA sin ventana")
+    parser.add_argument("--azul", type=dificultad_desde_texto, default=Dificultad.EXPERTO)
+    parser.add_argument("--rojo", type=dificultad_desde_texto, default=Dificultad.NORMAL)
+    parser.add_argument("--partidas", type=int, default=1)
+    parser.add_argument(
+        "--inicia", choices=["azul", "rojo", "alterna"], default="alterna"
+    )
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument(
+        "--cache", default=None, help="archivo SQLite de caché persistente de posiciones"
+    )
+    parser.add_argument(
+        "--finales", default=None, help="directorio de la tabla de finales (herramientas.finales)"
+    )
+    parser.add_argument(
+        "--pruebas", type=int, default=None, metavar="NODOS",
+        help="el experto busca victorias forzadas (números de prueba) con este presupuesto",
+    )
+    parser.add_argument(
+        "--pruebas-solo", choices=["azul", "rojo"], default=None,
+        help="usar --pruebas solo en un color",
+    )
+    parser.add_argument("--procesos", type=int, default=1, help="partidas en paralelo")
+    parser.add_argument(
+        "--compartida", type=int, default=None, metavar="ENTRADAS",
+        help="tabla de transposición en memoria compartida entre procesos",
+    )
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    if args.semilla is not None:
+        random.seed(args.semilla)
+    perfilador = perfilado.crear_desde_argumentos(args)
+    if perfilador is not None and args.procesos > 1:
+        parser.error("el perfilado no se combina con --procesos")
+    dificultades = {AZUL: args.azul, ROJO: args.rojo}
+    solo = {"azul": AZUL, "rojo": ROJO}.get(args.pruebas_solo)
+    nodos_prueba = {
+        jugador: args.pruebas if solo in (None, jugador) else None
+        for jugador in dificultades
+    }
+    envolvente = not args.sin_wraparound
+    compartida = TablaCompartida(args.compartida) if args.compartida else None
+    iniciales = [
+        (AZUL if numero % 2 == 0 else ROJO) if args.inicia == "alterna"
+        else (AZUL if args.inicia == "azul" else ROJO)
+        for numero in range(args.partidas)
+    ]
+
+    resultados: List[ResultadoPartida] = []
+    uso_compartida: Counter = Counter()
+    if args.procesos > 1:
+        # Cada proceso abre sus propias conexiones a caché y tablas
+        cache = finales = None
+        with ProcessPoolExecutor(
+            args.procesos,
+            initializer=_iniciar_trabajador,
+            initargs=(
+                dificultades, nodos_prueba, args.tamano, envolvente, args.cache,
+                args.finales, compartida.nombre if compartida is not None else None,
+            ),
+        ) as ejecutor:
+            for resultado, uso in ejecutor.map(_jugar_en_trabajador, iniciales):
+                resultados.append(resultado)
+                uso_compartida.update(uso)
+    else:
+        cache = CachePersistente(args.cache) if args.cache else None
+        finales = TablaFinales(args.finales, args.tamano, envolvente) if args.finales else None
+        for numero_partida, inicial in enumerate(iniciales, 1):
+            estrategias = {
+                jugador: FactoriaEstrategias.crear_estrategia(
+                    dificultad, jugador, cache, finales, nodos_prueba[jugador], compartida
+                )
+                for jugador, dificultad in dificultades.items()
+            }
+            motor = MotorJuego(args.tamano, envolvente)
+            resultados.append(
+                jugar_partida(
+                    estrategias, inicial, perfilador, dificultades, motor, numero_partida
+                )
+            )
+        if compartida is not None:
+            uso_compartida.update(compartida.estadisticas())
+        if cache is not None:
+            # El resumen informa las entradas después de cerrar la conexión
+            entradas_cache = len(cache)
+            cache.cerrar()
+        if finales is not None:
+            finales.cerrar()
+    if compartida is not None:
+        compartida.cerrar()
+
+    victorias = {AZUL: 0, ROJO: 0, None: 0}
+    tiempos: Dict[str, List[float]] = {AZUL: [], ROJO: []}
+    total_movimientos = 0
+    for resultado in resultados:
+        victorias[resultado.ganador] += 1
+        total_movimientos += len(resultado.movimientos)
+        for jugador in tiempos:
+            tiempos[jugador].extend(resultado.tiempos[jugador])
+
+    print(f"Partidas: {args.partidas}")
+    print(
+        f"Azul ({args.azul.name.lower()}): {victorias[AZUL]}  "
+        f"Rojo ({args.rojo.name.lower()}): {victorias[ROJO]}  "
+        f"Empates: {victorias[None]}"
+    )
+    print(f"Movimientos por partida: {total_movimientos / max(args.partidas, 1):.1f}")
+    for jugador, nombre in ((AZUL, "Azul"), (ROJO, "Rojo")):
+        if tiempos[jugador]:
+            medio = 1000 * sum(tiempos[jugador]) / len(tiempos[jugador])
+            print(f"{nombre}: {medio:.2f} ms por turno, máx {1000 * max(tiempos[jugador]):.2f} ms")
+    if cache is not None:
+        print(
+            f"Caché: {cache.aciertos} aciertos, {cache.escrituras} escrituras, "
+            f"{entradas_cache} entradas"
+        )
+    if finales is not None:
+        print(f"Tabla de finales: {finales.aciertos} posiciones resueltas")
+    if compartida is not None:
+        consultas = max(uso_compartida["consultas"], 1)
+        print(
+            f"Tabla compartida: {uso_compartida['aciertos']} aciertos "
+            f"({uso_compartida['aciertos_ajenos']} de otro proceso) en "
+            f"{uso_compartida['consultas']} consultas, "
+            f"colisiones {uso_compartida['colisiones'] / consultas:.1%}, "
+            f"{uso_compartida['escrituras']} escrituras"
+        )
+    if perfilador is not None:
+        print(f"Perfiles ({perfilador.modo}) en {perfilador.directorio}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Modo de perfilado (--profile) para main.py y los ejecutores sin ventana.
+
+Cada fase perfilada (un turno de la IA, el bucle de render) produce en el
+directorio de salida (nombre = <sesión>_<etiqueta>):
+    <nombre>.txt          tiempo por fase (generación, copia, evaluación,
+                          búsqueda, render) y funciones más costosas
+    <nombre>.collapsed    pilas colapsadas para herramientas de flamegraph
+    <nombre>.prof         volcado de pstats (solo modo cprofile)
+y una fila en resumen.csv, etiquetada por dificultad y número de movimiento.
+
+La sesión (fecha, hora y proceso al crear el Perfilador) y el número de
+partida en la etiqueta de cada turno evitan que una corrida, o la partida
+siguiente de la misma corrida, pise los reportes de otra.
+"""
+
+import cProfile
+import csv
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+FASES = ("generacion", "copia", "evaluacion", "busqueda", "render", "otros")
+
+MODOS = ("auto", "cprofile", "muestreo")
+
+# Funciones de core/interfaces.py que solo existen para duplicar estados
+_FUNCIONES_COPIA = {"copiar", "__init__", "_actualizar_cabezas_desde_historial"}
+
+
+def muestreo_disponible() -> bool:
+    """El muestreador necesita sys._current_frames (CPython)"""
+    return hasattr(sys, "_current_frames")
+
+
+def resolver_modo(modo: str) -> str:
+    if modo not in MODOS:
+        raise ValueError(f"Modo de perfilado desconocido: {modo}")
+    if modo == "auto":
+        return "muestreo" if muestreo_disponible() else "cprofile"
+    if modo == "muestreo" and not muestreo_disponible():
+        return "cprofile"
+    return modo
+
+
+def etiqueta_turno(dificultad, numero_movimiento: int, partida: Optional[int] = None) -> str:
+    """Etiqueta de un turno de la IA, p.ej. experto_mov012 o p003_experto_mov012"""
+    nombre = getattr(dificultad, "name", str(dificultad)).lower()
+    etiqueta = f"{nombre}_mov{numero_movimiento:03d}"
+    return etiqueta if partida is None else f"p{partida:03d}_{etiqueta}"
+
+
+def clasificar_funcion(archivo: str, funcion: str) -> str:
+    """Asigna una función (archivo, nombre) a una de las FASES"""
+    ruta = archivo.replace("\\", "/")
+    if "pygame" in ruta or "pygame" in funcion or "/gui/" in ruta:
+        return "render"
+    if "/core/" in ruta:
+        if ruta.endswith("interfaces.py") and funcion in _FUNCIONES_COPIA:
+            return "copia"
+        return "generacion"
+    if funcion == "copiar":
+        return "copia"
+    if ruta.endswith("ai/evaluador.py"):
+        return "evaluacion"
+    if "/ai/" in ruta:
+        return "busqueda"
+    return "otros"
+
+
+def _es_anonima(archivo: str, funcion: str) -> bool:
+    """Funciones nativas (~) y generadas (<string>, p.ej. NamedTuple.__new__)"""
+    return (archivo == "~" and "pygame" not in funcion) or archivo == "<string>"
+
+
+def _reparto_fases(clave, stats, memo, visitados=frozenset()) -> Dict[str, float]:
+    """
+    Fracción del tiempo propio de una función que corresponde a cada fase.
+    Las funciones anónimas se reparten entre las fases de quienes las
+    llaman, en proporción al tiempo gastado desde cada llamador.
+    """
+    if clave in memo:
+        return memo[clave]
+    archivo, _, funcion = clave
+    llamadores = stats[clave][4] if clave in stats else {}
+    if not _es_anonima(archivo, funcion) or not llamadores or clave in visitados:
+        reparto = {clasificar_funcion(archivo, funcion): 1.0}
+    else:
+        total = sum(datos[2] for datos in llamadores.values())
+        reparto: Dict[str, float] = {}
+        for llamador, datos in llamadores.items():
+            peso = datos[2] / total if total else 1.0 / len(llamadores)
+            sub = _reparto_fases(llamador, stats, memo, visitados | {clave})
+            for fase, fraccion in sub.items():
+                reparto[fase] = reparto.get(fase, 0.0) + peso * fraccion
+    memo[clave] = reparto
+    return reparto
+
+
+def _nombre_marco(archivo: str, funcion: str) -> str:
+    return f"{os.path.basename(archivo)}:{funcion}"
+
+
+class _Sesion:
+    """Lleva el tiempo activo de una sesión (sin contar las pausas)"""
+
+    def __init__(self):
+        self.duracion = 0.0
+        self._desde: Optional[float] = None
+
+    def _marcar_inicio(self) -> None:
+        self._desde = time.perf_counter()
+
+    def _marcar_fin(self) -> None:
+        if self._desde is not None:
+            self.duracion += time.perf_counter() - self._desde
+            self._desde = None
+
+
+class _SesionCProfile(_Sesion):
+    """
+    Perfil determinista con cProfile. Pausar cierra el tramo actual y
+    reanudar abre uno nuevo; los tramos se suman al generar el reporte.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tramos: List[cProfile.Profile] = []
+
+    def iniciar(self) -> None:
+        self._marcar_inicio()
+        self.tramos.append(cProfile.Profile())
+        self.tramos[-1].enable()
+
+    def pausar(self) -> None:
+        self.tramos[-1].disable()
+        self._marcar_fin()
+
+    def reanudar(self) -> None:
+        self.iniciar()
+
+    def detener(self) -> None:
+        self.tramos[-1].disable()
+        self._marcar_fin()
+
+    def _estadisticas(self, salida=None) -> pstats.Stats:
+        stats = pstats.Stats(self.tramos[0], stream=salida or io.StringIO())
+        for tramo in self.tramos[1:]:
+            stats.add(tramo)
+        return stats
+
+    def tiempos_por_fase(self) -> Dict[str, float]:
+        stats = self._estadisticas().stats
+        tiempos = dict.fromkeys(FASES, 0.0)
+        for clave, datos in stats.items():
+            for fase, peso in _reparto_fases(clave, stats, {}).items():
+                tiempos[fase] += datos[2] * peso
+        return tiempos
+
+    def pilas_colapsadas(self) -> Dict[str, int]:
+        """
+        cProfile no guarda pilas completas: se emiten aristas
+        llamador;llamado con el tiempo propio en microsegundos
+        """
+        pilas: Counter = Counter()
+        for (archivo, _, funcion), datos in self._estadisticas().stats.items():
+            _, _, tiempo_propio, _, llamadores = datos
+            marco = _nombre_marco(archivo, funcion)
+            if not llamadores:
+                pilas[marco] += int(tiempo_propio * 1e6)
+                continue
+            for (arch_llamador, _, func_llamador), datos_llamador in llamadores.items():
+                llamador = _nombre_marco(arch_llamador, func_llamador)
+                pilas[f"{llamador};{marco}"] += int(datos_llamador[2] * 1e6)
+        return {pila: valor for pila, valor in pilas.items() if valor > 0}
+
+    def texto_funciones(self, limite: int = 25) -> str:
+        salida = io.StringIO()
+        self._estadisticas(salida).sort_stats("tottime").print_stats(limite)
+        return salida.getvalue()
+
+    def volcar(self, ruta: str) -> None:
+        self._estadisticas().dump_stats(ruta)
+
+
+class _SesionMuestreo(_Sesion):
+    """
+    Perfil por muestreo: un hilo toma la pila del hilo perfilado cada
+    `intervalo` segundos. Da pilas reales para flamegraphs con un coste
+    mucho menor que cProfile en la búsqueda recursiva.
+    """
+
+    def __init__(self, intervalo: float = 0.001):
+        super().__init__()
+        self.intervalo = intervalo
+        self.muestras: Counter = Counter()
+        self._hilo_objetivo = threading.get_ident()
+        self._activo = threading.Event()
+        self._fin = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._intervalo_cambio = sys.getswitchinterval()
+
+    def iniciar(self) -> None:
+        # Ceder el GIL más seguido para que el muestreador pueda tomar muestras
+        sys.setswitchinterval(min(self._intervalo_cambio, self.intervalo))
+        self._marcar_inicio()
+        self._activo.set()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+
+    def pausar(self) -> None:
+        self._activo.clear()
+        self._marcar_fin()
+
+    def reanudar(self) -> None:
+        self._marcar_inicio()
+        self._activo.set()
+
+    def detener(self) -> None:
+        self._marcar_fin()
+        self._fin.set()
+        self._activo.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        sys.setswitchinterval(self._intervalo_cambio)
+
+    def _muestrear(self) -> None:
+        while not self._fin.is_set():
+            self._activo.wait()
+            time.sleep(self.intervalo)
+            if self._fin.is_set() or not self._activo.is_set():
+                continue
+            marco = sys._current_frames().get(self._hilo_objetivo)
+            pila: List[Tuple[str, str]] = []
+            while marco is not None:
+                codigo = marco.f_code
+                pila.append((codigo.co_filename, codigo.co_name))
+                marco = marco.f_back
+            if pila:
+                pila.reverse()
+                self.muestras[tuple(pila)] += 1
+
+    def tiempos_por_fase(self) -> Dict[str, float]:
+        tiempos = dict.fromkeys(FASES, 0.0)
+        total = sum(self.muestras.values())
+        if not total:
+            return tiempos
+        for pila, cantidad in self.muestras.items():
+            archivo, funcion = next(
+                (marco for marco in reversed(pila) if not _es_anonima(*marco)),
+                pila[-1],
+            )
+            tiempos[clasificar_funcion(archivo, funcion)] += cantidad
+        return {fase: self.duracion * n / total for fase, n in tiempos.items()}
+
+    def pilas_colapsadas(self) -> Dict[str, int]:
+        pilas: Counter = Counter()
+        for pila, cantidad in self.muestras.items():
+            pilas[";".join(_nombre_marco(a, f) for a, f in pila)] += cantidad
+        return dict(pilas)
+
+    def texto_funciones(self, limite: int = 25) -> str:
+        propias: Counter = Counter()
+        for pila, cantidad in self.muestras.items():
+            propias[_nombre_marco(*pila[-1])] += cantidad
+        total = sum(propias.values()) or 1
+        lineas = [f"{'muestras':>9} {'%':>6}  función"]
+        for marco, cantidad in propias.most_common(limite):
+            lineas.append(f"{cantidad:>9} {100 * cantidad / total:>5.1f}%  {marco}")
+        return "\n".join(lineas) + "\n"
+
+    def volcar(self, ruta: str) -> None:
+        pass  # No hay formato pstats para muestras
+
+
+class Perfilador:
+    """
+    Perfila fases con nombre. Las fases se pueden anidar (un turno de la
+    IA dentro del bucle de render): la exterior se pausa mientras corre la
+    interior, así cada reporte solo cuenta su propio trabajo.
+    """
+
+    def __init__(
+        self, directorio: str = "perfiles", modo: str = "auto", sesion: Optional[str] = None
+    ):
+        self.modo = resolver_modo(modo)
+        self.directorio = directorio
+        self.sesion = sesion or f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        os.makedirs(directorio, exist_ok=True)
+        self._pila: list = []
+        self.filas: List[dict] = []
+
+    def _nueva_sesion(self):
+        if self.modo == "muestreo":
+            return _SesionMuestreo()
+        return _SesionCProfile()
+
+    @contextmanager
+    def perfilar(self, etiqueta: str, dificultad=None, movimiento: Optional[int] = None):
+        if self._pila:
+            self._pila[-1].pausar()
+        sesion = self._nueva_sesion()
+        self._pila.append(sesion)
+        sesion.iniciar()
+        try:
+            yield sesion
+        finally:
+            sesion.detener()
+            self._pila.pop()
+            # El reporte se escribe antes de reanudar la fase exterior:
+            # pstats desactiva el hook de perfilado global al leer un Profile
+            self._escribir(etiqueta, sesion, dificultad, movimiento)
+            if self._pila:
+                self._pila[-1].reanudar()
+
+    def _escribir(self, etiqueta, sesion, dificultad, movimiento) -> None:
+        etiqueta = f"{self.sesion}_{etiqueta}"
+        base = os.path.join(self.directorio, etiqueta)
+        duracion = sesion.duracion
+        fases = sesion.tiempos_por_fase()
+
+        with open(base + ".txt", "w", encoding="utf-8") as archivo:
+            archivo.write(f"Etiqueta: {etiqueta}\n")
+            if dificultad is not None:
+                archivo.write(f"Dificultad: {getattr(dificultad, 'name', dificultad)}\n")
+            if movimiento is not None:
+                archivo.write(f"Movimiento: {movimiento}\n")
+            archivo.write(f"Modo: {self.modo}\nDuración: {duracion * 1000:.2f} ms\n\n")
+            archivo.write("Tiempo por fase:\n")
+            total = sum(fases.values()) or 1.0
+            for fase in FASES:
+                archivo.write(
+                    f"  {fase:<11} {fases[fase] * 1000:>10.2f} ms"
+                    f" {100 * fases[fase] / total:>6.1f}%\n"
+                )
+            archivo.write("\n")
+            archivo.write(sesion.texto_funciones())
+
+        with open(base + ".collapsed", "w", encoding="utf-8") as archivo:
+            for pila, valor in sorted(sesion.pilas_colapsadas().items()):
+                archivo.write(f"{pila} {valor}\n")
+
+        sesion.volcar(base + ".prof")
+
+        fila = {
+            "etiqueta": etiqueta,
+            "dificultad": getattr(dificultad, "name", dificultad) or "",
+            "movimiento": "" if movimiento is None else movimiento,
+            "duracion_ms": round(duracion * 1000, 3),
+        }
+        fila.update({f"{fase}_ms": round(fases[fase] * 1000, 3) for fase in FASES})
+        self.filas.append(fila)
+        self._agregar_a_resumen(fila)
+
+    def _agregar_a_resumen(self, fila: dict) -> None:
+        ruta = os.path.join(self.directorio, "resumen.csv")
+        nuevo = not os.path.exists(ruta)
+        with open(ruta, "a", newline="", encoding="utf-8") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=list(fila))
+            if nuevo:
+                escritor.writeheader()
+            escritor.writerow(fila)
+
+
+def agregar_argumentos(parser) -> None:
+    """Opciones --profile comunes a main.py y a los ejecutores sin ventana"""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="auto",
+        choices=MODOS,
+        help="perfilar turnos de la IA y render (auto usa muestreo si está disponible)",
+    )
+    parser.add_argument(
+        "--dir-perfiles",
+        default="perfiles",
+        help="directorio donde se escriben los reportes de perfilado",
+    )
+
+
+def crear_desde_argumentos(args) -> Optional[Perfilador]:
+    if not args.profile:
+        return None
+    return Perfilador(args.dir_perfiles, args.profile)
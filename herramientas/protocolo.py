@@ -0,0 +1,284 @@
+"""
+Motor persistente que habla un protocolo de líneas por stdin/stdout, al
+estilo UCI del ajedrez. Un proceso por jugador mantiene cargados el motor,
+las estrategias y sus tablas de transposición entre jugada y jugada.
+
+    python -m herramientas.protocolo
+
+Comandos (uno por línea; las coordenadas se escriben x,y):
+    uci                               -> id name, option..., uciok
+    isready                           -> readyok
+    newgame                           vacía las tablas de transposición
+    setoption name <n> value <v>      profundidad (búsquedas sin tiempo) o
+                                      tabla (entradas máximas de la tabla)
+    position startpos [size N] [bounded] [turn azul|rojo] [moves x,y ...]
+    position text <tablero> <turno> [acotado] [moves x,y ...]
+    go [time <ms>] [depth <n>] [infinite]
+                                      busca en segundo plano; emite una línea
+                                      "info" por profundidad y "bestmove x,y"
+                                      (o "bestmove none"); infinite sigue
+                                      hasta "stop"
+    stop                              corta la búsqueda en curso
+    eval                              eval <f(e)> azul <mov.> rojo <mov.>
+    d                                 muestra la posición en notación de texto
+    quit
+
+Sin "time" ni "depth", go usa la profundidad configurada. Los errores se
+informan con una línea "error <mensaje>" y no terminan el proceso. Si la
+búsqueda falla se informa "info string error <mensaje>" y, como siempre,
+"bestmove none": el cliente nunca queda esperando.
+"""
+
+import logging
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO, Posicion
+from core.juego import MotorJuego
+from core.serializacion import estado_a_texto, estado_desde_texto
+from ai.estrategias import EstrategiaMinimax
+from ai.estadisticas import EstadisticasBusqueda
+from ai.evaluador import FuncionEvaluadora
+
+logger = logging.getLogger(__name__)
+
+NOMBRE = "Snake vs Snake"
+
+
+class ErrorComando(Exception):
+    """Comando mal formado; se responde con una línea "error" """
+
+
+def formatear_posicion(pos: Optional[Posicion]) -> str:
+    return "none" if pos is None else f"{pos.x},{pos.y}"
+
+
+def leer_posicion(texto: str) -> Posicion:
+    try:
+        x, y = texto.split(",")
+        return Posicion(int(x), int(y))
+    except ValueError:
+        raise ErrorComando(f"coordenada inválida: {texto!r}")
+
+
+class MotorProtocolo:
+    """Estado persistente del motor y despacho de comandos"""
+
+    def __init__(self, salida: TextIO = sys.stdout, profundidad: int = 3):
+        self.salida = salida
+        self.profundidad = profundidad
+        self.tamano_tabla = 200_000
+        self.motor = MotorJuego()
+        self.motor.inicializar_juego(AZUL)
+        self.evaluador = FuncionEvaluadora()
+        # Una estrategia por color: sus tablas se conservan entre comandos
+        self.estrategias: Dict[str, EstrategiaMinimax] = {}
+        self._escritura = threading.Lock()
+        self._busqueda: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    def escribir(self, linea: str) -> None:
+        # La búsqueda escribe desde su hilo mientras se siguen leyendo comandos
+        with self._escritura:
+            self.salida.write(linea + "\n")
+            self.salida.flush()
+
+    def ejecutar(self, entrada: TextIO = sys.stdin) -> None:
+        """Atiende comandos hasta "quit" o fin de la entrada"""
+        for linea in entrada:
+            if not self.procesar(linea):
+                break
+        self.detener_busqueda()
+
+    def procesar(self, linea: str) -> bool:
+        """Ejecuta un comando; False si hay que terminar"""
+        partes = linea.split()
+        if not partes:
+            return True
+        comando, argumentos = partes[0], partes[1:]
+        if comando == "quit":
+            return False
+        manejador = getattr(self, f"_cmd_{comando}", None)
+        if manejador is None:
+            self.escribir(f"error comando desconocido: {comando}")
+            return True
+        try:
+            manejador(argumentos)
+        except ErrorComando as error:
+            self.escribir(f"error {error}")
+        return True
+
+    def estrategia(self, jugador: str) -> EstrategiaMinimax:
+        estrategia = self.estrategias.get(jugador)
+        if estrategia is None:
+            estrategia = EstrategiaMinimax(
+                jugador,
+                profundidad=self.profundidad,
+                callback_progreso=self._informar,
+                tamano_tabla=self.tamano_tabla,
+            )
+            self.estrategias[jugador] = estrategia
+        return estrategia
+
+    def detener_busqueda(self) -> None:
+        if self._busqueda is not None:
+            self._detener.set()
+            self._busqueda.join()
+            self._busqueda = None
+
+    # ===== Comandos =====
+
+    def _cmd_isready(self, argumentos: List[str]) -> None:
+        self.escribir("readyok")
+
+    def _cmd_uci(self, argumentos: List[str]) -> None:
+        self.escribir(f"id name {NOMBRE}")
+        self.escribir("option name profundidad type spin default 3")
+        self.escribir("option name tabla type spin default 200000")
+        self.escribir("uciok")
+
+    def _cmd_newgame(self, argumentos: List[str]) -> None:
+        self.detener_busqueda()
+        for estrategia in self.estrategias.values():
+            estrategia.tabla.clear()
+
+    def _cmd_setoption(self, argumentos: List[str]) -> None:
+        if len(argumentos) != 4 or argumentos[0] != "name" or argumentos[2] != "value":
+            raise ErrorComando("uso: setoption name <nombre> value <valor>")
+        nombre, valor = argumentos[1].lower(), argumentos[3]
+        try:
+            numero = int(valor)
+        except ValueError:
+            raise ErrorComando(f"valor inválido: {valor!r}")
+        self.detener_busqueda()
+        if nombre == "profundidad":
+            self.profundidad = numero
+            for estrategia in self.estrategias.values():
+                estrategia.profundidad = numero
+        elif nombre == "tabla":
+            self.tamano_tabla = numero
+            for estrategia in self.estrategias.values():
+                estrategia.tamano_tabla = numero
+        else:
+            raise ErrorComando(f"opción desconocida: {nombre}")
+
+    def _cmd_position(self, argumentos: List[str]) -> None:
+        self.detener_busqueda()
+        if "moves" in argumentos:
+            corte = argumentos.index("moves")
+            argumentos, jugadas = argumentos[:corte], argumentos[corte + 1:]
+        else:
+            jugadas = []
+        if not argumentos:
+            raise ErrorComando("uso: position startpos|text ...")
+
+        if argumentos[0] == "startpos":
+            motor = self._posicion_inicial(argumentos[1:])
+        elif argumentos[0] == "text":
+            try:
+                estado = estado_desde_texto(" ".join(argumentos[1:]))
+            except ValueError as error:
+                raise ErrorComando(str(error))
+            motor = MotorJuego(estado.topologia.tamano, estado.topologia.envolvente)
+            motor.estado_actual = estado
+            motor.verificar_fin_juego()
+        else:
+            raise ErrorComando(f"posición desconocida: {argumentos[0]}")
+
+        for texto in jugadas:
+            resultado = motor.realizar_movimiento(leer_posicion(texto))
+            if not resultado.es_valido:
+                raise ErrorComando(f"movimiento {texto}: {resultado.mensaje}")
+        self.motor = motor
+
+    def _posicion_inicial(self, argumentos: List[str]) -> MotorJuego:
+        tamano, envolvente, turno = TABLERO_TAMANO, True, AZUL
+        iterador = iter(argumentos)
+        try:
+            for palabra in iterador:
+                if palabra == "size":
+                    tamano = int(next(iterador))
+                elif palabra == "bounded":
+                    envolvente = False
+                elif palabra == "turn":
+                    turno = {"azul": AZUL, "rojo": ROJO}[next(iterador)]
+                else:
+                    raise ErrorComando(f"opción de startpos desconocida: {palabra}")
+            motor = MotorJuego(tamano, envolvente)
+        except (StopIteration, KeyError, ValueError):
+            raise ErrorComando("uso: position startpos [size N] [bounded] [turn azul|rojo]")
+        motor.inicializar_juego(turno)
+        return motor
+
+    def _cmd_go(self, argumentos: List[str]) -> None:
+        self.detener_busqueda()
+        tiempo_limite = profundidad = None
+        infinita = False
+        iterador = iter(argumentos)
+        try:
+            for palabra in iterador:
+                if palabra == "infinite":
+                    infinita = True
+                elif palabra == "time":
+                    tiempo_limite = int(next(iterador)) / 1000
+                elif palabra == "depth":
+                    profundidad = int(next(iterador))
+                else:
+                    raise ErrorComando(f"opción de go desconocida: {palabra}")
+        except (StopIteration, ValueError):
+            raise ErrorComando("uso: go [time <ms>] [depth <n>] [infinite]")
+        if tiempo_limite is None and profundidad is None and not infinita:
+            profundidad = self.profundidad
+
+        if self.motor.juego_terminado:
+            self.escribir("bestmove none")
+            return
+        estrategia = self.estrategia(self.motor.obtener_estado_actual().turno)
+        self._detener = threading.Event()
+        self._busqueda = threading.Thread(
+            target=self._buscar,
+            args=(estrategia, self.motor, tiempo_limite, profundidad, self._detener),
+            daemon=True,
+        )
+        self._busqueda.start()
+
+    def _buscar(self, estrategia, motor, tiempo_limite, profundidad, detener) -> None:
+        movimiento = None
+        try:
+            movimiento, _ = estrategia.buscar(motor, tiempo_limite, detener, profundidad)
+        except Exception as error:
+            logger.exception("Falló la búsqueda")
+            self.escribir(f"info string error {error}")
+        finally:
+            self.escribir(f"bestmove {formatear_posicion(movimiento)}")
+
+    def _informar(self, estadisticas: EstadisticasBusqueda) -> None:
+        self.escribir(
+            f"info depth {estadisticas.profundidad_alcanzada} "
+            f"score {estadisticas.mejor_valor + 0.0:g} nodes {estadisticas.nodos} "
+            f"time {estadisticas.tiempo_total * 1000:.0f} "
+            f"nps {estadisticas.nodos_por_segundo:.0f} "
+            f"pv {formatear_posicion(estadisticas.mejor_movimiento)}"
+        )
+
+    def _cmd_stop(self, argumentos: List[str]) -> None:
+        self.detener_busqueda()
+
+    def _cmd_eval(self, argumentos: List[str]) -> None:
+        estado = self.motor.obtener_estado_actual()
+        valor = self.evaluador.evaluar_estado(estado, self.motor)
+        azul = len(self.motor.obtener_movimientos_validos(AZUL))
+        rojo = len(self.motor.obtener_movimientos_validos(ROJO))
+        self.escribir(f"eval {valor:g} azul {azul} rojo {rojo}")
+
+    def _cmd_d(self, argumentos: List[str]) -> None:
+        self.escribir(estado_a_texto(self.motor.obtener_estado_actual()))
+
+
+def main() -> None:
+    MotorProtocolo().ejecutar()
+
+
+if __name__ == "__main__":
+    main()
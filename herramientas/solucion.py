@@ -0,0 +1,62 @@
+"""
+Valor teórico del juego en tableros chicos (ai.solucionador).
+
+    python -m herramientas.solucion --tamanos 4 5
+    python -m herramientas.solucion --tamanos 4 5 6 --sin-wraparound --base soluciones.db
+
+Por tamaño muestra el resultado para el primer jugador, sus primeras
+jugadas óptimas, las posiciones resueltas y cuánto crece el tiempo
+respecto del tamaño anterior. Con --base las posiciones resueltas y el
+resumen quedan en un archivo SQLite que las ejecuciones siguientes
+reutilizan.
+"""
+
+import argparse
+import logging
+
+from ai.solucionador import NOMBRES_VALOR, Solucionador
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Solución completa en tableros chicos")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[4, 5])
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument("--base", default=None, help="archivo SQLite de resultados")
+    parser.add_argument(
+        "--max-memoria", type=int, default=5_000_000,
+        help="posiciones en memoria antes de volcar a disco",
+    )
+    parser.add_argument("--sin-simetrias", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    envolvente = not args.sin_wraparound
+    borde = "envolvente" if envolvente else "acotado"
+    print(
+        f"{'tablero':>8} {'borde':>10} {'valor':>7} {'posiciones':>11} "
+        f"{'nodos':>10} {'segundos':>9} {'factor':>7}  mejores primeras jugadas"
+    )
+    anterior = None
+    for tamano in args.tamanos:
+        with Solucionador(
+            tamano, envolvente, args.base, args.max_memoria, not args.sin_simetrias
+        ) as solucionador:
+            resultado = solucionador.resolver()
+            desbordes = solucionador.tabla.desbordes
+        factor = f"{resultado.segundos / anterior:.0f}x" if anterior else "-"
+        anterior = resultado.segundos
+        mejores = " ".join(f"{p.x},{p.y}" for p in resultado.mejores)
+        if len(resultado.mejores) == tamano * tamano:
+            mejores = "todas"
+        tablero = f"{tamano}x{tamano}"
+        print(
+            f"{tablero:>8} {borde:>10} {NOMBRES_VALOR[resultado.valor]:>7} "
+            f"{resultado.posiciones:>11} {resultado.nodos:>10} "
+            f"{resultado.segundos:>9.2f} {factor:>7}  {mejores}"
+        )
+        if desbordes:
+            print(f"{'':>8} (tabla volcada a disco {desbordes} veces)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Test secuencial de razón de probabilidades (SPRT) entre dos
+configuraciones de estrategia: decide con la menor cantidad de partidas si
+un cambio que altera la búsqueda gana fuerza o no.
+
+    python -m herramientas.sprt --base minimax:profundidad=3 \
+        --candidata minimax:profundidad=3,extender_forzadas=False --procesos 4
+    python -m herramientas.sprt --base minimax --candidata mcts:milisegundos=100 \
+        --tiempo 0.1 --elo0 0 --elo1 20
+
+Cada configuración es `nombre[:param=valor,...]`, con nombre aleatoria,
+primero_mejor, minimax, pruebas o mcts (las clases de ai.estrategias) y los
+parámetros de su constructor. Con --tiempo las estrategias con buscar()
+(minimax, mcts) piensan esos segundos por jugada.
+
+Las partidas van de a pares: la misma apertura al azar (--apertura jugadas)
+con los colores cambiados, lo que quita gran parte del ruido de la
+apertura y de quién empieza. El LLR se calcula con el modelo
+pentanomial de pares (el de fishtest): con el puntaje medio por par m y su
+varianza v, LLR = n * (s1 - s0) * (2m - s0 - s1) / (2v), donde s0 y s1 son
+los puntajes esperados con elo0 y elo1. H1 (la candidata es elo1 mejor) se
+acepta cuando LLR >= log((1 - beta) / alfa), y H0 (es elo0) cuando
+LLR <= log(beta / (1 - alfa)). Las frecuencias de los cinco puntajes de par
+llevan un conteo ficticio (PSEUDO_CONTEO) para que pocos pares, o motores
+deterministas que repiten resultados, no den varianza nula.
+"""
+
+import argparse
+import ast
+import math
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, NamedTuple, Optional, Tuple
+
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO
+from core.juego import MotorJuego
+from ai.estrategias import (
+    EstrategiaAleatoria,
+    EstrategiaMCTS,
+    EstrategiaMinimax,
+    EstrategiaPrimeroMejor,
+    EstrategiaPruebas,
+)
+
+CLASES = {
+    "aleatoria": EstrategiaAleatoria,
+    "primero_mejor": EstrategiaPrimeroMejor,
+    "minimax": EstrategiaMinimax,
+    "pruebas": EstrategiaPruebas,
+    "mcts": EstrategiaMCTS,
+}
+ACEPTA_H0 = "H0"
+ACEPTA_H1 = "H1"
+# Conteo ficticio que se suma a cada uno de los cinco resultados posibles de
+# un par: evita varianza nula con pocos pares (o motores deterministas)
+PSEUDO_CONTEO = 0.25
+
+
+def parsear_configuracion(texto: str) -> Tuple[str, dict]:
+    """"minimax:profundidad=4,extender_forzadas=False" -> ("minimax", {...})"""
+    nombre, _, parametros = texto.partition(":")
+    if nombre not in CLASES:
+        raise argparse.ArgumentTypeError(
+            f"estrategia inválida: {nombre} (opciones: {', '.join(CLASES)})"
+        )
+    argumentos = {}
+    for parametro in filter(None, parametros.split(",")):
+        clave, _, valor = parametro.partition("=")
+        try:
+            argumentos[clave] = ast.literal_eval(valor)
+        except (ValueError, SyntaxError):
+            argumentos[clave] = valor
+    return nombre, argumentos
+
+
+def crear_estrategia(configuracion: Tuple[str, dict], jugador: str):
+    nombre, argumentos = configuracion
+    return CLASES[nombre](jugador, **argumentos)
+
+
+# ===== Estadística =====
+
+
+def puntaje_esperado(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_desde_puntaje(puntaje: float) -> float:
+    puntaje = min(max(puntaje, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / puntaje - 1)
+
+
+def llr_pares(puntajes_pares: List[float], elo0: float, elo1: float) -> float:
+    """
+    Log de la razón de verosimilitud (aproximación normal) para los
+    puntajes medios de cada par de partidas (0, 1/4, 1/2, 3/4 o 1)
+    """
+    n = len(puntajes_pares)
+    if not n:
+        return 0.0
+    frecuencias = dict.fromkeys((0.0, 0.25, 0.5, 0.75, 1.0), PSEUDO_CONTEO)
+    for puntaje in puntajes_pares:
+        frecuencias[puntaje] += 1
+    total = sum(frecuencias.values())
+    media = sum(p * f for p, f in frecuencias.items()) / total
+    varianza = sum((p - media) ** 2 * f for p, f in frecuencias.items()) / total
+    s0, s1 = puntaje_esperado(elo0), puntaje_esperado(elo1)
+    return n * (s1 - s0) * (2 * media - s0 - s1) / (2 * varianza)
+
+
+def limites(alfa: float, beta: float) -> Tuple[float, float]:
+    """(cota inferior, cota superior) del LLR"""
+    return math.log(beta / (1 - alfa)), math.log((1 - beta) / alfa)
+
+
+# ===== Partidas =====
+
+
+class ResultadoPar(NamedTuple):
+    apertura: int
+    # Puntaje de la candidata en cada partida (1, 1/2 o 0)
+    puntajes: Tuple[float, float]
+    jugadas: int
+    segundos: float
+
+
+def _elegir(estrategia, motor: MotorJuego, tiempo: Optional[float]):
+    if tiempo is not None and hasattr(estrategia, "buscar"):
+        return estrategia.buscar(motor, tiempo)[0]
+    return estrategia.seleccionar_movimiento(motor)
+
+
+def jugar(
+    estrategias: dict,
+    apertura: int,
+    jugadas_apertura: int,
+    tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True,
+    tiempo: Optional[float] = None,
+) -> Tuple[Optional[str], int]:
+    """Una partida desde la apertura número `apertura`; (ganador, jugadas)"""
+    rng = random.Random(apertura)
+    motor = MotorJuego(tamano, envolvente)
+    motor.inicializar_juego(AZUL)
+    jugadas = 0
+    while not motor.juego_terminado:
+        jugador = motor.obtener_estado_actual().turno
+        if jugadas < jugadas_apertura:
+            posicion = rng.choice(motor.obtener_movimientos_validos(jugador))
+        else:
+            posicion = _elegir(estrategias[jugador], motor, tiempo)
+        if posicion is None or not motor.realizar_movimiento(posicion).es_valido:
+            break
+        jugadas += 1
+    _, ganador = motor.verificar_fin_juego()
+    return ganador, jugadas
+
+
+def jugar_par(
+    base: Tuple[str, dict],
+    candidata: Tuple[str, dict],
+    apertura: int,
+    jugadas_apertura: int = 2,
+    tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True,
+    tiempo: Optional[float] = None,
+) -> ResultadoPar:
+    """La misma apertura dos veces: la candidata primero con azul y después con rojo"""
+    inicio = time.perf_counter()
+    puntajes = []
+    total = 0
+    for color_candidata in (AZUL, ROJO):
+        color_base = ROJO if color_candidata == AZUL else AZUL
+        estrategias = {
+            color_candidata: crear_estrategia(candidata, color_candidata),
+            color_base: crear_estrategia(base, color_base),
+        }
+        ganador, jugadas = jugar(
+            estrategias, apertura, jugadas_apertura, tamano, envolvente, tiempo
+        )
+        puntajes.append(0.5 if ganador is None else float(ganador == color_candidata))
+        total += jugadas
+    return ResultadoPar(apertura, tuple(puntajes), total, time.perf_counter() - inicio)
+
+
+# ===== SPRT =====
+
+
+class ResultadoSPRT(NamedTuple):
+    decision: Optional[str]  # ACEPTA_H0, ACEPTA_H1 o None (sin decisión)
+    llr: float
+    pares: int
+    victorias: int
+    empates: int
+    derrotas: int
+    elo: float  # Estimado de la candidata respecto de la base
+    segundos: float
+    # LLR después de cada par
+    traza: List[float]
+
+
+def sprt(
+    base: Tuple[str, dict],
+    candidata: Tuple[str, dict],
+    elo0: float = 0.0,
+    elo1: float = 10.0,
+    alfa: float = 0.05,
+    beta: float = 0.05,
+    max_pares: int = 5000,
+    min_pares: int = 10,
+    procesos: int = 1,
+    jugadas_apertura: int = 2,
+    tamano: int = TABLERO_TAMANO,
+    envolvente: bool = True,
+    tiempo: Optional[float] = None,
+    semilla: int = 0,
+    informar=None,
+) -> ResultadoSPRT:
+    """
+    Juega pares hasta aceptar H0 o H1 (nunca antes de `min_pares`) o
+    llegar a `max_pares`. Con `procesos` > 1 los pares corren en un pool
+    con a lo sumo dos por proceso en vuelo; los que quedan en vuelo al
+    decidir se descartan.
+    `informar(resultado)` se llama tras cada par.
+    """
+    inferior, superior = limites(alfa, beta)
+    inicio = time.perf_counter()
+    puntajes_pares: List[float] = []
+    conteo = {1.0: 0, 0.5: 0, 0.0: 0}
+    traza: List[float] = []
+    llr = 0.0
+    decision = None
+    argumentos = (jugadas_apertura, tamano, envolvente, tiempo)
+
+    def registrar(par: ResultadoPar) -> Optional[ResultadoSPRT]:
+        nonlocal llr, decision
+        for puntaje in par.puntajes:
+            conteo[puntaje] += 1
+        puntajes_pares.append(sum(par.puntajes) / 2)
+        llr = llr_pares(puntajes_pares, elo0, elo1)
+        traza.append(llr)
+        if len(puntajes_pares) < min_pares:
+            pass
+        elif llr >= superior:
+            decision = ACEPTA_H1
+        elif llr <= inferior:
+            decision = ACEPTA_H0
+        resultado = ResultadoSPRT(
+            decision, llr, len(puntajes_pares), conteo[1.0], conteo[0.5], conteo[0.0],
+            elo_desde_puntaje(sum(puntajes_pares) / len(puntajes_pares)),
+            time.perf_counter() - inicio, traza,
+        )
+        if informar is not None:
+            informar(resultado)
+        return resultado
+
+    resultado = ResultadoSPRT(None, 0.0, 0, 0, 0, 0, 0.0, 0.0, traza)
+    aperturas = iter(range(semilla, semilla + max_pares))
+    if procesos <= 1:
+        for apertura in aperturas:
+            resultado = registrar(jugar_par(base, candidata, apertura, *argumentos))
+            if decision is not None:
+                break
+        return resultado
+
+    ejecutor = ProcessPoolExecutor(procesos)
+    try:
+        en_vuelo = set()
+        while True:
+            while len(en_vuelo) < 2 * procesos:
+                apertura = next(aperturas, None)
+                if apertura is None:
+                    break
+                en_vuelo.add(ejecutor.submit(jugar_par, base, candidata, apertura, *argumentos))
+            if not en_vuelo:
+                break
+            listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resultado = registrar(futuro.result())
+                if decision is not None:
+                    return resultado
+        return resultado
+    finally:
+        ejecutor.shutdown(cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="SPRT entre dos configuraciones de estrategia")
+    parser.add_argument("--base", type=parsear_configuracion, default="minimax")
+    parser.add_argument("--candidata", type=parsear_configuracion, required=True)
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=10.0)
+    parser.add_argument("--alfa", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-pares", type=int, default=5000)
+    parser.add_argument("--min-pares", type=int, default=10)
+    parser.add_argument("--procesos", type=int, default=1)
+    parser.add_argument("--apertura", type=int, default=2, help="jugadas al azar de apertura")
+    parser.add_argument("--tiempo", type=float, default=None, help="segundos por jugada")
+    parser.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    parser.add_argument("--sin-wraparound", action="store_true")
+    parser.add_argument("--semilla", type=int, default=0, help="primera apertura")
+    parser.add_argument("--cada", type=int, default=1, help="imprimir la traza cada N pares")
+    args = parser.parse_args(argv)
+
+    inferior, superior = limites(args.alfa, args.beta)
+    print(
+        f"SPRT elo0={args.elo0:g} elo1={args.elo1:g} alfa={args.alfa:g} beta={args.beta:g}: "
+        f"LLR en [{inferior:.2f}, {superior:.2f}]"
+    )
+
+    def informar(resultado: ResultadoSPRT) -> None:
+        if resultado.pares % args.cada and resultado.decision is None:
+            return
+        partidas = 2 * resultado.pares
+        print(
+            f"pares {resultado.pares:>5}  V/E/D {resultado.victorias}/{resultado.empates}/"
+            f"{resultado.derrotas}  elo {resultado.elo:+7.1f}  LLR {resultado.llr:+6.2f}  "
+            f"{partidas / max(resultado.segundos, 1e-9):.2f} partidas/s",
+            flush=True,
+        )
+
+    resultado = sprt(
+        args.base, args.candidata, args.elo0, args.elo1, args.alfa, args.beta,
+        args.max_pares, args.min_pares, args.procesos, args.apertura, args.tamano,
+        not args.sin_wraparound, args.tiempo, args.semilla, informar,
+    )
+    partidas = 2 * resultado.pares
+    if resultado.decision == ACEPTA_H1:
+        veredicto = f"H1: la candidata es al menos {args.elo1:g} elo mejor"
+    elif resultado.decision == ACEPTA_H0:
+        veredicto = f"H0: la candidata no supera {args.elo0:g} elo"
+    else:
+        veredicto = "sin decisión (se alcanzó --max-pares)"
+    print(
+        f"{veredicto}. {partidas} partidas en {resultado.segundos:.1f} s "
+        f"({partidas / max(resultado.segundos, 1e-9):.2f} partidas/s)"
+    )
+    sys.exit(0 if resultado.decision == ACEPTA_H1 else 1)
+
+
+if __name__ == "__main__":
+    main()
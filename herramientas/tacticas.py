@@ -0,0 +1,378 @@
+"""
+Suite de posiciones tácticas: calidad de búsqueda por unidad de tiempo.
+
+    python -m herramientas.tacticas correr --estrategia experto --segundos 1
+    python -m herramientas.tacticas correr --estrategia experto --nodos 20000 \
+        --procesos 4 --salida resultados.jsonl
+
+La suite incluida se generó con estos dos comandos, más las dos líneas de
+comentario del principio (sin --vacias, el rango es 14..22):
+
+    python -m herramientas.tacticas generar --por-tipo 12 --vacias 26 32 \
+        --tipos victoria trampa > tacticas.txt
+    python -m herramientas.tacticas generar --por-tipo 12 --vacias 20 26 \
+        --tipos regiones >> tacticas.txt
+
+La suite (herramientas/tacticas.txt) tiene una posición por línea,
+separada por tabuladores: nombre, tipo, notación (core.serializacion),
+valor teórico para quien mueve (gana | empate | pierde) y las jugadas que lo
+conservan ("x,y" separadas por espacios). Las líneas con "#" son
+comentarios. Los valores los calcula el solucionador exacto, así que cada
+jugada se sabe correcta o no. Tipos:
+
+    victoria   gana quien mueve y menos de la mitad de las jugadas lo logran
+    trampa     la jugada de una búsqueda a profundidad 2 pierde valor
+    regiones   las cabezas ya no comparten casillas libres: final de conteo
+
+Cada posición se da a la estrategia con un presupuesto de tiempo y/o
+nodos. Está resuelta si la jugada final es una de las correctas. El
+tiempo (y los nodos) hasta la solución es el del primer informe de
+progreso desde el cual la jugada elegida ya no deja de ser correcta; sin
+informes por profundidad (principiante, normal, maestro), el total.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.estado import GestorEstado
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO, Dificultad, EstadoJuego, Posicion
+from core.juego import MotorJuego
+from core.serializacion import estado_a_texto, estado_desde_texto
+from ai.estadisticas import EstadisticasBusqueda
+from ai.estrategias import EstrategiaMCTS, EstrategiaMinimax
+from ai.factoria import FactoriaEstrategias
+from ai.solucionador import NOMBRES_VALOR, Solucionador
+from herramientas.etiquetar import posiciones_aleatorias
+
+SUITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tacticas.txt")
+TIPOS = ("victoria", "trampa", "regiones")
+ESTRATEGIAS = ("principiante", "normal", "experto", "maestro", "pruebas")
+
+
+class PosicionTactica(NamedTuple):
+    nombre: str
+    tipo: str
+    notacion: str
+    resultado: str  # Valor teórico para quien mueve
+    mejores: List[Posicion]  # Jugadas que conservan ese valor
+
+
+class ResultadoTactica(NamedTuple):
+    nombre: str
+    tipo: str
+    resuelta: bool
+    jugada: Optional[str]  # "x,y"
+    segundos: float
+    nodos: int
+    # Desde cuándo la jugada elegida es siempre correcta (None si no se resolvió)
+    segundos_solucion: Optional[float]
+    nodos_solucion: Optional[int]
+    profundidad: int
+
+
+# ===== Suite =====
+
+
+def _texto_jugada(posicion: Optional[Posicion]) -> Optional[str]:
+    return None if posicion is None else f"{posicion.x},{posicion.y}"
+
+
+def cargar_suite(ruta: str = SUITE) -> List[PosicionTactica]:
+    posiciones = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            nombre, tipo, notacion, resultado, jugadas = linea.split("\t")
+            mejores = [Posicion(*map(int, jugada.split(","))) for jugada in jugadas.split()]
+            posiciones.append(PosicionTactica(nombre, tipo, notacion, resultado, mejores))
+    return posiciones
+
+
+def linea_suite(posicion: PosicionTactica) -> str:
+    jugadas = " ".join(_texto_jugada(p) for p in posicion.mejores)
+    return "\t".join(
+        (posicion.nombre, posicion.tipo, posicion.notacion, posicion.resultado, jugadas)
+    )
+
+
+# ===== Generación =====
+
+
+def regiones_separadas(estado: EstadoJuego) -> bool:
+    """True si ninguna casilla libre es alcanzable por las dos cabezas"""
+    if estado.cabeza_azul is None or estado.cabeza_roja is None:
+        return False
+    topologia = estado.topologia
+    vacias = sum(1 << i for i, codigo in enumerate(estado.celdas) if not codigo)
+
+    def alcanzables(cabeza: Posicion) -> int:
+        region = 0
+        frontera = topologia.mascaras_vecinos[topologia.indice(cabeza)] & vacias
+        while frontera:
+            region |= frontera
+            siguiente = 0
+            while frontera:
+                bit = frontera & -frontera
+                siguiente |= topologia.mascaras_vecinos[bit.bit_length() - 1]
+                frontera ^= bit
+            frontera = siguiente & vacias & ~region
+        return region
+
+    return not alcanzables(estado.cabeza_azul) & alcanzables(estado.cabeza_roja)
+
+
+def valores_jugadas(
+    estado: EstadoJuego, solucionador: Solucionador
+) -> Dict[Posicion, int]:
+    """Valor exacto (para quien mueve) de cada jugada de la posición"""
+    jugador = estado.turno
+    otro = ROJO if jugador == AZUL else AZUL
+    motor = MotorJuego(estado.tamano, estado.topologia.envolvente)
+    valores = {}
+    for movimiento in GestorEstado.obtener_movimientos_validos(estado, jugador):
+        hijo = motor.simular_movimiento(estado, movimiento, jugador)
+        valores[movimiento] = -solucionador.valor_estado(hijo, otro)
+    return valores
+
+
+def clasificar(
+    estado: EstadoJuego, valores: Dict[Posicion, int]
+) -> Optional[Tuple[str, List[Posicion]]]:
+    """(tipo, jugadas correctas) si la posición sirve para la suite"""
+    if len(valores) < 2:
+        return None
+    valor = max(valores.values())
+    mejores = sorted(m for m, v in valores.items() if v == valor)
+    if len(mejores) == len(valores):
+        return None  # Cualquier jugada sirve: no prueba nada
+    if regiones_separadas(estado):
+        return "regiones", mejores
+    motor = MotorJuego(estado.tamano, estado.topologia.envolvente)
+    motor.estado_actual = estado.copiar()
+    natural = EstrategiaMinimax(estado.turno, profundidad=2).seleccionar_movimiento(motor)
+    if natural not in mejores:
+        return "trampa", mejores
+    if NOMBRES_VALOR[valor] == "gana" and 2 * len(mejores) < len(valores):
+        return "victoria", mejores
+    return None
+
+
+def generar_suite(
+    por_tipo: int = 12,
+    vacias: Tuple[int, int] = (14, 22),
+    tamano: int = TABLERO_TAMANO,
+    semilla: int = 0,
+    tipos: Tuple[str, ...] = TIPOS,
+) -> Iterator[PosicionTactica]:
+    """Posiciones de partidas al azar, resueltas y clasificadas, `por_tipo` de cada tipo"""
+    cantidades = dict.fromkeys(tipos, 0)
+    with Solucionador(tamano) as solucionador:
+        # Sin tope: se corta al completar todos los tipos
+        for texto in posiciones_aleatorias(1 << 30, *vacias, tamano, semilla=semilla):
+            estado = estado_desde_texto(texto)
+            valores = valores_jugadas(estado, solucionador)
+            clasificada = clasificar(estado, valores)
+            if clasificada is None or cantidades.get(clasificada[0], por_tipo) >= por_tipo:
+                continue
+            tipo, mejores = clasificada
+            cantidades[tipo] += 1
+            yield PosicionTactica(
+                f"{tipo}-{cantidades[tipo]:02d}", tipo, estado_a_texto(estado),
+                NOMBRES_VALOR[max(valores.values())], mejores,
+            )
+            if all(n >= por_tipo for n in cantidades.values()):
+                return
+
+
+# ===== Ejecución =====
+
+
+def crear_estrategia(nombre: str, jugador: str, nodos: Optional[int] = None):
+    if nombre == "pruebas":
+        return FactoriaEstrategias.crear_estrategia(
+            Dificultad.EXPERTO, jugador, nodos_prueba=nodos or 20_000
+        )
+    return FactoriaEstrategias.crear_estrategia(Dificultad[nombre.upper()], jugador)
+
+
+def correr_posicion(
+    posicion: PosicionTactica,
+    estrategia: str = "experto",
+    segundos: Optional[float] = 1.0,
+    nodos: Optional[int] = None,
+) -> ResultadoTactica:
+    """
+    Da la posición a la estrategia con el presupuesto indicado (experto y
+    maestro los respetan; el resto juega como siempre)
+    """
+    estado = estado_desde_texto(posicion.notacion)
+    jugador = estado.turno
+    motor = MotorJuego(estado.tamano, estado.topologia.envolvente)
+    motor.estado_actual = estado
+    ia = crear_estrategia(estrategia, jugador, nodos)
+    correctas = set(posicion.mejores)
+
+    informes: List[Tuple[float, int, Optional[Posicion]]] = []
+    inicio = time.perf_counter()
+    if isinstance(ia, EstrategiaMinimax):
+        ia.callback_progreso = lambda e: informes.append(
+            (time.perf_counter() - inicio, e.nodos, e.mejor_movimiento)
+        )
+        movimiento, estadisticas = ia.buscar(motor, segundos, max_nodos=nodos)
+    elif isinstance(ia, EstrategiaMCTS):
+        if nodos is not None:
+            ia.simulaciones, ia.milisegundos = nodos, None
+        movimiento, estadisticas = ia.buscar(motor, segundos if nodos is None else None)
+    else:
+        movimiento = ia.seleccionar_movimiento(motor)
+        estadisticas = ia.ultimas_estadisticas or EstadisticasBusqueda()
+    total = time.perf_counter() - inicio
+    # En Monte Carlo el presupuesto son las simulaciones
+    nodos_usados = estadisticas.simulaciones or estadisticas.nodos + estadisticas.nodos_prueba
+    informes.append((total, nodos_usados, movimiento))
+
+    solucion = None
+    for informe in reversed(informes):
+        if informe[2] not in correctas:
+            break
+        solucion = informe
+    return ResultadoTactica(
+        posicion.nombre, posicion.tipo, movimiento in correctas, _texto_jugada(movimiento),
+        total, nodos_usados,
+        None if solucion is None else solucion[0],
+        None if solucion is None else solucion[1],
+        estadisticas.profundidad_alcanzada,
+    )
+
+
+# Configuración de cada proceso del pool
+_CONFIGURACION: dict = {}
+
+
+def _iniciar(estrategia: str, segundos: Optional[float], nodos: Optional[int]) -> None:
+    _CONFIGURACION.update(estrategia=estrategia, segundos=segundos, nodos=nodos)
+
+
+def _correr(posicion: PosicionTactica) -> ResultadoTactica:
+    return correr_posicion(posicion, **_CONFIGURACION)
+
+
+def resumir(resultados: List[ResultadoTactica]) -> dict:
+    """Resueltas, tiempo y nodos medios hasta la solución, en total y por tipo"""
+    def resumen(grupo: List[ResultadoTactica]) -> dict:
+        resueltas = [r for r in grupo if r.resuelta]
+        return {
+            "posiciones": len(grupo),
+            "resueltas": len(resueltas),
+            "segundos_solucion": (
+                sum(r.segundos_solucion for r in resueltas) / len(resueltas) if resueltas else None
+            ),
+            "nodos_solucion": (
+                sum(r.nodos_solucion for r in resueltas) / len(resueltas) if resueltas else None
+            ),
+            "segundos": sum(r.segundos for r in grupo),
+        }
+
+    tipos = sorted({r.tipo for r in resultados})
+    return {
+        "total": resumen(resultados),
+        "por_tipo": {tipo: resumen([r for r in resultados if r.tipo == tipo]) for tipo in tipos},
+    }
+
+
+def _linea_resumen(nombre: str, datos: dict) -> str:
+    texto = f"{nombre:<10} {datos['resueltas']:>3}/{datos['posiciones']:<3}"
+    if datos["resueltas"]:
+        texto += (
+            f"  solución media {1000 * datos['segundos_solucion']:.0f} ms, "
+            f"{datos['nodos_solucion']:.0f} nodos"
+        )
+    return texto
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Suite de posiciones tácticas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    correr = sub.add_parser("correr", help="puntuar una estrategia sobre la suite")
+    correr.add_argument("archivo", nargs="?", default=SUITE)
+    correr.add_argument("--estrategia", choices=ESTRATEGIAS, default="experto")
+    correr.add_argument("--segundos", type=float, default=1.0, help="tiempo por posición")
+    correr.add_argument("--nodos", type=int, default=None, help="nodos (o simulaciones) por posición")
+    correr.add_argument("--tipo", choices=TIPOS, default=None, help="solo un tipo")
+    correr.add_argument("--procesos", type=int, default=1)
+    correr.add_argument("--salida", default=None, help="resultados en JSON por línea")
+
+    generar = sub.add_parser("generar", help="armar una suite con el solucionador exacto")
+    generar.add_argument("--por-tipo", type=int, default=12)
+    generar.add_argument("--vacias", type=int, nargs=2, default=(14, 22), metavar=("MIN", "MAX"))
+    generar.add_argument("--tamano", type=int, default=TABLERO_TAMANO)
+    generar.add_argument("--semilla", type=int, default=0)
+    generar.add_argument("--tipos", nargs="+", choices=TIPOS, default=list(TIPOS))
+    args = parser.parse_args(argv)
+
+    if args.comando == "generar":
+        print(f"# generar --por-tipo {args.por_tipo} --vacias {args.vacias[0]} "
+              f"{args.vacias[1]} --semilla {args.semilla} --tipos {' '.join(args.tipos)}")
+        for posicion in generar_suite(
+            args.por_tipo, tuple(args.vacias), args.tamano, args.semilla, tuple(args.tipos)
+        ):
+            print(linea_suite(posicion), flush=True)
+        return
+
+    posiciones = [
+        p for p in cargar_suite(args.archivo) if args.tipo is None or p.tipo == args.tipo
+    ]
+    segundos = None if args.nodos is not None and args.segundos <= 0 else args.segundos
+    configuracion = (args.estrategia, segundos, args.nodos)
+    inicio = time.perf_counter()
+    if args.procesos > 1:
+        ejecutor = ProcessPoolExecutor(args.procesos, initializer=_iniciar, initargs=configuracion)
+        iterador = ejecutor.map(_correr, posiciones)
+    else:
+        ejecutor = None
+        _iniciar(*configuracion)
+        iterador = map(_correr, posiciones)
+
+    resultados = []
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else None
+    try:
+        for resultado in iterador:
+            resultados.append(resultado)
+            marca = "ok" if resultado.resuelta else "--"
+            print(
+                f"{marca} {resultado.nombre:<14} {resultado.jugada or '-':>5} "
+                f"{1000 * resultado.segundos:7.0f} ms {resultado.nodos:>9} nodos"
+                f"  p{resultado.profundidad}",
+                file=sys.stderr,
+            )
+            if salida is not None:
+                salida.write(json.dumps(resultado._asdict()) + "\n")
+        resumen = resumir(resultados)
+        resumen.update(
+            estrategia=args.estrategia, segundos=segundos, nodos=args.nodos,
+            segundos_pared=time.perf_counter() - inicio,
+        )
+        if salida is not None:
+            salida.write(json.dumps({"resumen": resumen}) + "\n")
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+        if salida is not None:
+            salida.close()
+
+    print(_linea_resumen("total", resumen["total"]))
+    for tipo, datos in resumen["por_tipo"].items():
+        print(_linea_resumen(tipo, datos))
+    print(f"{resumen['segundos_pared']:.1f} s de pared")
+
+
+if __name__ == "__main__":
+    main()
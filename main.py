@@ -1,46 +1,97 @@
-from core import AZUL, ROJO, Dificultad, Posicion, MotorJuego
-from gui import GestorInterfaz
-from ai import EstrategiaAleatoria, EstrategiaPrimeroMejor, EstrategiaMinimax
+"""
+Punto de entrada: el juego con ventana (pygame) o, con --sin-ventana, el
+motor por stdin/stdout de herramientas.protocolo. Sin ventana no se
+importa pygame ni se calibra: el arranque es solo el de core y ai.
+"""
 
+import argparse
+import threading
+from collections import deque
+from typing import Optional
 
-class FactoriaEstrategias:
-    """Crea estrategias de IA según la dificultad seleccionada"""
+from core import AZUL, ROJO, TABLERO_TAMANO, Dificultad, Posicion, MotorJuego
+from ai import FactoriaEstrategias
+from ai.calibracion import Calibracion, obtener_calibracion
+from ai.estadisticas import CanalProgreso
+from herramientas import perfilado
 
-    @staticmethod
-    def crear_estrategia(dificultad: Dificultad, jugador: str):
-        if dificultad == Dificultad.PRINCIPIANTE:
-            return EstrategiaAleatoria(jugador)
-        elif dificultad == Dificultad.NORMAL:
-            return EstrategiaPrimeroMejor(jugador)
-        else:  # EXPERTO
-            return EstrategiaMinimax(jugador, profundidad=3)
+# Sugerencias y segundos de análisis del botón "Pista"
+JUGADAS_PISTA = 3
+SEGUNDOS_PISTA = 1.0
 
 
 class ControladorPrincipal:
     """Orquesta toda la aplicación"""
 
-    def __init__(self):
-        self.motor_juego = MotorJuego()
+    def __init__(
+        self,
+        perfilador: Optional[perfilado.Perfilador] = None,
+        tamano: int = TABLERO_TAMANO,
+        envolvente: bool = True,
+        calibracion: Optional[Calibracion] = None,
+    ):
+        # pygame se importa recién al abrir la ventana
+        from gui import GestorInterfaz
+
+        self.motor_juego = MotorJuego(tamano, envolvente)
+        # Presupuesto de la IA según la velocidad de esta máquina
+        self.calibracion = calibracion
         self.interfaz = GestorInterfaz()
         self.estrategia_ia = None
+        self.dificultad: Optional[Dificultad] = None
+        self.perfilador = perfilador
         self.jugador_humano = AZUL  # Por defecto
         self.jugador_ia = ROJO
+        # Análisis de la pista en segundo plano (se corta al mover)
+        self._hilo_pista: Optional[threading.Thread] = None
+        self._detener_pista = threading.Event()
+        # Turno de la IA en segundo plano: publica cada profundidad terminada
+        # en el canal (mapa de calor) y deja la jugada para el bucle principal
+        self.canal_progreso = CanalProgreso(al_publicar=self.interfaz.notificar_progreso)
+        self.interfaz.establecer_canal_progreso(self.canal_progreso)
+        self._hilo_ia: Optional[threading.Thread] = None
+        # Un evento por turno: reiniciar o salir corta la búsqueda en curso
+        self._detener_ia = threading.Event()
+        self._jugadas_ia: deque = deque()  # (partida, posición)
+        self._partida = 0
 
     def iniciar_aplicacion(self) -> None:
         """
         MÉTODO PRINCIPAL
         Punto de entrada de la aplicación
         """
-        self.interfaz.ejecutar_bucle_principal(
-            callback_juego_iniciado=self.inicializar_juego,
-            callback_movimiento=self.procesar_movimiento_humano,
-        )
+        try:
+            if self.perfilador is None:
+                self.interfaz.ejecutar_bucle_principal(
+                    callback_juego_iniciado=self.inicializar_juego,
+                    callback_movimiento=self.procesar_movimiento_humano,
+                    callback_pista=self.solicitar_pista,
+                    callback_fotograma=self.aplicar_jugada_ia,
+                )
+                return
+
+            # Los turnos de la IA se perfilan aparte (la fase "render" se pausa)
+            with self.perfilador.perfilar("render"):
+                self.interfaz.ejecutar_bucle_principal(
+                    callback_juego_iniciado=self.inicializar_juego,
+                    callback_movimiento=self.procesar_movimiento_humano,
+                    callback_pista=self.solicitar_pista,
+                    callback_fotograma=self.aplicar_jugada_ia,
+                )
+        finally:
+            self._detener_ia.set()
+            self._detener_pista.set()
 
     def inicializar_juego(self, dificultad: Dificultad, jugador_inicial: str) -> None:
         """Callback llamado cuando se selecciona configuración"""
+        # La búsqueda de la partida anterior se corta y su jugada se descarta
+        self._detener_ia.set()
+        self._partida += 1
+
         # Crear estrategia IA
+        self.dificultad = dificultad
         self.estrategia_ia = FactoriaEstrategias.crear_estrategia(
-            dificultad, self.jugador_ia
+            dificultad, self.jugador_ia, calibracion=self.calibracion
         )
 
         # Inicializar motor
@@ -56,6 +107,7 @@ class ControladorPrincipal:
         if estado_actual.turno != self.jugador_humano:
             return
 
+        self._detener_pista.set()
         resultado = self.motor_juego.realizar_movimiento(posicion)
 
         if resultado.es_valido:
@@ -65,16 +117,106 @@ class ControladorPrincipal:
                 self.procesar_turno_ia()
 
     def procesar_turno_ia(self) -> None:
-        """Ejecuta el turno de la IA"""
+        """
+        Ejecuta el turno de la IA. Con perfilador se busca en este hilo (el
+        perfil es por hilo); si no, en uno aparte y la jugada la aplica
+        aplicar_jugada_ia desde el bucle principal.
+        """
         if not self.estrategia_ia:
             return
 
-        posicion = self.estrategia_ia.seleccionar_movimiento(self.motor_juego)
+        if self.perfilador is not None:
+            estado = self.motor_juego.obtener_estado_actual()
+            numero = estado.fichas_colocadas() + 1
+            etiqueta = perfilado.etiqueta_turno(self.dificultad, numero, self._partida)
+            with self.perfilador.perfilar(etiqueta, self.dificultad, numero):
+                posicion = self.estrategia_ia.seleccionar_movimiento(self.motor_juego)
+            self._terminar_turno_ia(posicion)
+            return
+
+        estrategia = self.estrategia_ia
+        partida = self._partida
+        # La búsqueda trabaja sobre su propio motor: reiniciar no la afecta
+        estado = self.motor_juego.obtener_estado_actual()
+        motor = MotorJuego(estado.tamano, estado.topologia.envolvente)
+        motor.estado_actual = estado.copiar()
+        self.canal_progreso.reiniciar(estado.clave())
+        if hasattr(estrategia, "callback_progreso"):
+            estrategia.callback_progreso = self.canal_progreso.publicar
+        self._detener_ia = threading.Event()
+        detener = self._detener_ia
+
+        def pensar() -> None:
+            posicion = estrategia.seleccionar_movimiento(motor, detener)
+            self._jugadas_ia.append((partida, posicion))
+            self.interfaz.notificar_progreso()
+
+        self._hilo_ia = threading.Thread(target=pensar, name="turno-ia", daemon=True)
+        self._hilo_ia.start()
+
+    def aplicar_jugada_ia(self) -> None:
+        """Aplica la jugada que dejó el hilo de la IA, si es de esta partida"""
+        while self._jugadas_ia:
+            partida, posicion = self._jugadas_ia.popleft()
+            if partida == self._partida:
+                self._terminar_turno_ia(posicion)
+
+    def _terminar_turno_ia(self, posicion: Optional[Posicion]) -> None:
         if posicion:
             self.motor_juego.realizar_movimiento(posicion)
 
+        self.interfaz.establecer_estadisticas(self.estrategia_ia.ultimas_estadisticas)
+
         self.actualizar_interfaz()
 
+    def solicitar_pista(self) -> None:
+        """
+        Analiza la posición del humano en un hilo aparte, sin frenar el
+        render; las mejores jugadas llegan a la interfaz al terminar
+        """
+        if self.motor_juego.juego_terminado:
+            return
+        estado = self.motor_juego.obtener_estado_actual()
+        if estado.turno != self.jugador_humano:
+            return
+        if self._hilo_pista is not None and self._hilo_pista.is_alive():
+            return
+
+        copia = estado.copiar()
+        self._detener_pista = threading.Event()
+        detener = self._detener_pista
+        self.interfaz.iniciar_pista(copia)
+
+        def analizar() -> None:
+            from ai.analisis import analizar_estado
+
+            lineas = analizar_estado(
+                copia, JUGADAS_PISTA, tiempo_limite=SEGUNDOS_PISTA, detener=detener
+            )
+            sugerencias = [
+                (
+                    linea.movimiento,
+                    f"({linea.movimiento.x},{linea.movimiento.y}) "
+                    f"{self._texto_valor(linea.valor)}  "
+                    + " ".join(f"{p.x},{p.y}" for p in linea.variacion[1:6]),
+                )
+                for linea in lineas
+            ]
+            self.interfaz.establecer_pista(copia, sugerencias)
+
+        self._hilo_pista = threading.Thread(target=analizar, name="pista", daemon=True)
+        self._hilo_pista.start()
+
+    @staticmethod
+    def _texto_valor(valor: float) -> str:
+        from ai.estrategias import VICTORIA
+
+        if valor >= VICTORIA:
+            return "gana"
+        if valor <= -VICTORIA:
+            return "pierde"
+        return f"{int(round(valor)):+d}"
+
     def actualizar_interfaz(self) -> None:
         """Actualiza la interfaz con el estado actual"""
         estado = self.motor_juego.obtener_estado_actual()
@@ -86,5 +228,38 @@ class ControladorPrincipal:
 
 # ===== PUNTO DE ENTRADA =====
 if __name__ == "__main__":
-    controlador = ControladorPrincipal()
+    parser = argparse.ArgumentParser(description="Snake vs Snake")
+    parser.add_argument(
+        "--tamano", type=int, default=TABLERO_TAMANO, help="lado del tablero"
+    )
+    parser.add_argument(
+        "--sin-wraparound",
+        action="store_true",
+        help="bordes cerrados: las casillas del borde no conectan con el opuesto",
+    )
+    parser.add_argument(
+        "--recalibrar",
+        action="store_true",
+        help="volver a medir la velocidad de la máquina (se guarda en disco)",
+    )
+    parser.add_argument(
+        "--sin-ventana",
+        action="store_true",
+        help="motor por stdin/stdout (ver herramientas.protocolo), sin pygame",
+    )
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    if args.sin_ventana:
+        from herramientas.protocolo import main as protocolo
+
+        protocolo()
+        raise SystemExit(0)
+
+    controlador = ControladorPrincipal(
+        perfilado.crear_desde_argumentos(args),
+        tamano=args.tamano,
+        envolvente=not args.sin_wraparound,
+        calibracion=obtener_calibracion(recalibrar=args.recalibrar),
+    )
     controlador.iniciar_aplicacion()
@@ -0,0 +1 @@
+# Servicios de red sin ventana (no importan pygame)
@@ -0,0 +1,407 @@
+"""
+Servicio de análisis con micro-lotes: muchas peticiones de evaluación o
+pista que llegan a la vez se agrupan y se puntúan en una sola llamada
+vectorizada (ai.lotes.evaluar_lote).
+
+Un lote se cierra al llegar a `max_lote` peticiones o cuando la primera
+lleva `espera_maxima` segundos en cola, lo que ocurra antes.
+
+    evaluar  valor estático del estado (+ favorable a azul)
+    sugerir  mejor movimiento a un ply para el jugador en turno: los hijos
+             de todas las pistas del lote se puntúan juntos, sin crearlos
+
+Se usa en proceso (await servicio.evaluar(estado)) o por TCP con el mismo
+estilo que servidor.partidas, un objeto JSON por línea:
+
+    -> {"id": 1, "tipo": "evaluar", "estado": "7/7/3A3/7/7/1R5/7 A"}
+    <- {"id": 1, "tipo": "evaluacion", "valor": 2.0}
+    -> {"id": 2, "tipo": "sugerir", "estado": "..."}
+    <- {"id": 2, "tipo": "sugerencia", "x": 3, "y": 2, "valor": 1.0}
+    -> {"tipo": "metricas"}
+
+Las respuestas pueden llegar fuera de orden; "id" las empareja.
+
+    python -m servidor.analisis servir --puerto 8766 --max-lote 128
+    python -m servidor.analisis carga --peticiones 20000 --concurrencia 256
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from core.interfaces import AZUL, EstadoJuego, Posicion
+from core.estado import GestorEstado
+from core.juego import MotorJuego
+from core.serializacion import estado_desde_texto
+from ai.evaluador import FuncionEvaluadora
+from ai.lotes import evaluar_jugadas_lote, evaluar_lote
+from servidor.metricas import RegistroLatencias
+
+logger = logging.getLogger(__name__)
+
+EVALUAR = "evaluar"
+SUGERIR = "sugerir"
+
+
+class _Peticion:
+    __slots__ = ("tipo", "estado", "futuro", "llegada")
+
+    def __init__(self, tipo: str, estado: EstadoJuego, futuro: asyncio.Future):
+        self.tipo = tipo
+        self.estado = estado
+        self.futuro = futuro
+        self.llegada = time.perf_counter()
+
+
+class ServicioAnalisis:
+    """Cola de peticiones de análisis atendida en micro-lotes"""
+
+    def __init__(self, max_lote: int = 64, espera_maxima: float = 0.002):
+        if max_lote < 1:
+            raise ValueError("max_lote debe ser al menos 1")
+        self.max_lote = max_lote
+        self.espera_maxima = espera_maxima
+
+        # "cola": desde que llega la petición hasta que entra en un lote;
+        # "total": hasta que se responde
+        self.latencias = RegistroLatencias()
+        self.peticiones = 0
+        self.lotes = 0
+        self.posiciones_evaluadas = 0
+        self._inicio: Optional[float] = None
+        # deque + Event en lugar de asyncio.Queue: encolar es lo único que
+        # se paga por petición, y aquí solo hace falta despertar al lote
+        self._cola: deque = deque()
+        self._aviso: Optional[asyncio.Event] = None
+        self._tarea: Optional[asyncio.Task] = None
+
+    async def iniciar(self) -> None:
+        self._aviso = asyncio.Event()
+        self._inicio = time.perf_counter()
+        self._tarea = asyncio.create_task(self._atender_lotes())
+
+    async def cerrar(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+
+    async def evaluar(self, estado: EstadoJuego) -> float:
+        return await self._encolar(EVALUAR, estado)
+
+    async def sugerir(self, estado: EstadoJuego) -> Tuple[Optional[Posicion], float]:
+        return await self._encolar(SUGERIR, estado)
+
+    def _encolar(self, tipo: str, estado: EstadoJuego) -> asyncio.Future:
+        futuro = asyncio.get_running_loop().create_future()
+        self._cola.append(_Peticion(tipo, estado, futuro))
+        # Despertar al atender la primera petición o al completar un lote
+        if len(self._cola) == 1 or len(self._cola) >= self.max_lote:
+            self._aviso.set()
+        return futuro
+
+    def metricas(self) -> dict:
+        transcurrido = time.perf_counter() - self._inicio if self._inicio else 0.0
+        return {
+            "tipo": "metricas",
+            "peticiones": self.peticiones,
+            "lotes": self.lotes,
+            "tamano_medio_lote": self.peticiones / self.lotes if self.lotes else 0.0,
+            "posiciones_evaluadas": self.posiciones_evaluadas,
+            "peticiones_por_segundo": (
+                self.peticiones / transcurrido if transcurrido else 0.0
+            ),
+            "en_cola": len(self._cola),
+            "latencias": self.latencias.resumen(),
+        }
+
+    async def _atender_lotes(self) -> None:
+        cola = self._cola
+        while True:
+            if not cola:
+                self._aviso.clear()
+                await self._aviso.wait()
+            limite = cola[0].llegada + self.espera_maxima
+            while len(cola) < self.max_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                self._aviso.clear()
+                try:
+                    await asyncio.wait_for(self._aviso.wait(), restante)
+                except asyncio.TimeoutError:
+                    break
+            lote = [cola.popleft() for _ in range(min(len(cola), self.max_lote))]
+            self._procesar_lote(lote)
+
+    def _procesar_lote(self, lote: List[_Peticion]) -> None:
+        ahora = time.perf_counter()
+        for peticion in lote:
+            self.latencias.registrar("cola", ahora - peticion.llegada)
+
+        evaluaciones = [p for p in lote if p.tipo == EVALUAR]
+        pistas = [p for p in lote if p.tipo == SUGERIR]
+        jugadas = [
+            GestorEstado.obtener_movimientos_validos(p.estado, p.estado.turno)
+            for p in pistas
+        ]
+        try:
+            valores = evaluar_lote([p.estado for p in evaluaciones])
+            valores_hijos = evaluar_jugadas_lote([p.estado for p in pistas], jugadas)
+        except Exception as error:
+            logger.exception("Error evaluando un lote de %d peticiones", len(lote))
+            for peticion in lote:
+                if not peticion.futuro.done():
+                    peticion.futuro.set_exception(error)
+            return
+
+        for peticion, valor in zip(evaluaciones, valores):
+            if not peticion.futuro.done():  # El cliente pudo dejar de esperar
+                peticion.futuro.set_result(float(valor))
+        for peticion, movimientos, hijos in zip(pistas, jugadas, valores_hijos):
+            if peticion.futuro.done():
+                continue
+            if not movimientos:
+                peticion.futuro.set_result((None, 0.0))
+                continue
+            # Azul maximiza f(e), rojo la minimiza
+            mejor = int(hijos.argmax() if peticion.estado.turno == AZUL else hijos.argmin())
+            peticion.futuro.set_result((movimientos[mejor], float(hijos[mejor])))
+
+        fin_lote = time.perf_counter()
+        for peticion in lote:
+            self.latencias.registrar("total", fin_lote - peticion.llegada)
+        self.peticiones += len(lote)
+        self.lotes += 1
+        self.posiciones_evaluadas += len(evaluaciones) + sum(map(len, jugadas))
+
+
+# ===== Frontal TCP =====
+
+
+async def _responder(servicio: ServicioAnalisis, mensaje: dict) -> dict:
+    identificador = mensaje.get("id")
+    tipo = mensaje.get("tipo")
+    if tipo == "metricas":
+        return {"id": identificador, **servicio.metricas()}
+    try:
+        estado = estado_desde_texto(mensaje["estado"])
+    except (KeyError, TypeError, ValueError) as error:
+        return {"id": identificador, "tipo": "error", "mensaje": f"Estado inválido: {error}"}
+
+    if tipo == EVALUAR:
+        valor = await servicio.evaluar(estado)
+        return {"id": identificador, "tipo": "evaluacion", "valor": valor}
+    if tipo == SUGERIR:
+        movimiento, valor = await servicio.sugerir(estado)
+        return {
+            "id": identificador,
+            "tipo": "sugerencia",
+            "x": None if movimiento is None else movimiento.x,
+            "y": None if movimiento is None else movimiento.y,
+            "valor": valor,
+        }
+    return {"id": identificador, "tipo": "error", "mensaje": f"Tipo desconocido: {tipo!r}"}
+
+
+async def servir(
+    servicio: ServicioAnalisis, host: str, puerto: int, max_en_curso: int = 256
+) -> asyncio.AbstractServer:
+    """
+    Frontal TCP; cada línea se atiende en su propia tarea para poder
+    agruparla. Con `max_en_curso` peticiones de una conexión sin responder
+    se deja de leer esa conexión hasta que alguna termine.
+    """
+
+    async def atender(lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        pendientes = set()
+        en_curso = asyncio.Semaphore(max_en_curso)
+
+        async def escribir(respuesta: dict):
+            escritor.write(json.dumps(respuesta).encode() + b"\n")
+            await escritor.drain()
+
+        async def responder(mensaje):
+            try:
+                respuesta = await _responder(servicio, mensaje)
+            except Exception:
+                logger.exception("Error atendiendo la petición %r", mensaje.get("id"))
+                respuesta = {
+                    "id": mensaje.get("id"), "tipo": "error",
+                    "mensaje": "Error interno del servicio",
+                }
+            await escribir(respuesta)
+
+        try:
+            while linea := await lector.readline():
+                try:
+                    mensaje = json.loads(linea)
+                except json.JSONDecodeError:
+                    await escribir({"tipo": "error", "mensaje": "JSON inválido"})
+                    continue
+                if not isinstance(mensaje, dict):
+                    continue
+                await en_curso.acquire()
+                tarea = asyncio.create_task(responder(mensaje))
+                pendientes.add(tarea)
+                tarea.add_done_callback(pendientes.discard)
+                tarea.add_done_callback(lambda _: en_curso.release())
+            await asyncio.gather(*pendientes, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    return await asyncio.start_server(atender, host, puerto)
+
+
+# ===== Generador de carga =====
+
+
+def posiciones_de_prueba(cantidad: int, semilla: int = 0) -> List[EstadoJuego]:
+    """Posiciones variadas de partidas aleatorias (aperturas a finales)"""
+    rng = random.Random(semilla)
+    estados = []
+    while len(estados) < cantidad:
+        motor = MotorJuego()
+        motor.inicializar_juego(AZUL)
+        while not motor.juego_terminado:
+            estado = motor.obtener_estado_actual()
+            estados.append(estado)
+            opciones = motor.obtener_movimientos_validos(estado.turno)
+            if not opciones:
+                break
+            motor.realizar_movimiento(rng.choice(opciones))
+    return estados[:cantidad]
+
+
+async def _carga(consultar, posiciones: List[EstadoJuego], concurrencia: int) -> dict:
+    """`concurrencia` clientes que consultan las posiciones repartidas entre ellos"""
+    latencias = RegistroLatencias()
+
+    async def cliente(indice: int):
+        for estado in posiciones[indice::concurrencia]:
+            inicio = time.perf_counter()
+            await consultar(estado)
+            latencias.registrar("peticion", time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+    return {
+        "peticiones_por_segundo": len(posiciones) / segundos,
+        "latencias": latencias.resumen()["peticion"],
+    }
+
+
+async def comparar(
+    peticiones: int = 20000,
+    concurrencia: int = 256,
+    max_lote: int = 128,
+    espera_maxima: float = 0.002,
+    tipo: str = EVALUAR,
+) -> List[dict]:
+    """
+    Rendimiento de una llamada por petición (FuncionEvaluadora / un hijo a
+    la vez) frente al servicio sin lotes (max_lote=1) y con micro-lotes
+    """
+    posiciones = posiciones_de_prueba(peticiones)
+    filas = []
+
+    evaluador = FuncionEvaluadora()
+    motor = MotorJuego()
+
+    async def directo(estado):
+        if tipo == EVALUAR:
+            evaluador.evaluar_estado(estado, motor)
+        else:
+            for movimiento in GestorEstado.obtener_movimientos_validos(estado, estado.turno):
+                hijo = GestorEstado.aplicar_movimiento(estado, movimiento).nuevo_estado
+                evaluador.evaluar_estado(hijo, motor)
+        await asyncio.sleep(0)
+
+    fila = await _carga(directo, posiciones, concurrencia)
+    fila.update(modo="una llamada por petición", tamano_medio_lote=1.0)
+    filas.append(fila)
+
+    for lote in (1, max_lote):
+        servicio = ServicioAnalisis(max_lote=lote, espera_maxima=espera_maxima)
+        await servicio.iniciar()
+        consultar = servicio.evaluar if tipo == EVALUAR else servicio.sugerir
+        fila = await _carga(consultar, posiciones, concurrencia)
+        await servicio.cerrar()
+        metricas = servicio.metricas()
+        fila.update(
+            modo=f"servicio max_lote={lote}",
+            tamano_medio_lote=metricas["tamano_medio_lote"],
+            cola_p99=metricas["latencias"]["cola"]["p99"],
+        )
+        filas.append(fila)
+    return filas
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servicio de análisis con micro-lotes")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    servir_cmd = subcomandos.add_parser("servir")
+    servir_cmd.add_argument("--host", default="127.0.0.1")
+    servir_cmd.add_argument("--puerto", type=int, default=8766)
+    servir_cmd.add_argument(
+        "--max-en-curso", type=int, default=256, help="peticiones sin responder por conexión"
+    )
+
+    carga_cmd = subcomandos.add_parser("carga")
+    carga_cmd.add_argument("--peticiones", type=int, default=20000)
+    carga_cmd.add_argument("--concurrencia", type=int, default=256)
+    carga_cmd.add_argument("--tipo", choices=[EVALUAR, SUGERIR], default=EVALUAR)
+
+    for sub in (servir_cmd, carga_cmd):
+        sub.add_argument("--max-lote", type=int, default=128)
+        sub.add_argument(
+            "--espera-maxima", type=float, default=2.0, help="milisegundos"
+        )
+    args = parser.parse_args(argv)
+    espera = args.espera_maxima / 1000
+
+    if args.comando == "servir":
+        logging.basicConfig(level=logging.INFO)
+
+        async def ejecutar():
+            servicio = ServicioAnalisis(args.max_lote, espera)
+            await servicio.iniciar()
+            servidor = await servir(servicio, args.host, args.puerto, args.max_en_curso)
+            logger.info("Servicio de análisis en %s:%d", args.host, args.puerto)
+            async with servidor:
+                await servidor.serve_forever()
+
+        try:
+            asyncio.run(ejecutar())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    filas = asyncio.run(
+        comparar(args.peticiones, args.concurrencia, args.max_lote, espera, args.tipo)
+    )
+    print(
+        f"{'modo':<26} {'pet/s':>10} {'lote medio':>11} "
+        f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'cola p99':>9}"
+    )
+    for fila in filas:
+        latencias = fila["latencias"]
+        cola = f"{fila['cola_p99']:>9.2f}" if "cola_p99" in fila else f"{'-':>9}"
+        print(
+            f"{fila['modo']:<26} {fila['peticiones_por_segundo']:>10.0f} "
+            f"{fila['tamano_medio_lote']:>11.1f} {latencias['p50']:>9.2f} "
+            f"{latencias['p99']:>9.2f} {cola}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Cliente de carga para el servidor de partidas: simula muchos humanos
+jugando a la vez (movimientos aleatorios válidos con un tiempo de
+"pensar") y reporta percentiles de latencia por dificultad.
+
+    python -m servidor.partidas --procesos 4 &
+    python -m servidor.carga --clientes 300 --partidas 2
+    python -m servidor.carga --clientes 200 --servidor-local   # todo en un proceso
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from core.interfaces import AZUL, Dificultad
+from core.estado import GestorEstado
+from core.serializacion import estado_desde_texto
+from servidor.metricas import RegistroLatencias
+
+# Sin --dificultad: maestro piensa un segundo por jugada y se pide aparte
+DIFICULTADES_POR_DEFECTO = [
+    dificultad for dificultad in Dificultad if dificultad != Dificultad.MAESTRO
+]
+
+
+class ResultadoCarga:
+    """Agregado de todos los clientes simulados"""
+
+    def __init__(self):
+        self.latencias = RegistroLatencias()
+        self.partidas = 0
+        self.errores: Dict[str, int] = {}
+        self.duracion = 0.0
+
+    def contar_error(self, codigo: str) -> None:
+        self.errores[codigo] = self.errores.get(codigo, 0) + 1
+
+    @property
+    def peticiones(self) -> int:
+        return sum(len(v) for v in self.latencias.muestras.values())
+
+    def resumen(self) -> str:
+        lineas = [
+            f"Partidas: {self.partidas}  Peticiones: {self.peticiones}  "
+            f"Duración: {self.duracion:.1f} s  "
+            f"({self.peticiones / self.duracion if self.duracion else 0:.0f} pet/s)",
+            self.latencias.tabla(),
+        ]
+        if self.errores:
+            lineas.append(f"Errores: {self.errores}")
+        return "\n".join(lineas)
+
+
+async def _peticion(lector, escritor, mensaje: dict) -> dict:
+    escritor.write(json.dumps(mensaje).encode() + b"\n")
+    await escritor.drain()
+    linea = await lector.readline()
+    if not linea:
+        raise ConnectionError("El servidor cerró la conexión")
+    return json.loads(linea)
+
+
+async def jugador_simulado(
+    host: str,
+    puerto: int,
+    dificultad: Dificultad,
+    partidas: int,
+    resultado: ResultadoCarga,
+    pensar: float = 0.0,
+    rng: Optional[random.Random] = None,
+) -> None:
+    """Un humano simulado: juega `partidas` partidas seguidas en una conexión"""
+    rng = rng or random.Random()
+    categoria = dificultad.name.lower()
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        for numero in range(partidas):
+            inicia = "ia" if numero % 2 else "humano"
+            mensaje = {"tipo": "nueva", "dificultad": categoria, "inicia": inicia}
+            respuesta = await _reintentar(lector, escritor, mensaje, resultado)
+            if respuesta is None:
+                return
+
+            while respuesta["tipo"] == "estado" and not respuesta["terminado"]:
+                if pensar:
+                    await asyncio.sleep(rng.uniform(0, 2 * pensar))
+                estado = estado_desde_texto(respuesta["estado"])
+                opciones = GestorEstado.obtener_movimientos_validos(estado, AZUL)
+                posicion = rng.choice(opciones)
+                mensaje = {"tipo": "mover", "x": posicion.x, "y": posicion.y}
+
+                inicio = time.perf_counter()
+                respuesta = await _reintentar(lector, escritor, mensaje, resultado)
+                if respuesta is None:
+                    return
+                resultado.latencias.registrar(categoria, time.perf_counter() - inicio)
+            resultado.partidas += 1
+    finally:
+        escritor.close()
+
+
+async def _reintentar(lector, escritor, mensaje, resultado: ResultadoCarga):
+    """Envía `mensaje`; si el servidor está ocupado espera y reintenta"""
+    espera = 0.01
+    while True:
+        respuesta = await _peticion(lector, escritor, mensaje)
+        if respuesta["tipo"] != "error":
+            return respuesta
+        resultado.contar_error(respuesta["codigo"])
+        if respuesta["codigo"] != "ocupado":
+            return None
+        await asyncio.sleep(espera)
+        espera = min(espera * 2, 1.0)
+
+
+async def ejecutar_carga(
+    host: str,
+    puerto: int,
+    clientes: int,
+    partidas: int = 1,
+    dificultades: Optional[List[Dificultad]] = None,
+    pensar: float = 0.0,
+    semilla: Optional[int] = None,
+) -> ResultadoCarga:
+    """
+    Lanza `clientes` jugadores a la vez, repartidos entre las dificultades
+    (por defecto, DIFICULTADES_POR_DEFECTO)
+    """
+    dificultades = dificultades or DIFICULTADES_POR_DEFECTO
+    resultado = ResultadoCarga()
+    rng = random.Random(semilla)
+    tareas = [
+        jugador_simulado(
+            host,
+            puerto,
+            dificultades[i % len(dificultades)],
+            partidas,
+            resultado,
+            pensar,
+            random.Random(rng.random()),
+        )
+        for i in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    salidas = await asyncio.gather(*tareas, return_exceptions=True)
+    resultado.duracion = time.perf_counter() - inicio
+    for salida in salidas:
+        if isinstance(salida, Exception):
+            resultado.contar_error(type(salida).__name__)
+    return resultado
+
+
+async def _carga_con_servidor_local(args) -> ResultadoCarga:
+    from servidor.partidas import ServidorPartidas
+
+    servidor = ServidorPartidas(puerto=0, procesos=args.procesos,
+                                max_sesiones=max(args.clientes, 1000))
+    await servidor.iniciar()
+    try:
+        return await ejecutar_carga(
+            servidor.host, servidor.puerto, args.clientes, args.partidas,
+            args.dificultades, args.pensar, args.semilla,
+        )
+    finally:
+        await servidor.cerrar()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Carga de humanos simulados")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--partidas", type=int, default=1)
+    parser.add_argument(
+        "--dificultad",
+        dest="dificultades",
+        action="append",
+        type=lambda texto: Dificultad[texto.upper()],
+        help="se puede repetir; por defecto todas salvo maestro",
+    )
+    parser.add_argument(
+        "--pensar", type=float, default=0.05, help="tiempo medio de pensar (s)"
+    )
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument(
+        "--servidor-local",
+        action="store_true",
+        help="levanta un servidor en este proceso en un puerto libre",
+    )
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.servidor_local:
+        resultado = asyncio.run(_carga_con_servidor_local(args))
+    else:
+        resultado = asyncio.run(
+            ejecutar_carga(
+                args.host, args.puerto, args.clientes, args.partidas,
+                args.dificultades, args.pensar, args.semilla,
+            )
+        )
+    print(resultado.resumen())
+
+
+if __name__ == "__main__":
+    main()
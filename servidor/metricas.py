@@ -0,0 +1,54 @@
+"""
+Latencias por categoría (dificultad, tipo de petición...) con percentiles.
+Lo usan el servidor de partidas y los clientes de carga.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentil(ordenados: Sequence[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    rango = max(math.ceil(p / 100 * len(ordenados)) - 1, 0)
+    return ordenados[min(rango, len(ordenados) - 1)]
+
+
+class RegistroLatencias:
+    """Acumula latencias (en segundos) agrupadas por categoría"""
+
+    def __init__(self):
+        self.muestras: Dict[str, List[float]] = defaultdict(list)
+
+    def registrar(self, categoria: str, segundos: float) -> None:
+        self.muestras[categoria].append(segundos)
+
+    def resumen(self) -> Dict[str, dict]:
+        """{categoria: {"n", "p50", "p90", "p99", "max"}} con tiempos en ms"""
+        resultado = {}
+        for categoria, valores in sorted(self.muestras.items()):
+            ordenados = sorted(valores)
+            fila = {"n": len(ordenados)}
+            for p in PERCENTILES:
+                fila[f"p{p}"] = 1000 * percentil(ordenados, p)
+            fila["max"] = 1000 * ordenados[-1]
+            resultado[categoria] = fila
+        return resultado
+
+    def tabla(self) -> str:
+        """Resumen en texto, una fila por categoría"""
+        columnas = [f"p{p}" for p in PERCENTILES] + ["max"]
+        lineas = [
+            f"{'categoria':<14} {'n':>7} "
+            + " ".join(f"{c + ' (ms)':>10}" for c in columnas)
+        ]
+        for categoria, fila in self.resumen().items():
+            lineas.append(
+                f"{categoria:<14} {fila['n']:>7} "
+                + " ".join(f"{fila[c]:>10.2f}" for c in columnas)
+            )
+        return "\n".join(lineas)
@@ -0,0 +1,456 @@
+"""
+Servidor de partidas: muchas sesiones de MotorJuego a la vez sobre TCP.
+
+Protocolo: un objeto JSON por línea (UTF-8) en cada sentido. Cada conexión
+es una sesión; el humano juega con azul y la IA con rojo, como en main.py.
+
+    -> {"tipo": "nueva", "dificultad": "experto", "inicia": "humano",
+        "tamano": 7, "envolvente": true}
+    -> {"tipo": "mover", "x": 3, "y": 4}
+    -> {"tipo": "metricas"}
+    <- {"tipo": "estado", "estado": "7/7/3A3/7/7/7/7 R", "terminado": false,
+        "ganador": null, "ia": {"x": 1, "y": 5, "ms": 12.3, "agotado": false}}
+    <- {"tipo": "error", "codigo": "...", "mensaje": "..."}
+
+El estado viaja en la notación de texto de core.serializacion. Los turnos
+de la IA se calculan en un pool de procesos compartido, así que el bucle
+de eventos nunca se bloquea con una búsqueda.
+
+Límites y contrapresión:
+    - max_sesiones: conexiones por encima del límite reciben "lleno".
+    - Cada conexión procesa una petición a la vez y espera a que el
+      cliente lea la respuesta (drain) antes de leer la siguiente.
+    - max_cola: turnos de IA pendientes en todo el servidor; por encima,
+      la jugada se rechaza con "ocupado" sin tocar la partida.
+    - limite_turno_ia: si la IA no responde a tiempo se juega un movimiento
+      aleatorio válido ("agotado": true). Cuenta también la espera de un
+      proceso libre del pool.
+    - Si el pool falla (un proceso muere, la búsqueda lanza una excepción)
+      se responde con el error "interno" y la jugada puede reintentarse.
+    - limite_inactividad: la sesión se cierra si el cliente no envía nada.
+    - "tamano" debe estar entre TAMANO_MINIMO y TAMANO_MAXIMO.
+
+Con ruta_cache, cada proceso del pool abre el mismo CachePersistente y
+las búsquedas de todas las sesiones lo comparten. Con entradas_compartida
+el servidor crea una TablaCompartida (tabla de transposición en memoria
+compartida) y todos los procesos del pool buscan sobre ella.
+
+    python -m servidor.partidas --puerto 8765 --procesos 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from core.interfaces import AZUL, ROJO, TABLERO_TAMANO, Dificultad, Posicion
+from core.juego import MotorJuego
+from core.serializacion import codificar_estado, decodificar_estado, estado_a_texto
+from ai.cache_persistente import CachePersistente
+from ai.factoria import FactoriaEstrategias
+from ai.tabla_compartida import TablaCompartida
+from servidor.metricas import RegistroLatencias
+
+logger = logging.getLogger(__name__)
+
+# Estrategias por proceso del pool, reutilizadas entre turnos (y su caché)
+_ESTRATEGIAS: Dict[Tuple[str, str], object] = {}
+_CACHE: Optional[CachePersistente] = None
+
+# Lados de tablero que acepta "nueva": acota la memoria de cada sesión y
+# las topologías que se guardan en caché
+TAMANO_MINIMO = 2
+TAMANO_MAXIMO = 15
+_COMPARTIDA: Optional[TablaCompartida] = None
+
+
+def abrir_cache(ruta: str) -> None:
+    """Inicializador del pool: abre el caché persistente de este proceso"""
+    global _CACHE
+    _CACHE = CachePersistente(ruta)
+
+
+def abrir_recursos(ruta_cache: Optional[str], nombre_compartida: Optional[str]) -> None:
+    """Inicializador del pool: caché persistente y tabla compartida, si hay"""
+    global _COMPARTIDA
+    if ruta_cache:
+        abrir_cache(ruta_cache)
+    if nombre_compartida:
+        _COMPARTIDA = TablaCompartida.abrir(nombre_compartida)
+
+
+def calcular_turno_ia(
+    datos: bytes, dificultad: str
+) -> Tuple[Optional[Tuple[int, int]], float]:
+    """
+    Se ejecuta en el pool de procesos: decodifica el estado, elige el
+    movimiento del jugador en turno y devuelve ((x, y) o None, segundos)
+    """
+    inicio = time.perf_counter()
+    estado = decodificar_estado(datos)
+    motor = MotorJuego(estado.topologia.tamano, estado.topologia.envolvente)
+    motor.estado_actual = estado
+
+    clave = (dificultad, estado.turno)
+    estrategia = _ESTRATEGIAS.get(clave)
+    if estrategia is None:
+        estrategia = FactoriaEstrategias.crear_estrategia(
+            Dificultad[dificultad], estado.turno, _CACHE, compartida=_COMPARTIDA
+        )
+        _ESTRATEGIAS[clave] = estrategia
+
+    posicion = estrategia.seleccionar_movimiento(motor)
+    resultado = None if posicion is None else (posicion.x, posicion.y)
+    return resultado, time.perf_counter() - inicio
+
+
+class ErrorProtocolo(Exception):
+    """Petición rechazada; se responde con {"tipo": "error", "codigo": ...}"""
+
+    def __init__(self, codigo: str, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.mensaje = mensaje
+
+
+class Sesion:
+    """Una partida humano (azul) contra IA (rojo) asociada a una conexión"""
+
+    jugador_humano = AZUL
+    jugador_ia = ROJO
+
+    def __init__(self, identificador: int):
+        self.identificador = identificador
+        self.motor: Optional[MotorJuego] = None
+        self.dificultad: Optional[Dificultad] = None
+
+    def respuesta_estado(self, ia: Optional[dict] = None) -> dict:
+        estado = self.motor.obtener_estado_actual()
+        terminado, ganador = self.motor.verificar_fin_juego()
+        return {
+            "tipo": "estado",
+            "estado": estado_a_texto(estado),
+            "terminado": terminado,
+            "ganador": ganador,
+            "ia": ia,
+        }
+
+
+class ServidorPartidas:
+    """Servidor asyncio de sesiones de juego con IA en un pool de procesos"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        puerto: int = 8765,
+        procesos: Optional[int] = None,
+        max_sesiones: int = 1000,
+        max_cola: int = 256,
+        limite_turno_ia: float = 5.0,
+        limite_inactividad: float = 300.0,
+        ejecutor: Optional[Executor] = None,
+        ruta_cache: Optional[str] = None,
+        entradas_compartida: Optional[int] = None,
+    ):
+        self.host = host
+        self.puerto = puerto
+        self.max_sesiones = max_sesiones
+        self.max_cola = max_cola
+        self.limite_turno_ia = limite_turno_ia
+        self.limite_inactividad = limite_inactividad
+
+        self._ejecutor_propio = ejecutor is None
+        self.compartida = (
+            TablaCompartida(entradas_compartida)
+            if entradas_compartida and ejecutor is None
+            else None
+        )
+        if ejecutor is None and (ruta_cache or self.compartida is not None):
+            nombre = self.compartida.nombre if self.compartida is not None else None
+            ejecutor = ProcessPoolExecutor(
+                max_workers=procesos, initializer=abrir_recursos,
+                initargs=(ruta_cache, nombre),
+            )
+        self.ejecutor = ejecutor or ProcessPoolExecutor(max_workers=procesos)
+        self.procesos = procesos or os.cpu_count() or 1
+
+        self.sesiones: Dict[int, Sesion] = {}
+        self.latencias = RegistroLatencias()
+        self.rechazos: Dict[str, int] = {"lleno": 0, "ocupado": 0}
+        self.turnos_agotados = 0
+        self._identificadores = itertools.count(1)
+        self._pendientes = 0  # Turnos de IA admitidos y sin terminar
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._conexiones: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._trabajadores: Optional[asyncio.Semaphore] = None
+
+    async def iniciar(self) -> None:
+        """Empieza a escuchar; con puerto 0 se usa uno libre (ver self.puerto)"""
+        # Un cálculo por proceso: el límite de tiempo cuenta desde que empieza
+        self._trabajadores = asyncio.Semaphore(self.procesos)
+        self._servidor = await asyncio.start_server(
+            self._atender, self.host, self.puerto
+        )
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        logger.info("Servidor de partidas en %s:%d", self.host, self.puerto)
+
+    async def servir(self) -> None:
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def cerrar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        # Cerrar los sockets hace que cada sesión lea fin de flujo y termine
+        tareas = list(self._conexiones.values())
+        for escritor in list(self._conexiones):
+            escritor.close()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        if self._ejecutor_propio:
+            self.ejecutor.shutdown(wait=False, cancel_futures=True)
+        if self.compartida is not None:
+            self.compartida.cerrar()
+
+    def metricas(self) -> dict:
+        return {
+            "tipo": "metricas",
+            "sesiones": len(self.sesiones),
+            "pendientes": self._pendientes,
+            "rechazos": dict(self.rechazos),
+            "turnos_agotados": self.turnos_agotados,
+            "latencias_ia": self.latencias.resumen(),
+        }
+
+    async def _atender(
+        self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter
+    ) -> None:
+        if len(self.sesiones) >= self.max_sesiones:
+            self.rechazos["lleno"] += 1
+            await self._enviar(
+                escritor, _error("lleno", "Servidor lleno, intente más tarde")
+            )
+            escritor.close()
+            return
+
+        sesion = Sesion(next(self._identificadores))
+        self.sesiones[sesion.identificador] = sesion
+        self._conexiones[escritor] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(
+                        lector.readline(), self.limite_inactividad
+                    )
+                except asyncio.TimeoutError:
+                    await self._enviar(
+                        escritor, _error("inactividad", "Sesión cerrada por inactividad")
+                    )
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._enviar(escritor, _error("protocolo", "Línea demasiado larga"))
+                    break
+                if not linea:
+                    break
+
+                try:
+                    mensaje = json.loads(linea)
+                    respuesta = await self._procesar(sesion, mensaje)
+                except ErrorProtocolo as error:
+                    respuesta = _error(error.codigo, error.mensaje)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    respuesta = _error("protocolo", "JSON inválido")
+                if respuesta is None:
+                    break
+                await self._enviar(escritor, respuesta)
+        except ConnectionError:
+            pass
+        finally:
+            del self.sesiones[sesion.identificador]
+            del self._conexiones[escritor]
+            escritor.close()
+
+    async def _enviar(self, escritor: asyncio.StreamWriter, respuesta: dict) -> None:
+        escritor.write(json.dumps(respuesta).encode() + b"\n")
+        # Contrapresión: no se lee la siguiente petición hasta vaciar el buffer
+        await escritor.drain()
+
+    async def _procesar(self, sesion: Sesion, mensaje) -> Optional[dict]:
+        if not isinstance(mensaje, dict):
+            raise ErrorProtocolo("protocolo", "Se esperaba un objeto JSON")
+        tipo = mensaje.get("tipo")
+        if tipo == "nueva":
+            return await self._nueva_partida(sesion, mensaje)
+        if tipo == "mover":
+            return await self._mover(sesion, mensaje)
+        if tipo == "metricas":
+            return self.metricas()
+        if tipo == "salir":
+            return None
+        raise ErrorProtocolo("protocolo", f"Tipo de mensaje desconocido: {tipo!r}")
+
+    async def _nueva_partida(self, sesion: Sesion, mensaje: dict) -> dict:
+        try:
+            dificultad = Dificultad[str(mensaje.get("dificultad", "normal")).upper()]
+            tamano = int(mensaje.get("tamano", TABLERO_TAMANO))
+            if not TAMANO_MINIMO <= tamano <= TAMANO_MAXIMO:
+                raise ValueError(
+                    f"el tamaño debe estar entre {TAMANO_MINIMO} y {TAMANO_MAXIMO}"
+                )
+            envolvente = mensaje.get("envolvente", True)
+            if not isinstance(envolvente, bool):
+                raise TypeError("envolvente debe ser true o false")
+            motor = MotorJuego(tamano, envolvente)
+        except (KeyError, ValueError, TypeError) as error:
+            raise ErrorProtocolo("invalido", f"Configuración inválida: {error}")
+
+        inicia_ia = mensaje.get("inicia", "humano") == "ia"
+        if inicia_ia:
+            self._admitir_turno_ia()
+        sesion.motor = motor
+        sesion.dificultad = dificultad
+        motor.inicializar_juego(sesion.jugador_ia if inicia_ia else sesion.jugador_humano)
+
+        try:
+            ia = await self._turno_ia(sesion) if inicia_ia else None
+        except ErrorProtocolo:
+            sesion.motor = None  # La partida no llegó a empezar
+            raise
+        return sesion.respuesta_estado(ia)
+
+    async def _mover(self, sesion: Sesion, mensaje: dict) -> dict:
+        if sesion.motor is None:
+            raise ErrorProtocolo("invalido", "No hay partida en curso")
+        if sesion.motor.juego_terminado:
+            raise ErrorProtocolo("invalido", "La partida ya terminó")
+        if sesion.motor.obtener_estado_actual().turno != sesion.jugador_humano:
+            raise ErrorProtocolo("invalido", "No es el turno del humano")
+        try:
+            posicion = Posicion(int(mensaje["x"]), int(mensaje["y"]))
+        except (KeyError, ValueError, TypeError):
+            raise ErrorProtocolo("protocolo", "Movimiento sin coordenadas x, y")
+
+        # Se decide antes de tocar la partida para que "ocupado" sea reintentable
+        self._admitir_turno_ia()
+        previo = sesion.motor.estado_actual
+        resultado = sesion.motor.realizar_movimiento(posicion)
+        if not resultado.es_valido or sesion.motor.juego_terminado:
+            self._pendientes -= 1
+            if not resultado.es_valido:
+                raise ErrorProtocolo("invalido", resultado.mensaje)
+            return sesion.respuesta_estado()
+
+        try:
+            ia = await self._turno_ia(sesion)
+        except ErrorProtocolo:
+            # realizar_movimiento no modifica el estado previo: la jugada
+            # del humano se deshace y puede reintentarse
+            sesion.motor.estado_actual = previo
+            raise
+        return sesion.respuesta_estado(ia)
+
+    def _admitir_turno_ia(self) -> None:
+        if self._pendientes >= self.max_cola:
+            self.rechazos["ocupado"] += 1
+            raise ErrorProtocolo("ocupado", "Demasiados turnos de IA pendientes")
+        self._pendientes += 1
+
+    async def _turno_ia(self, sesion: Sesion) -> dict:
+        """
+        Calcula y aplica el turno de la IA (ya admitido con _admitir_turno_ia).
+        El límite de tiempo incluye la espera de un proceso libre. Si el pool
+        falla se responde con el error "interno" sin tocar la partida.
+        """
+        inicio = time.perf_counter()
+        agotado = False
+        try:
+            datos = codificar_estado(sesion.motor.obtener_estado_actual())
+            try:
+                coordenadas, _ = await asyncio.wait_for(
+                    self._calcular_en_pool(datos, sesion.dificultad), self.limite_turno_ia
+                )
+            except asyncio.TimeoutError:
+                agotado = True
+                self.turnos_agotados += 1
+                movimientos = sesion.motor.obtener_movimientos_validos(sesion.jugador_ia)
+                coordenadas = random.choice(movimientos) if movimientos else None
+            except Exception:
+                logger.exception("Falló el turno de IA de la sesión %d", sesion.identificador)
+                raise ErrorProtocolo("interno", "La IA no pudo calcular su turno")
+        finally:
+            self._pendientes -= 1
+
+        segundos = time.perf_counter() - inicio
+        self.latencias.registrar(sesion.dificultad.name.lower(), segundos)
+        if coordenadas is None:
+            return {"x": None, "y": None, "ms": 1000 * segundos, "agotado": agotado}
+
+        posicion = Posicion(*coordenadas)
+        sesion.motor.realizar_movimiento(posicion)
+        return {"x": posicion.x, "y": posicion.y, "ms": 1000 * segundos, "agotado": agotado}
+
+    async def _calcular_en_pool(self, datos: bytes, dificultad: Dificultad):
+        await self._trabajadores.acquire()
+        try:
+            futuro = asyncio.get_running_loop().run_in_executor(
+                self.ejecutor, calcular_turno_ia, datos, dificultad.name
+            )
+        except BaseException:
+            self._trabajadores.release()
+            raise
+        # El semáforo se libera cuando el proceso termina de verdad, aunque
+        # la sesión ya no espere el resultado (shield: cancelar esta espera
+        # no cancela el cálculo)
+        futuro.add_done_callback(lambda _: self._trabajadores.release())
+        return await asyncio.shield(futuro)
+
+
+def _error(codigo: str, mensaje: str) -> dict:
+    return {"tipo": "error", "codigo": codigo, "mensaje": mensaje}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor de partidas JSON sobre TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--max-sesiones", type=int, default=1000)
+    parser.add_argument("--max-cola", type=int, default=256)
+    parser.add_argument("--limite-turno", type=float, default=5.0)
+    parser.add_argument("--limite-inactividad", type=float, default=300.0)
+    parser.add_argument(
+        "--cache", default=None, help="archivo SQLite de caché persistente de posiciones"
+    )
+    parser.add_argument(
+        "--compartida", type=int, default=None, metavar="ENTRADAS",
+        help="tabla de transposición en memoria compartida por el pool",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    servidor = ServidorPartidas(
+        host=args.host,
+        puerto=args.puerto,
+        procesos=args.procesos,
+        max_sesiones=args.max_sesiones,
+        max_cola=args.max_cola,
+        limite_turno_ia=args.limite_turno,
+        limite_inactividad=args.limite_inactividad,
+        ruta_cache=args.cache,
+        entradas_compartida=args.compartida,
+    )
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
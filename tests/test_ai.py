@@ -0,0 +1,694 @@
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from core.interfaces import TABLERO_TAMANO, AZUL, ROJO, VACIO, Posicion, EstadoJuego
+from core.juego import MotorJuego
+from ai.estrategias import EstrategiaMinimax, VICTORIA
+from ai.estadisticas import CanalProgreso, EstadisticasBusqueda
+from ai.evaluador import FuncionEvaluadora
+from ai.lotes import evaluar_jugadas_lote, evaluar_lote
+from ai.cache_persistente import CachePersistente
+from ai.finales import EMPATE, GANA, PIERDE, TablaFinales, generar_tabla_finales
+from ai.solucionador import GANA as GANA_PRUEBA, Solucionador
+from ai.numeros_prueba import BusquedaNumerosPrueba
+from ai.estrategias import EstrategiaPruebas
+from ai.estrategias import EstrategiaMCTS
+from ai.factoria import FactoriaEstrategias
+from ai import calibracion
+from core.interfaces import Dificultad
+from concurrent.futures import ProcessPoolExecutor
+from ai.tabla_compartida import TablaCompartida
+from ai.analisis import analizar_estado
+from core.estado import GestorEstado
+
+
+def crear_motor_con_tablero(vacias, cabeza_azul, cabeza_roja, turno):
+    """Tablero lleno de fichas azules salvo `vacias`, con las cabezas indicadas"""
+    tablero = [[AZUL] * TABLERO_TAMANO for _ in range(TABLERO_TAMANO)]
+    for pos in vacias:
+        tablero[pos.y][pos.x] = VACIO
+    tablero[cabeza_roja.y][cabeza_roja.x] = ROJO
+    estado = EstadoJuego(tablero, turno)
+    estado.agregar_movimiento(cabeza_azul, AZUL)
+    estado.agregar_movimiento(cabeza_roja, ROJO)
+
+    motor = MotorJuego()
+    motor.estado_actual = estado
+    return motor
+
+
+def test_minimax_encuentra_bloqueo_inmediato():
+    """Si un movimiento deja al oponente sin salida, Minimax lo elige"""
+    motor = crear_motor_con_tablero(
+        vacias=[Posicion(1, 0), Posicion(3, 0), Posicion(4, 4), Posicion(5, 5)],
+        cabeza_azul=Posicion(2, 0),
+        cabeza_roja=Posicion(0, 0),
+        turno=AZUL,
+    )
+    estrategia = EstrategiaMinimax(AZUL, profundidad=3)
+
+    movimiento, estadisticas = estrategia.buscar(motor)
+
+    assert movimiento == Posicion(1, 0)
+    assert estadisticas.mejor_valor >= VICTORIA
+
+
+def test_minimax_devuelve_estadisticas():
+    """Cada búsqueda entrega contadores y tiempos por profundidad"""
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    motor.realizar_movimiento(Posicion(3, 3))  # Azul
+    motor.realizar_movimiento(Posicion(0, 0))  # Rojo
+
+    progreso = []
+    estrategia = EstrategiaMinimax(AZUL, profundidad=3, callback_progreso=progreso.append)
+    movimiento = estrategia.seleccionar_movimiento(motor)
+
+    estadisticas = estrategia.ultimas_estadisticas
+    assert isinstance(estadisticas, EstadisticasBusqueda)
+    assert movimiento in motor.obtener_movimientos_validos(AZUL)
+    assert estadisticas.mejor_movimiento == movimiento
+    assert estadisticas.profundidad_alcanzada == 3
+    assert len(estadisticas.tiempo_por_profundidad) == 3
+    assert estadisticas.nodos > 0
+    assert estadisticas.evaluaciones > 0
+    assert 0.0 <= estadisticas.tasa_aciertos_cache <= 1.0
+    # Un aviso de progreso por cada profundidad completada
+    assert len(progreso) == 3
+
+
+def test_canal_progreso_publica_valores_de_la_raiz():
+    """Cada profundidad publica el valor de todas las jugadas de la raíz"""
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    motor.realizar_movimiento(Posicion(3, 3))  # Azul
+    motor.realizar_movimiento(Posicion(0, 0))  # Rojo
+    estado = motor.obtener_estado_actual()
+
+    avisos = []
+    canal = CanalProgreso(al_publicar=lambda: avisos.append(canal.ultimo().profundidad))
+    canal.reiniciar(estado.clave())
+    assert canal.ultimo() is None
+    estrategia = EstrategiaMinimax(AZUL, profundidad=3, callback_progreso=canal.publicar)
+    movimiento = estrategia.seleccionar_movimiento(motor)
+
+    progreso = canal.ultimo()
+    assert avisos == [1, 2, 3]
+    assert progreso.clave == estado.clave()
+    assert set(progreso.valores) == set(motor.obtener_movimientos_validos(AZUL))
+    assert progreso.mejor_movimiento == movimiento
+    assert progreso.valores[movimiento] == max(progreso.valores.values())
+
+    # Sin nadie escuchando no se arma el mapa de valores
+    sin_canal = EstrategiaMinimax(AZUL, profundidad=2)
+    sin_canal.seleccionar_movimiento(motor)
+    assert sin_canal.ultimas_estadisticas.valores_raiz is None
+
+
+def test_minimax_no_imprime_sin_logger(capsys):
+    """La salida de depuración va al logger, no a stdout"""
+    motor = MotorJuego()
+    motor.inicializar_juego(ROJO)
+    EstrategiaMinimax(ROJO, profundidad=2).seleccionar_movimiento(motor)
+
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("profundidad", [1, 2, 3])
+def test_minimax_juega_partida_completa(profundidad):
+    """Dos Minimax juegan hasta el final sin movimientos inválidos"""
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    estrategias = {
+        AZUL: EstrategiaMinimax(AZUL, profundidad=profundidad),
+        ROJO: EstrategiaMinimax(ROJO, profundidad=profundidad),
+    }
+
+    while not motor.juego_terminado:
+        turno = motor.obtener_estado_actual().turno
+        movimiento = estrategias[turno].seleccionar_movimiento(motor)
+        assert movimiento is not None
+        assert motor.realizar_movimiento(movimiento).es_valido
+
+    assert motor.ganador in (AZUL, ROJO, None)
+
+
+def test_evaluacion_por_lotes_coincide_con_evaluador():
+    """evaluar_lote y evaluar_jugadas_lote dan lo mismo que FuncionEvaluadora"""
+    rng = random.Random(7)
+    estados = []
+    for tamano, envolvente in [(7, True), (5, False), (9, True)] * 10:
+        motor = MotorJuego(tamano, envolvente)
+        motor.inicializar_juego(rng.choice([AZUL, ROJO]))
+        for _ in range(rng.randrange(12)):
+            opciones = motor.obtener_movimientos_validos(motor.obtener_estado_actual().turno)
+            if motor.juego_terminado or not opciones:
+                break
+            motor.realizar_movimiento(rng.choice(opciones))
+        estados.append(motor.obtener_estado_actual())
+
+    evaluador = FuncionEvaluadora()
+    motor = MotorJuego()
+    assert list(evaluar_lote(estados)) == [evaluador.evaluar_estado(e, motor) for e in estados]
+
+    jugadas = [GestorEstado.obtener_movimientos_validos(e, e.turno) for e in estados]
+    for estado, movimientos, valores in zip(estados, jugadas, evaluar_jugadas_lote(estados, jugadas)):
+        esperados = [
+            evaluador.evaluar_estado(GestorEstado.aplicar_movimiento(estado, m).nuevo_estado, motor)
+            for m in movimientos
+        ]
+        assert list(valores) == esperados
+
+
+def test_minimax_respeta_orden_de_detenerse():
+    """Con la orden activada se devuelve lo de la última iteración completa"""
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    detener = threading.Event()
+    detener.set()
+
+    movimiento, estadisticas = EstrategiaMinimax(AZUL).buscar(motor, detener=detener)
+
+    # El evento se comprueba cada NODOS_ENTRE_COMPROBACIONES nodos
+    assert estadisticas.interrumpida
+    assert 1 <= estadisticas.profundidad_alcanzada < motor.obtener_estado_actual().tamano ** 2
+    assert movimiento == estadisticas.mejor_movimiento
+    assert movimiento in motor.obtener_movimientos_validos(AZUL)
+
+
+def test_minimax_con_tiempo_limite():
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    motor.realizar_movimiento(Posicion(3, 3))
+    motor.realizar_movimiento(Posicion(0, 0))
+
+    inicio = time.perf_counter()
+    movimiento, estadisticas = EstrategiaMinimax(AZUL).buscar(motor, tiempo_limite=0.1)
+
+    assert time.perf_counter() - inicio < 0.5
+    assert movimiento in motor.obtener_movimientos_validos(AZUL)
+    assert estadisticas.profundidad_alcanzada > 3
+
+
+def test_cache_persistente_entre_busquedas(tmp_path):
+    """Una segunda estrategia (otra "partida") reutiliza la raíz guardada"""
+    ruta = str(tmp_path / "cache.db")
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    motor.realizar_movimiento(Posicion(3, 3))
+
+    with CachePersistente(ruta) as cache:
+        primero, _ = EstrategiaMinimax(ROJO, profundidad=3, cache=cache).buscar(motor)
+    with CachePersistente(ruta) as cache:
+        assert len(cache) > 0
+        segundo, estadisticas = EstrategiaMinimax(ROJO, profundidad=3, cache=cache).buscar(motor)
+
+    assert segundo == primero
+    assert estadisticas.aciertos_cache_persistente > 0
+    assert estadisticas.nodos == 0
+
+
+def test_cache_persistente_desaloja_las_menos_profundas(tmp_path):
+    with CachePersistente(str(tmp_path / "cache.db"), max_entradas=3) as cache:
+        for i in range(5):
+            cache.guardar(bytes([i]), 2 + i, float(i), 0, i)
+        cache.guardar(bytes([4]), 3, 0.0, 0, 0)  # Menos profunda: se ignora
+        cache.volcar()
+        assert len(cache) == 3
+        assert cache.obtener(bytes([0])) is None
+        assert cache.obtener(bytes([4])) == (6, 4.0, 0, 4)
+
+
+def test_cache_persistente_ve_escrituras_de_otra_conexion(tmp_path):
+    """Dos procesos sobre el mismo archivo: lo que vuelca uno lo lee el otro"""
+    ruta = str(tmp_path / "cache.db")
+    with CachePersistente(ruta) as escritor, CachePersistente(ruta) as lector:
+        assert lector.obtener(b"\x01") is None
+        escritor.guardar(b"\x01", 4, 1.5, 0, 7)
+        escritor.volcar()
+        assert lector.obtener(b"\x01") == (4, 1.5, 0, 7)
+        assert lector.lecturas_disco == 1
+
+def _final_aleatorio(tamano: int, vacias: int, semilla: int):
+    """Motor de una partida aleatoria con `vacias` casillas libres, o None"""
+    rng = random.Random(semilla)
+    motor = MotorJuego(tamano)
+    motor.inicializar_juego(rng.choice((AZUL, ROJO)))
+    while not motor.juego_terminado:
+        estado = motor.obtener_estado_actual()
+        if estado.celdas.count(0) <= vacias:
+            return motor
+        motor.realizar_movimiento(rng.choice(motor.obtener_movimientos_validos(estado.turno)))
+    return None
+
+
+def test_tabla_finales_coincide_con_busqueda_completa(tmp_path):
+    directorio = str(tmp_path / "finales")
+    generar_tabla_finales(directorio, 3, tamano=5, procesos=1)
+    niveles = generar_tabla_finales(directorio, 5, tamano=5, procesos=1, tamano_bloque=50)
+    assert [n.reanudado for n in niveles] == [True] * 4 + [False] * 2
+
+    comprobadas = 0
+    with TablaFinales(directorio, tamano=5) as tabla:
+        for semilla in range(60):
+            motor = _final_aleatorio(5, 5, semilla)
+            if motor is None:
+                continue
+            estado = motor.obtener_estado_actual()
+            final = tabla.consultar(estado, estado.turno)
+            vacias = estado.celdas.count(0)
+            valor, _ = EstrategiaMinimax(estado.turno).minimax(estado, vacias, True, motor)
+            esperado = GANA if valor >= VICTORIA else PIERDE if valor <= -VICTORIA else EMPATE
+            assert final.resultado == esperado
+            if esperado != EMPATE:
+                # Minimax suma las jugadas que sobran al llegar al final
+                assert final.distancia == vacias - (abs(valor) - VICTORIA)
+            comprobadas += 1
+    assert comprobadas > 20
+
+
+
+def test_tabla_finales_descarta_bloques_de_otra_particion(tmp_path):
+    """Reanudar con otro tamano_bloque no mezcla bloques de las dos particiones"""
+    referencia = str(tmp_path / "referencia")
+    generar_tabla_finales(referencia, 4, tamano=5, procesos=1)
+
+    directorio = str(tmp_path / "finales")
+    generar_tabla_finales(directorio, 3, tamano=5, procesos=1)
+    # Bloques de una ejecución interrumpida con otra partición
+    for indice in range(3):
+        ruta = os.path.join(directorio, f"nivel_04.bloque_{indice:05d}")
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"\xff" * 100)
+    niveles = generar_tabla_finales(directorio, 4, tamano=5, procesos=1, tamano_bloque=50)
+
+    assert not niveles[-1].reanudado
+    assert sorted(os.listdir(directorio)) == sorted(os.listdir(referencia))
+    with open(os.path.join(directorio, "nivel_04.bin"), "rb") as generado, \
+            open(os.path.join(referencia, "nivel_04.bin"), "rb") as esperado:
+        assert generado.read() == esperado.read()
+
+def test_minimax_consulta_tabla_finales(tmp_path):
+    directorio = str(tmp_path / "finales")
+    generar_tabla_finales(directorio, 4, tamano=5, procesos=1)
+    motor = next(
+        m for m in (_final_aleatorio(5, 5, s) for s in range(100))
+        if m is not None and len(m.obtener_movimientos_validos(m.estado_actual.turno)) > 1
+    )
+    jugador = motor.obtener_estado_actual().turno
+
+    with TablaFinales(directorio, tamano=5) as tabla:
+        estrategia = EstrategiaMinimax(jugador, profundidad=5, finales=tabla)
+        _, estadisticas = estrategia.buscar(motor)
+    _, referencia = EstrategiaMinimax(jugador, profundidad=5).buscar(motor)
+
+    assert estadisticas.aciertos_finales > 0
+    assert estadisticas.nodos < referencia.nodos
+    assert estadisticas.mejor_valor == referencia.mejor_valor
+
+
+def test_extensiones_forzadas_conservan_el_valor_exacto():
+    extendidas = 0
+    for semilla in range(40):
+        motor = _final_aleatorio(5, 10, semilla)
+        if motor is None:
+            continue
+        estado = motor.obtener_estado_actual()
+        vacias = estado.celdas.count(0)
+        valores = []
+        for extender in (False, True):
+            estrategia = EstrategiaMinimax(estado.turno, extender_forzadas=extender)
+            estrategia._estadisticas = EstadisticasBusqueda()
+            valor, _ = estrategia.minimax(estado, vacias, True, motor)
+            valores.append(valor)
+        # Incluida la distancia al final: las jugadas forzadas se descuentan
+        assert valores[0] == valores[1]
+        extendidas += estrategia._estadisticas.extensiones > 0
+    assert extendidas > 5
+
+
+def test_solucionador_coincide_con_minimax_completo():
+    """Sin simetrías y con la tabla desbordando a disco da lo mismo"""
+    with Solucionador(4) as solucionador, Solucionador(
+        4, reducir_simetrias=False, max_memoria=100
+    ) as sin_reducir:
+        for semilla in range(15):
+            motor = _final_aleatorio(4, 10, semilla)
+            if motor is None:
+                continue
+            estado = motor.obtener_estado_actual()
+            vacias = estado.celdas.count(0)
+            valor, _ = EstrategiaMinimax(estado.turno).minimax(estado, vacias, True, motor)
+            esperado = (valor >= VICTORIA) - (valor <= -VICTORIA)
+            assert solucionador.valor_estado(estado, estado.turno) == esperado
+            assert sin_reducir.valor_estado(estado, estado.turno) == esperado
+        assert sin_reducir.tabla.desbordes > 0
+
+
+def test_solucionador_guarda_resultado(tmp_path):
+    ruta = str(tmp_path / "soluciones.db")
+    with Solucionador(4, envolvente=False, ruta=ruta) as solucionador:
+        resultado = solucionador.resolver()
+    assert resultado.valor == -1  # En 4x4 pierde quien empieza
+    assert len(resultado.mejores) == 16
+
+    # La segunda vez todas las posiciones salen de la base
+    with Solucionador(4, envolvente=False, ruta=ruta) as solucionador:
+        assert solucionador.resolver().posiciones == 0
+    with sqlite3.connect(ruta) as conexion:
+        assert conexion.execute("SELECT valor FROM soluciones").fetchall() == [(-1,)]
+
+
+def test_numeros_prueba_coincide_con_solucionador():
+    """Los resultados demostrados son exactos y la jugada ganadora gana"""
+    topologia = MotorJuego(4).topologia
+    busqueda = BusquedaNumerosPrueba(topologia, max_nodos=50_000, tamano_tabla=2_000)
+    with Solucionador(4) as solucionador:
+        for semilla in range(40):
+            motor = _final_aleatorio(4, 4 + semilla % 10, semilla)
+            if motor is None:
+                continue
+            estado = motor.obtener_estado_actual()
+            resultado = busqueda.resolver(estado, estado.turno)
+            assert resultado.resultado == solucionador.valor_estado(estado, estado.turno)
+            if resultado.movimiento is not None:
+                motor.realizar_movimiento(resultado.movimiento)
+                siguiente = motor.obtener_estado_actual()
+                assert motor.juego_terminado or (
+                    solucionador.valor_estado(siguiente, siguiente.turno) == -1
+                )
+    # La tabla se mantuvo acotada recolectando entradas
+    assert len(busqueda.tabla) <= 2_000
+
+
+def test_numeros_prueba_respeta_presupuesto():
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    busqueda = BusquedaNumerosPrueba(motor.topologia, max_nodos=500)
+    resultado = busqueda.resolver(motor.obtener_estado_actual(), AZUL)
+    assert resultado.resultado is None
+    assert resultado.nodos <= 501
+
+
+def test_numeros_prueba_recupera_jugada_de_hijo_descartado():
+    """Raíz demostrada en la tabla sin sus hijos: la jugada se vuelve a demostrar"""
+    for semilla in range(60):
+        motor = _final_aleatorio(5, 10, semilla)
+        if motor is None:
+            continue
+        estado = motor.obtener_estado_actual()
+        busqueda = BusquedaNumerosPrueba(motor.topologia, max_nodos=50_000)
+        primera = busqueda.resolver(estado, estado.turno, solo_victoria=True)
+        if primera.resultado == GANA_PRUEBA:
+            break
+    else:
+        pytest.fail("Ninguna victoria demostrada")
+
+    # Lo que dejaría una recolección: solo la entrada que más costó, la raíz
+    busqueda.tabla = dict([max(busqueda.tabla.items(), key=lambda item: item[1][2])])
+    segunda = busqueda.resolver(estado, estado.turno, solo_victoria=True)
+    assert segunda.resultado == GANA_PRUEBA
+    motor.realizar_movimiento(segunda.movimiento)
+    siguiente = motor.obtener_estado_actual()
+    if not motor.juego_terminado:
+        rival = BusquedaNumerosPrueba(motor.topologia, max_nodos=100_000)
+        assert rival.resolver(siguiente, siguiente.turno).resultado == -1
+
+def test_estrategia_pruebas_juega_victoria_demostrada():
+    for semilla in range(50):
+        motor = _final_aleatorio(7, 20, semilla)
+        if motor is None:
+            continue
+        jugador = motor.obtener_estado_actual().turno
+        estrategia = EstrategiaPruebas(jugador, max_nodos=100_000)
+        movimiento = estrategia.seleccionar_movimiento(motor)
+        if estrategia.ultimas_estadisticas.victoria_demostrada:
+            break
+    else:
+        pytest.fail("Ninguna victoria demostrada")
+
+    assert estrategia.ultimas_estadisticas.nodos_prueba > 0
+    motor.realizar_movimiento(movimiento)
+    siguiente = motor.obtener_estado_actual()
+    if not motor.juego_terminado:
+        rival = BusquedaNumerosPrueba(motor.topologia, max_nodos=100_000)
+        assert rival.resolver(siguiente, siguiente.turno).resultado == -1
+
+
+def test_seleccionar_movimiento_se_corta_con_detener():
+    """Un turno abandonado (partida reiniciada) deja de buscar enseguida"""
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    motor.realizar_movimiento(Posicion(3, 3))
+
+    minimax = EstrategiaMinimax(ROJO, profundidad=4)
+    assert minimax.seleccionar_movimiento(motor, threading.Event()) is not None
+    assert minimax.ultimas_estadisticas.profundidad_alcanzada == 4
+
+    detenido = threading.Event()
+    detenido.set()
+    for estrategia in (
+        EstrategiaMinimax(ROJO, profundidad=30),
+        EstrategiaPruebas(ROJO, max_vacias=0, respaldo=EstrategiaMinimax(ROJO, profundidad=30)),
+        EstrategiaMCTS(ROJO, milisegundos=60_000),
+    ):
+        inicio = time.perf_counter()
+        estrategia.seleccionar_movimiento(motor, detenido)
+        assert time.perf_counter() - inicio < 1.0
+
+def test_factoria_maestro_usa_mcts():
+    estrategia = FactoriaEstrategias.crear_estrategia(Dificultad.MAESTRO, AZUL)
+    assert isinstance(estrategia, EstrategiaMCTS)
+
+
+def _victorias_inmediatas(motor):
+    estado = motor.obtener_estado_actual()
+    rival = ROJO if estado.turno == AZUL else AZUL
+    return [
+        m for m in motor.obtener_movimientos_validos(estado.turno)
+        if not GestorEstado.obtener_movimientos_validos(
+            GestorEstado.aplicar_movimiento(estado, m).nuevo_estado, rival
+        )
+    ]
+
+
+def test_mcts_juega_victoria_inmediata():
+    for semilla in range(200):
+        motor = _final_aleatorio(7, 20, semilla)
+        if motor is None:
+            continue
+        jugador = motor.obtener_estado_actual().turno
+        victorias = _victorias_inmediatas(motor)
+        if len(victorias) == 1 and len(motor.obtener_movimientos_validos(jugador)) > 2:
+            break
+    else:
+        raise AssertionError("ninguna partida con una sola victoria inmediata")
+
+    estrategia = EstrategiaMCTS(jugador, simulaciones=2000, semilla=0)
+    movimiento, estadisticas = estrategia.buscar(motor)
+    assert movimiento == victorias[0]
+    assert estadisticas.simulaciones == 2000
+
+
+def test_mcts_reutiliza_arbol_entre_turnos():
+    motor = _final_aleatorio(7, 30, semilla=3)
+    jugador = motor.obtener_estado_actual().turno
+    estrategia = EstrategiaMCTS(jugador, simulaciones=1500, semilla=1)
+
+    movimiento, primera = estrategia.buscar(motor)
+    assert primera.simulaciones_reutilizadas == 0
+    assert primera.simulaciones_por_segundo > 0
+    motor.realizar_movimiento(movimiento)
+    respuesta = motor.obtener_movimientos_validos(ROJO if jugador == AZUL else AZUL)[0]
+    motor.realizar_movimiento(respuesta)
+
+    _, segunda = estrategia.buscar(motor)
+    assert segunda.simulaciones_reutilizadas > 0
+
+
+def test_tabla_compartida_guarda_y_detecta_colisiones():
+    with TablaCompartida(entradas=4) as tabla:
+        assert tabla.entradas == 4
+        tabla.guardar(0b100, 5, -3.5, 1, 17)
+        assert tabla.obtener(0b100) == (5, -3.5, 1, 17)
+        # Misma cubeta, otra clave: la entrada profunda se conserva
+        tabla.guardar(0b110, 2, 1.0, 0, -1)
+        assert tabla.obtener(0b100) == (5, -3.5, 1, 17)
+        assert tabla.obtener(0b110) == (2, 1.0, 0, -1)
+        assert tabla.obtener(0b1000) is None
+        assert tabla.colisiones == 1
+        assert tabla.aciertos_ajenos == 0
+
+
+
+def test_tabla_compartida_conserva_la_busqueda_mas_profunda_de_la_misma_clave():
+    with TablaCompartida(entradas=4) as tabla:
+        tabla.guardar(0b100, 10, 2.0, 0, 3)
+        tabla.guardar(0b100, 2, -1.0, 1, 5)  # Va a la entrada de reemplazo
+        assert tabla.obtener(0b100) == (10, 2.0, 0, 3)
+        tabla.guardar(0b100, 12, 4.0, 0, 6)
+        assert tabla.obtener(0b100) == (12, 4.0, 0, 6)
+
+def _buscar_con_tabla_compartida(nombre: str) -> int:
+    tabla = TablaCompartida.abrir(nombre)
+    motor = _final_aleatorio(7, 35, semilla=5)
+    EstrategiaMinimax(motor.obtener_estado_actual().turno, profundidad=4,
+                      compartida=tabla).buscar(motor)
+    escrituras = tabla.escrituras
+    tabla.cerrar()
+    return escrituras
+
+
+def test_tabla_compartida_entre_procesos():
+    with TablaCompartida(entradas=1 << 14) as tabla:
+        with ProcessPoolExecutor(1) as ejecutor:
+            assert ejecutor.submit(_buscar_con_tabla_compartida, tabla.nombre).result() > 0
+
+        motor = _final_aleatorio(7, 35, semilla=5)
+        jugador = motor.obtener_estado_actual().turno
+        movimiento, estadisticas = EstrategiaMinimax(
+            jugador, profundidad=4, compartida=tabla
+        ).buscar(motor)
+        referencia, sola = EstrategiaMinimax(jugador, profundidad=4).buscar(motor)
+
+        assert estadisticas.aciertos_compartida > 0
+        assert tabla.aciertos_ajenos == tabla.aciertos
+        assert estadisticas.mejor_valor == sola.mejor_valor
+        assert estadisticas.nodos < sola.nodos
+
+
+def test_analisis_multipv_coincide_con_busqueda_por_jugada():
+    motor = next(
+        m for m in (_final_aleatorio(7, 38, s) for s in range(200))
+        if m is not None and len(m.obtener_movimientos_validos(m.estado_actual.turno)) >= 3
+    )
+    estado = motor.obtener_estado_actual()
+    jugador = estado.turno
+    exactos = {}
+    for movimiento in motor.obtener_movimientos_validos(jugador):
+        estrategia = EstrategiaMinimax(jugador)
+        estrategia._estadisticas = EstadisticasBusqueda()
+        hijo = motor.simular_movimiento(estado, movimiento, jugador)
+        exactos[movimiento], _ = estrategia.minimax(
+            hijo, 3, False, motor, float("-inf"), float("inf")
+        )
+
+    lineas = analizar_estado(estado, k=3, profundidad=4)
+
+    assert len(lineas) == 3
+    assert [linea.valor for linea in lineas] == sorted(exactos.values(), reverse=True)[:3]
+    assert all(exactos[linea.movimiento] == linea.valor for linea in lineas)
+    assert len({linea.movimiento for linea in lineas}) == 3
+    for linea in lineas:
+        # La variación es una secuencia de jugadas legales desde la raíz
+        assert linea.variacion[0] == linea.movimiento
+        actual, turno = estado, jugador
+        for movimiento in linea.variacion:
+            assert movimiento in GestorEstado.obtener_movimientos_validos(actual, turno)
+            actual = motor.simular_movimiento(actual, movimiento, turno)
+            turno = ROJO if turno == AZUL else AZUL
+    assert motor.obtener_estado_actual() is estado
+
+
+def test_calibracion_presupuesto_por_latencia():
+    """En una máquina lenta el presupuesto lo fija la latencia; en una rápida, el objetivo"""
+    lenta = calibracion.Calibracion(4_000, 1_000, calibracion.huella_maquina(), 0.0)
+    rapida = calibracion.Calibracion(10_000_000, 10_000_000, calibracion.huella_maquina(), 0.0)
+    experto = calibracion.PRESUPUESTOS[Dificultad.EXPERTO]
+
+    assert lenta.presupuesto(Dificultad.EXPERTO) == int(4_000 * experto.latencia)
+    assert rapida.presupuesto(Dificultad.EXPERTO) == experto.trabajo
+    assert calibracion.Calibracion(1, 1, "", 0.0).presupuesto(Dificultad.MAESTRO) == (
+        calibracion.PRESUPUESTOS[Dificultad.MAESTRO].minimo
+    )
+
+    minimax = FactoriaEstrategias.crear_estrategia(Dificultad.EXPERTO, AZUL, calibracion=lenta)
+    assert minimax.max_nodos == 1_000
+    mcts = FactoriaEstrategias.crear_estrategia(Dificultad.MAESTRO, AZUL, calibracion=lenta)
+    assert mcts.simulaciones == 1_000
+    assert FactoriaEstrategias.crear_estrategia(Dificultad.EXPERTO, AZUL).max_nodos is None
+
+
+def test_calibracion_se_guarda_por_maquina(tmp_path):
+    ruta = str(tmp_path / "calibracion.json")
+    medida = calibracion.calibrar(segundos=0.05)
+    assert medida.nodos_por_segundo > 0 and medida.simulaciones_por_segundo > 0
+
+    calibracion.guardar_calibracion(medida, ruta)
+    assert calibracion.obtener_calibracion(ruta) == medida
+    # Otra máquina (u otra versión de la búsqueda): se vuelve a medir
+    calibracion.guardar_calibracion(medida._replace(huella="otra"), ruta)
+    assert calibracion.cargar_calibracion(ruta) is None
+    assert calibracion.obtener_calibracion(ruta).huella == calibracion.huella_maquina()
+
+
+# Arranque sin ventana: core, ai y main (sin pygame) según -X importtime.
+# En la máquina de referencia son unos 50 ms (factoría) y 100 ms (main)
+PRESUPUESTO_IMPORTACION_MS = 300
+
+
+def _importar(codigo):
+    """Módulos importados por `codigo` en un intérprete nuevo y ms de los de nivel superior"""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=raiz, capture_output=True, text=True, check=True,
+    ).stderr
+    modulos = set()
+    milisegundos = 0.0
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        modulos.add(nombre.strip())
+        if nombre.strip().split(".")[0] in ("core", "ai", "main") and nombre[1] != " ":
+            milisegundos += int(acumulado) / 1000
+    return modulos, milisegundos
+
+
+@pytest.mark.parametrize("codigo", ["from ai import FactoriaEstrategias", "import main"])
+def test_importacion_sin_pygame_y_en_presupuesto(codigo):
+    """Ni core ni ai importan pygame; las búsquedas pesadas se cargan al usarlas"""
+    modulos, _ = _importar(codigo)
+    assert "pygame" not in modulos and "numpy" not in modulos
+    assert not {"ai.mcts", "ai.numeros_prueba", "ai.solucionador", "sqlite3"} & modulos
+    # El menor de tres arranques, para no medir ruido de la máquina
+    assert min(_importar(codigo)[1] for _ in range(3)) < PRESUPUESTO_IMPORTACION_MS
+
+
+def test_paquetes_cargan_nombres_al_primer_uso():
+    modulos, _ = _importar("import core, ai")
+    assert "core.juego" not in modulos and "ai.estrategias" not in modulos
+
+    import ai
+    assert ai.EstrategiaMinimax is EstrategiaMinimax
+    assert "FactoriaEstrategias" in dir(ai)
+    with pytest.raises(AttributeError):
+        ai.NoExiste
+
+
+def test_pvs_y_aspiracion_conservan_el_valor_con_menos_nodos():
+    """PVS y aspiración no cambian el valor de alfa-beta; las reducciones ahorran más"""
+    from herramientas.benchmark import MEJORAS_PODA, _partida_aleatoria
+
+    nodos = dict.fromkeys(MEJORAS_PODA, 0)
+    for semilla in (1, 3, 5):
+        motor = _partida_aleatoria(14, semilla)
+        jugador = motor.obtener_estado_actual().turno
+        valores = {}
+        for nombre, mejoras in MEJORAS_PODA.items():
+            estrategia = EstrategiaMinimax(jugador, profundidad=10, **mejoras)
+            _, estadisticas = estrategia.buscar(motor)
+            valores[nombre] = estadisticas.mejor_valor
+            nodos[nombre] += estadisticas.nodos
+        assert valores["pvs"] == valores["aspiracion"] == valores["alfa-beta"]
+
+    assert nodos["pvs"] <= nodos["alfa-beta"]
+    assert nodos["aspiracion"] <= nodos["alfa-beta"]
+    assert nodos["todas"] < nodos["reducciones"] < nodos["alfa-beta"]
@@ -1,6 +1,22 @@
 import pytest
-from core.interfaces import TABLERO_TAMANO, AZUL, ROJO, VACIO, Posicion
+from core.interfaces import (
+    TABLERO_TAMANO,
+    AZUL,
+    ROJO,
+    VACIO,
+    Posicion,
+    obtener_topologia,
+    obtener_simetrias,
+)
 from core.juego import MotorJuego
+from core.compacto import MotorCompacto
+from core.serializacion import (
+    TAMANO_MAXIMO,
+    codificar_estado,
+    decodificar_estado,
+    estado_a_texto,
+    estado_desde_texto,
+)
 
 
 def test_inicializacion_motor():
@@ -149,3 +165,172 @@ def test_movimientos_validos():
     assert len(movimientos_azul) == 4
     for pos in expected_positions:
         assert pos in movimientos_azul
+
+
+def test_codificacion_compacta_ida_y_vuelta():
+    """codificar/decodificar conserva tablero, cabezas y turno"""
+    juego = MotorJuego()
+    juego.inicializar_juego(AZUL)
+    for pos in [Posicion(3, 3), Posicion(0, 0), Posicion(3, 4), Posicion(6, 0)]:
+        assert juego.realizar_movimiento(pos).es_valido
+    estado = juego.obtener_estado_actual()
+
+    codigo = codificar_estado(estado)
+    assert len(codigo) <= 16
+
+    decodificado = decodificar_estado(codigo)
+    assert decodificado.tablero == estado.tablero
+    assert decodificado.cabeza_azul == Posicion(3, 4)
+    assert decodificado.cabeza_roja == Posicion(6, 0)
+    assert decodificado.turno == estado.turno
+    assert codificar_estado(decodificado) == codigo
+
+
+def test_codificacion_estado_inicial():
+    """Sin cabezas y con turno rojo también se codifica sin pérdidas"""
+    juego = MotorJuego()
+    juego.inicializar_juego(ROJO)
+    estado = juego.obtener_estado_actual()
+
+    decodificado = decodificar_estado(codificar_estado(estado))
+    assert decodificado.cabeza_azul is None
+    assert decodificado.cabeza_roja is None
+    assert decodificado.turno == ROJO
+
+
+def test_notacion_texto():
+    """La notación de texto distingue cabezas y cuerpo"""
+    estado = estado_desde_texto("7/7/1aA4/7/7/5Rr/7 R")
+
+    assert estado.tablero[2][1] == AZUL
+    assert estado.cabeza_azul == Posicion(2, 2)
+    assert estado.cabeza_roja == Posicion(5, 5)
+    assert estado.tablero[5][6] == ROJO
+    assert estado.turno == ROJO
+    assert estado_a_texto(estado) == "7/7/1aA4/7/7/5Rr/7 R"
+
+    with pytest.raises(ValueError):
+        estado_desde_texto("7/7/1x5/7/7/7/7 A")
+
+
+def test_copiar_comparte_historial_y_aisla_tablero():
+    """La copia comparte el historial previo pero no el tablero"""
+    juego = MotorJuego()
+    juego.inicializar_juego(AZUL)
+    juego.realizar_movimiento(Posicion(3, 3))  # Azul
+    juego.realizar_movimiento(Posicion(0, 0))  # Rojo
+    estado = juego.obtener_estado_actual()
+
+    copia = estado.copiar()
+    copia.tablero[3][4] = AZUL
+    copia.agregar_movimiento(Posicion(4, 3), AZUL)
+
+    assert estado.tablero[3][4] == VACIO
+    assert estado.historial_azul == [Posicion(3, 3)]
+    assert copia.historial_azul == [Posicion(3, 3), Posicion(4, 3)]
+    assert copia.cabeza_azul == Posicion(4, 3)
+    assert estado.cabeza_azul == Posicion(3, 3)
+
+
+def test_estado_compacto_con_slots():
+    """EstadoJuego no tiene __dict__ y su tablero es un bytearray plano"""
+    estado = MotorJuego()
+    estado.inicializar_juego(AZUL)
+    estado = estado.obtener_estado_actual()
+
+    assert not hasattr(estado, "__dict__")
+    assert len(estado.celdas) == TABLERO_TAMANO * TABLERO_TAMANO
+    assert estado.fichas_colocadas() == 0
+
+
+def test_tablero_acotado_sin_wraparound():
+    """Sin wraparound, desde el borde no se salta al lado opuesto"""
+    juego = MotorJuego(envolvente=False)
+    juego.inicializar_juego(AZUL)
+    juego.realizar_movimiento(Posicion(0, 0))  # Azul en la esquina
+    juego.realizar_movimiento(Posicion(3, 3))  # Rojo
+
+    movimientos = juego.obtener_movimientos_validos(AZUL)
+    assert set(movimientos) == {Posicion(1, 0), Posicion(0, 1)}
+    assert not juego.realizar_movimiento(Posicion(TABLERO_TAMANO - 1, 0)).es_valido
+
+
+@pytest.mark.parametrize("tamano", [9, 11])
+def test_tableros_de_otros_tamanos(tamano):
+    """El motor admite otros lados, con wraparound por defecto"""
+    juego = MotorJuego(tamano)
+    juego.inicializar_juego(AZUL)
+    assert len(juego.obtener_movimientos_validos(AZUL)) == tamano * tamano
+
+    juego.realizar_movimiento(Posicion(tamano - 1, 0))  # Azul
+    juego.realizar_movimiento(Posicion(4, 4))  # Rojo
+    assert Posicion(0, 0) in juego.obtener_movimientos_validos(AZUL)
+    assert juego.realizar_movimiento(Posicion(tamano - 1, tamano - 1)).es_valido
+
+
+def test_topologia_compartida_entre_estados():
+    """Las tablas de vecinos se calculan una vez y las comparten las copias"""
+    juego = MotorJuego(9, envolvente=False)
+    juego.inicializar_juego(AZUL)
+    estado = juego.obtener_estado_actual()
+
+    assert estado.topologia is obtener_topologia(9, False)
+    assert estado.copiar().topologia is estado.topologia
+    assert MotorJuego(9, envolvente=False).topologia is estado.topologia
+
+
+def test_serializacion_conserva_topologia():
+    juego = MotorJuego(9, envolvente=False)
+    juego.inicializar_juego(ROJO)
+    juego.realizar_movimiento(Posicion(8, 8))  # Rojo
+    juego.realizar_movimiento(Posicion(0, 0))  # Azul
+    estado = juego.obtener_estado_actual()
+
+    decodificado = decodificar_estado(codificar_estado(estado))
+    assert decodificado.topologia is estado.topologia
+    assert decodificado.clave() == estado.clave()
+
+    texto = estado_a_texto(estado)
+    assert texto.endswith(" acotado")
+    assert estado_desde_texto(texto).clave() == estado.clave()
+
+
+def test_codificacion_rechaza_tableros_sin_lugar_en_la_cabecera():
+    """Un lado mayor que 127 pisaría el bit de tablero acotado"""
+    juego = MotorJuego(TAMANO_MAXIMO + 1)
+    juego.inicializar_juego(AZUL)
+    with pytest.raises(ValueError, match="hasta 127x127"):
+        codificar_estado(juego.obtener_estado_actual())
+
+
+@pytest.mark.parametrize("envolvente, cantidad", [(True, 8 * 49), (False, 8)])
+def test_simetrias_conservan_vecinos(envolvente, cantidad):
+    topologia = obtener_topologia(7, envolvente)
+    simetrias = obtener_simetrias(topologia)
+    assert len(set(simetrias)) == cantidad
+    assert simetrias[0] == tuple(range(topologia.celdas))
+    for permutacion in simetrias:
+        for casilla, vecinos in enumerate(topologia.vecinos):
+            assert sorted(permutacion[v] for v in vecinos) == sorted(
+                topologia.vecinos[permutacion[casilla]]
+            )
+
+
+def test_motor_compacto_jugar_y_deshacer():
+    """El motor compacto parte de un EstadoJuego y deshace en el lugar"""
+    juego = MotorJuego(envolvente=False)
+    juego.inicializar_juego(AZUL)
+    juego.realizar_movimiento(Posicion(0, 0))  # Azul
+    juego.realizar_movimiento(Posicion(3, 3))  # Rojo
+    estado = juego.obtener_estado_actual()
+
+    motor = MotorCompacto.desde_estado(estado)
+    assert bytes(motor.celdas()) == bytes(estado.celdas)
+    assert motor.jugadas() == (1 << 1) | (1 << TABLERO_TAMANO)
+    assert motor.jugar(TABLERO_TAMANO - 1) is None  # Sin wraparound no es vecina
+
+    deshacer = motor.jugar(1)
+    assert motor.turno == 1 and motor.cabezas[0] == 1
+    motor.deshacer(deshacer)
+    assert bytes(motor.celdas()) == bytes(estado.celdas)
+    assert motor.cabezas == [0, 3 * TABLERO_TAMANO + 3] and motor.turno == 0
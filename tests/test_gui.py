@@ -0,0 +1,161 @@
+import os
+import queue
+import threading
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pytest.importorskip("pygame")
+
+import pygame
+
+from core.interfaces import AZUL, ROJO, Dificultad, Posicion
+from core.juego import MotorJuego
+from ai.estadisticas import EstadisticasBusqueda, ProgresoBusqueda
+from gui import espectador
+from gui.interfaz import (
+    BOARD_OFFSET_X,
+    BOARD_OFFSET_Y,
+    BOARD_SIZE_PX,
+    MetricasFotograma,
+    COLORS,
+    PantallaEspectador,
+    PantallaJuego,
+)
+
+
+def test_metricas_fotograma_promedia_tiempos():
+    """El tiempo por fotograma es el promedio de los fotogramas registrados"""
+    metricas = MetricasFotograma(ventana=4)
+    assert metricas.tiempo_fotograma_ms == 0.0
+    assert metricas.uso_cpu == 0.0
+
+    metricas.registrar(0.002, dibujado=True)
+    metricas.registrar(0.004, dibujado=False)
+
+    assert metricas.tiempo_fotograma_ms == pytest.approx(3.0)
+    assert metricas.fotogramas == 2
+    assert metricas.fotogramas_dibujados == 1
+
+
+def test_metricas_fotograma_ventana_deslizante():
+    """Solo se conservan los últimos fotogramas de la ventana"""
+    metricas = MetricasFotograma(ventana=2)
+    for duracion in (1.0, 0.001, 0.003):
+        metricas.registrar(duracion, dibujado=True)
+
+    assert metricas.tiempo_fotograma_ms == pytest.approx(2.0)
+    resumen = metricas.resumen()
+    assert resumen["fotogramas"] == 3
+    assert 0.0 <= resumen["uso_cpu"]
+
+
+def test_casillas_se_ajustan_al_tamano_del_tablero():
+    """En tableros más grandes el área es la misma y las casillas se achican"""
+    pantalla = PantallaJuego(None)
+    pantalla.tamano_tablero = 11
+    celda = pantalla.tamano_casilla
+
+    assert celda == BOARD_SIZE_PX // 11
+    esquina = (BOARD_OFFSET_X + 10 * celda + 1, BOARD_OFFSET_Y + 10 * celda + 1)
+    assert pantalla.convertir_pixel_a_casilla(esquina) == Posicion(10, 10)
+    assert pantalla.convertir_pixel_a_casilla((BOARD_OFFSET_X - 1, BOARD_OFFSET_Y)) is None
+
+
+def test_mapa_calor_solo_para_la_posicion_analizada():
+    """Las candidatas se pintan con el progreso de su posición y no de otra"""
+    pygame.init()
+    superficie = pygame.Surface((800, 600))
+    pantalla = PantallaJuego(superficie)
+    motor = MotorJuego()
+    motor.inicializar_juego(AZUL)
+    estado = motor.obtener_estado_actual()
+    celda = pantalla.tamano_casilla
+
+    class Canal:
+        progreso = ProgresoBusqueda(
+            estado.clave(), 2, {Posicion(1, 1): -5.0, Posicion(4, 2): 7.0}, Posicion(4, 2)
+        )
+
+        def ultimo(self):
+            return self.progreso
+
+    pantalla.canal_progreso = Canal()
+    pantalla.dibujar_tablero(estado)
+    centro_mejor = (BOARD_OFFSET_X + 4 * celda + celda // 2, BOARD_OFFSET_Y + 2 * celda + celda // 2)
+    centro_peor = (BOARD_OFFSET_X + celda + celda // 2, BOARD_OFFSET_Y + celda + celda // 2)
+    vacia = (BOARD_OFFSET_X + 6 * celda + celda // 2, BOARD_OFFSET_Y + 6 * celda + celda // 2)
+    assert superficie.get_at(vacia)[:3] == COLORS["board"]
+    mejor = superficie.get_at(centro_mejor)[:3]
+    peor = superficie.get_at(centro_peor)[:3]
+    assert mejor != COLORS["board"] and peor != COLORS["board"] and mejor != peor
+
+    motor.realizar_movimiento(Posicion(0, 0))
+    pantalla.dibujar_tablero(motor.obtener_estado_actual())
+    assert superficie.get_at(centro_mejor)[:3] == COLORS["board"]
+
+
+def test_estadisticas_profundas_no_tapan_el_boton_pista():
+    """Con muchas profundidades solo se listan las últimas que caben"""
+    pygame.init()
+    superficie = pygame.Surface((800, 600))
+    superficie.fill(COLORS["background"])
+    pantalla = PantallaJuego(superficie)
+    pantalla.mostrar_estadisticas = True
+    pantalla.estadisticas = EstadisticasBusqueda()
+    pantalla.estadisticas.tiempo_por_profundidad = [0.5] * 30
+
+    pantalla.dibujar_estadisticas()
+    boton = pantalla.boton_pista
+    for x in range(boton.left, boton.right):
+        for y in range(boton.top, boton.bottom):
+            assert superficie.get_at((x, y))[:3] == COLORS["background"]
+    # La última línea (la profundidad más reciente) queda justo encima
+    assert any(
+        superficie.get_at((x, y))[:3] != COLORS["background"]
+        for x in range(boton.left, boton.right)
+        for y in range(boton.top - 20, boton.top)
+    )
+
+def test_espectador_redibuja_solo_lo_que_cambio():
+    """Tras el primer dibujo completo solo se tocan los tableros actualizados"""
+    pygame.init()
+    superficie = pygame.Surface((800, 600))
+    espectador = PantallaEspectador(superficie, 64, tamano=7)
+    assert len(espectador.tableros) == 64
+    assert all(superficie.get_rect().contains(t) for t in espectador.tableros)
+    assert espectador.dibujar() == [superficie.get_rect()]
+    assert espectador.dibujar() == []
+
+    celdas = bytearray(49)
+    celdas[10] = 1
+    espectador.actualizar(5, bytes(celdas), 10, -1, latencia_ms=12.0)
+    espectador.actualizar(5, bytes(celdas), 10, -1, latencia_ms=8.0)
+    cambios = espectador.dibujar()
+    tablero = espectador.tableros[5]
+    assert cambios[0] == tablero and len(cambios) == 2  # Tablero y etiqueta
+    assert espectador.latencias[5] == (8.0, 20.0, 2)
+    celda = espectador.celda
+    centro = (tablero.x + 3 * celda + celda // 2, tablero.y + celda + celda // 2)
+    assert superficie.get_at(centro)[:3] == COLORS[AZUL]
+    assert espectador.dibujar() == []
+
+
+def test_espectador_trabajador_publica_cada_jugada():
+    """El trabajador intercala sus partidas y publica cada estado hasta el final"""
+    cola = queue.Queue()
+    dificultades = {AZUL: Dificultad.PRINCIPIANTE, ROJO: Dificultad.NORMAL}
+    espectador.trabajador(cola, threading.Event(), [3, 8], dificultades)
+
+    actualizaciones = []
+    while not cola.empty():
+        actualizaciones.append(cola.get())
+    for partida in (3, 8):
+        propias = [a for a in actualizaciones if a[0] == partida]
+        assert propias[0][4] is None and not any(propias[0][1])  # Tablero inicial
+        fichas = [len(a[1]) - a[1].count(0) for a in propias]
+        assert fichas == list(range(len(propias)))  # Una jugada por actualización
+        assert all(a[4] >= 0 for a in propias[1:])
+        assert propias[-1][5] is not None and all(a[5] is None for a in propias[:-1])
+    # Intercaladas: la segunda partida empieza antes de que termine la primera
+    assert [a[0] for a in actualizaciones[:2]] == [3, 8]
@@ -0,0 +1,217 @@
+import io
+import os
+import time
+
+from core.interfaces import AZUL, ROJO, Dificultad
+from core.estado import GestorEstado
+from core.serializacion import estado_desde_texto
+from ai.estrategias import EstrategiaAleatoria, EstrategiaMinimax
+from core.compacto import MotorCompacto
+from herramientas import etiquetar, fuzzing, perfilado, sprt, tacticas
+from herramientas import partida
+from herramientas.partida import jugar_partida
+from herramientas.protocolo import MotorProtocolo
+
+
+def test_clasificar_funcion_por_fase():
+    """Cada función del proyecto cae en la fase que le corresponde"""
+    assert perfilado.clasificar_funcion("/x/core/interfaces.py", "copiar") == "copia"
+    assert (
+        perfilado.clasificar_funcion("/x/core/estado.py", "obtener_movimientos_validos")
+        == "generacion"
+    )
+    assert perfilado.clasificar_funcion("/x/ai/evaluador.py", "evaluar_estado") == "evaluacion"
+    assert perfilado.clasificar_funcion("/x/ai/estrategias.py", "minimax") == "busqueda"
+    assert perfilado.clasificar_funcion("/x/gui/interfaz.py", "dibujar_tablero") == "render"
+    assert perfilado.clasificar_funcion("~", "<built-in method pygame.display.flip>") == "render"
+
+
+def test_etiqueta_turno():
+    assert perfilado.etiqueta_turno(Dificultad.EXPERTO, 7) == "experto_mov007"
+    assert perfilado.etiqueta_turno(Dificultad.EXPERTO, 7, 2) == "p002_experto_mov007"
+
+
+def test_perfilador_escribe_reportes_anidados(tmp_path):
+    """Una fase anidada produce su propio reporte y una fila en resumen.csv"""
+    perfilador = perfilado.Perfilador(str(tmp_path), "cprofile", sesion="s1")
+    estrategias = {AZUL: EstrategiaMinimax(AZUL, profundidad=2), ROJO: EstrategiaAleatoria(ROJO)}
+
+    with perfilador.perfilar("render"):
+        resultado = jugar_partida(
+            estrategias,
+            AZUL,
+            perfilador,
+            {AZUL: Dificultad.EXPERTO, ROJO: Dificultad.PRINCIPIANTE},
+            numero_partida=1,
+        )
+
+    archivos = os.listdir(tmp_path)
+    for extension in (".txt", ".collapsed", ".prof"):
+        assert "s1_p001_experto_mov001" + extension in archivos
+        assert "s1_render" + extension in archivos
+    assert len(perfilador.filas) == len(resultado.movimientos) + 1
+    with open(tmp_path / "resumen.csv", encoding="utf-8") as archivo:
+        assert archivo.readline().startswith("etiqueta,dificultad,movimiento")
+
+
+def test_jugar_partida_sin_ventana():
+    """Una partida completa entre dos IA termina con un resultado coherente"""
+    estrategias = {AZUL: EstrategiaAleatoria(AZUL), ROJO: EstrategiaAleatoria(ROJO)}
+    resultado = jugar_partida(estrategias, ROJO)
+
+    assert resultado.ganador in (AZUL, ROJO, None)
+    assert len(resultado.movimientos) >= 2
+    assert len(resultado.tiempos[ROJO]) >= len(resultado.tiempos[AZUL])
+
+
+
+def test_partida_main_con_cache(tmp_path, capsys):
+    """El resumen informa las entradas de la caché aunque ya esté cerrada"""
+    partida.main([
+        "--azul", "experto", "--rojo", "principiante", "--partidas", "1",
+        "--tamano", "5", "--cache", str(tmp_path / "cache.db"),
+    ])
+    salida = capsys.readouterr().out
+    assert "Partidas: 1" in salida
+    assert "entradas" in salida.splitlines()[-1]
+
+def _comandos(motor, *lineas):
+    for linea in lineas:
+        motor.procesar(linea)
+
+
+def test_protocolo_posicion_evaluacion_y_busqueda():
+    salida = io.StringIO()
+    motor = MotorProtocolo(salida)
+    _comandos(
+        motor,
+        "uci",
+        "position startpos moves 3,3 0,0",
+        "eval",
+        "go depth 3",
+    )
+    motor.detener_busqueda()  # Espera a que termine la búsqueda
+    _comandos(motor, "position startpos moves 9,9", "bogus")
+
+    lineas = salida.getvalue().splitlines()
+    assert "uciok" in lineas
+    assert "eval 0 azul 4 rojo 4" in lineas
+    assert sum(linea.startswith("info depth") for linea in lineas) == 3
+    mejores = [linea for linea in lineas if linea.startswith("bestmove")]
+    assert mejores == ["bestmove 2,3"]
+    assert lineas[-2] == "error movimiento 9,9: Posición fuera del tablero"
+    assert lineas[-1] == "error comando desconocido: bogus"
+
+
+def test_protocolo_stop_corta_busqueda_infinita():
+    """go infinite busca hasta stop y siempre responde con bestmove"""
+    salida = io.StringIO()
+    motor = MotorProtocolo(salida)
+    _comandos(motor, "position startpos size 9", "go infinite")
+    time.sleep(0.05)
+    _comandos(motor, "stop")
+
+    lineas = salida.getvalue().splitlines()
+    assert lineas[-1].startswith("bestmove ")
+    assert lineas[-1] != "bestmove none"
+    # Las estrategias (y sus tablas) se conservan para la siguiente orden
+    assert motor.estrategias[AZUL].tabla
+
+
+class _EstrategiaRota:
+    def buscar(self, *argumentos):
+        raise RuntimeError("tabla corrupta")
+
+
+def test_protocolo_busqueda_fallida_responde_bestmove():
+    """Una excepción en el hilo de búsqueda no deja al cliente esperando"""
+    salida = io.StringIO()
+    motor = MotorProtocolo(salida)
+    motor.estrategias[AZUL] = _EstrategiaRota()
+    _comandos(motor, "position startpos", "go depth 3")
+    motor.detener_busqueda()
+
+    lineas = salida.getvalue().splitlines()
+    assert lineas == ["info string error tabla corrupta", "bestmove none"]
+
+
+def test_etiquetar_posiciones_en_lote(capsys):
+    etiquetar.main(["--aleatorias", "5", "--vacias", "10", "20", "--nodos", "20000"])
+    lineas = capsys.readouterr().out.splitlines()
+    assert len(lineas) == 5
+    for linea in lineas:
+        texto, etiqueta, jugada, nodos = linea.split("\t")
+        assert etiqueta in ("gana", "pierde", "empate", "?")
+        assert (jugada != "-") == (etiqueta == "gana")
+        assert int(nodos) >= 1
+
+
+def test_suite_tactica_y_corrida_con_presupuesto():
+    """La suite trae los tres tipos con jugadas legales, y experto resuelve los finales"""
+    suite = tacticas.cargar_suite()
+    assert {p.tipo for p in suite} == set(tacticas.TIPOS)
+    for posicion in suite:
+        estado = estado_desde_texto(posicion.notacion)
+        legales = GestorEstado.obtener_movimientos_validos(estado, estado.turno)
+        assert posicion.mejores and set(posicion.mejores) < set(legales)
+
+    regiones = [p for p in suite if p.tipo == "regiones"][:3]
+    resultados = [
+        tacticas.correr_posicion(p, "experto", segundos=None, nodos=5_000) for p in regiones
+    ]
+    assert all(r.resuelta for r in resultados)
+    assert all(r.nodos_solucion <= r.nodos and r.segundos_solucion <= r.segundos
+               for r in resultados)
+    resumen = tacticas.resumir(resultados)
+    assert resumen["total"]["resueltas"] == 3
+    assert resumen["por_tipo"]["regiones"]["posiciones"] == 3
+
+
+def test_sprt_llr_y_decision():
+    """El LLR crece con pares ganados, y un motor mucho más fuerte acepta H1"""
+    assert sprt.llr_pares([0.5] * 20, 0, 10) < 0 < sprt.llr_pares([1.0] * 20, 0, 10)
+    assert sprt.llr_pares([0.75, 0.5] * 10, 0, 10) > sprt.llr_pares([0.75, 0.5] * 5, 0, 10)
+    assert sprt.parsear_configuracion("minimax:profundidad=2,extender_forzadas=False") == (
+        "minimax", {"profundidad": 2, "extender_forzadas": False}
+    )
+
+    informados = []
+    resultado = sprt.sprt(
+        ("aleatoria", {}), ("minimax", {"profundidad": 2}), elo0=0, elo1=50,
+        max_pares=200, informar=informados.append,
+    )
+    assert resultado.decision == sprt.ACEPTA_H1
+    assert resultado.pares >= 10 and len(resultado.traza) == resultado.pares
+    assert resultado.victorias + resultado.empates + resultado.derrotas == 2 * resultado.pares
+    assert resultado.traza[-1] >= sprt.limites(0.05, 0.05)[1]
+    assert len(informados) == resultado.pares
+
+
+def test_fuzzing_motor_compacto_coincide_con_referencia():
+    """Secuencias al azar y adversarias: mismas jugadas, tableros y veredictos"""
+    resumen = fuzzing.fuzz(300, semilla=1)
+    assert resumen.fallas == []
+    assert resumen.jugadas < resumen.intentos  # Hubo intentos inválidos
+
+
+class _MotorSinEmpates(MotorCompacto):
+    """Error sembrado: el tablero lleno parejo lo gana quien movió último"""
+
+    def jugar(self, casilla):
+        deshacer = super().jugar(casilla)
+        if deshacer is not None and self.terminado:
+            self.ganador = self.turno
+        return deshacer
+
+
+def test_fuzzing_detecta_y_reduce_discrepancias():
+    resumen = fuzzing.fuzz(200, semilla=2, optimizado=_MotorSinEmpates, tamanos=(2, 4))
+    assert resumen.fallas
+    falla = resumen.fallas[0]
+    assert falla.discrepancia.aspecto == "fin"
+
+    minima = fuzzing.reducir(falla.configuracion, falla.secuencia, _MotorSinEmpates)
+    assert len(minima) <= len(falla.secuencia)
+    # Solo quedan las jugadas que llenan el tablero: ningún intento sobra
+    assert len(minima) == falla.configuracion.tamano ** 2
+    assert fuzzing.comparar(falla.configuracion, minima, _MotorSinEmpates) is not None
@@ -0,0 +1,252 @@
+import asyncio
+import json
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core.interfaces import AZUL, Posicion
+from core.estado import GestorEstado
+from core.serializacion import estado_desde_texto
+from servidor import analisis
+from servidor.analisis import ServicioAnalisis, posiciones_de_prueba, servir
+from servidor.carga import ejecutar_carga
+from servidor.metricas import RegistroLatencias, percentil
+from servidor.partidas import ServidorPartidas
+
+
+async def _con_servidor(prueba, **opciones):
+    """Levanta un servidor en un puerto libre, ejecuta `prueba` y lo cierra"""
+    servidor = ServidorPartidas(puerto=0, **opciones)
+    await servidor.iniciar()
+    try:
+        return await prueba(servidor)
+    finally:
+        await servidor.cerrar()
+
+
+async def _peticion(lector, escritor, mensaje):
+    escritor.write(json.dumps(mensaje).encode() + b"\n")
+    await escritor.drain()
+    return json.loads(await lector.readline())
+
+
+def test_partida_completa_por_protocolo():
+    """Un cliente juega una partida entera contra la IA principiante"""
+
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        respuesta = await _peticion(
+            lector, escritor, {"tipo": "nueva", "dificultad": "principiante"}
+        )
+        assert respuesta["tipo"] == "estado" and respuesta["ia"] is None
+
+        error = await _peticion(lector, escritor, {"tipo": "mover", "x": 99, "y": 0})
+        assert error == {
+            "tipo": "error", "codigo": "invalido", "mensaje": "Posición fuera del tablero"
+        }
+
+        turnos = 0
+        while not respuesta["terminado"]:
+            estado = estado_desde_texto(respuesta["estado"])
+            pos = GestorEstado.obtener_movimientos_validos(estado, AZUL)[0]
+            respuesta = await _peticion(
+                lector, escritor, {"tipo": "mover", "x": pos.x, "y": pos.y}
+            )
+            assert respuesta["tipo"] == "estado"
+            turnos += 1
+
+        metricas = await _peticion(lector, escritor, {"tipo": "metricas"})
+        escritor.close()
+        return turnos, metricas
+
+    turnos, metricas = asyncio.run(_con_servidor(prueba, procesos=1))
+    assert turnos > 0
+    assert metricas["latencias_ia"]["principiante"]["n"] >= turnos - 1
+
+
+def test_servidor_ocupado_no_modifica_la_partida():
+    """Sin hueco para turnos de IA, la jugada se rechaza y puede reintentarse"""
+
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        inicial = await _peticion(lector, escritor, {"tipo": "nueva"})
+        respuesta = await _peticion(lector, escritor, {"tipo": "mover", "x": 3, "y": 3})
+        escritor.close()
+        return inicial, respuesta
+
+    inicial, respuesta = asyncio.run(
+        _con_servidor(prueba, max_cola=0, ejecutor=ThreadPoolExecutor(1))
+    )
+    assert respuesta["codigo"] == "ocupado"
+    assert estado_desde_texto(inicial["estado"]).fichas_colocadas() == 0
+
+
+def test_nueva_partida_rechaza_tamanos_fuera_de_rango():
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        respuestas = [
+            await _peticion(lector, escritor, {"tipo": "nueva", "tamano": tamano})
+            for tamano in (1, 10_000, 5)
+        ]
+        escritor.close()
+        return respuestas
+
+    demasiado_chico, demasiado_grande, valido = asyncio.run(
+        _con_servidor(prueba, ejecutor=ThreadPoolExecutor(1))
+    )
+    assert demasiado_chico["codigo"] == demasiado_grande["codigo"] == "invalido"
+    assert "entre 2 y 15" in demasiado_grande["mensaje"]
+    assert valido["tipo"] == "estado"
+
+
+def test_nueva_partida_rechaza_envolvente_no_booleano():
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        respuestas = [
+            await _peticion(lector, escritor, {"tipo": "nueva", "envolvente": envolvente})
+            for envolvente in ("false", 0, None, False)
+        ]
+        escritor.close()
+        return respuestas
+
+    *invalidas, acotada = asyncio.run(_con_servidor(prueba, ejecutor=ThreadPoolExecutor(1)))
+    assert all(respuesta["codigo"] == "invalido" for respuesta in invalidas)
+    assert "envolvente" in invalidas[0]["mensaje"]
+    assert acotada["estado"].endswith(" acotado")
+
+
+def test_turno_ia_agotado_juega_movimiento_valido():
+    """Si la IA supera el límite de tiempo se juega un movimiento aleatorio"""
+
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        await _peticion(lector, escritor, {"tipo": "nueva", "dificultad": "experto"})
+        respuesta = await _peticion(lector, escritor, {"tipo": "mover", "x": 3, "y": 3})
+        escritor.close()
+        return respuesta
+
+    respuesta = asyncio.run(
+        _con_servidor(prueba, limite_turno_ia=0.0, ejecutor=ThreadPoolExecutor(1))
+    )
+    assert respuesta["ia"]["agotado"]
+    estado = estado_desde_texto(respuesta["estado"])
+    assert estado.cabeza_roja == Posicion(respuesta["ia"]["x"], respuesta["ia"]["y"])
+
+
+def test_espera_de_proceso_libre_cuenta_en_el_limite_del_turno():
+    """Con el pool saturado el turno se agota a tiempo en vez de esperar"""
+
+    async def prueba(servidor):
+        await servidor._trabajadores.acquire()  # El único proceso, ocupado
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        await _peticion(lector, escritor, {"tipo": "nueva", "dificultad": "experto"})
+        respuesta = await asyncio.wait_for(
+            _peticion(lector, escritor, {"tipo": "mover", "x": 3, "y": 3}), 5
+        )
+        escritor.close()
+        return respuesta
+
+    respuesta = asyncio.run(_con_servidor(
+        prueba, procesos=1, limite_turno_ia=0.1, ejecutor=ThreadPoolExecutor(1)
+    ))
+    assert respuesta["ia"]["agotado"]
+
+
+class _EjecutorRoto(Executor):
+    def submit(self, funcion, *args, **kwargs):
+        futuro = Future()
+        futuro.set_exception(BrokenProcessPool("un proceso del pool murió"))
+        return futuro
+
+
+def test_falla_del_pool_responde_error_y_conserva_la_partida():
+    async def prueba(servidor):
+        lector, escritor = await asyncio.open_connection(servidor.host, servidor.puerto)
+        await _peticion(lector, escritor, {"tipo": "nueva"})
+        error = await _peticion(lector, escritor, {"tipo": "mover", "x": 3, "y": 3})
+        servidor.ejecutor = ThreadPoolExecutor(1)
+        reintento = await _peticion(lector, escritor, {"tipo": "mover", "x": 3, "y": 3})
+        escritor.close()
+        return error, reintento
+
+    error, reintento = asyncio.run(
+        _con_servidor(prueba, ejecutor=_EjecutorRoto())
+    )
+    assert error["codigo"] == "interno"
+    assert reintento["tipo"] == "estado"
+    assert estado_desde_texto(reintento["estado"]).fichas_colocadas() == 2
+
+
+def test_carga_reporta_percentiles_por_dificultad():
+    async def prueba(servidor):
+        return await ejecutar_carga(servidor.host, servidor.puerto, clientes=6, semilla=1)
+
+    resultado = asyncio.run(_con_servidor(prueba, procesos=2, entradas_compartida=1 << 14))
+    resumen = resultado.latencias.resumen()
+    assert set(resumen) == {"principiante", "normal", "experto"}
+    assert resultado.partidas == 6
+    assert all(fila["p50"] <= fila["p99"] <= fila["max"] for fila in resumen.values())
+
+
+def test_percentiles():
+    assert percentil([], 50) == 0.0
+    assert percentil(list(range(1, 101)), 50) == 50
+    assert percentil(list(range(1, 101)), 99) == 99
+
+    registro = RegistroLatencias()
+    for ms in (1, 2, 3, 4):
+        registro.registrar("normal", ms / 1000)
+    assert registro.resumen()["normal"]["max"] == 4.0
+
+
+def test_servicio_analisis_agrupa_peticiones_concurrentes():
+    """Peticiones simultáneas se responden en pocos lotes"""
+    posiciones = posiciones_de_prueba(200)
+
+    async def prueba():
+        servicio = ServicioAnalisis(max_lote=64, espera_maxima=0.05)
+        await servicio.iniciar()
+        valores = await asyncio.gather(*(servicio.evaluar(e) for e in posiciones))
+        pistas = await asyncio.gather(*(servicio.sugerir(e) for e in posiciones[:50]))
+        await servicio.cerrar()
+        return servicio.metricas(), valores, pistas
+
+    metricas, valores, pistas = asyncio.run(prueba())
+    assert metricas["peticiones"] == 250
+    assert metricas["lotes"] <= 6
+    assert metricas["latencias"]["cola"]["n"] == 250
+    assert all(isinstance(v, float) for v in valores)
+    for estado, (movimiento, _) in zip(posiciones, pistas):
+        opciones = GestorEstado.obtener_movimientos_validos(estado, estado.turno)
+        assert movimiento in opciones or (movimiento is None and not opciones)
+
+
+def test_frontal_analisis_responde_aunque_falle_el_lote(monkeypatch):
+    """Un lote que falla responde error con su id; JSON inválido también se responde"""
+
+    def evaluar_roto(estados):
+        raise RuntimeError("lote roto")
+
+    monkeypatch.setattr(analisis, "evaluar_lote", evaluar_roto)
+    texto = "7/7/3A3/7/7/1R5/7 A"
+
+    async def prueba():
+        servicio = ServicioAnalisis(max_lote=4, espera_maxima=0.01)
+        await servicio.iniciar()
+        servidor = await servir(servicio, "127.0.0.1", 0, max_en_curso=1)
+        puerto = servidor.sockets[0].getsockname()[1]
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        lineas = [
+            json.dumps({"id": i, "tipo": "evaluar", "estado": texto}) for i in (1, 2)
+        ] + ["{no es json"]
+        escritor.write("\n".join(lineas).encode() + b"\n")
+        await escritor.drain()
+        respuestas = [json.loads(await lector.readline()) for _ in lineas]
+        escritor.close()
+        servidor.close()
+        await servidor.wait_closed()
+        await servicio.cerrar()
+        return respuestas
+
+    respuestas = asyncio.run(asyncio.wait_for(prueba(), 10))
+    tipos = {respuesta.get("id"): respuesta["tipo"] for respuesta in respuestas}
+    assert tipos == {1: "error", 2: "error", None: "error"}